@@ -8,35 +8,264 @@
                     повертає назву біржі та суму, яку отримаємо після обміну.
     2. /getRates  - повертає котирування для заданої пари (baseCurrency/quoteCurrency)
                     з усіх підтримуваних бірж.
+Та їхні пакетні версії /estimateBatch і /getRatesBatch для багатьох пар за один запит.
+GET /getRates віддає готовий знімок відповіді (services/rate_snapshots.py) з ETag і відповідає 304
+на If-None-Match, якщо курси пари не змінилися.
+Якщо вигідніше обміняти через проміжні активи (наприклад, SOL -> USDT -> BTC), /estimate
+повертає багатокроковий маршрут.
+Спреди між біржами для всіх пар повертає /spreads.
+Історію котирувань (свічки OHLC, TWAP/VWAP, історію спреду) повертають ендпоінти /history/*
+зі стрічки котирувань на диску (services/quote_tape.py).
+Оновлення курсів також можна отримувати потоком через WebSocket (/ws/rates) або SSE (/streamRates).
 
 Архітектура побудована таким чином, що для кожної біржі реалізовано клас, який має
 метод get_latest_price для отримання останньої ціни. Додаток агрегує дані з усіх бірж.
+
+У багатопроцесному режимі (QUOTE_SOURCE=shared, див. serve.py) з біржами працює лише процес
+збору даних, а цей додаток читає котирування з таблиці у спільній пам'яті, а ефективний курс
+(/estimate, маршрути) запитує в процесу збору даних (exchanges/shared.py).
+
+Біржі створюються та підключаються у фоні після старту додатку, тож сервер приймає запити одразу
+й відповідає даними тих бірж, які вже готові. Стан бірж повертає ендпоінт /ready.
+Метрики (затримки, помилки, вік котирувань, черги запитів) у форматі Prometheus повертає /metrics.
+
+Біржі та пари з відкритим запобіжником (exchanges/health.py) пропускаються одразу, без очікування
+на біржу, тож збій однієї біржі не збільшує затримку відповідей.
 """
 
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
+from typing import List
 import asyncio
+import os
+import time
+
+import metrics
+
+from exchanges.health import CLOSED, HALF_OPEN, HEALTH_SLOW_CALL, OPEN, PairError, Throttled
+from exchanges.quote_store import Quote, quote_store
+from exchanges.registry import EXCHANGE_NAMES, create_exchange
+from exchanges.shared import SharedQuoteExchange, mirror_quotes
+from exchanges.shared_table import SharedQuoteTable
+from exchanges.singleflight import SingleFlight, pair_key
+from logs import configure_logging, get_logger
+from services.rate_snapshots import RateSnapshots, etag_matches
+from services.rate_stream import RateBroadcaster, Subscriber, error_message, normalize_pair, parse_subscription
+from services.quote_tape import QUOTE_TAPE_ENABLED, ohlc, quote_tape, spread_history, twap, vwap
+from services.routing import RouteGraph
+from services.spread_scanner import SpreadScanner
+
+configure_logging()
+logger = get_logger("api")
+
+# Бюджет часу на один запит до API та на одну біржу (секунди)
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "3"))
+EXCHANGE_TIMEOUT = float(os.getenv("EXCHANGE_TIMEOUT", "2"))
+# Чи надсилати дублікат запиту до біржі, що відповідає довше за свій p95
+HEDGE_REQUESTS = os.getenv("HEDGE_REQUESTS", "1") == "1"
+# Максимальна кількість елементів у пакетному запиті
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "100"))
+# Інтервал keep-alive повідомлень потоку SSE (секунди)
+SSE_KEEPALIVE_INTERVAL = 15
+# Скільки найкращих за поточними цінами маршрутів перераховувати з урахуванням глибини ринку
+ROUTE_CANDIDATES = int(os.getenv("ROUTE_CANDIDATES", "3"))
+# Джерело котирувань: "local" - біржі в цьому процесі, "shared" - таблиця у спільній пам'яті
+QUOTE_SOURCE = os.getenv("QUOTE_SOURCE", "local")
+# Інтервал опитування таблиці котирувань у режимі "shared" (секунди)
+QUOTE_TABLE_POLL_INTERVAL = float(os.getenv("QUOTE_TABLE_POLL_INTERVAL", "0.05"))
+# Вікно запитів історії за замовчуванням та максимальна кількість точок у відповіді
+HISTORY_DEFAULT_WINDOW = float(os.getenv("HISTORY_DEFAULT_WINDOW", "3600"))
+MAX_HISTORY_POINTS = int(os.getenv("MAX_HISTORY_POINTS", "10000"))
+
+# Статуси отримання котирування з біржі
+STATUS_OK = "ok"
+STATUS_NO_DATA = "no_data"
+STATUS_TIMEOUT = "timeout"
+STATUS_ERROR = "error"
+# Біржу або пару пропущено: відкритий запобіжник
+STATUS_UNAVAILABLE = "unavailable"
+# Біржа відповіла про перевищення ліміту запитів
+STATUS_RATE_LIMITED = "rate_limited"
+
+# Стани запуску бірж (для /ready)
+VENUE_STARTING = "starting"
+VENUE_WARMING = "warming"
+VENUE_READY = "ready"
+VENUE_FAILED = "failed"
+
+# Таблиця котирувань процесу збору даних (лише в режимі "shared")
+quote_table = SharedQuoteTable() if QUOTE_SOURCE == "shared" else None
+
+# Запущені біржі в порядку EXCHANGE_NAMES; список заповнюється у фоні під час старту
+exchanges = []
+exchanges_by_name = {}
+# Біржі, запуск яких завершився помилкою
+failed_exchanges = set()
+
+# Розсилка оновлень курсів підписаним клієнтам
+broadcaster = RateBroadcaster(EXCHANGE_NAMES)
+
+# Граф обміну між активами для багатокрокових маршрутів; пари бірж (зокрема пули Uniswap з реєстру)
+# додаються з першим котируванням у сховищі
+route_graph = RouteGraph(EXCHANGE_NAMES)
+
+# Сканер спредів між біржами
+spread_scanner = SpreadScanner(EXCHANGE_NAMES)
+
+
+def build_exchange(name: str):
+    """
+    Створює адаптер біржі: власний (режим "local") або читання таблиці котирувань (режим "shared").
+    """
+    if quote_table is not None:
+        return SharedQuoteExchange(name, quote_table)
+    return create_exchange(name)
+
+
+async def start_exchange(name: str):
+    """
+    Створює та запускає біржу у фоні й додає її до списку exchanges.
+
+    Створення адаптера (імпорт ccxt/web3, читання ABI) виконується в окремому потоці,
+    щоб не блокувати цикл подій. Помилка запуску однієї біржі не впливає на інші.
+    """
+    try:
+        exchange = await asyncio.to_thread(build_exchange, name)
+        await exchange.start()
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error("[%s] Помилка запуску біржі: %s", name, e)
+        failed_exchanges.add(name)
+        return
+    exchanges_by_name[name] = exchange
+    exchanges[:] = [exchanges_by_name[n] for n in EXCHANGE_NAMES if n in exchanges_by_name]
+
+
+def venue_status(name: str) -> str:
+    """Стан запуску біржі: starting, warming (запущена, але ще без даних), ready або failed."""
+    if name in failed_exchanges:
+        return VENUE_FAILED
+    exchange = exchanges_by_name.get(name)
+    if exchange is None:
+        return VENUE_STARTING
+    return VENUE_READY if exchange.is_warm() else VENUE_WARMING
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Життєвий цикл FastAPI додатку.
+
+    Під час старту запускає всі біржі у фоні (відкриття з'єднань, фонові задачі) і не чекає
+    на них, тож додаток одразу приймає запити. Під час зупинки закриває запущені біржі,
+    звільняючи HTTP-сесії та пули з'єднань.
+    У режимі "shared" також запускається перенесення котирувань з таблиці, а в режимі "local" -
+    запис котирувань у стрічку (у режимі "shared" її записує процес збору даних).
+    """
+    broadcaster.start()
+    rate_snapshots.start()
+    route_graph.start()
+    spread_scanner.start()
+    startup_tasks = [asyncio.create_task(start_exchange(name)) for name in EXCHANGE_NAMES]
+    mirror_task = None
+    if quote_table is not None:
+        mirror_task = asyncio.create_task(mirror_quotes(quote_table, quote_store, QUOTE_TABLE_POLL_INTERVAL))
+    record_tape = QUOTE_TAPE_ENABLED and quote_table is None
+    if record_tape:
+        quote_tape.start()
+    try:
+        yield
+    finally:
+        for task in startup_tasks:
+            task.cancel()
+        await asyncio.gather(*startup_tasks, return_exceptions=True)
+        if mirror_task is not None:
+            mirror_task.cancel()
+        broadcaster.stop()
+        rate_snapshots.stop()
+        route_graph.stop()
+        spread_scanner.stop()
+        await asyncio.gather(*(exchange.close() for exchange in exchanges), return_exceptions=True)
+        await asyncio.gather(*(exchange.health.close() for exchange in exchanges), return_exceptions=True)
+        if record_tape:
+            await quote_tape.stop()
 
-# Імпортуємо класи бірж
-from exchanges.binance import BinanceExchange
-from exchanges.kucoin import KuCoinExchange
-from exchanges.uniswap import UniswapExchange
-from exchanges.raydium import RaydiumExchange
-from exchanges.gate import GateExchange
 
 # Ініціалізація FastAPI додатку
-app = FastAPI(title="Crypto Exchange API", version="1.0")
+app = FastAPI(title="Crypto Exchange API", version="1.0", lifespan=lifespan)
 
-# Ініціалізація об'єктів бірж
-binance = BinanceExchange()
-kucoin = KuCoinExchange()
-gate = GateExchange()
-uniswap = UniswapExchange()
-raydium = RaydiumExchange()
+# Запити fetch_prices, що виконуються, за канонічним ключем пари
+inflight_prices = SingleFlight()
 
-# Об'єднуємо всі біржі в один список для подальшої обробки
-exchanges = [binance, kucoin, gate, uniswap, raydium]
+
+def _inflight_requests():
+    """Кількість спільних запитів, що виконуються: API (fetch_prices) та кожної біржі (для /metrics)."""
+    sizes = {("api",): len(inflight_prices)}
+    for exchange in exchanges:
+        sizes[(exchange.name,)] = len(exchange.inflight)
+    return sizes
+
+
+def _rate_limiter_queues():
+    """Кількість запитів у черзі планувальника запитів кожної біржі (для /metrics)."""
+    return {
+        (exchange.name,): exchange.rate_limiter.queued
+        for exchange in exchanges
+        if getattr(exchange, "rate_limiter", None) is not None
+    }
+
+
+def _quote_staleness():
+    """Вік найсвіжішого котирування кожної біржі у сховищі котирувань (для /metrics)."""
+    now = time.time()
+    return {(name,): now - timestamp for name, timestamp in quote_store.latest_timestamps().items()}
+
+
+def _venue_states():
+    """Стан запуску кожної біржі: 1 для поточного стану (для /metrics)."""
+    return {
+        (name, state): 1 if venue_status(name) == state else 0
+        for name in EXCHANGE_NAMES
+        for state in (VENUE_STARTING, VENUE_WARMING, VENUE_READY, VENUE_FAILED)
+    }
+
+
+metrics.Gauge("inflight_requests", "Кількість спільних запитів, що виконуються", ("scope",), collect=_inflight_requests)
+metrics.Gauge(
+    "rate_limiter_queued_requests", "Кількість запитів у черзі планувальника біржі", ("exchange",),
+    collect=_rate_limiter_queues,
+)
+metrics.Gauge(
+    "quote_staleness_seconds", "Вік найсвіжішого котирування біржі у сховищі", ("exchange",),
+    collect=_quote_staleness,
+)
+metrics.Gauge("exchange_state", "Стан запуску біржі", ("exchange", "state"), collect=_venue_states)
+
+
+def _circuit_states():
+    """Стан запобіжника кожної біржі: 0 - closed, 1 - half_open, 2 - open (для /metrics)."""
+    codes = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+    return {(exchange.name,): codes[exchange.health.venue.state] for exchange in exchanges}
+
+
+def _open_pair_circuits():
+    """Кількість пар з відкритим запобіжником на кожній біржі (для /metrics)."""
+    return {(exchange.name,): exchange.health.open_pairs() for exchange in exchanges}
+
+
+metrics.Gauge(
+    "circuit_breaker_state", "Стан запобіжника біржі (0 - closed, 1 - half_open, 2 - open)", ("exchange",),
+    collect=_circuit_states,
+)
+metrics.Gauge(
+    "circuit_breaker_open_pairs", "Кількість пар біржі з відкритим запобіжником", ("exchange",),
+    collect=_open_pair_circuits,
+)
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -68,50 +297,352 @@ class GetRatesRequest(BaseModel):
     quoteCurrency: str
 
 
+class EstimateBatchRequest(BaseModel):
+    """
+    Модель запиту для ендпоінту /estimateBatch.
+
+    Атрибути:
+        requests: Список запитів обміну (див. EstimateRequest).
+    """
+    requests: List[EstimateRequest]
+
+
+class GetRatesBatchRequest(BaseModel):
+    """
+    Модель запиту для ендпоінту /getRatesBatch.
+
+    Атрибути:
+        pairs: Список пар валют (див. GetRatesRequest).
+    """
+    pairs: List[GetRatesRequest]
+
+
+async def await_quote(exchange, coro, base: str, quote: str, timeout: float, method: str = "get_shared_quote"):
+    """
+    Очікує котирування з однієї біржі з обмеженням часу.
+
+    Якщо запобіжник біржі або пари відкритий, корутина не виконується і одразу повертається
+    STATUS_UNAVAILABLE. Результат запиту записується в облік стану біржі (exchange.health):
+    помилка, перевищення часу або повільна відповідь вважаються збоєм біржі, помилка пари
+    (PairError) та повільна відповідь без даних - збоєм лише для пари, а відповідь про ліміт
+    запитів (Throttled) не записується (STATUS_RATE_LIMITED).
+
+    Параметри:
+        exchange: Об'єкт біржі.
+        coro: Корутина, що повертає котирування (Quote) або None.
+        base (str): Базова валюта.
+        quote (str): Валюта котирування.
+        timeout (float): Максимальний час очікування (секунди).
+        method (str): Назва методу біржі для метрик.
+
+    Повертає:
+        Кортеж (котирування, статус), де статус - один з STATUS_OK, STATUS_NO_DATA,
+        STATUS_TIMEOUT, STATUS_ERROR, STATUS_UNAVAILABLE або STATUS_RATE_LIMITED.
+    """
+    if not exchange.health.allow(base, quote):
+        coro.close()
+        metrics.QUOTE_REQUESTS.inc(exchange.name, method, STATUS_UNAVAILABLE)
+        return None, STATUS_UNAVAILABLE
+    started = time.perf_counter()
+    pair_only = False
+    try:
+        result = await asyncio.wait_for(coro, timeout=max(timeout, 0))
+    except asyncio.TimeoutError:
+        logger.warning("[%s] Перевищено час очікування для %s/%s", exchange.name, base, quote)
+        status = STATUS_TIMEOUT
+        result = None
+    except Throttled as e:
+        logger.info("[%s] Ліміт запитів біржі для %s/%s: %s", exchange.name, base, quote, e)
+        status = STATUS_RATE_LIMITED
+        result = None
+    except PairError as e:
+        logger.warning("[%s] Біржа відхилила пару %s/%s: %s", exchange.name, base, quote, e)
+        status = STATUS_ERROR
+        pair_only = True
+        result = None
+    except Exception as e:
+        logger.warning("[%s] Помилка отримання котирування для %s/%s: %s", exchange.name, base, quote, e)
+        status = STATUS_ERROR
+        result = None
+    else:
+        status = STATUS_OK if result is not None else STATUS_NO_DATA
+    elapsed = time.perf_counter() - started
+    slow = elapsed > HEALTH_SLOW_CALL
+    if status == STATUS_RATE_LIMITED:
+        # Ліміт запитів - не збій біржі: планувальник уже призупинено на час паузи
+        pass
+    elif status == STATUS_NO_DATA:
+        # Швидка відповідь без даних (біржа не торгує парою) не є збоєм
+        if slow:
+            exchange.health.record(base, quote, True, venue=False)
+    elif pair_only:
+        exchange.health.record(base, quote, True, venue=False)
+    else:
+        exchange.health.record(base, quote, status != STATUS_OK or slow)
+    metrics.QUOTE_DURATION.observe(exchange.name, method, value=elapsed)
+    metrics.QUOTE_REQUESTS.inc(exchange.name, method, status)
+    if result is not None:
+        metrics.QUOTE_AGE.observe(exchange.name, value=max(result.age, 0.0))
+    return result, status
+
+
+async def fetch_quote(exchange, base: str, quote: str, timeout: float):
+    """
+    Асинхронна функція для отримання котирування з однієї біржі з обмеженням часу.
+    Повертає кортеж (котирування, статус), див. await_quote.
+    """
+    return await await_quote(exchange, exchange.get_shared_quote(base, quote, HEDGE_REQUESTS), base, quote, timeout)
+
+
+async def _fetch_all_quotes(base: str, quote: str):
+    """
+    Отримує котирування пари base/quote з усіх бірж одночасно.
+    """
+    timeout = min(EXCHANGE_TIMEOUT, REQUEST_TIMEOUT)
+    # Створюємо список завдань для отримання котирувань з кожної біржі
+    tasks = [fetch_quote(exchange, base, quote, timeout) for exchange in exchanges]
+    results = await asyncio.gather(*tasks)
+    return [(ex.name, result, status) for ex, (result, status) in zip(exchanges, results)]
+
+
 async def fetch_prices(base: str, quote: str):
     """
     Асинхронна функція для отримання котирувань з усіх бірж.
 
+    Ціни централізованих бірж читаються зі сховища котирувань, яке оновлюється у фоні;
+    запит до біржі виконується лише тоді, коли дані у сховищі застаріли.
+
+    Кожна біржа має власний бюджет часу (EXCHANGE_TIMEOUT), обмежений загальним бюджетом
+    запиту (REQUEST_TIMEOUT). Біржі, що не вклалися в бюджет, позначаються статусом
+    STATUS_TIMEOUT, а результати інших бірж повертаються як зазвичай.
+
+    Одночасні виклики для однієї пари (та зворотної до неї) об'єднуються в один обхід бірж.
+
     Параметри:
         base (str): Базова валюта.
         quote (str): Валюта котирування.
 
     Повертає:
-        Список кортежів (назва_біржі, ціна) для кожної біржі.
+        Список кортежів (назва_біржі, котирування, статус) для кожної біржі,
+        де котирування - об'єкт Quote (ціна та час отримання) або None.
     """
-    # Створюємо список завдань для отримання котирувань з кожної біржі
-    tasks = [exchange.get_latest_price(base, quote) for exchange in exchanges]
-    prices = await asyncio.gather(*tasks)
-    return list(zip([ex.name for ex in exchanges], prices))
+    (canonical_base, canonical_quote), inverted = pair_key(base, quote)
+    results = await inflight_prices.do(
+        (canonical_base, canonical_quote),
+        lambda: _fetch_all_quotes(canonical_base, canonical_quote),
+    )
+    if not inverted:
+        return results
+    return [(name, result.inverted() if result else None, status) for name, result, status in results]
 
 
-async def estimate(input_amount: float, input_currency: str, output_currency: str):
+async def fetch_prices_batch(pairs):
     """
-    Асинхронна функція для визначення найбільш вигідного обміну.
+    Асинхронна функція для отримання котирувань з усіх бірж для багатьох пар одночасно.
+
+    Пари дедуплікуються: однакові пари та зворотні до них отримуються одним обходом бірж,
+    тож на кожну (біржу, пару) припадає не більше одного запиту на весь пакет.
+
+    Параметри:
+        pairs: Список кортежів (base, quote).
+
+    Повертає:
+        Словник {(BASE, QUOTE): результат fetch_prices} для кожної запитаної пари.
+    """
+    unique = {}
+    for base, quote in pairs:
+        key, _ = pair_key(base, quote)
+        unique.setdefault(key, None)
+    fetched = await asyncio.gather(*(fetch_prices(base, quote) for base, quote in unique))
+    canonical_results = dict(zip(unique, fetched))
+
+    results = {}
+    for base, quote in pairs:
+        key, inverted = pair_key(base, quote)
+        canonical = canonical_results[key]
+        if inverted:
+            canonical = [(name, result.inverted() if result else None, status) for name, result, status in canonical]
+        results[(base.upper(), quote.upper())] = canonical
+    return results
+
+
+def select_best(input_amount: float, results):
+    """
+    Визначає найбільш вигідний обмін за котируваннями бірж.
 
     Параметри:
         input_amount (float): Сума, яку користувач хоче обміняти.
-        input_currency (str): Валюта, яку користувач хоче обміняти.
-        output_currency (str): Валюта, яку користувач хоче отримати.
+        results: Результат fetch_prices.
 
     Повертає:
-        Кортеж (best_exchange, best_output_amount), де:
+        Кортеж (best_exchange, best_output_amount, best_quote), де:
             best_exchange - назва біржі, що дає найкращий курс,
-            best_output_amount - сума, яку отримаємо після обміну.
+            best_output_amount - сума, яку отримаємо після обміну,
+            best_quote - котирування (Quote), на основі якого виконано розрахунок.
     """
     best_exchange = None
     best_output_amount = -1
-    # Отримуємо котирування з усіх бірж
-    results = await fetch_prices(input_currency, output_currency)
+    best_quote = None
     # Проходимо по результатах і знаходимо найвигідніший обмін
-    for name, price in results:
-        if price is None:
+    for name, quote, _ in results:
+        if quote is None:
             continue
-        output_amount = input_amount * price
+        output_amount = input_amount * quote.price
         if output_amount > best_output_amount:
             best_output_amount = output_amount
             best_exchange = name
-    return best_exchange, best_output_amount
+            best_quote = quote
+    return best_exchange, best_output_amount, best_quote
+
+
+def format_rates(results, age: bool = True):
+    """
+    Формує відповідь /getRates з результату fetch_prices. Якщо age=False, вік котирувань
+    не додається (відповідь залежить лише від курсів і може кешуватися, див. GET /getRates).
+    """
+    response = []
+    for name, quote, status in results:
+        if status == STATUS_TIMEOUT:
+            response.append({"exchangeName": name, "error": "Перевищено час очікування", "status": status})
+        elif status == STATUS_UNAVAILABLE:
+            response.append({"exchangeName": name, "error": "Біржа тимчасово недоступна", "status": status})
+        elif status == STATUS_RATE_LIMITED:
+            response.append({"exchangeName": name, "error": "Перевищено ліміт запитів біржі", "status": status})
+        elif quote is None:
+            response.append({"exchangeName": name, "error": "Немає даних", "status": status})
+        elif age:
+            response.append({"exchangeName": name, "rate": quote.price, "age": round(quote.age, 3)})
+        else:
+            response.append({"exchangeName": name, "rate": quote.price})
+    return response
+
+
+# Знімки відповідей GET /getRates, що перебудовуються при зміні курсів пари
+rate_snapshots = RateSnapshots(fetch_prices, lambda results: format_rates(results, age=False))
+
+
+def check_batch_size(size: int):
+    """
+    Перевіряє розмір пакетного запиту; для порожнього або завеликого пакета повертається помилка 400.
+    """
+    if size == 0 or size > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400, detail=f"Пакет повинен містити від 1 до {MAX_BATCH_SIZE} елементів"
+        )
+
+
+async def evaluate_route(route, input_amount: float):
+    """
+    Перераховує маршрут з урахуванням глибини ринку: сума, отримана на кожному кроці,
+    обмінюється на наступному кроці за ефективним курсом біржі.
+
+    Параметри:
+        route (Route): Маршрут з RouteGraph.
+        input_amount (float): Сума обміну в першому активі маршруту.
+
+    Повертає:
+        Кортеж (сума_на_виході, timestamp найстаріших даних) або None, якщо якийсь крок не має даних.
+    """
+    amount = input_amount
+    timestamp = route.timestamp
+    for hop in route.hops:
+        exchange = exchanges_by_name.get(hop.exchange)
+        if exchange is None or not exchange.health.allow(hop.source, hop.target):
+            return None
+        result = await exchange.get_effective_quote(hop.source, hop.target, amount, HEDGE_REQUESTS)
+        if result is None:
+            return None
+        amount *= result.price
+        timestamp = min(timestamp, result.timestamp)
+    return amount, timestamp
+
+
+async def estimate_routes(input_amount: float, input_currency: str, output_currency: str, timeout: float):
+    """
+    Знаходить найкращий багатокроковий маршрут обміну.
+
+    Кандидати обираються в графі обміну за поточними цінами (ROUTE_CANDIDATES найкращих),
+    а потім перераховуються з урахуванням глибини ринку в межах бюджету часу.
+
+    Повертає:
+        Кортеж (маршрут, сума_на_виході, котирування) або (None, -1, None), якщо маршруту немає.
+    """
+    routes = route_graph.best_routes(input_currency, output_currency, limit=ROUTE_CANDIDATES, min_hops=2)
+
+    async def evaluate(route):
+        try:
+            return await asyncio.wait_for(evaluate_route(route, input_amount), timeout=max(timeout, 0))
+        except asyncio.TimeoutError:
+            return None
+        except Exception as e:
+            logger.warning("Помилка розрахунку маршруту %s/%s: %s", input_currency, output_currency, e)
+            return None
+
+    best_route, best_output_amount, best_quote = None, -1, None
+    for route, result in zip(routes, await asyncio.gather(*(evaluate(route) for route in routes))):
+        if result is None:
+            continue
+        output_amount, timestamp = result
+        if output_amount > best_output_amount:
+            best_route = route
+            best_output_amount = output_amount
+            best_quote = Quote(output_amount / input_amount, timestamp)
+    return best_route, best_output_amount, best_quote
+
+
+def route_name(route) -> str:
+    """Назва маршруту для відповіді API: біржі кроків через "+" (без повторів)."""
+    return "+".join(dict.fromkeys(hop.exchange for hop in route.hops))
+
+
+def format_route(route):
+    """Кроки маршруту для відповіді API."""
+    return [{"exchangeName": hop.exchange, "from": hop.source, "to": hop.target} for hop in route.hops]
+
+
+async def estimate(input_amount: float, input_currency: str, output_currency: str):
+    """
+    Асинхронна функція для визначення найбільш вигідного обміну.
+
+    Курс кожної біржі враховує глибину ринку для суми input_amount: для централізованих бірж
+    заявка проводиться по локальному стакану, для Uniswap - симулюється обмін по тіках пулу.
+    Якщо таких даних немає, використовується поточний курс біржі.
+
+    Одночасно з прямим обміном перевіряються маршрути через проміжні активи (estimate_routes);
+    маршрут повертається, якщо дає більшу суму.
+
+    Параметри:
+        input_amount (float): Сума, яку користувач хоче обміняти.
+        input_currency (str): Валюта, яку користувач хоче обміняти.
+        output_currency (str): Валюта, яку користувач хоче отримати.
+
+    Повертає:
+        Кортеж (best_exchange, best_output_amount, best_quote, route), де перші три елементи
+        описані в select_best, а route - багатокроковий маршрут (Route) або None для прямого обміну.
+    """
+    timeout = min(EXCHANGE_TIMEOUT, REQUEST_TIMEOUT)
+    # Отримуємо ефективні курси обміну з усіх бірж одночасно
+    tasks = [
+        await_quote(
+            exchange,
+            exchange.get_effective_quote(input_currency, output_currency, input_amount, HEDGE_REQUESTS),
+            input_currency,
+            output_currency,
+            timeout,
+            "get_effective_quote",
+        )
+        for exchange in exchanges
+    ]
+    results, (route, route_output_amount, route_quote) = await asyncio.gather(
+        asyncio.gather(*tasks),
+        estimate_routes(input_amount, input_currency, output_currency, timeout),
+    )
+    best_exchange, best_output_amount, best_quote = select_best(
+        input_amount, [(ex.name, result, status) for ex, (result, status) in zip(exchanges, results)]
+    )
+    if route is not None and route_output_amount > best_output_amount:
+        return route_name(route), route_output_amount, route_quote, route
+    return best_exchange, best_output_amount, best_quote, None
 
 
 @app.post("/estimate")
@@ -125,16 +656,22 @@ async def estimate_endpoint(request: EstimateRequest):
         - outputCurrency: Валюта, яку хочуть отримати.
 
     Повертає:
-        JSON об'єкт з назвами біржі та сумою, яку отримаємо після обміну.
+        JSON об'єкт з назвами біржі, сумою, яку отримаємо після обміну (з урахуванням
+        глибини стакану / ліквідності пулу), та віком даних у секундах (age).
+        Для багатокрокового маршруту exchangeName містить біржі кроків через "+", а поле route -
+        кроки маршруту [{"exchangeName", "from", "to"}, ...].
 
     Якщо не вдалося отримати дані жодної біржі, повертається помилка 500.
     """
-    best_exchange, best_output_amount = await estimate(
+    best_exchange, best_output_amount, best_quote, route = await estimate(
         request.inputAmount, request.inputCurrency, request.outputCurrency
     )
     if best_exchange is None:
         raise HTTPException(status_code=500, detail="Не вдалося отримати дані ні від однієї біржі")
-    return {"exchangeName": best_exchange, "outputAmount": best_output_amount}
+    response = {"exchangeName": best_exchange, "outputAmount": best_output_amount, "age": round(best_quote.age, 3)}
+    if route is not None:
+        response["route"] = format_route(route)
+    return response
 
 
 @app.post("/getRates")
@@ -150,18 +687,349 @@ async def get_rates_endpoint(request: GetRatesRequest):
         JSON масив об'єктів, де кожен об'єкт містить:
             - exchangeName: Назва біржі.
             - rate: Курс (ціна) 1 базової валюти в quoteCurrency.
-            Якщо дані недоступні, повертається повідомлення про помилку.
+            - age: Вік котирування в секундах.
+            Якщо дані недоступні, повертається повідомлення про помилку (error) та статус (status):
+            "no_data", "timeout" (біржа не відповіла вчасно), "error" або "unavailable"
+            (відкритий запобіжник біржі чи пари, біржу не запитували).
     """
     results = await fetch_prices(request.baseCurrency, request.quoteCurrency)
+    return format_rates(results)
+
+
+@app.get("/getRates")
+async def get_rates_snapshot_endpoint(request: Request, baseCurrency: str, quoteCurrency: str):
+    """
+    GET-варіант ендпоінту /getRates (наприклад, /getRates?baseCurrency=BTC&quoteCurrency=USDT).
+
+    Повертає готовий знімок відповіді пари: масив у форматі POST /getRates без поля age.
+    Знімок серіалізується один раз після кожної зміни курсів пари (і не рідше ніж раз на
+    RATES_SNAPSHOT_TTL секунд), тож запит не обходить біржі й не серіалізує відповідь.
+
+    Відповідь містить заголовок ETag; якщо клієнт передав його в If-None-Match і курси не
+    змінилися, повертається 304 без тіла.
+    """
+    pair = parse_pairs([f"{baseCurrency}/{quoteCurrency}"])[0]
+    snapshot = await rate_snapshots.get(pair)
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        metrics.RATE_SNAPSHOTS.inc("not_modified")
+        return Response(status_code=304, headers=headers)
+    return Response(snapshot.body, media_type="application/json", headers=headers)
+
+
+@app.post("/estimateBatch")
+async def estimate_batch_endpoint(request: EstimateBatchRequest):
+    """
+    Ендпоінт /estimateBatch.
+
+    Приймає JSON запит з полем requests - списком запитів у форматі /estimate.
+    Усі запити обробляються одночасно з урахуванням глибини ринку для кожної суми; однакові
+    запити котирувань до бірж (для пари та зворотної до неї) об'єднуються в один.
+
+    Повертає:
+        JSON масив у тому ж порядку, що й requests. Кожен елемент містить поля запиту
+        (inputAmount, inputCurrency, outputCurrency) та результат у форматі /estimate
+        (exchangeName, outputAmount, age, route) або поле error, якщо даних немає.
+    """
+    check_batch_size(len(request.requests))
+    estimates = await asyncio.gather(
+        *(estimate(item.inputAmount, item.inputCurrency, item.outputCurrency) for item in request.requests)
+    )
     response = []
-    for name, price in results:
-        if price is None:
-            response.append({"exchangeName": name, "error": "Немає даних"})
+    for item, (best_exchange, best_output_amount, best_quote, route) in zip(request.requests, estimates):
+        entry = {
+            "inputAmount": item.inputAmount,
+            "inputCurrency": item.inputCurrency,
+            "outputCurrency": item.outputCurrency,
+        }
+        if best_exchange is None:
+            entry["error"] = "Не вдалося отримати дані ні від однієї біржі"
         else:
-            response.append({"exchangeName": name, "rate": price})
+            entry.update(
+                {"exchangeName": best_exchange, "outputAmount": best_output_amount, "age": round(best_quote.age, 3)}
+            )
+            if route is not None:
+                entry["route"] = format_route(route)
+        response.append(entry)
     return response
 
 
+@app.post("/getRatesBatch")
+async def get_rates_batch_endpoint(request: GetRatesBatchRequest):
+    """
+    Ендпоінт /getRatesBatch.
+
+    Приймає JSON запит з полем pairs - списком пар у форматі /getRates.
+    Котирування для всіх пар отримуються одночасно, а кожна пара (разом зі зворотною)
+    запитується в бірж лише один раз.
+
+    Повертає:
+        JSON масив у тому ж порядку, що й pairs. Кожен елемент містить baseCurrency,
+        quoteCurrency та rates - масив у форматі відповіді /getRates.
+    """
+    check_batch_size(len(request.pairs))
+    batch = await fetch_prices_batch([(item.baseCurrency, item.quoteCurrency) for item in request.pairs])
+    return [
+        {
+            "baseCurrency": item.baseCurrency,
+            "quoteCurrency": item.quoteCurrency,
+            "rates": format_rates(batch[(item.baseCurrency.upper(), item.quoteCurrency.upper())]),
+        }
+        for item in request.pairs
+    ]
+
+
+@app.get("/ready")
+async def ready_endpoint():
+    """
+    Ендпоінт готовності /ready.
+
+    Повертає стан кожної біржі: "starting" (створюється), "warming" (запущена, ще без даних),
+    "ready" або "failed". Код відповіді 200, якщо готова хоча б одна біржа, інакше 503.
+    """
+    venues = {name: venue_status(name) for name in EXCHANGE_NAMES}
+    ready = any(status == VENUE_READY for status in venues.values())
+    return JSONResponse({"ready": ready, "exchanges": venues}, status_code=200 if ready else 503)
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """
+    Ендпоінт /metrics.
+
+    Повертає метрики додатку в текстовому форматі Prometheus.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/spreads")
+async def spreads_endpoint(minSpread: float = 0.0, limit: int = 100, pairs: str = None, pairwise: bool = False):
+    """
+    Ендпоінт /spreads.
+
+    Повертає спреди між біржами для всіх пар з котируваннями щонайменше на двох біржах,
+    відсортовані за спаданням. Спреди перераховуються у фоні при кожній зміні цін.
+
+    Параметри:
+        minSpread: Мінімальний спред (частка, 0.01 = 1%).
+        limit: Максимальна кількість пар у відповіді.
+        pairs: Пари через кому, якими обмежити відповідь (наприклад, BTC/USDT,ETH/USDT).
+        pairwise: Чи додавати попарні спреди між біржами.
+
+    Повертає:
+        JSON об'єкт з полями spreads (масив {"pair", "spread", "buyExchange", "buyRate",
+        "sellExchange", "sellRate", "rates"}) та alerts - пари, спред яких перевищує поріг.
+    """
+    selected = parse_pairs([pair for pair in pairs.split(",") if pair]) if pairs else None
+    return {
+        "spreads": spread_scanner.snapshot(minSpread, limit, selected, pairwise),
+        "alerts": sorted(spread_scanner.pairs[column] for column in spread_scanner.alerts),
+    }
+
+
+def history_window(start: float, end: float, interval: float = None):
+    """
+    Приводить вікно запиту історії до (start, end): за замовчуванням - останні HISTORY_DEFAULT_WINDOW
+    секунд. Для некоректного вікна або завеликої кількості точок повертається помилка 400.
+    """
+    end = time.time() if end is None else end
+    start = end - HISTORY_DEFAULT_WINDOW if start is None else start
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start повинен бути меншим за end")
+    if interval is not None and (interval <= 0 or (end - start) / interval > MAX_HISTORY_POINTS):
+        raise HTTPException(
+            status_code=400, detail=f"interval повинен бути додатним, а вікно - не більше {MAX_HISTORY_POINTS} інтервалів"
+        )
+    return start, end
+
+
+def parse_history_pair(pair: str):
+    """Розбирає пару запиту історії на (BASE, QUOTE); для некоректної пари повертається помилка 400."""
+    return tuple(parse_pairs([pair])[0].split("/"))
+
+
+@app.get("/history/ohlc")
+async def history_ohlc_endpoint(exchange: str, pair: str, interval: float = 60.0, start: float = None, end: float = None):
+    """
+    Ендпоінт /history/ohlc.
+
+    Повертає свічки OHLC пари на біржі зі стрічки котирувань.
+
+    Параметри:
+        exchange: Назва біржі.
+        pair: Пара (наприклад, BTC/USDT); пара, записана у зворотному напрямку, інвертується.
+        interval: Тривалість свічки, секунди.
+        start, end: Межі вікна (unix-час, секунди); за замовчуванням - остання година.
+
+    Повертає:
+        JSON об'єкт з полем candles - масив {"time", "open", "high", "low", "close", "volume", "count"}
+        лише для інтервалів, у яких були котирування (time - початок свічки, кратний interval).
+    """
+    start, end = history_window(start, end, interval)
+    base, quote = parse_history_pair(pair)
+    timestamps, prices, volumes, _ = quote_tape.history(exchange, base, quote, start, end)
+    # Свічки вирівнюються за кратними interval від початку епохи Unix
+    candles = ohlc(timestamps, prices, volumes, start - start % interval, interval)
+    columns = [candles[name].tolist() for name in ("time", "open", "high", "low", "close", "volume", "count")]
+    return {
+        "exchangeName": exchange,
+        "pair": f"{base}/{quote}",
+        "interval": interval,
+        "candles": [
+            {"time": t, "open": o, "high": h, "low": l, "close": c, "volume": v, "count": n}
+            for t, o, h, l, c, v, n in zip(*columns)
+        ],
+    }
+
+
+@app.get("/history/average")
+async def history_average_endpoint(exchange: str, pair: str, start: float = None, end: float = None):
+    """
+    Ендпоінт /history/average.
+
+    Повертає середні ціни пари на біржі за вікно зі стрічки котирувань:
+        - twap: середня ціна, зважена за часом дії кожної ціни (ціна перед вікном діє з його початку);
+        - vwap: середня ціна, зважена за обсягом угод (лише для бірж, що повідомляють обсяг угод,
+          наприклад Uniswap), інакше null;
+        - count: кількість котирувань у вікні.
+    """
+    start, end = history_window(start, end)
+    base, quote = parse_history_pair(pair)
+    timestamps, prices, volumes, previous = quote_tape.history(exchange, base, quote, start, end)
+    return {
+        "exchangeName": exchange,
+        "pair": f"{base}/{quote}",
+        "start": start,
+        "end": end,
+        "twap": twap(timestamps, prices, start, end, previous),
+        "vwap": vwap(prices, volumes),
+        "count": len(prices),
+    }
+
+
+@app.get("/history/spreads")
+async def history_spreads_endpoint(pair: str, interval: float = 60.0, start: float = None, end: float = None,
+                                   exchanges: str = None):
+    """
+    Ендпоінт /history/spreads.
+
+    Повертає історію спреду пари між біржами: на кожній точці start, start + interval, ...
+    береться остання ціна кожної біржі (не старша за TAPE_SPREAD_TTL секунд).
+
+    Параметри:
+        pair: Пара (наприклад, BTC/USDT).
+        interval: Крок точок, секунди.
+        start, end: Межі вікна (unix-час, секунди); за замовчуванням - остання година.
+        exchanges: Біржі через кому (за замовчуванням - усі біржі зі стрічки).
+
+    Повертає:
+        JSON об'єкт з полем points - масив {"time", "spread", "buyExchange", "sellExchange", "rates"}
+        для точок, де ціни є щонайменше на двох біржах.
+    """
+    start, end = history_window(start, end, interval)
+    base, quote = parse_history_pair(pair)
+    names = [name for name in exchanges.split(",") if name] if exchanges else quote_tape.exchanges()
+    history = spread_history(quote_tape, names, base, quote, start, end, interval)
+    points = []
+    for t, spread, buy, sell, prices in zip(
+        history["time"].tolist(), history["spread"].tolist(), history["buy"].tolist(), history["sell"].tolist(),
+        history["prices"].tolist(),
+    ):
+        points.append({
+            "time": t,
+            "spread": spread,
+            "buyExchange": names[buy],
+            "sellExchange": names[sell],
+            "rates": {name: price for name, price in zip(names, prices) if price == price},
+        })
+    return {"pair": f"{base}/{quote}", "interval": interval, "points": points}
+
+
+def parse_pairs(pairs) -> List[str]:
+    """
+    Приводить список пар до вигляду "BASE/QUOTE"; для некоректної пари повертається помилка 400.
+    """
+    normalized = []
+    for pair in pairs:
+        value = normalize_pair(pair)
+        if value is None:
+            raise HTTPException(status_code=400, detail=f"Некоректна пара: {pair}")
+        normalized.append(value)
+    return normalized
+
+
+@app.websocket("/ws/rates")
+async def rates_websocket(websocket: WebSocket):
+    """
+    WebSocket-потік курсів.
+
+    Клієнт надсилає JSON повідомлення {"subscribe": ["BTC/USDT", ...]} або
+    {"unsubscribe": ["BTC/USDT", ...]}; пари також можна передати параметром pairs
+    (наприклад, /ws/rates?pairs=BTC/USDT,ETH/USDT).
+
+    Сервер одразу надсилає поточні курси з пам'яті, а далі - кожну зміну курсу у вигляді
+    {"pair", "exchangeName", "rate", "timestamp"}. На некоректне повідомлення (не JSON, бінарний
+    кадр, поля не є списками пар) сервер відповідає {"error": ...} і не закриває з'єднання.
+    """
+    await websocket.accept()
+    subscriber = Subscriber()
+    initial = [pair for pair in websocket.query_params.get("pairs", "").split(",") if pair]
+    broadcaster.subscribe(subscriber, [p for p in map(normalize_pair, initial) if p])
+
+    async def sender():
+        while True:
+            await websocket.send_text(await subscriber.queue.get())
+
+    sender_task = asyncio.create_task(sender())
+    try:
+        while True:
+            try:
+                # Бінарний кадр не має поля "text" (KeyError)
+                subscribe, unsubscribe = parse_subscription(await websocket.receive_text())
+            except KeyError:
+                subscriber.offer(error_message("Очікується текстове JSON-повідомлення"))
+                continue
+            except ValueError as e:
+                subscriber.offer(error_message(f"Некоректне повідомлення: {e}"))
+                continue
+            broadcaster.subscribe(subscriber, subscribe)
+            broadcaster.unsubscribe(subscriber, unsubscribe)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        broadcaster.unsubscribe(subscriber)
+        sender_task.cancel()
+
+
+@app.get("/streamRates")
+async def stream_rates_endpoint(request: Request, pairs: str):
+    """
+    SSE-потік курсів (text/event-stream).
+
+    Параметри:
+        pairs: Пари через кому (наприклад, /streamRates?pairs=BTC/USDT,ETH/USDT).
+
+    Кожна подія містить JSON {"pair", "exchangeName", "rate", "timestamp"}: спочатку поточні
+    курси з пам'яті, а далі - кожну зміну курсу.
+    """
+    subscriber = Subscriber()
+    broadcaster.subscribe(subscriber, parse_pairs([pair for pair in pairs.split(",") if pair]))
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), timeout=SSE_KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {message}\n\n"
+        finally:
+            broadcaster.unsubscribe(subscriber)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 if __name__ == '__main__':
     import uvicorn
 
@@ -0,0 +1,367 @@
+"""
+Модуль fake_cex.py
+------------------
+
+Локальна заглушка REST API централізованої біржі для бенчмарків.
+
+Сервер відповідає у форматі, який розбирають ccxt-клієнти Binance.US, KuCoin або Gate.io
+(параметр dialect), тож адаптери бірж працюють з ним без змін - достатньо задати змінну
+<НАЗВА>_API_URL (див. exchanges/cex_exchange.py). Підтримуються лише публічні запити, які
+використовує додаток: список ринків, усі тікери, тікер символу та стакан.
+
+Затримку (latency, jitter) та частку помилок (error_rate - HTTP 503, rate_limit_rate - HTTP 429)
+можна налаштувати; кількість запитів за шляхом рахується в calls. Ціни змінюються випадковим
+блуканням із фіксованим seed, тож прогони відтворювані.
+
+Запуск окремо:
+    python -m bench.fake_cex --dialect binance --port 9001 --latency 0.05 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+
+from aiohttp import web
+
+# Символи та початкові ціни заглушки
+DEFAULT_PRICES = {
+    "BTC/USDT": 64000.0,
+    "ETH/USDT": 3100.0,
+    "SOL/USDT": 145.0,
+    "ETH/BTC": 0.0485,
+    "BTC/USDC": 64010.0,
+    "ETH/USDC": 3101.0,
+    "SOL/USDC": 145.1,
+    "SOL/BTC": 0.00227,
+}
+# Крок цін рівнів стакану (частка ціни)
+BOOK_LEVEL_STEP = 0.0001
+
+DIALECTS = ("binance", "kucoin", "gate")
+
+
+class FakeCex:
+    """
+    Заглушка REST API біржі.
+
+    Параметри:
+        dialect (str): Формат відповідей: "binance", "kucoin" або "gate".
+        extra_symbols (int): Кількість додаткових синтетичних символів (для реалістичного розміру fetch_tickers).
+        latency (float): Базова затримка відповіді (секунди).
+        jitter (float): Випадкова добавка до затримки (0..jitter секунд).
+        error_rate (float): Частка запитів, що завершуються HTTP 503.
+        rate_limit_rate (float): Частка запитів, що завершуються HTTP 429 з Retry-After.
+        seed (int): Seed генератора випадкових чисел.
+    """
+
+    def __init__(self, dialect: str, extra_symbols: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, seed: int = 0):
+        if dialect not in DIALECTS:
+            raise ValueError(f"Невідомий формат біржі: {dialect}")
+        self.dialect = dialect
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.random = random.Random(seed)
+        self.prices = dict(DEFAULT_PRICES)
+        for i in range(extra_symbols):
+            self.prices[f"T{i:04d}/USDT"] = 1.0 + i
+        # Кількість запитів за шляхом
+        self.calls = Counter()
+        self._runner = None
+        self.url = None
+
+    def reset(self):
+        """Обнуляє лічильники запитів."""
+        self.calls.clear()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Запускає сервер і повертає його адресу (port=0 - вільний порт)."""
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/{path:.*}", self._dispatch)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self):
+        """Зупиняє сервер."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        self.calls[request.path] += 1
+        delay = self.latency + (self.random.random() * self.jitter if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        roll = self.random.random()
+        if roll < self.rate_limit_rate:
+            return web.json_response({"code": -1003, "msg": "Too many requests"}, status=429, headers={"Retry-After": "1"})
+        if roll < self.rate_limit_rate + self.error_rate:
+            return web.json_response({"code": -1001, "msg": "Service unavailable"}, status=503)
+        return await handler(request)
+
+    def _walk(self):
+        """Зсуває всі ціни на випадковий крок (до 0.05%)."""
+        for symbol, price in self.prices.items():
+            self.prices[symbol] = price * (1 + (self.random.random() - 0.5) * 0.001)
+
+    def _book(self, price: float, limit: int):
+        bids = [[price * (1 - BOOK_LEVEL_STEP * (i + 1)), 0.5 + self.random.random()] for i in range(limit)]
+        asks = [[price * (1 + BOOK_LEVEL_STEP * (i + 1)), 0.5 + self.random.random()] for i in range(limit)]
+        return bids, asks
+
+    def _symbol(self, native: str):
+        """Повертає символ "BASE/QUOTE" за символом біржі або None."""
+        for symbol in self.prices:
+            if self._native(symbol) == native:
+                return symbol
+        return None
+
+    def _native(self, symbol: str) -> str:
+        base, quote = symbol.split("/")
+        if self.dialect == "binance":
+            return base + quote
+        if self.dialect == "kucoin":
+            return f"{base}-{quote}"
+        return f"{base}_{quote}"
+
+    async def _dispatch(self, request):
+        handler = getattr(self, f"_{self.dialect}", None)
+        response = handler(request.path, request.query)
+        if response is None:
+            # Запити, які заглушка не підтримує (ф'ючерси, опціони тощо), повертають порожній список
+            return web.json_response({"code": "200000", "data": []} if self.dialect == "kucoin" else [])
+        return web.json_response(response)
+
+    # Binance.US (https://api.binance.us/api/v3)
+
+    def _binance(self, path: str, query):
+        now = int(time.time() * 1000)
+        if path == "/api/v3/exchangeInfo":
+            return {
+                "timezone": "UTC",
+                "serverTime": now,
+                "rateLimits": [],
+                "symbols": [
+                    {
+                        "symbol": self._native(symbol),
+                        "status": "TRADING",
+                        "baseAsset": symbol.split("/")[0],
+                        "baseAssetPrecision": 8,
+                        "quoteAsset": symbol.split("/")[1],
+                        "quotePrecision": 8,
+                        "quoteAssetPrecision": 8,
+                        "orderTypes": ["LIMIT", "MARKET"],
+                        "icebergAllowed": True,
+                        "ocoAllowed": True,
+                        "isSpotTradingAllowed": True,
+                        "isMarginTradingAllowed": False,
+                        "filters": [],
+                        "permissions": ["SPOT"],
+                    }
+                    for symbol in self.prices
+                ],
+            }
+        if path in ("/api/v3/ticker/24hr", "/api/v3/ticker/price"):
+            self._walk()
+            native = query.get("symbol")
+            if native:
+                symbol = self._symbol(native)
+                return self._binance_ticker(symbol, now) if symbol else {"code": -1121, "msg": "Invalid symbol."}
+            return [self._binance_ticker(symbol, now) for symbol in self.prices]
+        if path == "/api/v3/depth":
+            symbol = self._symbol(query.get("symbol", ""))
+            if symbol is None:
+                return {"code": -1121, "msg": "Invalid symbol."}
+            bids, asks = self._book(self.prices[symbol], int(query.get("limit", 100)))
+            return {"lastUpdateId": now, "bids": [[str(p), str(q)] for p, q in bids], "asks": [[str(p), str(q)] for p, q in asks]}
+        return None
+
+    def _binance_ticker(self, symbol: str, now: int):
+        price = self.prices[symbol]
+        return {
+            "symbol": self._native(symbol),
+            "priceChange": "0",
+            "priceChangePercent": "0",
+            "weightedAvgPrice": str(price),
+            "prevClosePrice": str(price),
+            "lastPrice": str(price),
+            "bidPrice": str(price * (1 - BOOK_LEVEL_STEP)),
+            "askPrice": str(price * (1 + BOOK_LEVEL_STEP)),
+            "openPrice": str(price),
+            "highPrice": str(price),
+            "lowPrice": str(price),
+            "volume": "1000",
+            "quoteVolume": str(1000 * price),
+            "openTime": now - 86400000,
+            "closeTime": now,
+            "count": 1000,
+        }
+
+    # KuCoin (https://api.kucoin.com)
+
+    def _kucoin(self, path: str, query):
+        now = int(time.time() * 1000)
+        if path == "/api/v2/symbols":
+            data = [
+                {
+                    "symbol": self._native(symbol),
+                    "name": self._native(symbol),
+                    "baseCurrency": symbol.split("/")[0],
+                    "quoteCurrency": symbol.split("/")[1],
+                    "feeCurrency": symbol.split("/")[1],
+                    "market": "USDS",
+                    "baseMinSize": "0.00001",
+                    "quoteMinSize": "0.1",
+                    "baseMaxSize": "10000000",
+                    "quoteMaxSize": "99999999",
+                    "baseIncrement": "0.00000001",
+                    "quoteIncrement": "0.00000001",
+                    "priceIncrement": "0.00000001",
+                    "priceLimitRate": "0.1",
+                    "minFunds": "0.1",
+                    "isMarginEnabled": False,
+                    "enableTrading": True,
+                }
+                for symbol in self.prices
+            ]
+        elif path == "/api/v3/currencies":
+            currencies = sorted({part for symbol in self.prices for part in symbol.split("/")})
+            data = [
+                {"currency": currency, "name": currency, "fullName": currency, "precision": 8, "chains": []}
+                for currency in currencies
+            ]
+        elif path == "/api/v1/market/allTickers":
+            self._walk()
+            data = {"time": now, "ticker": [self._kucoin_ticker(symbol) for symbol in self.prices]}
+        elif path == "/api/v1/market/stats":
+            self._walk()
+            symbol = self._symbol(query.get("symbol", ""))
+            data = {"time": now, **self._kucoin_ticker(symbol)} if symbol else {}
+        elif path.startswith("/api/v1/market/orderbook/level2_"):
+            symbol = self._symbol(query.get("symbol", ""))
+            if symbol is None:
+                return {"code": "400100", "msg": "Unsupported trading pair."}
+            bids, asks = self._book(self.prices[symbol], int(path.rsplit("_", 1)[1]))
+            data = {"time": now, "sequence": str(now), "bids": [[str(p), str(q)] for p, q in bids], "asks": [[str(p), str(q)] for p, q in asks]}
+        else:
+            return None
+        return {"code": "200000", "data": data}
+
+    def _kucoin_ticker(self, symbol: str):
+        price = str(self.prices[symbol])
+        return {
+            "symbol": self._native(symbol),
+            "symbolName": self._native(symbol),
+            "buy": price,
+            "sell": price,
+            "last": price,
+            "changeRate": "0",
+            "changePrice": "0",
+            "high": price,
+            "low": price,
+            "vol": "1000",
+            "volValue": "1000",
+            "averagePrice": price,
+        }
+
+    # Gate.io (https://api.gateio.ws/api/v4)
+
+    def _gate(self, path: str, query):
+        now = int(time.time() * 1000)
+        if path == "/api/v4/spot/currency_pairs":
+            return [
+                {
+                    "id": self._native(symbol),
+                    "base": symbol.split("/")[0],
+                    "quote": symbol.split("/")[1],
+                    "fee": "0.2",
+                    "min_base_amount": "0.0001",
+                    "min_quote_amount": "1",
+                    "amount_precision": 8,
+                    "precision": 8,
+                    "trade_status": "tradable",
+                    "sell_start": 0,
+                    "buy_start": 0,
+                }
+                for symbol in self.prices
+            ]
+        if path == "/api/v4/spot/currencies":
+            currencies = sorted({part for symbol in self.prices for part in symbol.split("/")})
+            return [
+                {
+                    "currency": currency,
+                    "delisted": False,
+                    "withdraw_disabled": False,
+                    "withdraw_delayed": False,
+                    "deposit_disabled": False,
+                    "trade_disabled": False,
+                    "chain": currency,
+                }
+                for currency in currencies
+            ]
+        if path == "/api/v4/spot/tickers":
+            self._walk()
+            native = query.get("currency_pair")
+            symbols = [self._symbol(native)] if native else list(self.prices)
+            return [self._gate_ticker(symbol) for symbol in symbols if symbol]
+        if path == "/api/v4/spot/order_book":
+            symbol = self._symbol(query.get("currency_pair", ""))
+            if symbol is None:
+                return {"label": "INVALID_CURRENCY_PAIR", "message": "Invalid currency pair"}
+            bids, asks = self._book(self.prices[symbol], int(query.get("limit", 100)))
+            return {"id": now, "current": now, "update": now, "bids": [[str(p), str(q)] for p, q in bids], "asks": [[str(p), str(q)] for p, q in asks]}
+        return None
+
+    def _gate_ticker(self, symbol: str):
+        price = str(self.prices[symbol])
+        return {
+            "currency_pair": self._native(symbol),
+            "last": price,
+            "lowest_ask": price,
+            "highest_bid": price,
+            "change_percentage": "0",
+            "base_volume": "1000",
+            "quote_volume": "1000",
+            "high_24h": price,
+            "low_24h": price,
+        }
+
+
+async def _serve(args):
+    server = FakeCex(args.dialect, args.extra_symbols, args.latency, args.jitter, args.error_rate, args.rate_limit_rate)
+    url = await server.start(args.host, args.port)
+    print(f"{args.dialect}: {url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Заглушка REST API біржі для бенчмарків")
+    parser.add_argument("--dialect", choices=DIALECTS, default="binance")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--extra-symbols", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
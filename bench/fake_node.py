@@ -0,0 +1,369 @@
+"""
+Модуль fake_node.py
+-------------------
+
+Локальна заглушка WebSocket JSON-RPC вузла Ethereum для бенчмарків.
+
+Вузол імітує пули Uniswap V3: кожні block_time секунд створюється новий блок, у якому для
+випадкових пулів генеруються події Swap (випадкове блукання ціни). Події розсилаються підписникам
+eth_subscribe("logs") та зберігаються для eth_getLogs. Виклики eth_call до Multicall3.aggregate3
+відповідають станом пулів: slot0(), liquidity(), fee(), tickSpacing(), tickBitmap(), ticks(),
+а також getBlockNumber() самого Multicall3, getPool() фабрики пулів та decimals() токенів (для
+пошуку пулів реєстру без адреси; такі пули отримують синтетичну адресу з комісією POOL_FEE).
+
+Затримку відповіді (latency) можна налаштувати; кількість викликів за методом рахується в calls.
+
+Запуск окремо (адресу потім задають у ETH_WS_URL):
+    python -m bench.fake_node --port 8546 --block-time 1 --swaps-per-block 4
+"""
+
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import math
+import random
+from collections import Counter, deque
+
+from eth_abi import decode, encode
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+
+from exchanges.multicall import (
+    DECIMALS_SELECTOR,
+    FEE_SELECTOR,
+    GET_BLOCK_NUMBER_SELECTOR,
+    GET_POOL_SELECTOR,
+    LIQUIDITY_SELECTOR,
+    MULTICALL3_ADDRESS,
+    SLOT0_SELECTOR,
+    TICK_BITMAP_SELECTOR,
+    TICK_SPACING_SELECTOR,
+    TICKS_SELECTOR,
+)
+from exchanges.pool_registry import UNISWAP_V3_FACTORY, PoolRegistry
+from exchanges.swap_stream import SWAP_TOPIC
+
+# Початкові ціни пулів заглушки (ціна token0 у token1)
+DEFAULT_PRICES = {
+    "ETH/USDT": 3100.0,
+    "BTC/ETH": 20.6,
+    "ETH/SOL": 21.4,
+    "BTC/USDT": 64000.0,
+    "BTC/USDC": 64010.0,
+    "USDC/ETH": 1 / 3100.0,
+    "USDC/USDT": 1.0,
+}
+AGGREGATE3_SELECTOR = bytes.fromhex("82ad56cb")  # aggregate3((address,bool,bytes)[])
+POOL_LIQUIDITY = 10 ** 22
+POOL_FEE = 3000
+POOL_TICK_SPACING = 60
+# Ініціалізовані тіки в кожному слові tickBitmap: кожен BITMAP_STRIDE-й стиснутий тік
+BITMAP_STRIDE = 32
+# Скільки останніх блоків з подіями зберігається для eth_getLogs
+HISTORY_BLOCKS = 1000
+ZERO_WORD = bytes(32)
+
+
+def sqrt_price_from_price(price: float, decimals_diff: int) -> int:
+    """sqrtPriceX96 для ціни token0 у token1 (обернення PoolState.price_from_sqrt)."""
+    return int(math.sqrt(price / 10 ** decimals_diff) * 2 ** 96)
+
+
+def tick_from_sqrt_price(sqrt_price_x96: int) -> int:
+    """Поточний тік пулу для sqrtPriceX96."""
+    return math.floor(math.log((sqrt_price_x96 / 2 ** 96) ** 2, 1.0001))
+
+
+def _word(value: int) -> bytes:
+    return value.to_bytes(32, "big", signed=value < 0)
+
+
+def _to_int(value) -> int:
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+class FakePool:
+    """Стан одного пулу заглушки."""
+
+    def __init__(self, address: str, sqrt_price_x96: int):
+        self.address = address.lower()
+        self.sqrt_price_x96 = sqrt_price_x96
+        self.tick = tick_from_sqrt_price(sqrt_price_x96)
+
+    def step(self, rng: random.Random):
+        """Зсуває ціну пулу на випадковий крок (до 0.05%) і повертає (amount0, amount1)."""
+        factor = 1 + (rng.random() - 0.5) * 0.001
+        self.sqrt_price_x96 = int(self.sqrt_price_x96 * math.sqrt(factor))
+        self.tick = tick_from_sqrt_price(self.sqrt_price_x96)
+        amount0 = rng.randint(10 ** 15, 10 ** 18)
+        return (amount0, -amount0) if factor < 1 else (-amount0, amount0)
+
+
+class FakeNode:
+    """
+    Заглушка WebSocket JSON-RPC вузла Ethereum.
+
+    Параметри:
+        pools: Словник {адреса_пулу: sqrtPriceX96}.
+        block_time (float): Інтервал між блоками (секунди).
+        swaps_per_block (int): Кількість подій Swap у кожному блоці.
+        latency (float): Затримка відповіді на запит (секунди).
+        start_block (int): Номер першого блоку.
+        seed (int): Seed генератора випадкових чисел.
+        factory_pools: Словник {(token0, token1, fee): адреса_пулу} для getPool() фабрики.
+        token_decimals: Словник {адреса_токена: кількість десяткових знаків} для decimals().
+        max_logs (int): Максимальна кількість логів у відповіді eth_getLogs; для більшого
+                        результату повертається помилка, як у публічних вузлів.
+    """
+
+    def __init__(self, pools, block_time: float = 1.0, swaps_per_block: int = 4, latency: float = 0.0,
+                 start_block: int = 20_000_000, seed: int = 0, factory_pools=None, token_decimals=None,
+                 max_logs: int = 10_000):
+        self.pools = {address.lower(): FakePool(address, sqrt_price) for address, sqrt_price in pools.items()}
+        self.factory_pools = {
+            (token0.lower(), token1.lower(), fee): address.lower()
+            for (token0, token1, fee), address in (factory_pools or {}).items()
+        }
+        self.token_decimals = {address.lower(): decimals for address, decimals in (token_decimals or {}).items()}
+        self.block_time = block_time
+        self.swaps_per_block = swaps_per_block
+        self.latency = latency
+        self.max_logs = max_logs
+        self.block_number = start_block
+        self.random = random.Random(seed)
+        # Кількість викликів за методом JSON-RPC (та викликів усередині aggregate3)
+        self.calls = Counter()
+        self.logs = deque()
+        self._subscriptions = {}
+        self._subscription_ids = itertools.count(1)
+        self._server = None
+        self._producer = None
+        self.url = None
+
+    @classmethod
+    def from_supported_pairs(cls, prices=None, **kwargs) -> "FakeNode":
+        """
+        Створює вузол з пулами файлу даних реєстру пулів (без кешу знайдених пулів) за цінами prices
+        (за замовчуванням DEFAULT_PRICES). Пули без адреси отримують синтетичну адресу, яку повертає getPool().
+        """
+        prices = {**DEFAULT_PRICES, **(prices or {})}
+        registry = PoolRegistry.load(cache_file=None)
+        pools = {}
+        factory_pools = {}
+        for pair, info in registry.supported_pairs().items():
+            if pair not in prices or info["decimals_diff"] is None:
+                continue
+            address = info["pool_address"]
+            if address is None:
+                address = "0x" + hashlib.sha256(f"{info['token0']}:{info['token1']}".encode()).hexdigest()[:40]
+            address = address.lower()
+            factory_pools[(info["token0"], info["token1"], info["fee"] or POOL_FEE)] = address
+            if address not in pools:
+                pools[address] = sqrt_price_from_price(prices[pair], info["decimals_diff"])
+        token_decimals = {registry.tokens[symbol]: decimals for symbol, decimals in registry.token_decimals().items()}
+        return cls(pools, factory_pools=factory_pools, token_decimals=token_decimals, **kwargs)
+
+    def reset(self):
+        """Обнуляє лічильники викликів."""
+        self.calls.clear()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Запускає вузол і генерацію блоків; повертає адресу ws:// (port=0 - вільний порт)."""
+        self._server = await serve(self._handle, host, port, max_size=None)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"ws://{host}:{port}"
+        self._producer = asyncio.create_task(self._produce_blocks())
+        return self.url
+
+    async def stop(self):
+        """Зупиняє вузол."""
+        if self._producer is not None:
+            self._producer.cancel()
+            await asyncio.gather(self._producer, return_exceptions=True)
+            self._producer = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _produce_blocks(self):
+        """Створює блоки з подіями Swap і розсилає їх підписникам."""
+        while True:
+            await asyncio.sleep(self.block_time)
+            self.block_number += 1
+            addresses = list(self.pools)
+            block_logs = []
+            for log_index in range(self.swaps_per_block if addresses else 0):
+                pool = self.pools[self.random.choice(addresses)]
+                block_logs.append(self._swap_log(pool, log_index))
+            self.logs.extend(block_logs)
+            while self.logs and _to_int(self.logs[0]["blockNumber"]) < self.block_number - HISTORY_BLOCKS:
+                self.logs.popleft()
+            for log in block_logs:
+                for (ws, subscription_id), addresses_filter in list(self._subscriptions.items()):
+                    if addresses_filter is None or log["address"] in addresses_filter:
+                        message = {"jsonrpc": "2.0", "method": "eth_subscription", "params": {"subscription": subscription_id, "result": log}}
+                        try:
+                            await ws.send(json.dumps(message))
+                        except Exception:
+                            self._subscriptions.pop((ws, subscription_id), None)
+
+    def _swap_log(self, pool: FakePool, log_index: int) -> dict:
+        amount0, amount1 = pool.step(self.random)
+        data = b"".join(_word(value) for value in (amount0, amount1, pool.sqrt_price_x96, POOL_LIQUIDITY, pool.tick))
+        block_hash = "0x" + self.block_number.to_bytes(32, "big").hex()
+        return {
+            "address": pool.address,
+            "topics": [SWAP_TOPIC, "0x" + bytes(32).hex(), "0x" + bytes(32).hex()],
+            "data": "0x" + data.hex(),
+            "blockNumber": hex(self.block_number),
+            "blockHash": block_hash,
+            "transactionHash": "0x" + (self.block_number * 1000 + log_index).to_bytes(32, "big").hex(),
+            "transactionIndex": hex(log_index),
+            "logIndex": hex(log_index),
+            "removed": False,
+        }
+
+    async def _handle(self, ws):
+        try:
+            async for raw in ws:
+                request = json.loads(raw)
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                method = request.get("method")
+                self.calls[method] += 1
+                try:
+                    response = {"jsonrpc": "2.0", "id": request.get("id"), "result": self._call(ws, method, request.get("params") or [])}
+                except Exception as e:
+                    response = {"jsonrpc": "2.0", "id": request.get("id"), "error": {"code": -32000, "message": str(e)}}
+                await ws.send(json.dumps(response))
+        except ConnectionClosed:
+            pass
+        finally:
+            for key in [key for key in self._subscriptions if key[0] is ws]:
+                del self._subscriptions[key]
+
+    def _call(self, ws, method: str, params: list):
+        if method == "web3_clientVersion":
+            return "FakeNode/1.0"
+        if method == "eth_chainId":
+            return "0x1"
+        if method == "net_version":
+            return "1"
+        if method == "eth_blockNumber":
+            return hex(self.block_number)
+        if method == "eth_call":
+            return "0x" + self._eth_call(params[0]).hex()
+        if method == "eth_getLogs":
+            return self._get_logs(params[0])
+        if method == "eth_subscribe":
+            if params[0] != "logs":
+                raise ValueError(f"unsupported subscription: {params[0]}")
+            addresses = params[1].get("address") if len(params) > 1 else None
+            if isinstance(addresses, str):
+                addresses = [addresses]
+            subscription_id = hex(next(self._subscription_ids))
+            self._subscriptions[(ws, subscription_id)] = {a.lower() for a in addresses} if addresses else None
+            return subscription_id
+        if method == "eth_unsubscribe":
+            return self._subscriptions.pop((ws, params[0]), None) is not None
+        raise ValueError(f"method not supported: {method}")
+
+    def _get_logs(self, log_filter: dict):
+        from_block = self._block(log_filter.get("fromBlock", "latest"))
+        to_block = self._block(log_filter.get("toBlock", "latest"))
+        addresses = log_filter.get("address")
+        if isinstance(addresses, str):
+            addresses = [addresses]
+        addresses = {a.lower() for a in addresses} if addresses else None
+        logs = [
+            log for log in self.logs
+            if from_block <= _to_int(log["blockNumber"]) <= to_block and (addresses is None or log["address"] in addresses)
+        ]
+        if len(logs) > self.max_logs:
+            raise ValueError(f"query returned more than {self.max_logs} results")
+        return logs
+
+    def _block(self, tag) -> int:
+        if tag in ("latest", "safe", "finalized", "pending", None):
+            return self.block_number
+        if tag == "earliest":
+            return 0
+        return _to_int(tag)
+
+    def _eth_call(self, call: dict) -> bytes:
+        target = call.get("to", "").lower()
+        data = bytes.fromhex((call.get("data") or call.get("input") or "0x")[2:])
+        if target == MULTICALL3_ADDRESS.lower() and data[:4] == AGGREGATE3_SELECTOR:
+            (calls,) = decode(["(address,bool,bytes)[]"], data[4:])
+            results = [self._inner_call(address.lower(), call_data) for address, _, call_data in calls]
+            return encode(["(bool,bytes)[]"], [results])
+        success, result = self._inner_call(target, data)
+        if not success:
+            raise ValueError("execution reverted")
+        return result
+
+    def _inner_call(self, target: str, data: bytes):
+        """Виконує виклик до пулу або Multicall3. Повертає (success, returnData)."""
+        selector = data[:4]
+        self.calls[f"call:{selector.hex()}"] += 1
+        if target == MULTICALL3_ADDRESS.lower() and selector == GET_BLOCK_NUMBER_SELECTOR:
+            return True, _word(self.block_number)
+        if target == UNISWAP_V3_FACTORY.lower() and selector == GET_POOL_SELECTOR:
+            token_a, token_b = ("0x" + data[4 + 32 * i + 12:4 + 32 * (i + 1)].hex() for i in range(2))
+            fee = int.from_bytes(data[68:100], "big")
+            address = self.factory_pools.get((min(token_a, token_b), max(token_a, token_b), fee))
+            return True, bytes(12) + bytes.fromhex(address[2:]) if address else ZERO_WORD
+        if selector == DECIMALS_SELECTOR and target in self.token_decimals:
+            return True, _word(self.token_decimals[target])
+        pool = self.pools.get(target)
+        if pool is None:
+            return False, b""
+        if selector == SLOT0_SELECTOR:
+            return True, b"".join(_word(value) for value in (pool.sqrt_price_x96, pool.tick, 0, 1, 1, 0, 1))
+        if selector == LIQUIDITY_SELECTOR:
+            return True, _word(POOL_LIQUIDITY)
+        if selector == FEE_SELECTOR:
+            return True, _word(POOL_FEE)
+        if selector == TICK_SPACING_SELECTOR:
+            return True, _word(POOL_TICK_SPACING)
+        if selector == TICK_BITMAP_SELECTOR:
+            bitmap = sum(1 << bit for bit in range(0, 256, BITMAP_STRIDE))
+            return True, _word(bitmap)
+        if selector == TICKS_SELECTOR:
+            # liquidityGross, liquidityNet = 0: ліквідність однакова в усіх діапазонах
+            return True, _word(POOL_LIQUIDITY) + ZERO_WORD * 7
+        return False, b""
+
+
+async def _serve(args):
+    node = FakeNode.from_supported_pairs(
+        block_time=args.block_time, swaps_per_block=args.swaps_per_block, latency=args.latency,
+        max_logs=args.max_logs,
+    )
+    url = await node.start(args.host, args.port)
+    print(f"node: {url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await node.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Заглушка WebSocket JSON-RPC вузла Ethereum для бенчмарків")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8546)
+    parser.add_argument("--block-time", type=float, default=1.0)
+    parser.add_argument("--swaps-per-block", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--max-logs", type=int, default=10_000)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+"""
+Модуль fake_solana.py
+---------------------
+
+Локальна заглушка JSON-RPC вузла Solana для бенчмарків та перевірки адаптера Raydium.
+
+Вузол відтворює запис змін акаунтів: файл JSONL, кожен рядок якого - {"slot": ..., "pubkey": ...,
+"data": <base64>}. На старті застосовуються всі записи першого слоту, далі кожні interval секунд -
+записи наступного слоту, а змінені акаунти розсилаються підписникам accountSubscribe. Після кінця
+запису відтворення починається спочатку (номери слотів при цьому продовжують зростати).
+
+HTTP (POST) та WebSocket обслуговуються на одному порту, як у справжнього вузла:
+getMultipleAccounts, getAccountInfo, getSlot, getHealth, accountSubscribe, accountUnsubscribe.
+
+Якщо запису немає, його можна згенерувати (synthetic_recording): пули RAYDIUM_POOLS з випадковим
+блуканням ціни, закодовані за layout з raydium_layouts.py. Записати справжні акаунти можна
+командою record (опитування getMultipleAccounts вузла Solana).
+
+Запуск (адреси потім задають у SOLANA_RPC_URL та SOLANA_WS_URL):
+    python -m bench.fake_solana serve --port 8899 [--recording raydium.jsonl]
+    python -m bench.fake_solana synth --output raydium.jsonl --slots 200
+    python -m bench.fake_solana record --rpc-url https://api.mainnet-beta.solana.com --output raydium.jsonl --duration 60
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import math
+import random
+import time
+from collections import Counter
+
+import aiohttp
+from aiohttp import web
+
+from exchanges.account_stream import get_multiple_accounts
+from exchanges.raydium_layouts import (
+    AMM_BASE_DECIMAL,
+    AMM_BASE_DECIMAL_OFFSET,
+    AMM_BASE_MINT_OFFSET,
+    AMM_BASE_VAULT_OFFSET,
+    AMM_QUOTE_MINT_OFFSET,
+    AMM_QUOTE_VAULT_OFFSET,
+    AMM_V4_SIZE,
+    CLMM_DISCRIMINATOR,
+    CLMM_MINT0_OFFSET,
+    CLMM_MINT1_OFFSET,
+    CLMM_PRICE,
+    CLMM_PRICE_OFFSET,
+    PUBKEY_SIZE,
+    TOKEN_ACCOUNT_SIZE,
+    TOKEN_AMOUNT,
+    TOKEN_AMOUNT_OFFSET,
+    b58decode,
+    b58encode,
+    decode_amm_v4,
+)
+from supported_pairs import RAYDIUM_POOLS, SOLANA_TOKEN_MINTS
+
+# Початкові ціни пулів синтетичного запису
+DEFAULT_PRICES = {
+    "SOL/USDC": 150.0,
+    "SOL/USDT": 150.1,
+    "RAY/USDC": 1.8,
+}
+# Десяткові знаки токенів синтетичного запису
+TOKEN_DECIMALS = {"SOL": 9, "USDC": 6, "USDT": 6, "RAY": 6}
+# Розмір акаунта PoolState програми CLMM
+CLMM_SIZE = 1544
+# Резерв базового токена пулів AMM v4 синтетичного запису (у цілих токенах)
+AMM_BASE_RESERVE = 100_000
+TICK_SPACING = 1
+
+
+def _derive_pubkey(*parts: str) -> str:
+    """Детермінована адреса акаунта для синтетичного запису."""
+    return b58encode(hashlib.sha256("/".join(parts).encode()).digest())
+
+
+def encode_amm_v4(base_decimals: int, quote_decimals: int, base_vault: str, quote_vault: str,
+                  base_mint: str, quote_mint: str) -> bytes:
+    """Акаунт пулу AMM v4 з полями, які читає decode_amm_v4 (решта - нулі)."""
+    data = bytearray(AMM_V4_SIZE)
+    AMM_BASE_DECIMAL.pack_into(data, AMM_BASE_DECIMAL_OFFSET, base_decimals, quote_decimals)
+    for offset, pubkey in ((AMM_BASE_VAULT_OFFSET, base_vault), (AMM_QUOTE_VAULT_OFFSET, quote_vault),
+                           (AMM_BASE_MINT_OFFSET, base_mint), (AMM_QUOTE_MINT_OFFSET, quote_mint)):
+        data[offset:offset + PUBKEY_SIZE] = b58decode(pubkey)
+    return bytes(data)
+
+
+def encode_clmm(mint0: str, mint1: str, decimals0: int, decimals1: int, sqrt_price_x64: int, liquidity: int = 10 ** 12) -> bytes:
+    """Акаунт PoolState програми CLMM з полями, які читає decode_clmm (решта - нулі)."""
+    data = bytearray(CLMM_SIZE)
+    data[:8] = CLMM_DISCRIMINATOR
+    data[CLMM_MINT0_OFFSET:CLMM_MINT0_OFFSET + PUBKEY_SIZE] = b58decode(mint0)
+    data[CLMM_MINT1_OFFSET:CLMM_MINT1_OFFSET + PUBKEY_SIZE] = b58decode(mint1)
+    mask = (1 << 64) - 1
+    tick = math.floor(math.log((sqrt_price_x64 / 2 ** 64) ** 2, 1.0001))
+    CLMM_PRICE.pack_into(
+        data, CLMM_PRICE_OFFSET, decimals0, decimals1, TICK_SPACING,
+        liquidity & mask, liquidity >> 64, sqrt_price_x64 & mask, sqrt_price_x64 >> 64, tick,
+    )
+    return bytes(data)
+
+
+def encode_token_account(mint: str, amount: int) -> bytes:
+    """Акаунт SPL Token (сховище пулу) з mint та кількістю токенів."""
+    data = bytearray(TOKEN_ACCOUNT_SIZE)
+    data[:PUBKEY_SIZE] = b58decode(mint)
+    TOKEN_AMOUNT.pack_into(data, TOKEN_AMOUNT_OFFSET, amount)
+    return bytes(data)
+
+
+def _record(slot: int, pubkey: str, data: bytes) -> dict:
+    return {"slot": slot, "pubkey": pubkey, "data": base64.b64encode(data).decode()}
+
+
+def synthetic_recording(prices=None, slots: int = 200, start_slot: int = 300_000_000, seed: int = 0) -> list:
+    """
+    Генерує запис змін акаунтів пулів RAYDIUM_POOLS: у першому слоті - усі акаунти, у кожному
+    наступному - випадкове блукання ціни (до 0.05%) одного пулу.
+
+    Повертає список записів {"slot", "pubkey", "data"}.
+    """
+    prices = {**DEFAULT_PRICES, **(prices or {})}
+    rng = random.Random(seed)
+    pools = []
+    records = []
+    for pair, info in RAYDIUM_POOLS.items():
+        if pair not in prices:
+            continue
+        base, quote = pair.split("/")
+        base_mint, quote_mint = SOLANA_TOKEN_MINTS[base], SOLANA_TOKEN_MINTS[quote]
+        pool = {"pair": pair, "info": info, "price": prices[pair], "base": base, "quote": quote}
+        if info["type"] == "clmm":
+            pool["encode"] = lambda pool, base_mint=base_mint, quote_mint=quote_mint: [(
+                pool["info"]["pool_address"],
+                encode_clmm(
+                    base_mint, quote_mint, TOKEN_DECIMALS[pool["base"]], TOKEN_DECIMALS[pool["quote"]],
+                    int(math.sqrt(pool["price"] / 10 ** (TOKEN_DECIMALS[pool["base"]] - TOKEN_DECIMALS[pool["quote"]])) * 2 ** 64),
+                ),
+            )]
+        else:
+            base_vault = _derive_pubkey(info["pool_address"], "base_vault")
+            quote_vault = _derive_pubkey(info["pool_address"], "quote_vault")
+            records.append(_record(start_slot, info["pool_address"], encode_amm_v4(
+                TOKEN_DECIMALS[base], TOKEN_DECIMALS[quote], base_vault, quote_vault, base_mint, quote_mint,
+            )))
+            records.append(_record(start_slot, base_vault, encode_token_account(
+                base_mint, AMM_BASE_RESERVE * 10 ** TOKEN_DECIMALS[base],
+            )))
+            # Ціна змінюється лише через резерв токена котирування
+            pool["encode"] = lambda pool, quote_vault=quote_vault, quote_mint=quote_mint: [(
+                quote_vault,
+                encode_token_account(quote_mint, int(AMM_BASE_RESERVE * pool["price"] * 10 ** TOKEN_DECIMALS[pool["quote"]])),
+            )]
+        pools.append(pool)
+    for pool in pools:
+        records.extend(_record(start_slot, pubkey, data) for pubkey, data in pool["encode"](pool))
+    for slot in range(start_slot + 1, start_slot + slots):
+        if not pools:
+            break
+        pool = rng.choice(pools)
+        pool["price"] *= 1 + (rng.random() - 0.5) * 0.001
+        records.extend(_record(slot, pubkey, data) for pubkey, data in pool["encode"](pool))
+    return records
+
+
+def load_recording(path: str) -> list:
+    """Читає запис змін акаунтів з файлу JSONL."""
+    with open(path) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def save_recording(path: str, records):
+    """Записує зміни акаунтів у файл JSONL."""
+    with open(path, "w") as file:
+        for record in records:
+            file.write(json.dumps(record) + "\n")
+
+
+class FakeSolana:
+    """
+    Заглушка HTTP/WebSocket JSON-RPC вузла Solana, що відтворює запис змін акаунтів.
+
+    Параметри:
+        records: Список записів {"slot", "pubkey", "data"} (за замовчуванням - synthetic_recording()).
+        interval (float): Інтервал між слотами відтворення (секунди).
+        latency (float): Затримка відповіді на запит (секунди).
+    """
+
+    def __init__(self, records=None, interval: float = 0.4, latency: float = 0.0):
+        records = sorted(records if records is not None else synthetic_recording(), key=lambda record: record["slot"])
+        # Записи, згруповані за слотом, у порядку відтворення
+        self.slots = [
+            [(record["pubkey"], record["data"]) for record in group]
+            for _, group in itertools.groupby(records, key=lambda record: record["slot"])
+        ]
+        self.first_slot = records[0]["slot"] if records else 0
+        self.interval = interval
+        self.latency = latency
+        self.slot = self.first_slot
+        # Поточні дані акаунтів (base64)
+        self.accounts = {}
+        # Кількість викликів за методом JSON-RPC
+        self.calls = Counter()
+        self._position = 0
+        self._subscriptions = {}
+        self._subscription_ids = itertools.count(1)
+        self._runner = None
+        self._producer = None
+        self.url = None
+        self.ws_url = None
+        if self.slots:
+            self._apply_next()
+
+    def reset(self):
+        """Обнуляє лічильники викликів."""
+        self.calls.clear()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Запускає вузол і відтворення; повертає адресу http:// (та сама адреса з ws:// - WebSocket)."""
+        app = web.Application()
+        app.router.add_route("*", "/", self._dispatch)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        self.ws_url = f"ws://{host}:{port}"
+        self._producer = asyncio.create_task(self._replay())
+        return self.url
+
+    async def stop(self):
+        """Зупиняє вузол."""
+        if self._producer is not None:
+            self._producer.cancel()
+            await asyncio.gather(self._producer, return_exceptions=True)
+            self._producer = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _apply_next(self) -> list:
+        """Застосовує записи наступного слоту запису; повертає змінені адреси."""
+        if self._position == len(self.slots):
+            self._position = 0
+        changes = self.slots[self._position]
+        self._position += 1
+        if self.accounts:
+            self.slot += 1
+        for pubkey, data in changes:
+            self.accounts[pubkey] = data
+        return [pubkey for pubkey, _ in changes]
+
+    async def _replay(self):
+        """Відтворює запис і розсилає змінені акаунти підписникам."""
+        while self.slots:
+            await asyncio.sleep(self.interval)
+            for pubkey in self._apply_next():
+                for (ws, subscription_id), subscribed in list(self._subscriptions.items()):
+                    if subscribed != pubkey:
+                        continue
+                    message = {
+                        "jsonrpc": "2.0",
+                        "method": "accountNotification",
+                        "params": {"subscription": subscription_id, "result": self._account_result(pubkey)},
+                    }
+                    try:
+                        await ws.send_str(json.dumps(message))
+                    except Exception:
+                        self._subscriptions.pop((ws, subscription_id), None)
+
+    def _account(self, pubkey: str):
+        data = self.accounts.get(pubkey)
+        if data is None:
+            return None
+        return {"data": [data, "base64"], "executable": False, "lamports": 1, "owner": "11111111111111111111111111111111", "rentEpoch": 0}
+
+    def _account_result(self, pubkey: str) -> dict:
+        return {"context": {"slot": self.slot}, "value": self._account(pubkey)}
+
+    async def _dispatch(self, request):
+        if request.headers.get("Upgrade", "").lower() == "websocket":
+            return await self._handle_ws(request)
+        if request.method != "POST":
+            return web.json_response({"error": "method not allowed"}, status=405)
+        payload = await request.json()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if isinstance(payload, list):
+            return web.json_response([self._respond(None, item) for item in payload])
+        return web.json_response(self._respond(None, payload))
+
+    async def _handle_ws(self, request):
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        try:
+            async for message in ws:
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                await ws.send_str(json.dumps(self._respond(ws, json.loads(message.data))))
+        finally:
+            for key in [key for key in self._subscriptions if key[0] is ws]:
+                del self._subscriptions[key]
+        return ws
+
+    def _respond(self, ws, request: dict) -> dict:
+        method = request.get("method")
+        self.calls[method] += 1
+        try:
+            return {"jsonrpc": "2.0", "id": request.get("id"), "result": self._call(ws, method, request.get("params") or [])}
+        except Exception as e:
+            return {"jsonrpc": "2.0", "id": request.get("id"), "error": {"code": -32602, "message": str(e)}}
+
+    def _call(self, ws, method: str, params: list):
+        if method == "getHealth":
+            return "ok"
+        if method == "getSlot":
+            return self.slot
+        if method == "getAccountInfo":
+            return self._account_result(params[0])
+        if method == "getMultipleAccounts":
+            return {"context": {"slot": self.slot}, "value": [self._account(pubkey) for pubkey in params[0]]}
+        if method == "accountSubscribe":
+            if ws is None:
+                raise ValueError("accountSubscribe requires a WebSocket connection")
+            subscription_id = next(self._subscription_ids)
+            self._subscriptions[(ws, subscription_id)] = params[0]
+            return subscription_id
+        if method == "accountUnsubscribe":
+            return self._subscriptions.pop((ws, params[0]), None) is not None
+        raise ValueError(f"method not supported: {method}")
+
+
+async def record_accounts(rpc_url: str, output: str, duration: float, interval: float):
+    """
+    Записує зміни акаунтів пулів RAYDIUM_POOLS (та сховищ пулів AMM v4) зі справжнього вузла:
+    акаунти опитуються getMultipleAccounts кожні interval секунд, у запис потрапляють лише зміни.
+    """
+    last = {}
+    count = 0
+    async with aiohttp.ClientSession() as session:
+        pubkeys = [info["pool_address"] for info in RAYDIUM_POOLS.values()]
+        for pubkey, data, _ in await get_multiple_accounts(session, rpc_url, pubkeys):
+            state = decode_amm_v4(data) if data is not None else None
+            if state is not None:
+                pubkeys.extend((state.base_vault, state.quote_vault))
+        deadline = time.monotonic() + duration
+        with open(output, "w") as file:
+            while time.monotonic() < deadline:
+                for pubkey, data, slot in await get_multiple_accounts(session, rpc_url, pubkeys):
+                    if data is None or last.get(pubkey) == data:
+                        continue
+                    last[pubkey] = data
+                    file.write(json.dumps(_record(slot, pubkey, data)) + "\n")
+                    count += 1
+                await asyncio.sleep(interval)
+    print(f"{count} записів -> {output}")
+
+
+async def _serve(args):
+    records = load_recording(args.recording) if args.recording else None
+    node = FakeSolana(records, interval=args.interval, latency=args.latency)
+    url = await node.start(args.host, args.port)
+    print(f"solana: {url} ({node.ws_url})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await node.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Заглушка JSON-RPC вузла Solana для бенчмарків")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="запустити вузол, що відтворює запис")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8899)
+    serve.add_argument("--recording", help="файл JSONL із записом (за замовчуванням - синтетичний запис)")
+    serve.add_argument("--interval", type=float, default=0.4)
+    serve.add_argument("--latency", type=float, default=0.0)
+    synth = commands.add_parser("synth", help="згенерувати синтетичний запис")
+    synth.add_argument("--output", required=True)
+    synth.add_argument("--slots", type=int, default=200)
+    synth.add_argument("--seed", type=int, default=0)
+    record = commands.add_parser("record", help="записати акаунти пулів зі справжнього вузла")
+    record.add_argument("--rpc-url", required=True)
+    record.add_argument("--output", required=True)
+    record.add_argument("--duration", type=float, default=60.0)
+    record.add_argument("--interval", type=float, default=1.0)
+    args = parser.parse_args()
+    try:
+        if args.command == "serve":
+            asyncio.run(_serve(args))
+        elif args.command == "synth":
+            save_recording(args.output, synthetic_recording(slots=args.slots, seed=args.seed))
+        else:
+            asyncio.run(record_accounts(args.rpc_url, args.output, args.duration, args.interval))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
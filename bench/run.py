@@ -0,0 +1,321 @@
+"""
+Модуль run.py
+-------------
+
+Навантажувальні сценарії для FastAPI додатку на локальних заглушках бірж та вузла Ethereum.
+
+Запускає три заглушки REST API бірж (формати Binance.US, KuCoin, Gate.io, див. fake_cex.py),
+заглушку вузла Ethereum (fake_node.py) та заглушку вузла Solana (fake_solana.py), потім - додаток
+в окремому процесі uvicorn, спрямований на заглушки змінними <НАЗВА>_API_URL, ETH_WS_URL,
+SOLANA_RPC_URL та SOLANA_WS_URL (з --workers N - багатопроцесний режим serve.py з N воркерами).
+Після того як усі біржі готові (/ready),
+кожен сценарій виконується протягом duration секунд з concurrency одночасними клієнтами.
+
+Для кожного сценарію виводиться: кількість запитів за секунду (RPS), p50/p95/p99 затримки,
+кількість помилок та кількість запитів до заглушок бірж і вузлів за час сценарію.
+
+Результати можна зберегти (--output) і порівняти з попереднім прогоном (--baseline): якщо RPS
+впав або p95 зріс більше ніж на --tolerance, процес завершується з кодом 1.
+
+Приклади:
+    python -m bench.run
+    python -m bench.run --scenario getRates --scenario estimate --duration 20 --concurrency 64
+    python -m bench.run --latency 0.05 --jitter 0.05 --error-rate 0.02 --env QUOTE_TTL=1
+    python -m bench.run --workers 4
+    python -m bench.run --output bench.json
+    python -m bench.run --solana-recording raydium.jsonl
+    python -m bench.run --baseline bench.json --tolerance 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import NamedTuple
+
+import aiohttp
+
+from bench.fake_cex import FakeCex
+from bench.fake_node import FakeNode
+from bench.fake_solana import FakeSolana, load_recording
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Назви бірж додатку та формати їхніх заглушок
+CEX_DIALECTS = {"binance": "binance", "kucoin": "kucoin", "gate": "gate"}
+# Пари для сценаріїв зі змішаними запитами (зокрема зворотні та багатокрокові)
+MIXED_PAIRS = [
+    ("BTC", "USDT"), ("USDT", "BTC"), ("ETH", "USDT"), ("ETH", "BTC"), ("BTC", "ETH"),
+    ("SOL", "USDT"), ("ETH", "USDC"), ("SOL", "BTC"), ("ETH", "SOL"), ("BTC", "USDC"),
+]
+# Максимальний час очікування готовності додатку (секунди)
+STARTUP_TIMEOUT = 60
+
+
+class Scenario(NamedTuple):
+    """
+    Навантажувальний сценарій: HTTP-метод, шлях та функція, що створює тіло запиту.
+    Якщо conditional=True, клієнт надсилає If-None-Match з ETag попередньої відповіді.
+    """
+    name: str
+    method: str
+    path: str
+    body: object = None
+    conditional: bool = False
+
+
+def _pair(rng):
+    return rng.choice(MIXED_PAIRS)
+
+
+def _estimate_body(rng):
+    base, quote = _pair(rng)
+    return {"inputAmount": round(rng.uniform(0.01, 10), 4), "inputCurrency": base, "outputCurrency": quote}
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("getRates", "POST", "/getRates", lambda rng: {"baseCurrency": "BTC", "quoteCurrency": "USDT"}),
+        Scenario("getRatesGet", "GET", "/getRates?baseCurrency=BTC&quoteCurrency=USDT"),
+        Scenario("getRatesEtag", "GET", "/getRates?baseCurrency=BTC&quoteCurrency=USDT", conditional=True),
+        Scenario("getRatesMixed", "POST", "/getRates", lambda rng: dict(zip(("baseCurrency", "quoteCurrency"), _pair(rng)))),
+        Scenario("estimate", "POST", "/estimate", _estimate_body),
+        Scenario("getRatesBatch", "POST", "/getRatesBatch", lambda rng: {
+            "pairs": [dict(zip(("baseCurrency", "quoteCurrency"), _pair(rng))) for _ in range(20)]
+        }),
+        Scenario("estimateBatch", "POST", "/estimateBatch", lambda rng: {
+            "requests": [_estimate_body(rng) for _ in range(20)]
+        }),
+        Scenario("spreads", "GET", "/spreads?limit=20"),
+    )
+}
+
+
+def percentile(ordered, q: float) -> float:
+    """Перцентиль q (0..1) відсортованого списку (найближчий ранг)."""
+    if not ordered:
+        return float("nan")
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _upstream_calls(venues, node, solana):
+    """Кількість запитів до кожної заглушки (для вузла Ethereum - лише методи JSON-RPC)."""
+    calls = {name: sum(server.calls.values()) for name, server in venues.items()}
+    calls["uniswap"] = sum(count for method, count in node.calls.items() if not method.startswith("call:"))
+    calls["raydium"] = sum(solana.calls.values())
+    return calls
+
+
+async def wait_ready(session, url: str, venues, timeout: float = STARTUP_TIMEOUT):
+    """Чекає, доки всі біржі з venues стануть готовими (за /ready)."""
+    deadline = time.monotonic() + timeout
+    state = None
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(f"{url}/ready") as response:
+                state = await response.json()
+            if all(state["exchanges"].get(name) == "ready" for name in venues):
+                return state
+        except (aiohttp.ClientError, ValueError):
+            pass
+        await asyncio.sleep(0.25)
+    raise RuntimeError(f"Додаток не готовий за {timeout} с: {state}")
+
+
+async def run_scenario(session, url: str, scenario: Scenario, duration: float, concurrency: int, seed: int = 0):
+    """
+    Виконує сценарій протягом duration секунд з concurrency одночасними клієнтами.
+
+    Повертає:
+        Кортеж (відсортовані затримки успішних запитів у секундах, кількість помилок, тривалість).
+    """
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    deadline = started + duration
+
+    async def client(index: int):
+        nonlocal errors
+        rng = random.Random(seed * 1000 + index)
+        etag = None
+        while time.perf_counter() < deadline:
+            body = scenario.body(rng) if scenario.body else None
+            headers = {"If-None-Match": etag} if etag else None
+            request_started = time.perf_counter()
+            try:
+                async with session.request(scenario.method, url + scenario.path, json=body, headers=headers) as response:
+                    await response.read()
+                    ok = response.status < 400
+                    if scenario.conditional:
+                        etag = response.headers.get("ETag", etag)
+            except aiohttp.ClientError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - request_started)
+            else:
+                errors += 1
+
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    return sorted(latencies), errors, time.perf_counter() - started
+
+
+def summarize(name: str, latencies, errors: int, elapsed: float, upstream: dict) -> dict:
+    """Зведення результатів сценарію."""
+    return {
+        "scenario": name,
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "upstream_calls": upstream,
+        "upstream_per_request": sum(upstream.values()) / max(len(latencies) + errors, 1),
+    }
+
+
+def print_report(results):
+    header = f"{'scenario':<15}{'requests':>10}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'upstream':>10}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(
+            f"{result['scenario']:<15}{result['requests']:>10}{result['errors']:>8}{result['rps']:>10.1f}"
+            f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+            f"{sum(result['upstream_calls'].values()):>10}"
+        )
+    print()
+    for result in results:
+        calls = ", ".join(f"{name}={count}" for name, count in result["upstream_calls"].items())
+        print(f"{result['scenario']}: {calls} ({result['upstream_per_request']:.3f} на запит)")
+
+
+def compare(results, baseline, tolerance: float):
+    """
+    Порівнює результати з попереднім прогоном. Повертає список описів регресій.
+    """
+    previous = {result["scenario"]: result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(result["scenario"])
+        if before is None:
+            continue
+        if result["rps"] < before["rps"] * (1 - tolerance):
+            regressions.append(f"{result['scenario']}: RPS {before['rps']:.1f} -> {result['rps']:.1f}")
+        if result["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{result['scenario']}: p95 {before['p95_ms']:.2f} -> {result['p95_ms']:.2f} мс")
+    return regressions
+
+
+async def run(args) -> int:
+    venues = {
+        name: FakeCex(dialect, args.extra_symbols, args.latency, args.jitter, args.error_rate, args.rate_limit_rate, seed=i)
+        for i, (name, dialect) in enumerate(CEX_DIALECTS.items())
+    }
+    node = FakeNode.from_supported_pairs(block_time=args.block_time, swaps_per_block=args.swaps_per_block, latency=args.node_latency)
+    env = dict(os.environ, LOG_LEVEL="ERROR", QUOTE_SOURCE="local")
+    # Пули, події Swap та котирування заглушок не повинні потрапити в кеші та стрічку котирувань додатку
+    cache_dir = tempfile.TemporaryDirectory()
+    env["QUOTE_TAPE_DIR"] = os.path.join(cache_dir.name, "tape")
+    env["POOL_CACHE_FILE"] = os.path.join(cache_dir.name, "uniswap_pools_cache.json")
+    env["BACKFILL_CACHE_DIR"] = os.path.join(cache_dir.name, "swaps")
+    env["QUOTE_TABLE_PATH"] = os.path.join(cache_dir.name, "quotes.bin")
+    env["EFFECTIVE_QUOTE_SOCKET"] = os.path.join(cache_dir.name, "effective.sock")
+    for name, server in venues.items():
+        env[f"{name.upper()}_API_URL"] = await server.start()
+    env["ETH_WS_URL"] = await node.start()
+    solana = FakeSolana(load_recording(args.solana_recording) if args.solana_recording else None, interval=args.slot_time)
+    env["SOLANA_RPC_URL"] = await solana.start()
+    env["SOLANA_WS_URL"] = solana.ws_url
+    for item in args.env:
+        key, _, value = item.partition("=")
+        env[key] = value
+
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    if args.workers:
+        command = [sys.executable, "serve.py"]
+        env.update(PORT=str(port), WEB_CONCURRENCY=str(args.workers))
+    else:
+        command = [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+    app = subprocess.Popen(command, cwd=ROOT_DIR, env=env)
+    results = []
+    try:
+        connector = aiohttp.TCPConnector(limit=0)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            await wait_ready(session, url, list(venues) + ["uniswap", "raydium"])
+            for name in args.scenario or list(SCENARIOS):
+                scenario = SCENARIOS[name]
+                # Прогрів: кеші додатку та з'єднання клієнтів
+                await run_scenario(session, url, scenario, args.warmup, args.concurrency, args.seed)
+                for server in venues.values():
+                    server.reset()
+                node.reset()
+                solana.reset()
+                latencies, errors, elapsed = await run_scenario(
+                    session, url, scenario, args.duration, args.concurrency, args.seed
+                )
+                results.append(summarize(name, latencies, errors, elapsed, _upstream_calls(venues, node, solana)))
+    finally:
+        app.terminate()
+        try:
+            app.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            app.kill()
+        await asyncio.gather(*(server.stop() for server in venues.values()), node.stop(), solana.stop())
+        cache_dir.cleanup()
+
+    print_report(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nРегресії:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Навантажувальні сценарії для додатку на локальних заглушках бірж")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="сценарій (можна кілька; за замовчуванням усі)")
+    parser.add_argument("--duration", type=float, default=10.0, help="тривалість сценарію, секунди")
+    parser.add_argument("--warmup", type=float, default=2.0, help="тривалість прогріву перед сценарієм, секунди")
+    parser.add_argument("--concurrency", type=int, default=32, help="кількість одночасних клієнтів")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.02, help="затримка заглушок бірж, секунди")
+    parser.add_argument("--jitter", type=float, default=0.01, help="випадкова добавка до затримки, секунди")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="частка відповідей HTTP 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="частка відповідей HTTP 429")
+    parser.add_argument("--extra-symbols", type=int, default=500, help="додаткові символи в тікерах заглушок")
+    parser.add_argument("--node-latency", type=float, default=0.005, help="затримка заглушки вузла, секунди")
+    parser.add_argument("--block-time", type=float, default=1.0, help="інтервал блоків заглушки вузла, секунди")
+    parser.add_argument("--swaps-per-block", type=int, default=4)
+    parser.add_argument("--slot-time", type=float, default=0.4, help="інтервал слотів заглушки вузла Solana, секунди")
+    parser.add_argument("--solana-recording", help="запис акаунтів для заглушки вузла Solana (JSONL, див. fake_solana.py)")
+    parser.add_argument("--env", action="append", default=[], help="змінна середовища додатку KEY=VALUE")
+    parser.add_argument("--workers", type=int, default=0, help="запустити serve.py з цією кількістю HTTP-воркерів (0 - один процес uvicorn)")
+    parser.add_argument("--output", help="зберегти результати в JSON")
+    parser.add_argument("--baseline", help="порівняти з результатами попереднього прогону (JSON)")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="допустиме погіршення RPS/p95 (частка)")
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
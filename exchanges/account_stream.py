@@ -0,0 +1,202 @@
+"""
+Модуль account_stream.py
+------------------------
+
+Цей модуль містить потік оновлень акаунтів Solana (AccountStream) через WebSocket JSON-RPC
+(accountSubscribe) та пакетне читання акаунтів через HTTP JSON-RPC (getMultipleAccounts).
+
+Одне WebSocket-з'єднання тримає підписки на всі акаунти. Запити підписки надсилаються без
+очікування відповіді: відповідь зі своїм id зіставляється з акаунтом у тому ж циклі, що читає
+сповіщення, тож нові акаунти можна додавати до активного з'єднання. Після обриву з'єднання
+виконується повторне підключення з експоненційною затримкою й перепідписка на всі акаунти;
+пропущені за цей час зміни дочитує обробник on_disconnect (getMultipleAccounts).
+
+Дані акаунтів запитуються й надходять у кодуванні base64; обробник отримує сирі байти та слот.
+"""
+
+import asyncio
+import base64
+import itertools
+import json
+import os
+
+import websockets
+
+from logs import get_logger
+
+logger = get_logger("account_stream")
+
+# Рівень підтвердження даних Solana (processed, confirmed, finalized)
+SOLANA_COMMITMENT = os.getenv("SOLANA_COMMITMENT", "confirmed")
+# Максимальна кількість акаунтів в одному запиті getMultipleAccounts
+MAX_MULTIPLE_ACCOUNTS = 100
+
+# Затримка перед повторним підключенням (секунди)
+RECONNECT_DELAY = 1
+MAX_RECONNECT_DELAY = 30
+
+
+def decode_account_data(value: dict) -> bytes:
+    """
+    Повертає сирі байти акаунта з відповіді JSON-RPC (поле value) або None, якщо акаунта немає.
+    """
+    if not value:
+        return None
+    data = value.get("data")
+    if isinstance(data, list) and len(data) == 2 and data[1] == "base64":
+        return base64.b64decode(data[0])
+    return None
+
+
+async def get_multiple_accounts(session, rpc_url: str, pubkeys, commitment: str = SOLANA_COMMITMENT):
+    """
+    Читає акаунти пакетами через getMultipleAccounts.
+
+    Параметри:
+        session: aiohttp.ClientSession.
+        rpc_url (str): Адреса HTTP JSON-RPC вузла Solana.
+        pubkeys: Адреси акаунтів (base58).
+
+    Повертає:
+        Список (адреса, дані або None, слот) у порядку pubkeys.
+    """
+    pubkeys = list(pubkeys)
+    accounts = []
+    for start in range(0, len(pubkeys), MAX_MULTIPLE_ACCOUNTS):
+        chunk = pubkeys[start:start + MAX_MULTIPLE_ACCOUNTS]
+        payload = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "getMultipleAccounts",
+            "params": [chunk, {"encoding": "base64", "commitment": commitment}],
+        }
+        async with session.post(rpc_url, json=payload) as response:
+            response.raise_for_status()
+            message = await response.json()
+        if "error" in message:
+            raise RuntimeError(f"getMultipleAccounts: {message['error']}")
+        result = message["result"]
+        slot = result["context"]["slot"]
+        accounts.extend((pubkey, decode_account_data(value), slot) for pubkey, value in zip(chunk, result["value"]))
+    return accounts
+
+
+class AccountStream:
+    """
+    Потік оновлень акаунтів Solana через accountSubscribe.
+
+    Параметри:
+        ws_url (str): Адреса WebSocket JSON-RPC вузла Solana.
+        on_account: Функція, яка викликається як on_account(адреса, дані, слот) для кожного оновлення.
+        on_disconnect: Необов'язкова функція, яка викликається після обриву активного з'єднання.
+        commitment (str): Рівень підтвердження даних.
+    """
+
+    def __init__(self, ws_url: str, on_account, on_disconnect=None, commitment: str = SOLANA_COMMITMENT):
+        self.ws_url = ws_url
+        self.on_account = on_account
+        self.on_disconnect = on_disconnect
+        self.commitment = commitment
+        self.accounts = []
+        self.connected = False
+        self._ws = None
+        self._request_ids = itertools.count(1)
+        # id запиту підписки -> адреса; id підписки -> адреса
+        self._pending = {}
+        self._subscriptions = {}
+        self._task = None
+
+    def start(self):
+        """
+        Запускає фонову задачу потоку, якщо вона ще не працює.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Зупиняє фонову задачу потоку та закриває з'єднання.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def add_accounts(self, pubkeys):
+        """
+        Додає акаунти до підписки (на активному з'єднанні підписка виконується одразу).
+        """
+        new = [pubkey for pubkey in dict.fromkeys(pubkeys) if pubkey not in self.accounts]
+        self.accounts.extend(new)
+        if self._ws is not None and self.connected:
+            for pubkey in new:
+                await self._subscribe(self._ws, pubkey)
+
+    async def _subscribe(self, ws, pubkey: str):
+        request_id = next(self._request_ids)
+        self._pending[request_id] = pubkey
+        await ws.send(json.dumps({
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": "accountSubscribe",
+            "params": [pubkey, {"encoding": "base64", "commitment": self.commitment}],
+        }))
+
+    def _handle_message(self, message: dict):
+        """
+        Обробляє відповідь на запит підписки або сповіщення accountNotification.
+        """
+        if "id" in message:
+            pubkey = self._pending.pop(message["id"], None)
+            if pubkey is None:
+                return
+            if "error" in message:
+                logger.warning("Помилка підписки на акаунт %s: %s", pubkey, message["error"])
+            else:
+                self._subscriptions[message["result"]] = pubkey
+            return
+        if message.get("method") != "accountNotification":
+            return
+        params = message.get("params", {})
+        pubkey = self._subscriptions.get(params.get("subscription"))
+        result = params.get("result") or {}
+        if pubkey is None:
+            return
+        data = decode_account_data(result.get("value"))
+        if data is not None:
+            self.on_account(pubkey, data, result.get("context", {}).get("slot", 0))
+
+    async def _run(self):
+        """
+        Основний цикл: підключення, підписка на всі акаунти та обробка сповіщень.
+        Після обриву з'єднання виконується повторне підключення з експоненційною затримкою.
+        """
+        delay = RECONNECT_DELAY
+        while True:
+            try:
+                async with websockets.connect(self.ws_url, max_size=None) as ws:
+                    self._ws = ws
+                    self._pending = {}
+                    self._subscriptions = {}
+                    for pubkey in self.accounts:
+                        await self._subscribe(ws, pubkey)
+                    self.connected = True
+                    delay = RECONNECT_DELAY
+                    logger.info("Підписка на %s акаунтів активна", len(self.accounts))
+                    async for raw in ws:
+                        self._handle_message(json.loads(raw))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Помилка потоку акаунтів: %s", e)
+            finally:
+                self._ws = None
+                was_connected, self.connected = self.connected, False
+            if was_connected and self.on_disconnect is not None:
+                self.on_disconnect()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
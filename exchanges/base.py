@@ -5,8 +5,28 @@
 Цей модуль містить базовий клас Exchange, який задає інтерфейс для роботи з криптобіржами.
 Всі конкретні реалізації бірж (як централізованих, так і децентралізованих) повинні наслідуватися від цього класу
 та реалізовувати метод get_latest_price для отримання останньої ціни за заданою парою валют.
+
+Метод get_latest_quote повертає ту саму ціну разом з часом її отримання (Quote), щоб API
+міг повідомити клієнтам вік котирування.
+
+Метод get_shared_quote об'єднує одночасні запити для однієї пари (та зворотної до неї)
+в один запит до біржі. Хеджування (latency.hedged) застосовується лише до самого звернення
+до біржі (див. CexExchange), а не до відповідей з пам'яті.
+
+Метод get_effective_quote повертає курс обміну конкретної суми з урахуванням глибини ринку
+(стакан CEX або ліквідність пулу DEX); у базовому класі це поточний курс.
+
+Атрибут health (HealthTracker) тримає запобіжники біржі та її пар: API пропускає біржу або пару
+з відкритим запобіжником, а пробні запити (get_latest_quote) виконуються у фоні.
 """
 
+import time
+
+from .health import HealthTracker
+from .quote_store import Quote
+from .singleflight import SingleFlight, pair_key
+
+
 class Exchange:
     def __init__(self, name: str):
         """
@@ -16,6 +36,10 @@ class Exchange:
             name (str): Назва біржі (наприклад, "binance", "kucoin" тощо).
         """
         self.name = name
+        # Запити, що виконуються, за канонічним ключем пари
+        self.inflight = SingleFlight()
+        # Запобіжники біржі та пар; проба - звичайне отримання котирування
+        self.health = HealthTracker(name, self.get_latest_quote)
 
     async def get_latest_price(self, base: str, quote: str) -> float:
         """
@@ -33,3 +57,91 @@ class Exchange:
             у класах-нащадках, які представляють конкретні біржі.
         """
         raise NotImplementedError("Метод get_latest_price не реалізовано")
+
+    async def get_latest_quote(self, base: str, quote: str, hedge: bool = False) -> Quote:
+        """
+        Асинхронний метод, який повертає останнє котирування (ціну та час отримання) для пари base/quote.
+
+        У базовому класі викликає get_latest_price і позначає результат поточним часом.
+        Біржі, які тримають ціни у сховищі котирувань, перевизначають цей метод, щоб повертати
+        реальний час отримання ціни.
+
+        Параметр hedge дозволяє хеджувати звернення до біржі (якщо воно потрібне); біржі, що
+        відповідають з пам'яті, його ігнорують.
+
+        Повертає:
+            Quote: Котирування або None, якщо ціну отримати не вдалося.
+        """
+        price = await self.get_latest_price(base, quote)
+        if price is None:
+            return None
+        return Quote(price, time.time())
+
+    async def get_shared_quote(self, base: str, quote: str, hedge: bool = False) -> Quote:
+        """
+        Повертає котирування для пари base/quote, об'єднуючи одночасні запити.
+
+        Одночасні виклики для однієї пари, а також для зворотної до неї, очікують на один
+        спільний виклик get_latest_quote для канонічного напрямку пари; результат для
+        зворотного напрямку інвертується.
+
+        Параметри:
+            base (str): Базова валюта.
+            quote (str): Валюта котирування.
+            hedge (bool): Чи дозволено хеджувати звернення до біржі (див. latency.hedged).
+
+        Повертає:
+            Quote: Котирування або None, якщо ціну отримати не вдалося.
+        """
+        (canonical_base, canonical_quote), inverted = pair_key(base, quote)
+        result = await self.inflight.do(
+            (canonical_base, canonical_quote),
+            lambda: self.get_latest_quote(canonical_base, canonical_quote, hedge),
+        )
+        if result is None or not inverted:
+            return result
+        return result.inverted()
+
+    async def get_effective_quote(self, base: str, quote: str, amount: float, hedge: bool = False) -> Quote:
+        """
+        Повертає ефективний курс обміну amount base на quote (отримана сума / amount).
+
+        У базовому класі глибина ринку не враховується і повертається поточний курс
+        (get_shared_quote). Біржі, що тримають стакан або стан ліквідності в пам'яті,
+        перевизначають цей метод.
+
+        Параметри:
+            base (str): Валюта, яку обмінюють.
+            quote (str): Валюта, яку хочуть отримати.
+            amount (float): Сума обміну в base.
+            hedge (bool): Чи дозволено хеджувати запит до біржі.
+
+        Повертає:
+            Quote: Ефективний курс або None, якщо даних немає.
+        """
+        return await self.get_shared_quote(base, quote, hedge)
+
+    def is_warm(self) -> bool:
+        """
+        Чи має біржа дані для відповідей (для ендпоінту готовності /ready).
+        У базовому класі біржа вважається готовою одразу після запуску.
+        """
+        return True
+
+    async def start(self):
+        """
+        Асинхронний метод запуску біржі (відкриття з'єднань, фонові задачі тощо).
+
+        Викликається один раз під час старту FastAPI додатку (lifespan).
+        У базовому класі нічого не робить.
+        """
+        return None
+
+    async def close(self):
+        """
+        Асинхронний метод зупинки біржі, який закриває відкриті з'єднання та фонові задачі.
+
+        Викликається один раз під час зупинки FastAPI додатку (lifespan).
+        У базовому класі нічого не робить.
+        """
+        return None
@@ -3,20 +3,37 @@
 -----------------
 
 Цей модуль містить реалізацію класу BinanceExchange, який наслідується від CexExchange.
-Клас BinanceExchange використовує бібліотеку ccxt для взаємодії з API біржі Binance.
+Клас BinanceExchange використовує асинхронний клієнт бібліотеки ccxt (ccxt.async_support)
+для взаємодії з API біржі Binance без блокування циклу подій.
 """
 
-import ccxt
+import ccxt.async_support as ccxt
 from .cex_exchange import CexExchange
+from .rate_limiter import RateLimiter
+
+# Ліміт Binance.US: 1200 одиниць ваги запитів (REQUEST_WEIGHT) за хвилину на IP
+REQUEST_WEIGHT_LIMIT = 1200
+REQUEST_WEIGHT_WINDOW = 60
+# Вага запитів за документацією Binance.US
+REQUEST_COSTS = {
+    'fetch_tickers': 40,    # GET /api/v3/ticker/24hr без символу
+    'fetch_ticker': 1,      # GET /api/v3/ticker/24hr для одного символу
+    'fetch_order_book': 1,  # GET /api/v3/depth, limit <= 100
+    'load_markets': 10,     # GET /api/v3/exchangeInfo
+}
 
 class BinanceExchange(CexExchange):
     def __init__(self):
         """
         Ініціалізує об'єкт BinanceExchange.
 
-        Використовується клієнт ccxt для Binance із ввімкненим лімітуванням запитів
-        ('enableRateLimit': True), що допомагає уникнути перевищення обмежень API.
+        Використовується асинхронний клієнт ccxt для Binance. Запити обмежуються планувальником
+        (RateLimiter) за опублікованим лімітом ваги запитів Binance.US.
         """
-        client = ccxt.binanceus({'enableRateLimit': True})
-        super().__init__('binance', client)
-
+        client = ccxt.binanceus({'enableRateLimit': False})
+        super().__init__(
+            'binance',
+            client,
+            RateLimiter.for_limit(REQUEST_WEIGHT_LIMIT, REQUEST_WEIGHT_WINDOW),
+            REQUEST_COSTS,
+        )
@@ -4,61 +4,453 @@
 
 Цей модуль містить клас CexExchange, який є базовим для централізованих бірж (CEX), що використовують бібліотеку ccxt.
 Клас наслідується від базового класу Exchange і реалізує метод get_latest_price для отримання останньої ціни заданої пари валют.
+
+Клієнти ccxt є асинхронними (ccxt.async_support): запити не блокують цикл подій, а HTTP-сесія
+клієнта (aiohttp) тримає з'єднання відкритими для повторного використання між запитами.
+
+Ціни не запитуються на кожен запит API: фонова задача періодично завантажує всі тікери біржі
+одним запитом (fetch_tickers) у спільне сховище котирувань. Запит до біржі за окремою парою
+(fetch_ticker) виконується лише тоді, коли дані у сховищі застаріли. Лише цей запит хеджується
+(latency.hedged), і лише його затримки враховуються у p95 біржі: відповіді зі сховища не
+занижують p95 і не призводять до дублювання запитів.
+
+Список ринків біржі завантажується у фоні та періодично оновлюється в індекс символів
+(base, quote) -> (символ, інвертована чи ні). Тож визначення символу для пари - це один пошук
+у словнику до будь-якого звернення до мережі, а непідтримувані пари відкидаються одразу.
+
+Для символів з ORDER_BOOK_SYMBOLS у пам'яті підтримуються локальні копії стаканів (OrderBook).
+Це опитування REST-знімків (fetch_order_book глибиною ORDER_BOOK_DEPTH) кожні
+ORDER_BOOK_REFRESH_INTERVAL секунд, а не потік змін біржі (diff/WebSocket): кожен знімок
+замінює стакан повністю, тож рівні, яких у знімку вже немає, не залишаються в стакані.
+Стакан відстає від біржі до одного інтервалу опитування, і кожне опитування коштує повну
+вагу запиту знімка. З локальних стаканів
+get_effective_quote рахує реальну суму обміну з урахуванням глибини ринку.
+
+Усі запити до біржі проходять через планувальник (RateLimiter) з вагою запиту за опублікованими
+лімітами біржі: запити користувачів (fetch_ticker при застарілому котируванні) обслуговуються
+раніше за фонові оновлення тікерів, ринків і стаканів. Вбудоване лімітування ccxt
+(enableRateLimit) вимкнено, бо воно не розрізняє пріоритетів.
+
+Інтервали фонових оновлень тікерів і стаканів виводяться з ваги їхніх запитів та швидкості
+поповнення відра (background_intervals): якщо за налаштованих інтервалів фонові запити
+споживали б більше за RATE_LIMIT_BACKGROUND_SHARE поповнення, подовжуються інтервали тих
+оновлень, що не вкладаються у свою частку бюджету (наприклад, тікерів Binance.US, де
+fetch_tickers важить 40). Максимальний вік стакану для розрахунків не менший за два інтервали
+оновлення стаканів.
+
+REST-адреси ccxt-клієнта можна спрямувати на інший хост змінною <НАЗВА>_API_URL (наприклад,
+BINANCE_API_URL=http://127.0.0.1:9001 для локальної заглушки біржі з bench/).
+
+Тривалість і результат кожного запиту до біржі (ok, error, timeout, rate_limited, cancelled)
+та звернення до сховища котирувань (hit/miss) записуються в метрики (модуль metrics).
 """
 
-import ccxt
+import asyncio
+import os
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+from ccxt.base.errors import BadRequest, BadSymbol, DDoSProtection, RateLimitExceeded, RequestTimeout
+
+import metrics
+from logs import get_logger
 from .base import Exchange
+from .health import PairError, Throttled
+from .latency import LatencyTracker, hedged
+from .order_book import OrderBook
+from .quote_store import Quote, quote_store
+from .rate_limiter import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, RATE_LIMIT_BACKOFF, RateLimiter
+
+logger = get_logger("cex")
+
+# Інтервал оновлення тікерів у фоні (секунди)
+TICKERS_REFRESH_INTERVAL = float(os.getenv("TICKERS_REFRESH_INTERVAL", "2"))
+# Максимальний вік котирування, після якого виконується запит до біржі (секунди)
+QUOTE_TTL = float(os.getenv("QUOTE_TTL", "10"))
+# Інтервал оновлення списку ринків біржі (секунди)
+MARKETS_REFRESH_INTERVAL = float(os.getenv("MARKETS_REFRESH_INTERVAL", "3600"))
+# Символи, для яких підтримуються локальні стакани
+ORDER_BOOK_SYMBOLS = [
+    symbol.strip().upper()
+    for symbol in os.getenv("ORDER_BOOK_SYMBOLS", "BTC/USDT,ETH/USDT,SOL/USDT,ETH/BTC").split(",")
+    if symbol.strip()
+]
+# Глибина стакану (кількість рівнів з кожного боку)
+ORDER_BOOK_DEPTH = int(os.getenv("ORDER_BOOK_DEPTH", "100"))
+# Інтервал опитування REST-знімків стаканів (секунди)
+ORDER_BOOK_REFRESH_INTERVAL = float(os.getenv("ORDER_BOOK_REFRESH_INTERVAL", "5"))
+# Максимальний вік стакану, після якого він не використовується для розрахунків (секунди)
+ORDER_BOOK_TTL = float(os.getenv("ORDER_BOOK_TTL", "10"))
+
+# Вага запитів за замовчуванням (у конкретних біржах задається за їхньою документацією)
+DEFAULT_REQUEST_COSTS = {
+    'fetch_tickers': 1,
+    'fetch_ticker': 1,
+    'fetch_order_book': 1,
+    'load_markets': 1,
+}
+
+
+def override_api_url(client, base_url: str):
+    """
+    Спрямовує всі REST-адреси ccxt-клієнта на хост base_url, зберігаючи шляхи API біржі.
+    """
+    target = urlsplit(base_url)
+
+    def rewrite(urls):
+        if isinstance(urls, dict):
+            return {key: rewrite(value) for key, value in urls.items()}
+        if isinstance(urls, str):
+            parts = urlsplit(urls)
+            return urlunsplit((target.scheme, target.netloc, parts.path, parts.query, parts.fragment))
+        return urls
+
+    client.urls['api'] = rewrite(client.urls['api'])
+
 
 class CexExchange(Exchange):
-    def __init__(self, name: str, client):
+    def __init__(self, name: str, client, rate_limiter: RateLimiter = None, request_costs: dict = None):
         """
         Ініціалізує об'єкт CexExchange.
 
         Параметри:
             name (str): Назва біржі (наприклад, "binance", "kucoin" тощо).
-            client: Екземпляр ccxt-клієнта, який використовується для взаємодії з API біржі
-                    (наприклад, ccxt.binance() або ccxt.kucoin()).
+            client: Екземпляр асинхронного ccxt-клієнта, який використовується для взаємодії з API біржі
+                    (наприклад, ccxt.async_support.binance() або ccxt.async_support.kucoin()).
+            rate_limiter (RateLimiter): Планувальник запитів за лімітами біржі.
+            request_costs (dict): Вага запитів за назвою методу ccxt.
         """
         super().__init__(name)
         self.client = client
+        api_url = os.getenv(f"{name.upper()}_API_URL")
+        if api_url:
+            override_api_url(client, api_url)
+        self.rate_limiter = rate_limiter or RateLimiter.for_limit(10, 1)
+        self.request_costs = {**DEFAULT_REQUEST_COSTS, **(request_costs or {})}
+        self.quote_store = quote_store
+        self.refresh_interval = TICKERS_REFRESH_INTERVAL
+        self.quote_ttl = QUOTE_TTL
+        # Затримки запитів fetch_ticker до біржі (для хеджування)
+        self.latency = LatencyTracker()
+        self.markets_refresh_interval = MARKETS_REFRESH_INTERVAL
+        # Індекс символів: (base, quote) -> (символ, inverted); None, доки ринки не завантажено
+        self.symbol_index = None
+        # Локальні стакани за символом
+        self.order_books = {symbol: OrderBook(symbol) for symbol in ORDER_BOOK_SYMBOLS}
+        self.order_book_interval = ORDER_BOOK_REFRESH_INTERVAL
+        self.order_book_ttl = ORDER_BOOK_TTL
+        # Час останнього успішного завантаження тікерів
+        self.tickers_updated = None
+        self._tasks = []
 
-    async def get_latest_price(self, base: str, quote: str) -> float:
+    async def start(self):
         """
-        Асинхронний метод для отримання останньої ціни (latest price) для пари валют.
+        Запускає фонові задачі періодичного оновлення тікерів та списку ринків.
+        """
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._refresh_loop()),
+                asyncio.create_task(self._markets_loop()),
+                asyncio.create_task(self._order_books_loop()),
+            ]
+
+    async def close(self):
+        """
+        Зупиняє фонові задачі та закриває HTTP-сесію ccxt-клієнта разом з пулом відкритих з'єднань.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.client.close()
+
+    def _can_hedge(self) -> bool:
+        """
+        Чи можна запускати дублікат запиту: лише коли планувальник не призупинено і в ньому немає
+        черги (інакше дублікат чекав би за першим запитом і витрачав ліміт).
+        """
+        return not self.rate_limiter.paused and not self.rate_limiter.queued
+
+    async def _request(self, method: str, *args, priority: int = PRIORITY_BACKGROUND, latency: LatencyTracker = None):
+        """
+        Виконує метод ccxt-клієнта через планувальник запитів.
+
+        Якщо передано latency, у нього записується тривалість успішного HTTP-звернення до біржі
+        (без часу очікування в черзі планувальника).
+
+        Якщо біржа відповіла помилкою ліміту, планувальник призупиняється на Retry-After
+        (або RATE_LIMIT_BACKOFF) секунд, а помилка передається далі.
+        """
+        await self.rate_limiter.acquire(self.request_costs[method], priority)
+        started = time.perf_counter()
+        status = 'error'
+        try:
+            result = await getattr(self.client, method)(*args)
+            status = 'ok'
+            if latency is not None:
+                latency.record(time.perf_counter() - started)
+            return result
+        except (DDoSProtection, RateLimitExceeded):
+            status = 'rate_limited'
+            headers = self.client.last_response_headers or {}
+            retry_after = headers.get('Retry-After') or headers.get('retry-after')
+            try:
+                delay = float(retry_after)
+            except (TypeError, ValueError):
+                delay = RATE_LIMIT_BACKOFF
+            logger.warning("[%s] Перевищено ліміт запитів, пауза %s с", self.name, delay)
+            self.rate_limiter.pause(delay)
+            raise
+        except RequestTimeout:
+            status = 'timeout'
+            raise
+        except asyncio.CancelledError:
+            status = 'cancelled'
+            raise
+        finally:
+            metrics.UPSTREAM_DURATION.observe(self.name, method, value=time.perf_counter() - started)
+            metrics.UPSTREAM_REQUESTS.inc(self.name, method, status)
+
+    async def load_markets(self):
+        """
+        Завантажує список спотових ринків біржі та перебудовує індекс символів.
+
+        Для кожного активного ринку BASE/QUOTE в індекс записуються два ключі:
+        (BASE, QUOTE) -> (символ, False) та (QUOTE, BASE) -> (символ, True).
+        Пряма пара має пріоритет над інвертованою.
+        """
+        markets = await self._request('load_markets', True)
+        index = {}
+        for symbol, market in markets.items():
+            if not market.get('spot', True) or market.get('active') is False:
+                continue
+            base = market['base'].upper()
+            quote = market['quote'].upper()
+            index[(base, quote)] = (symbol, False)
+            index.setdefault((quote, base), (symbol, True))
+        self.symbol_index = index
+
+    def resolve_symbol(self, base: str, quote: str):
+        """
+        Визначає символ біржі для пари base/quote без звернень до мережі.
+
+        Повертає:
+            Список кандидатів [(символ, inverted), ...]. Якщо ринки завантажено, список містить
+            не більше одного кандидата (порожній для непідтримуваної пари); інакше - пряму
+            та зворотну пари для перевірки по черзі.
+        """
+        if self.symbol_index is None:
+            return [(f"{base}/{quote}", False), (f"{quote}/{base}", True)]
+        resolved = self.symbol_index.get((base, quote))
+        return [resolved] if resolved else []
+
+    async def _markets_loop(self):
+        """
+        Фонова задача, яка оновлює індекс символів кожні markets_refresh_interval секунд.
+        Після невдалого завантаження повторна спроба виконується через refresh_interval секунд.
+        """
+        while True:
+            try:
+                await self.load_markets()
+                delay = self.markets_refresh_interval
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("[%s] Помилка завантаження ринків: %s", self.name, e)
+                delay = self.refresh_interval
+            await asyncio.sleep(delay)
+
+    async def refresh_tickers(self):
+        """
+        Завантажує всі тікери біржі одним запитом (fetch_tickers) і записує останні ціни у сховище котирувань.
+        """
+        tickers = await self._request('fetch_tickers')
+        now = time.time()
+        for symbol, ticker in tickers.items():
+            last = ticker.get('last') if ticker else None
+            if last:
+                self.quote_store.update(self.name, symbol, last, now)
+        self.tickers_updated = now
+
+    def is_warm(self) -> bool:
+        """Біржа готова, щойно тікери завантажено хоча б один раз."""
+        return self.tickers_updated is not None
+
+    def tracked_order_books(self):
+        """
+        Стакани, які оновлюються у фоні: символи, якими біржа не торгує (за індексом ринків), пропускаються.
+        """
+        return [
+            book for symbol, book in self.order_books.items()
+            if self.symbol_index is not None and self.symbol_index.get(tuple(symbol.split('/'))) == (symbol, False)
+        ]
+
+    def background_intervals(self):
+        """
+        Інтервали фонових оновлень (тікерів, стаканів) з урахуванням бюджету запитів біржі.
+
+        Споживання кожного оновлення за налаштованого інтервалу (refresh_interval,
+        order_book_interval) - вага fetch_tickers за інтервал тікерів та вага fetch_order_book
+        усіх стаканів за інтервал стаканів. Якщо разом вони перевищують частку поповнення відра
+        для фонових запитів, подовжуються інтервали тих оновлень, що не вкладаються у свою
+        частку (RateLimiter.background_scales).
+
+        Повертає:
+            Кортеж (інтервал тікерів, інтервал стаканів) у секундах.
+        """
+        books = len(self.tracked_order_books())
+        tickers_scale, books_scale = self.rate_limiter.background_scales([
+            self.request_costs['fetch_tickers'] / self.refresh_interval,
+            books * self.request_costs['fetch_order_book'] / self.order_book_interval,
+        ])
+        return self.refresh_interval * tickers_scale, self.order_book_interval * books_scale
+
+    async def _refresh_loop(self):
+        """
+        Фонова задача, яка оновлює тікери з інтервалом background_intervals (не частіше за refresh_interval).
+        """
+        while True:
+            try:
+                await self.refresh_tickers()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("[%s] Помилка оновлення тікерів: %s", self.name, e)
+            await asyncio.sleep(self.background_intervals()[0])
+
+    async def refresh_order_book(self, book: OrderBook):
+        """
+        Завантажує REST-знімок стакану символу й замінює ним локальну копію: кожен запит -
+        повний знімок глибиною ORDER_BOOK_DEPTH, тож застарілі рівні не переживають опитування.
+        """
+        snapshot = await self._request('fetch_order_book', book.symbol, ORDER_BOOK_DEPTH)
+        book.apply_snapshot(snapshot['bids'], snapshot['asks'])
+
+    async def _order_books_loop(self):
+        """
+        Фонова задача, яка оновлює локальні стакани з інтервалом background_intervals
+        (не частіше за order_book_interval).
+        """
+        while True:
+            books = self.tracked_order_books()
+            results = await asyncio.gather(*(self.refresh_order_book(book) for book in books), return_exceptions=True)
+            for book, result in zip(books, results):
+                if isinstance(result, Exception):
+                    logger.warning("[%s] Помилка оновлення стакану %s: %s", self.name, book.symbol, result)
+            await asyncio.sleep(self.background_intervals()[1])
+
+    async def get_effective_quote(self, base: str, quote: str, amount: float, hedge: bool = False) -> Quote:
+        """
+        Повертає ефективний курс обміну amount base на quote з урахуванням глибини стакану.
+
+        Якщо для символу пари є свіжий локальний стакан, сума обміну рахується обходом рівнів:
+        продаж base по бідах для прямої пари або купівля по асках для зворотної. Інакше, а також
+        якщо глибини стакану недостатньо, повертається поточний курс (як у базовому класі).
+
+        Повертає:
+            Quote: Курс (отримана сума / amount) та час оновлення стакану.
+        """
+        base = base.upper()
+        quote = quote.upper()
+        if amount > 0:
+            # Стакан не вважається застарілим, доки не пропущено більше одного оновлення
+            max_age = max(self.order_book_ttl, 2 * self.background_intervals()[1])
+            for symbol, inverted in self.resolve_symbol(base, quote):
+                book = self.order_books.get(symbol)
+                if book is None or book.age is None or book.age > max_age:
+                    continue
+                output = book.buy_base(amount) if inverted else book.sell_base(amount)
+                if output is not None:
+                    return Quote(output / amount, book.timestamp)
+        return await super().get_effective_quote(base, quote, amount, hedge)
+
+    async def get_latest_quote(self, base: str, quote: str, hedge: bool = False) -> Quote:
+        """
+        Асинхронний метод для отримання останнього котирування (ціни та часу отримання) для пари валют.
 
         Параметри:
             base (str): Базова валюта (наприклад, "BTC").
             quote (str): Валюта котирування (наприклад, "USDT").
+            hedge (bool): Чи дозволено хеджувати запит тікера з біржі (див. latency.hedged).
 
         Повертає:
-            float: Остання ціна для пари base/quote.
+            Quote: Котирування для пари base/quote.
                    Якщо дані не знайдено або виникла помилка, повертається None.
 
         Логіка:
-            1. Спроба отримати дані для прямої пари (наприклад, "BTC/USDT").
-            2. Якщо пряма пара недоступна, спробувати отримати дані для зворотної пари (наприклад, "USDT/BTC")
-               та інвертувати отримане значення (1 / ціна).
+            1. Визначення символу біржі для пари через індекс ринків (без звернень до мережі).
+               Якщо біржа не торгує ні прямою, ні зворотною парою, одразу повертається None.
+            2. Пошук свіжого котирування (не старшого за quote_ttl) у сховищі.
+            3. Якщо у сховищі немає свіжих даних, запит тікера з біржі (хеджований, якщо
+               hedge=True; затримки записуються лише для цих запитів). Якщо жоден запит
+               не вдався, піднімається помилка останнього з них (для обліку стану біржі):
+               невідомий символ (BadSymbol) не є помилкою, інші відхилення запиту за
+               символом (BadRequest) піднімаються як PairError, відповідь про ліміт
+               запитів (429/418) - одразу як Throttled (планувальник уже призупинено),
+               а решта (мережеві помилки, тайм-аути, 5xx, помилки автентифікації
+               та доступу, інші помилки біржі) - як є і враховуються запобіжником біржі.
+            Для зворотної пари (наприклад, "USDT/BTC" для запиту BTC/USDT) ціна інвертується (1 / ціна).
         """
         base = base.upper()
         quote = quote.upper()
-        direct_symbol = f"{base}/{quote}"
-        reversed_symbol = f"{quote}/{base}"
+        candidates = self.resolve_symbol(base, quote)
 
-        # Спроба отримати дані для прямої пари
-        try:
-            ticker = self.client.fetch_ticker(direct_symbol)
-            if ticker and ticker.get('last'):
-                return ticker.get('last')
-        except Exception as e:
-            print(f"[{self.name}] Неможливо отримати дані для {direct_symbol}: {e}")
+        # Спроба знайти свіже котирування у сховищі
+        for symbol, inverted in candidates:
+            cached = self.quote_store.get(self.name, symbol, self.quote_ttl)
+            if cached is not None:
+                metrics.QUOTE_CACHE.inc(self.name, 'hit')
+                return cached.inverted() if inverted else cached
+        if candidates:
+            metrics.QUOTE_CACHE.inc(self.name, 'miss')
+            if self.rate_limiter.paused:
+                # Після відповіді 429/418 запит не стає в чергу до кінця паузи, а одразу відхиляється
+                raise Throttled(f"запити до {self.name} призупинено після перевищення ліміту")
 
-        # Якщо пряма пара недоступна, пробуємо отримати дані для зворотної пари та інвертуємо ціну
-        try:
-            ticker = self.client.fetch_ticker(reversed_symbol)
-            if ticker and ticker.get('last'):
-                reversed_price = ticker.get('last')
-                return 1 / reversed_price if reversed_price != 0 else None
-        except Exception as e:
-            print(f"[{self.name}] Неможливо отримати дані для {reversed_symbol}: {e}")
+        # Спроба отримати дані з біржі
+        error = None
+        for symbol, inverted in candidates:
+            try:
+                ticker = await hedged(
+                    lambda: self._request('fetch_ticker', symbol, priority=PRIORITY_INTERACTIVE, latency=self.latency),
+                    self.latency, hedge, self._can_hedge,
+                )
+                if ticker and ticker.get('last'):
+                    self.quote_store.update(self.name, symbol, ticker.get('last'))
+                    fetched = self.quote_store.get(self.name, symbol)
+                    return fetched.inverted() if inverted else fetched
+            except BadSymbol as e:
+                # Біржа не торгує символом (ринки ще не завантажено): це відсутність даних, а не збій
+                logger.debug("[%s] Невідомий символ %s: %s", self.name, symbol, e)
+            except BadRequest as e:
+                logger.warning("[%s] Біржа відхилила запит для %s: %s", self.name, symbol, e)
+                error = PairError(str(e))
+                error.__cause__ = e
+            except (DDoSProtection, RateLimitExceeded) as e:
+                # Інші кандидати не запитуються: планувальник призупинено до кінця паузи
+                raise Throttled(str(e)) from e
+            except Exception as e:
+                logger.warning("[%s] Неможливо отримати дані для %s: %s", self.name, symbol, e)
+                error = e
 
+        if error is not None:
+            raise error
         return None
+
+    async def get_latest_price(self, base: str, quote: str) -> float:
+        """
+        Асинхронний метод для отримання останньої ціни (latest price) для пари валют.
+
+        Параметри:
+            base (str): Базова валюта (наприклад, "BTC").
+            quote (str): Валюта котирування (наприклад, "USDT").
+
+        Повертає:
+            float: Остання ціна для пари base/quote.
+                   Якщо дані не знайдено або виникла помилка, повертається None.
+        """
+        try:
+            result = await self.get_latest_quote(base, quote)
+        except Exception:
+            return None
+        return result.price if result is not None else None
@@ -3,21 +3,30 @@
 --------------
 
 Цей модуль містить реалізацію класу GateExchange, який відповідає за взаємодію з біржею Gate.io.
-Клас наслідується від CexExchange і використовує бібліотеку ccxt для отримання даних з Gate.io.
+Клас наслідується від CexExchange і використовує асинхронний клієнт ccxt (ccxt.async_support)
+для отримання даних з Gate.io.
 """
 
-import ccxt
+import ccxt.async_support as ccxt
 from .cex_exchange import CexExchange
+from .rate_limiter import RateLimiter
+
+# Ліміт Gate.io для публічних спотових запитів: 200 запитів за 10 секунд
+PUBLIC_LIMIT = 200
+PUBLIC_LIMIT_WINDOW = 10
+# Кожен публічний запит важить 1; load_markets виконує кілька запитів
+REQUEST_COSTS = {
+    'load_markets': 3,
+}
 
 class GateExchange(CexExchange):
     def __init__(self):
         """
         Ініціалізує об'єкт GateExchange.
 
-        Використовується ccxt для створення клієнта біржі Gate.io.
-        У ccxt ця біржа позначається як "gateio". Параметр 'enableRateLimit': True дозволяє
-        уникнути перевищення лімітів запитів до API.
+        Використовується ccxt.async_support для створення асинхронного клієнта біржі Gate.io.
+        У ccxt ця біржа позначається як "gate" (колишня назва "gateio"). Запити обмежуються
+        планувальником (RateLimiter) за опублікованим лімітом публічних запитів Gate.io.
         """
-        # Створюємо екземпляр ccxt для Gate.io із ввімкненим лімітуванням запитів
-        client = ccxt.gateio({'enableRateLimit': True})
-        super().__init__('gate', client)
+        client = ccxt.gate({'enableRateLimit': False})
+        super().__init__('gate', client, RateLimiter.for_limit(PUBLIC_LIMIT, PUBLIC_LIMIT_WINDOW), REQUEST_COSTS)
@@ -0,0 +1,235 @@
+"""
+Модуль health.py
+----------------
+
+Цей модуль містить облік стану бірж (HealthTracker) із запобіжниками (circuit breaker) для кожної
+біржі та кожної пари на ній.
+
+Запобіжник рахує результати запитів за останні HEALTH_WINDOW секунд. Помилкою вважається запит,
+що завершився помилкою або перевищенням часу, а також запит, що тривав довше за HEALTH_SLOW_CALL.
+Коли частка помилок досягає HEALTH_ERROR_RATE (за щонайменше HEALTH_MIN_SAMPLES запитів),
+запобіжник відкривається:
+
+    closed    - запити виконуються як зазвичай;
+    open      - запити одразу пропускаються, без звернень до біржі;
+    half_open - час відкриття минув, у фоні виконується пробний запит; запити користувачів
+                і далі пропускаються. Успішна проба закриває запобіжник, невдала - знову
+                відкриває його на вдвічі довший час (до CIRCUIT_MAX_OPEN_SECONDS).
+
+Запобіжник біржі враховує запити за всіма парами (збій біржі), а запобіжник пари - лише запити
+за цією парою (біржа не торгує парою або постійно відхиляє її). Пара та зворотна до неї мають
+один запобіжник (канонічний ключ pair_key). Адаптери піднімають PairError для помилок, що
+стосуються лише пари (біржа відхилила запит за символом): такі помилки не відкривають
+запобіжник біржі, щоб запити з некоректними парами не вимикали справну біржу. Відповідь біржі
+про перевищення ліміту запитів (Throttled) не враховується взагалі: планувальник запитів уже
+призупинено, а справна біржа не повинна відкривати запобіжник через власний ліміт.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+
+import metrics
+from logs import get_logger
+from .singleflight import pair_key
+
+logger = get_logger("health")
+
+# Вікно, за яке рахується частка помилок (секунди)
+HEALTH_WINDOW = float(os.getenv("HEALTH_WINDOW", "30"))
+# Мінімальна кількість запитів у вікні, після якої запобіжник може відкритися
+HEALTH_MIN_SAMPLES = int(os.getenv("HEALTH_MIN_SAMPLES", "5"))
+# Частка помилок, за якої запобіжник відкривається
+HEALTH_ERROR_RATE = float(os.getenv("HEALTH_ERROR_RATE", "0.5"))
+# Запит, довший за цей час, вважається помилкою (секунди)
+HEALTH_SLOW_CALL = float(os.getenv("HEALTH_SLOW_CALL", "1.5"))
+# Початковий та максимальний час, на який відкривається запобіжник (секунди)
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "5"))
+CIRCUIT_MAX_OPEN_SECONDS = float(os.getenv("CIRCUIT_MAX_OPEN_SECONDS", "60"))
+# Максимальний час пробного запиту (секунди)
+CIRCUIT_PROBE_TIMEOUT = float(os.getenv("CIRCUIT_PROBE_TIMEOUT", "5"))
+
+class PairError(Exception):
+    """Помилка запиту, що стосується лише пари, а не біржі (враховується лише запобіжником пари)."""
+
+
+class Throttled(Exception):
+    """Біржа відповіла про перевищення ліміту запитів (HTTP 429/418); не враховується запобіжниками."""
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Запобіжник однієї біржі або пари: ковзне вікно результатів запитів та стан.
+
+    Атрибути:
+        state: Стан (closed, open або half_open).
+        probe_pair: Пара (base, quote) останнього невдалого запиту - її запитує проба.
+    """
+
+    def __init__(self):
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.open_for = CIRCUIT_OPEN_SECONDS
+        self.probe_pair = None
+        # (час, чи помилка) запитів за останні HEALTH_WINDOW секунд
+        self._samples = deque()
+        self._failures = 0
+
+    def _trim(self, now: float):
+        while self._samples and self._samples[0][0] < now - HEALTH_WINDOW:
+            _, failed = self._samples.popleft()
+            self._failures -= failed
+
+    def error_rate(self, now: float = None) -> float:
+        """Частка помилок у вікні (0, якщо запитів не було)."""
+        self._trim(time.monotonic() if now is None else now)
+        return self._failures / len(self._samples) if self._samples else 0.0
+
+    def record(self, failed: bool, now: float) -> bool:
+        """
+        Додає результат запиту. Повертає True, якщо запобіжник щойно відкрився.
+        """
+        if self.state != CLOSED:
+            # Поки запобіжник відкритий, стан визначає лише проба
+            return False
+        self._samples.append((now, failed))
+        self._failures += failed
+        self._trim(now)
+        if failed and len(self._samples) >= HEALTH_MIN_SAMPLES and self._failures / len(self._samples) >= HEALTH_ERROR_RATE:
+            self.trip(now)
+            return True
+        return False
+
+    def trip(self, now: float):
+        """Відкриває запобіжник (після невдалої проби - на вдвічі довший час)."""
+        if self.state == HALF_OPEN:
+            self.open_for = min(self.open_for * 2, CIRCUIT_MAX_OPEN_SECONDS)
+        self.state = OPEN
+        self.opened_at = now
+
+    def reset(self):
+        """Закриває запобіжник і очищає вікно."""
+        self.state = CLOSED
+        self.open_for = CIRCUIT_OPEN_SECONDS
+        self._samples.clear()
+        self._failures = 0
+
+    def probe_due(self, now: float) -> bool:
+        """Чи минув час відкриття (пора запускати пробу)."""
+        return self.state == OPEN and now >= self.opened_at + self.open_for
+
+
+class HealthTracker:
+    """
+    Стан однієї біржі: запобіжник біржі та запобіжники пар.
+
+    Параметри:
+        name (str): Назва біржі.
+        probe: Корутинна функція probe(base, quote) пробного запиту; проба успішна, якщо вона
+               повернула не None без помилки за CIRCUIT_PROBE_TIMEOUT секунд.
+    """
+
+    def __init__(self, name: str, probe):
+        self.name = name
+        self.probe = probe
+        self.venue = CircuitBreaker()
+        # Канонічна пара -> запобіжник пари
+        self.pairs = {}
+        self._probes = set()
+
+    def _breakers(self, base: str, quote: str, create: bool):
+        """Запобіжники біржі та пари; запобіжник пари створюється лише при create=True."""
+        key, _ = pair_key(base, quote)
+        breaker = self.pairs.get(key)
+        if breaker is None:
+            if not create:
+                return ((self.venue, None),)
+            breaker = self.pairs[key] = CircuitBreaker()
+        return (self.venue, None), (breaker, key)
+
+    def allow(self, base: str, quote: str) -> bool:
+        """
+        Чи можна запитувати пару на біржі зараз. Не чекає на мережу: для відкритого запобіжника,
+        час відкриття якого минув, у фоні запускається проба, а запит пропускається.
+        """
+        now = time.monotonic()
+        allowed = True
+        for breaker, key in self._breakers(base, quote, create=False):
+            if breaker.state == CLOSED:
+                continue
+            allowed = False
+            if breaker.probe_due(now):
+                self._start_probe(breaker, key)
+        return allowed
+
+    def record(self, base: str, quote: str, failed: bool, venue: bool = True):
+        """
+        Записує результат запиту пари. Якщо venue=False, результат враховується лише
+        запобіжником пари (наприклад, біржа відповіла, але даних для пари немає).
+        Запобіжник пари створюється при першій помилці за парою.
+        """
+        now = time.monotonic()
+        for breaker, key in self._breakers(base, quote, create=failed):
+            if key is None and not venue:
+                continue
+            if failed:
+                breaker.probe_pair = (base, quote)
+            if breaker.record(failed, now):
+                self._transition(key, OPEN)
+                logger.warning(
+                    "[%s] Запобіжник %s відкрито на %.0f с (частка помилок %.0f%%)",
+                    self.name, self._label(key), breaker.open_for, breaker.error_rate(now) * 100,
+                )
+
+    def _label(self, key) -> str:
+        return "біржі" if key is None else "пари " + "/".join(key)
+
+    def _transition(self, key, state: str):
+        metrics.CIRCUIT_TRANSITIONS.inc(self.name, "venue" if key is None else "pair", state)
+
+    def _start_probe(self, breaker: CircuitBreaker, key):
+        breaker.state = HALF_OPEN
+        self._transition(key, HALF_OPEN)
+        base, quote = breaker.probe_pair or key
+        try:
+            task = asyncio.get_running_loop().create_task(self._probe(breaker, key, base, quote))
+        except RuntimeError:
+            breaker.trip(time.monotonic())
+            return
+        self._probes.add(task)
+        task.add_done_callback(self._probes.discard)
+
+    async def _probe(self, breaker: CircuitBreaker, key, base: str, quote: str):
+        """
+        Пробний запит: успіх закриває запобіжник, невдача знову відкриває його.
+        """
+        try:
+            result = await asyncio.wait_for(self.probe(base, quote), CIRCUIT_PROBE_TIMEOUT)
+            ok = result is not None
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            ok = False
+        if ok:
+            breaker.reset()
+            self._transition(key, CLOSED)
+            logger.info("[%s] Запобіжник %s закрито", self.name, self._label(key))
+        else:
+            breaker.trip(time.monotonic())
+            self._transition(key, OPEN)
+
+    def open_pairs(self) -> int:
+        """Кількість пар з відкритим (або напіввідкритим) запобіжником."""
+        return sum(1 for breaker in self.pairs.values() if breaker.state != CLOSED)
+
+    async def close(self):
+        """Скасовує пробні запити, що виконуються."""
+        for task in list(self._probes):
+            task.cancel()
+        await asyncio.gather(*self._probes, return_exceptions=True)
@@ -3,19 +3,32 @@
 ----------------
 
 Цей модуль містить реалізацію класу KuCoinExchange, який відповідає за взаємодію з біржею KuCoin.
-Клас наслідується від CexExchange і використовує бібліотеку ccxt для отримання даних з KuCoin.
+Клас наслідується від CexExchange і використовує асинхронний клієнт ccxt (ccxt.async_support)
+для отримання даних з KuCoin.
 """
 
-import ccxt
+import ccxt.async_support as ccxt
 from .cex_exchange import CexExchange
+from .rate_limiter import RateLimiter
+
+# Ліміт KuCoin для публічних запитів: 2000 одиниць ваги за 30 секунд на IP
+PUBLIC_QUOTA = 2000
+PUBLIC_QUOTA_WINDOW = 30
+# Вага запитів за документацією KuCoin
+REQUEST_COSTS = {
+    'fetch_tickers': 15,    # GET /api/v1/market/allTickers
+    'fetch_ticker': 15,     # GET /api/v1/market/stats
+    'fetch_order_book': 4,  # GET /api/v1/market/orderbook/level2_100
+    'load_markets': 7,      # GET /api/v2/symbols та /api/v3/currencies
+}
 
 class KuCoinExchange(CexExchange):
     def __init__(self):
         """
         Ініціалізує об'єкт KuCoinExchange.
 
-        Використовується ccxt для створення клієнта біржі KuCoin із ввімкненим лімітуванням запитів.
-        Параметр 'enableRateLimit': True дозволяє уникнути перевищення лімітів API біржі.
+        Використовується ccxt.async_support для створення асинхронного клієнта біржі KuCoin.
+        Запити обмежуються планувальником (RateLimiter) за опублікованою квотою публічних запитів KuCoin.
         """
-        client = ccxt.kucoin({'enableRateLimit': True})
-        super().__init__('kucoin', client)
+        client = ccxt.kucoin({'enableRateLimit': False})
+        super().__init__('kucoin', client, RateLimiter.for_limit(PUBLIC_QUOTA, PUBLIC_QUOTA_WINDOW), REQUEST_COSTS)
@@ -0,0 +1,95 @@
+"""
+Модуль latency.py
+-----------------
+
+Цей модуль містить облік затримок запитів до бірж та "хеджовані" запити.
+
+LatencyTracker тримає ковзне вікно останніх затримок біржі і рахує їхній перцентиль (p95).
+Затримки записує сам запит (наприклад, CexExchange._request) і лише для HTTP-звернення до біржі:
+час очікування в черзі планувальника запитів у p95 не потрапляє.
+
+Функція hedged виконує запит і, якщо він триває довше за p95 біржі, запускає його дублікат;
+повертається результат того запиту, що завершився першим, а інший скасовується. Дублікат не
+запускається, якщо can_hedge повертає False (наприклад, у планувальнику запитів біржі є черга:
+дублікат лише став би за першим запитом і витратив би ліміт).
+"""
+
+import asyncio
+from collections import deque
+
+# Розмір ковзного вікна затримок
+LATENCY_WINDOW = 200
+# Мінімальна кількість вимірів, після якої p95 вважається достовірним для хеджування
+HEDGE_MIN_SAMPLES = 20
+
+
+class LatencyTracker:
+    """
+    Ковзне вікно затримок (секунди) успішних запитів до однієї біржі.
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+
+    def record(self, latency: float):
+        """Додає вимір затримки."""
+        self._samples.append(latency)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, q: float) -> float:
+        """
+        Повертає перцентиль q (0..1) затримок або None, якщо вимірів ще немає.
+        """
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+    def p95(self) -> float:
+        """Повертає p95 затримок або None, якщо вимірів ще немає."""
+        return self.percentile(0.95)
+
+
+async def hedged(factory, tracker: LatencyTracker, hedge: bool = True, can_hedge=None):
+    """
+    Виконує запит з хеджуванням.
+
+    Параметри:
+        factory: Функція без аргументів, що повертає нову корутину запиту (корутина сама
+                 записує затримку звернення до біржі в tracker).
+        tracker (LatencyTracker): Облік затримок біржі (джерело p95).
+        hedge (bool): Чи дозволено запускати дублікат запиту.
+        can_hedge: Функція без аргументів; дублікат запускається, лише якщо вона повертає True.
+
+    Логіка:
+        1. Запускається перший запит.
+        2. Якщо він не завершився за p95 затримок біржі і can_hedge() дозволяє, запускається дублікат.
+        3. Повертається результат першого успішно завершеного запиту, решта скасовуються.
+           Якщо всі запити завершились помилкою, піднімається помилка першого з них.
+    """
+    hedge_delay = tracker.p95() if hedge and len(tracker) >= HEDGE_MIN_SAMPLES else None
+    first = asyncio.ensure_future(factory())
+    if hedge_delay is None:
+        return await first
+
+    tasks = [first]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+        if not done and (can_hedge is None or can_hedge()):
+            tasks.append(asyncio.ensure_future(factory()))
+        pending = set(tasks)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = error or task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
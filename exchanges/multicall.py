@@ -0,0 +1,133 @@
+"""
+Модуль multicall.py
+-------------------
+
+Цей модуль містить допоміжні функції для пакетного читання стану пулів Uniswap V3 через контракт
+Multicall3: один eth_call повертає slot0() для багатьох пулів разом з номером блоку, на якому
+виконано читання. Так само пакетно читаються ліквідність, параметри пулів, ініціалізовані тіки,
+а також адреси пулів фабрики (getPool) та десяткові знаки токенів (decimals) для реєстру пулів.
+
+Відповіді декодуються напряму з байтів, без ABI-шару web3.
+"""
+
+from typing import NamedTuple
+
+# Адреса Multicall3 однакова в усіх EVM-мережах
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"internalType": "address", "name": "target", "type": "address"},
+                    {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+                    {"internalType": "bytes", "name": "callData", "type": "bytes"},
+                ],
+                "internalType": "struct Multicall3.Call3[]",
+                "name": "calls",
+                "type": "tuple[]",
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"internalType": "bool", "name": "success", "type": "bool"},
+                    {"internalType": "bytes", "name": "returnData", "type": "bytes"},
+                ],
+                "internalType": "struct Multicall3.Result[]",
+                "name": "returnData",
+                "type": "tuple[]",
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function",
+    }
+]
+
+# Селектори функцій (перші 4 байти keccak256 сигнатури)
+SLOT0_SELECTOR = bytes.fromhex("3850c7bd")  # slot0()
+GET_BLOCK_NUMBER_SELECTOR = bytes.fromhex("42cbb15c")  # getBlockNumber()
+LIQUIDITY_SELECTOR = bytes.fromhex("1a686502")  # liquidity()
+FEE_SELECTOR = bytes.fromhex("ddca3f43")  # fee()
+TICK_SPACING_SELECTOR = bytes.fromhex("d0c93a7c")  # tickSpacing()
+TICK_BITMAP_SELECTOR = bytes.fromhex("5339c296")  # tickBitmap(int16)
+TICKS_SELECTOR = bytes.fromhex("f30dba93")  # ticks(int24)
+GET_POOL_SELECTOR = bytes.fromhex("1698ee82")  # getPool(address,address,uint24) фабрики пулів
+DECIMALS_SELECTOR = bytes.fromhex("313ce567")  # decimals() токена ERC-20
+
+
+class Slot0(NamedTuple):
+    """
+    Частина стану slot0() пулу Uniswap V3, потрібна для ціноутворення.
+    """
+    sqrt_price_x96: int
+    tick: int
+
+
+def decode_slot0(data: bytes) -> Slot0:
+    """
+    Декодує відповідь slot0(): перше слово - sqrtPriceX96 (uint160), друге - tick (int24).
+
+    Повертає:
+        Slot0 або None, якщо відповідь порожня або пул не ініціалізовано.
+    """
+    if len(data) < 64:
+        return None
+    sqrt_price_x96 = int.from_bytes(data[0:32], "big")
+    if not sqrt_price_x96:
+        return None
+    tick = int.from_bytes(data[32:64], "big", signed=True)
+    return Slot0(sqrt_price_x96, tick)
+
+
+def encode_call(selector: bytes, *args: int) -> bytes:
+    """
+    Кодує виклик функції з цілочисельними аргументами (кожен - 32-байтне слово зі знаком).
+    """
+    return selector + b"".join(arg.to_bytes(32, "big", signed=True) for arg in args)
+
+
+def decode_word(data: bytes, index: int = 0, signed: bool = False) -> int:
+    """
+    Повертає index-те 32-байтне слово відповіді як ціле число.
+    """
+    return int.from_bytes(data[32 * index:32 * (index + 1)], "big", signed=signed)
+
+
+def decode_address(data: bytes, index: int = 0) -> str:
+    """
+    Повертає index-те 32-байтне слово відповіді як адресу в нижньому регістрі ("0x" + 40 символів).
+    """
+    return "0x" + data[32 * index + 12:32 * (index + 1)].hex()
+
+
+def build_slot0_calls(pool_addresses):
+    """
+    Формує список викликів для aggregate3: getBlockNumber() на самому Multicall3,
+    а потім slot0() для кожного пулу.
+    """
+    calls = [(MULTICALL3_ADDRESS, False, GET_BLOCK_NUMBER_SELECTOR)]
+    calls.extend((address, True, SLOT0_SELECTOR) for address in pool_addresses)
+    return calls
+
+
+def decode_slot0_results(pool_addresses, results):
+    """
+    Декодує результат aggregate3, сформованого build_slot0_calls.
+
+    Повертає:
+        Кортеж (block_number, {адреса_пулу: Slot0}); пули, для яких виклик завершився
+        невдало, у словник не потрапляють.
+    """
+    _, block_data = results[0]
+    block_number = int.from_bytes(block_data[0:32], "big")
+    states = {}
+    for address, (success, data) in zip(pool_addresses, results[1:]):
+        if not success:
+            continue
+        slot0 = decode_slot0(data)
+        if slot0 is not None:
+            states[address] = slot0
+    return block_number, states
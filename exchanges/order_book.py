@@ -0,0 +1,142 @@
+"""
+Модуль order_book.py
+--------------------
+
+Цей модуль містить локальну копію біржового стакану (L2 order book) для розрахунку реальної
+суми обміну з урахуванням глибини ринку.
+
+Стакан будується зі знімка (apply_snapshot) і далі оновлюється інкрементно змінами рівнів
+(apply_diff): рівень з нульовим обсягом видаляється, інші - додаються або змінюються.
+Ціни рівнів тримаються у відсортованих списках, а для обходу глибини ліниво будуються
+масиви накопичених обсягів, тож розрахунок заповнення заявки - це бінарний пошук.
+"""
+
+import time
+from bisect import bisect_left, insort
+
+
+class _BookSide:
+    """
+    Одна сторона стакану: словник ціна -> обсяг і відсортований список цін.
+
+    Параметри:
+        descending (bool): True для бідів (найкраща ціна - найбільша), False для асків.
+    """
+
+    def __init__(self, descending: bool):
+        self.descending = descending
+        self.levels = {}
+        self._prices = []  # завжди за зростанням
+        self._cumulative = None  # (ціни, накопичений обсяг base, накопичений обсяг quote)
+
+    def clear(self):
+        self.levels.clear()
+        self._prices = []
+        self._cumulative = None
+
+    def set_level(self, price: float, amount: float):
+        """
+        Встановлює обсяг рівня; нульовий обсяг видаляє рівень.
+        """
+        if amount <= 0:
+            if self.levels.pop(price, None) is not None:
+                del self._prices[bisect_left(self._prices, price)]
+                self._cumulative = None
+            return
+        if price not in self.levels:
+            insort(self._prices, price)
+        self.levels[price] = amount
+        self._cumulative = None
+
+    def best(self) -> float:
+        """Найкраща ціна сторони або None, якщо сторона порожня."""
+        if not self._prices:
+            return None
+        return self._prices[-1] if self.descending else self._prices[0]
+
+    def cumulative(self):
+        """
+        Повертає (ціни, накопичений обсяг base, накопичений обсяг quote) у порядку від найкращої ціни.
+        Масиви перебудовуються лише після змін стакану.
+        """
+        if self._cumulative is None:
+            prices = self._prices[::-1] if self.descending else list(self._prices)
+            cum_base, cum_quote = [], []
+            total_base = total_quote = 0.0
+            for price in prices:
+                amount = self.levels[price]
+                total_base += amount
+                total_quote += amount * price
+                cum_base.append(total_base)
+                cum_quote.append(total_quote)
+            self._cumulative = (prices, cum_base, cum_quote)
+        return self._cumulative
+
+
+class OrderBook:
+    """
+    Локальна копія стакану для одного символу.
+
+    Атрибути:
+        symbol: Символ у форматі "BASE/QUOTE".
+        bids, asks: Сторони стакану.
+        timestamp: Час останнього оновлення (time.time()).
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.bids = _BookSide(descending=True)
+        self.asks = _BookSide(descending=False)
+        self.timestamp = None
+
+    @property
+    def age(self) -> float:
+        """Вік стакану в секундах (None, якщо знімка ще не було)."""
+        if self.timestamp is None:
+            return None
+        return max(0.0, time.time() - self.timestamp)
+
+    def apply_snapshot(self, bids, asks):
+        """
+        Замінює стакан знімком. bids/asks - списки [ціна, обсяг, ...].
+        """
+        self.bids.clear()
+        self.asks.clear()
+        self.apply_diff(bids, asks)
+
+    def apply_diff(self, bids, asks):
+        """
+        Застосовує зміни рівнів. bids/asks - списки [ціна, обсяг, ...]; обсяг 0 видаляє рівень.
+        """
+        for level in bids:
+            self.bids.set_level(level[0], level[1])
+        for level in asks:
+            self.asks.set_level(level[0], level[1])
+        self.timestamp = time.time()
+
+    def sell_base(self, amount: float) -> float:
+        """
+        Скільки quote отримаємо, продавши amount base по бідах.
+        Повертає None, якщо глибини стакану недостатньо.
+        """
+        prices, cum_base, cum_quote = self.bids.cumulative()
+        index = bisect_left(cum_base, amount)
+        if index >= len(prices):
+            return None
+        filled_base = cum_base[index - 1] if index else 0.0
+        filled_quote = cum_quote[index - 1] if index else 0.0
+        return filled_quote + (amount - filled_base) * prices[index]
+
+    def buy_base(self, quote_amount: float) -> float:
+        """
+        Скільки base отримаємо, витративши quote_amount quote по асках.
+        Повертає None, якщо глибини стакану недостатньо.
+        """
+        prices, cum_base, cum_quote = self.asks.cumulative()
+        index = bisect_left(cum_quote, quote_amount)
+        if index >= len(prices):
+            return None
+        filled_base = cum_base[index - 1] if index else 0.0
+        filled_quote = cum_quote[index - 1] if index else 0.0
+        return filled_base + (quote_amount - filled_quote) / prices[index]
+
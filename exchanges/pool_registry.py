@@ -0,0 +1,356 @@
+"""
+Модуль pool_registry.py
+-----------------------
+
+Цей модуль містить реєстр пулів Uniswap V3 (PoolRegistry), що завантажується з файлу даних
+UNISWAP_POOLS_FILE (за замовчуванням config/uniswap_pools.json) і може містити тисячі пулів.
+
+Файл даних задає токени (адреса та, необов'язково, кількість десяткових знаків), рівні комісій
+фабрики та список пулів: пара "BASE/QUOTE" і, необов'язково, адреса пулу та комісія. Пули без
+адреси та токени без десяткових знаків знаходяться в мережі (discover) пакетними викликами
+Multicall3: getPool(token0, token1, fee) фабрики для кожного рівня комісії (з кількох знайдених
+пулів обирається пул з найбільшою ліквідністю) та decimals() токенів. Знайдене зберігається
+в кеші на диску (POOL_CACHE_FILE), тож після перезапуску повторні виклики не потрібні.
+
+Назва пари пулу в реєстрі завжди впорядкована за токенами пулу (token0/token1, як у контракті),
+тож ціна пулу - це ціна першого токена назви в другому. Під час завантаження будуються індекси:
+
+    pools   - адреса пулу в нижньому регістрі -> PoolInfo;
+    by_pair - "BASE/QUOTE" (обидва напрямки) -> (PoolInfo, чи інвертувати ціну пулу),
+
+тож пошук пулу для запиту - один пошук у словнику, без перетворень адрес.
+"""
+
+import json
+import os
+from typing import NamedTuple
+
+from web3 import Web3
+
+from logs import get_logger
+from .multicall import DECIMALS_SELECTOR, GET_POOL_SELECTOR, LIQUIDITY_SELECTOR, decode_address, decode_word, encode_call
+
+logger = get_logger("pool_registry")
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Файл даних реєстру пулів Uniswap V3
+UNISWAP_POOLS_FILE = os.getenv("UNISWAP_POOLS_FILE", os.path.join(BASE_DIR, "..", "config", "uniswap_pools.json"))
+# Файл кешу знайдених у мережі пулів та десяткових знаків токенів
+POOL_CACHE_FILE = os.getenv("POOL_CACHE_FILE", os.path.join("data", "uniswap_pools_cache.json"))
+# Адреса фабрики пулів Uniswap V3
+UNISWAP_V3_FACTORY = os.getenv("UNISWAP_V3_FACTORY", "0x1F98431c8aD98523631AE4a59f267346ea31F984")
+# Максимальна кількість викликів в одному запиті Multicall3 під час пошуку пулів
+DISCOVERY_BATCH_SIZE = int(os.getenv("DISCOVERY_BATCH_SIZE", "500"))
+
+# Рівні комісії фабрики за замовчуванням (мільйонні частки)
+DEFAULT_FEE_TIERS = (100, 500, 3000, 10000)
+
+ZERO_ADDRESS = "0x" + "00" * 20
+CACHE_VERSION = 1
+
+
+class PoolSpec(NamedTuple):
+    """
+    Запис пулу з файлу даних: символи токенів пари, адреса пулу в нижньому регістрі та комісія
+    (None, якщо не задані).
+    """
+    base: str
+    quote: str
+    address: str
+    fee: int
+
+
+class PoolInfo(NamedTuple):
+    """
+    Параметри пулу Uniswap V3 з реєстру.
+
+    Атрибути:
+        pair: Назва пари "TOKEN0/TOKEN1" (символи токенів у порядку контракту пулу).
+        address: Checksum-адреса пулу.
+        token0, token1: Адреси токенів пулу в нижньому регістрі.
+        decimals0, decimals1: Кількість десяткових знаків токенів.
+        fee: Комісія пулу (мільйонні частки) або None, якщо невідома.
+    """
+    pair: str
+    address: str
+    token0: str
+    token1: str
+    decimals0: int
+    decimals1: int
+    fee: int
+
+    @property
+    def decimals_diff(self) -> int:
+        """Різниця десяткових знаків token0 та token1."""
+        return self.decimals0 - self.decimals1
+
+
+class PoolRegistry:
+    """
+    Реєстр пулів Uniswap V3 з індексами за адресою пулу, парою та адресами токенів.
+
+    Параметри:
+        tokens: Словник {символ: {"address": адреса, "decimals": кількість знаків (необов'язково)}}.
+        specs: Список PoolSpec.
+        fee_tiers: Рівні комісії, серед яких шукаються пули без заданої комісії.
+        cache_file (str): Файл кешу знайдених пулів (None - без кешу).
+        factory (str): Адреса фабрики пулів.
+    """
+
+    def __init__(self, tokens: dict, specs, fee_tiers=DEFAULT_FEE_TIERS, cache_file: str = None,
+                 factory: str = UNISWAP_V3_FACTORY):
+        # Символ токена -> адреса в нижньому регістрі; адреса -> кількість десяткових знаків
+        self.tokens = {}
+        self.decimals = {}
+        for symbol, info in tokens.items():
+            address = info["address"].lower()
+            self.tokens[symbol.upper()] = address
+            if info.get("decimals") is not None:
+                self.decimals[address] = int(info["decimals"])
+        self.specs = list(specs)
+        self.fee_tiers = tuple(fee_tiers)
+        self.cache_file = cache_file
+        self.factory = Web3.to_checksum_address(factory)
+        # (token0, token1, задана комісія або None) -> (адреса пулу, комісія), знайдені фабрикою
+        self.discovered = {}
+        self.pools = {}
+        self.by_pair = {}
+        for spec in self.specs:
+            if spec.base not in self.tokens or spec.quote not in self.tokens:
+                logger.warning("Невідомі токени пулу %s/%s", spec.base, spec.quote)
+        self._load_cache()
+        self._build()
+
+    @classmethod
+    def load(cls, path: str = UNISWAP_POOLS_FILE, cache_file: str = POOL_CACHE_FILE) -> "PoolRegistry":
+        """
+        Завантажує реєстр з файлу даних та кешу знайдених пулів.
+        """
+        with open(path, "r") as f:
+            data = json.load(f)
+        specs = []
+        for entry in data.get("pools", []):
+            base, quote = entry["pair"].upper().split("/")
+            address = entry.get("address")
+            specs.append(PoolSpec(base, quote, address.lower() if address else None, entry.get("fee")))
+        return cls(data.get("tokens", {}), specs, data.get("fee_tiers", DEFAULT_FEE_TIERS), cache_file)
+
+    def _ordered(self, spec: PoolSpec):
+        """
+        Повертає (token0, token1, символ token0, символ token1) пулу запису або None, якщо токен невідомий.
+        """
+        base, quote = self.tokens.get(spec.base), self.tokens.get(spec.quote)
+        if base is None or quote is None:
+            return None
+        if base < quote:
+            return base, quote, spec.base, spec.quote
+        return quote, base, spec.quote, spec.base
+
+    def _resolve(self, spec: PoolSpec):
+        """
+        Повертає (адреса пулу, комісія) запису або None, якщо пул ще не знайдено.
+        """
+        if spec.address is not None:
+            return spec.address, spec.fee
+        ordered = self._ordered(spec)
+        return self.discovered.get((ordered[0], ordered[1], spec.fee)) if ordered else None
+
+    def _build(self):
+        """
+        Будує індекси для записів, у яких відомі адреса пулу та десяткові знаки обох токенів.
+        Якщо для пари задано кілька пулів, використовується перший.
+        """
+        self.pools.clear()
+        self.by_pair.clear()
+        for spec in self.specs:
+            ordered = self._ordered(spec)
+            resolved = self._resolve(spec)
+            if ordered is None or resolved is None:
+                continue
+            token0, token1, symbol0, symbol1 = ordered
+            address, fee = resolved
+            pair = f"{symbol0}/{symbol1}"
+            if address in self.pools or pair in self.by_pair:
+                continue
+            if token0 not in self.decimals or token1 not in self.decimals:
+                continue
+            info = PoolInfo(
+                pair, Web3.to_checksum_address(address), token0, token1, self.decimals[token0], self.decimals[token1], fee
+            )
+            self.pools[address] = info
+            self.by_pair[pair] = (info, False)
+            self.by_pair[f"{symbol1}/{symbol0}"] = (info, True)
+
+    def pending(self):
+        """
+        Записи з відомими токенами, для яких ще бракує адреси пулу або десяткових знаків токенів.
+        """
+        pending = []
+        for spec in self.specs:
+            ordered = self._ordered(spec)
+            if ordered is None:
+                continue
+            resolved = self._resolve(spec)
+            if resolved is None or resolved[0] not in self.pools:
+                pending.append(spec)
+        return pending
+
+    async def discover(self, aggregate) -> list:
+        """
+        Знаходить адреси пулів та десяткові знаки токенів для записів pending() пакетними викликами
+        Multicall3 і зберігає знайдене в кеш.
+
+        Параметри:
+            aggregate: Корутинна функція, що виконує список викликів (адреса, allowFailure, callData)
+                       одним aggregate3 і повертає список (success, returnData).
+
+        Повертає:
+            Список PoolInfo пулів, що з'явилися в реєстрі.
+        """
+        pending = self.pending()
+        if not pending:
+            return []
+        before = set(self.pools)
+        found = False
+
+        tokens = sorted({
+            token for spec in pending for token in self._ordered(spec)[:2] if token not in self.decimals
+        })
+        if tokens:
+            results = await self._batch(
+                aggregate, [(Web3.to_checksum_address(token), True, DECIMALS_SELECTOR) for token in tokens]
+            )
+            for token, (success, data) in zip(tokens, results):
+                if success and len(data) >= 32:
+                    self.decimals[token] = decode_word(data)
+                    found = True
+
+        # (ключ запису, рівень комісії) для кожного виклику getPool
+        lookups = []
+        for spec in pending:
+            token0, token1 = self._ordered(spec)[:2]
+            key = (token0, token1, spec.fee)
+            if spec.address is None and key not in self.discovered:
+                lookups.extend((key, fee) for fee in ((spec.fee,) if spec.fee else self.fee_tiers))
+        lookups = list(dict.fromkeys(lookups))
+        candidates = {}
+        if lookups:
+            results = await self._batch(aggregate, [
+                (self.factory, True, encode_call(GET_POOL_SELECTOR, int(key[0], 16), int(key[1], 16), fee))
+                for key, fee in lookups
+            ])
+            for (key, fee), (success, data) in zip(lookups, results):
+                if success and len(data) >= 32:
+                    address = decode_address(data)
+                    if address != ZERO_ADDRESS:
+                        candidates.setdefault(key, []).append((address, fee))
+
+        # З кількох пулів пари (різні рівні комісії) обирається пул з найбільшою ліквідністю
+        contested = [address for found_pools in candidates.values() if len(found_pools) > 1 for address, _ in found_pools]
+        liquidity = {}
+        if contested:
+            results = await self._batch(
+                aggregate, [(Web3.to_checksum_address(address), True, LIQUIDITY_SELECTOR) for address in contested]
+            )
+            for address, (success, data) in zip(contested, results):
+                liquidity[address] = decode_word(data) if success and len(data) >= 32 else 0
+        for key, found_pools in candidates.items():
+            self.discovered[key] = max(found_pools, key=lambda pool: liquidity.get(pool[0], 0))
+            found = True
+
+        if found:
+            self._save_cache()
+            self._build()
+        added = [info for address, info in self.pools.items() if address not in before]
+        missing = len(self.pending())
+        if added or missing:
+            logger.info("Знайдено пулів: %s, не знайдено: %s", len(added), missing)
+        return added
+
+    @staticmethod
+    async def _batch(aggregate, calls):
+        """Виконує виклики пакетами по DISCOVERY_BATCH_SIZE."""
+        results = []
+        for start in range(0, len(calls), DISCOVERY_BATCH_SIZE):
+            results.extend(await aggregate(calls[start:start + DISCOVERY_BATCH_SIZE]))
+        return results
+
+    def _load_cache(self):
+        """
+        Читає кеш знайдених пулів та десяткових знаків (кеш іншої фабрики або версії ігнорується).
+        Десяткові знаки з файлу даних мають пріоритет над кешем.
+        """
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, "r") as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Не вдалося прочитати кеш пулів %s: %s", self.cache_file, e)
+            return
+        if cache.get("version") != CACHE_VERSION or cache.get("factory") != self.factory:
+            return
+        for token, decimals in cache.get("decimals", {}).items():
+            self.decimals.setdefault(token, decimals)
+        for key, (address, fee) in cache.get("pools", {}).items():
+            token0, token1, spec_fee = key.split(":")
+            self.discovered[(token0, token1, int(spec_fee) if spec_fee else None)] = (address, fee)
+
+    def _save_cache(self):
+        """
+        Записує кеш атомарно (через тимчасовий файл), щоб перерваний запис не пошкодив його.
+        """
+        if not self.cache_file:
+            return
+        cache = {
+            "version": CACHE_VERSION,
+            "factory": self.factory,
+            "decimals": self.decimals,
+            "pools": {
+                f"{token0}:{token1}:{'' if fee is None else fee}": list(pool)
+                for (token0, token1, fee), pool in self.discovered.items()
+            },
+        }
+        try:
+            os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
+            tmp_path = self.cache_file + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(cache, f, indent=1)
+            os.replace(tmp_path, self.cache_file)
+        except OSError as e:
+            logger.warning("Не вдалося записати кеш пулів %s: %s", self.cache_file, e)
+
+    def supported_pairs(self) -> dict:
+        """
+        Словник пар реєстру для всіх записів з відомими токенами: пара ->
+        pool_address, token0, token1, decimals_diff, fee. Для пулів, ще не знайдених у мережі,
+        адреса (а для токенів без десяткових знаків - decimals_diff) дорівнює None.
+        Використовується тестовим вузлом (bench/fake_node.py), щоб відтворити пули файлу даних.
+        """
+        pairs = {}
+        for spec in self.specs:
+            ordered = self._ordered(spec)
+            if ordered is None:
+                continue
+            token0, token1, symbol0, symbol1 = ordered
+            pair = f"{symbol0}/{symbol1}"
+            if pair in pairs:
+                continue
+            resolved = self._resolve(spec)
+            decimals0, decimals1 = self.decimals.get(token0), self.decimals.get(token1)
+            pairs[pair] = {
+                "pool_address": Web3.to_checksum_address(resolved[0]) if resolved else None,
+                "token0": token0,
+                "token1": token1,
+                "decimals_diff": decimals0 - decimals1 if decimals0 is not None and decimals1 is not None else None,
+                "fee": resolved[1] if resolved else spec.fee,
+            }
+        return pairs
+
+    def token_decimals(self) -> dict:
+        """
+        Словник {символ: кількість десяткових знаків} для токенів з відомими знаками
+        (для тестового вузла bench/fake_node.py, який відповідає на decimals()).
+        """
+        return {symbol: self.decimals[address] for symbol, address in self.tokens.items() if address in self.decimals}
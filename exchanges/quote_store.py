@@ -0,0 +1,125 @@
+"""
+Модуль quote_store.py
+---------------------
+
+Цей модуль містить сховище котирувань у пам'яті (QuoteStore), з якого API віддає ціни
+замість того, щоб на кожен запит звертатися до бірж.
+
+Котирування зберігаються за ключем (назва_біржі, символ), де символ має вигляд "BASE/QUOTE"
+(наприклад, "BTC/USDT"). Кожне котирування містить час отримання, тож можна визначити його
+вік і відкинути застарілі дані (TTL).
+
+До сховища можна підписатися (add_listener): слухачі викликаються при кожній зміні ціни,
+що дозволяє розсилати оновлення клієнтам без опитування бірж.
+"""
+
+import time
+from typing import NamedTuple, Optional
+
+
+class Quote(NamedTuple):
+    """
+    Котирування для однієї пари на одній біржі.
+
+    Атрибути:
+        price: Ціна 1 базової валюти у валюті котирування.
+        timestamp: Час отримання котирування (секунди, time.time()).
+        volume: Обсяг угоди (у базовій валюті), що встановила ціну; 0 - обсяг невідомий.
+    """
+    price: float
+    timestamp: float
+    volume: float = 0.0
+
+    @property
+    def age(self) -> float:
+        """Вік котирування в секундах."""
+        return max(0.0, time.time() - self.timestamp)
+
+    def inverted(self) -> Optional["Quote"]:
+        """
+        Повертає котирування для зворотної пари (1 / ціна) з тим самим часом отримання
+        та обсягом, переведеним у валюту котирування. Якщо ціна дорівнює нулю, повертається None.
+        """
+        if not self.price:
+            return None
+        return Quote(1 / self.price, self.timestamp, self.volume * self.price)
+
+
+class QuoteStore:
+    """
+    Сховище котирувань у пам'яті, ключем якого є пара (назва_біржі, символ).
+    """
+
+    def __init__(self):
+        self._quotes = {}
+        self._listeners = []
+
+    def add_listener(self, listener, changes_only: bool = True):
+        """
+        Додає слухача змін ціни. Слухач викликається як listener(exchange, symbol, quote)
+        лише тоді, коли ціна символу змінилася (оновлення лише часу отримання не сповіщається).
+        Якщо changes_only=False, слухач викликається при кожному оновленні котирування.
+        """
+        self._listeners.append((listener, changes_only))
+
+    def remove_listener(self, listener):
+        """
+        Видаляє слухача змін ціни.
+        """
+        self._listeners = [entry for entry in self._listeners if entry[0] != listener]
+
+    def update(self, exchange: str, symbol: str, price: float, timestamp: float = None, volume: float = 0.0):
+        """
+        Записує котирування для символу на біржі.
+
+        Параметри:
+            exchange (str): Назва біржі.
+            symbol (str): Символ пари у форматі "BASE/QUOTE".
+            price (float): Ціна.
+            timestamp (float): Час отримання; якщо не задано, використовується поточний час.
+            volume (float): Обсяг угоди, що встановила ціну (у базовій валюті), якщо відомий.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        key = (exchange, symbol)
+        previous = self._quotes.get(key)
+        quote = self._quotes[key] = Quote(price, timestamp, volume)
+        if self._listeners:
+            changed = previous is None or previous.price != price
+            for listener, changes_only in self._listeners:
+                if changed or not changes_only:
+                    listener(exchange, symbol, quote)
+
+    def get(self, exchange: str, symbol: str, ttl: float = None) -> Optional[Quote]:
+        """
+        Повертає котирування для символу на біржі.
+
+        Параметри:
+            exchange (str): Назва біржі.
+            symbol (str): Символ пари у форматі "BASE/QUOTE".
+            ttl (float): Максимальний допустимий вік котирування в секундах.
+                         Якщо котирування старше, повертається None.
+
+        Повертає:
+            Quote або None, якщо котирування відсутнє чи застаріле.
+        """
+        quote = self._quotes.get((exchange, symbol))
+        if quote is None:
+            return None
+        if ttl is not None and quote.age > ttl:
+            return None
+        return quote
+
+    def latest_timestamps(self) -> dict:
+        """
+        Повертає час отримання найсвіжішого котирування кожної біржі {назва_біржі: timestamp}.
+        """
+        latest = {}
+        for (exchange, _), quote in self._quotes.items():
+            if quote.timestamp > latest.get(exchange, 0.0):
+                latest[exchange] = quote.timestamp
+        return latest
+
+
+# Спільне сховище котирувань для всіх бірж
+quote_store = QuoteStore()
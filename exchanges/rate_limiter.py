@@ -0,0 +1,175 @@
+"""
+Модуль rate_limiter.py
+----------------------
+
+Цей модуль містить планувальник запитів до біржі (RateLimiter): маркерне відро (token bucket)
+з вагою запитів та пріоритетною чергою.
+
+Кожен запит до біржі має вагу (ціну в одиницях ліміту біржі: наприклад, для Binance запит усіх
+тікерів важить набагато більше, ніж запит одного тікера). Запит виконується, коли у відрі
+достатньо маркерів; інакше він стає в чергу. Черга впорядкована за пріоритетом: запити
+користувачів (PRIORITY_INTERACTIVE) завжди обслуговуються раніше за фонові оновлення
+(PRIORITY_BACKGROUND), а в межах пріоритету - у порядку надходження.
+
+Параметри відра обчислюються з опублікованого ліміту біржі (вага за вікно часу) із запасом
+RATE_LIMIT_SAFETY так, що навіть повне відро разом з поповненням за вікно не перевищує ліміт.
+Якщо біржа все ж відповіла помилкою ліміту (HTTP 429/418), відро блокується на час Retry-After
+або RATE_LIMIT_BACKOFF секунд.
+
+Фонові оновлення не повинні постійно вичерпувати відро: їм дозволено витрачати лише частку
+RATE_LIMIT_BACKGROUND_SHARE швидкості поповнення (див. background_scales), решта лишається
+запитам користувачів.
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+
+# Пріоритети запитів (менше значення - вищий пріоритет)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+# Частка опублікованого ліміту біржі, яку дозволено використовувати
+RATE_LIMIT_SAFETY = float(os.getenv("RATE_LIMIT_SAFETY", "0.8"))
+# Частка ліміту вікна, яку можна витратити одразу (розмір відра)
+RATE_LIMIT_BURST = 0.2
+# Пауза після відповіді біржі про перевищення ліміту без заголовка Retry-After (секунди)
+RATE_LIMIT_BACKOFF = float(os.getenv("RATE_LIMIT_BACKOFF", "30"))
+# Частка швидкості поповнення відра, яку можуть витрачати фонові оновлення
+RATE_LIMIT_BACKGROUND_SHARE = float(os.getenv("RATE_LIMIT_BACKGROUND_SHARE", "0.5"))
+
+
+class RateLimiter:
+    """
+    Маркерне відро з вагою запитів та пріоритетною чергою.
+
+    Параметри:
+        rate (float): Швидкість поповнення відра (одиниць ваги за секунду).
+        capacity (float): Розмір відра (максимальний сплеск).
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        # Черга (пріоритет, порядковий номер, вага, future)
+        self._queue = []
+        self._counter = itertools.count()
+        self._timer = None
+
+    @classmethod
+    def for_limit(cls, weight: float, window: float, safety: float = RATE_LIMIT_SAFETY) -> "RateLimiter":
+        """
+        Створює відро для опублікованого ліміту біржі: weight одиниць ваги за window секунд.
+        Розмір відра та швидкість підібрано так, що за будь-яке вікно витрачається
+        не більше weight * safety.
+        """
+        budget = weight * safety
+        capacity = budget * RATE_LIMIT_BURST
+        return cls((budget - capacity) / window, capacity)
+
+    def background_scales(self, demands, share: float = RATE_LIMIT_BACKGROUND_SHARE) -> list:
+        """
+        У скільки разів треба подовжити інтервал кожного фонового оновлення, щоб їхнє сумарне
+        споживання (demands - одиниць ваги за секунду для кожного) не перевищувало share
+        швидкості поповнення відра.
+
+        Бюджет ділиться порівну (max-min): оновлення, що споживають не більше за свою частку,
+        залишаються без змін, а невикористаний ними бюджет порівну дістається дорожчим.
+        Для оновлень, що вкладаються в бюджет, повертається 1.
+        """
+        scales = [1.0] * len(demands)
+        budget = self.rate * share
+        pending = sorted((demand, i) for i, demand in enumerate(demands) if demand > 0)
+        while pending:
+            fair = budget / len(pending)
+            demand, i = pending[0]
+            if demand <= fair:
+                budget -= demand
+                pending.pop(0)
+                continue
+            for demand, i in pending:
+                scales[i] = demand / fair
+            break
+        return scales
+
+    @property
+    def paused(self) -> bool:
+        """Чи призупинено видачу маркерів після відповіді біржі про перевищення ліміту."""
+        return time.monotonic() < self._paused_until
+
+    @property
+    def queued(self) -> int:
+        """Кількість запитів у черзі."""
+        return sum(1 for entry in self._queue if not entry[3].done())
+
+    def _refill(self, now: float):
+        # Під час паузи відро не поповнюється (_updated зсунуто на її кінець)
+        if now > self._updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    async def acquire(self, weight: float = 1, priority: int = PRIORITY_BACKGROUND):
+        """
+        Очікує, доки запит вагою weight можна буде виконати, і списує маркери.
+
+        Запит без черги виконується одразу, якщо маркерів достатньо і в черзі немає
+        запитів з тим самим або вищим пріоритетом.
+        """
+        weight = min(weight, self.capacity)
+        now = time.monotonic()
+        self._refill(now)
+        if now >= self._paused_until and self.tokens >= weight and (not self._queue or self._queue[0][0] > priority):
+            self.tokens -= weight
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._counter), weight, future))
+        self._schedule()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Скасований запит звільняє маркери, якщо вони вже були списані
+            if future.done() and not future.cancelled():
+                self.tokens += weight
+            raise
+
+    def _schedule(self):
+        """
+        Видає маркери запитам з голови черги й планує наступне пробудження.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        now = time.monotonic()
+        self._refill(now)
+        while self._queue and now >= self._paused_until:
+            priority, _, weight, future = self._queue[0]
+            if future.done():
+                heapq.heappop(self._queue)
+                continue
+            if self.tokens < weight:
+                break
+            heapq.heappop(self._queue)
+            self.tokens -= weight
+            future.set_result(None)
+        if self._queue:
+            if now < self._paused_until:
+                delay = self._paused_until - now
+            else:
+                delay = (self._queue[0][2] - self.tokens) / self.rate
+            self._timer = asyncio.get_running_loop().call_later(max(delay, 0.001), self._schedule)
+
+    def pause(self, seconds: float):
+        """
+        Блокує видачу маркерів на seconds секунд (після відповіді біржі про перевищення ліміту)
+        та обнуляє відро.
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._updated = self._paused_until
+        self.tokens = 0.0
+        if self._queue:
+            self._schedule()
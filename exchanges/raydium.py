@@ -1,42 +1,278 @@
+"""
+Модуль raydium.py
+-----------------
+
+Цей модуль містить реалізацію класу RaydiumExchange для DEX Raydium (Solana).
+
+Для кожного пулу з RAYDIUM_POOLS тримається окремий стан (RaydiumPool), тож ціна будь-якої
+підтримуваної пари віддається одразу з пам'яті (як у UniswapExchange):
+
+    - пул AMM v4: ціна рахується з резервів двох сховищ (vault) токенів пулу за вирахуванням
+      нарахованих комісій (needTakePnl); адреси сховищ та десяткові знаки читаються з акаунта пулу;
+    - пул CLMM: ціна рахується з sqrtPriceX64 акаунта пулу.
+
+Оновлення акаунтів пулів і сховищ надходять через одне WebSocket-з'єднання (accountSubscribe,
+див. account_stream.py) і розбираються з бінарних layout (raydium_layouts.py). Ціни прогріваються
+пакетним читанням getMultipleAccounts під час старту та після кожного обриву підписки.
+
+Адреси вузла Solana задаються змінними SOLANA_RPC_URL (HTTP) та SOLANA_WS_URL (WebSocket), тож
+адаптер можна запустити на локальній заглушці вузла (bench/fake_solana.py).
+"""
+
+import asyncio
+import os
+import time
+
+import aiohttp
+
+import metrics
+from logs import get_logger
+from supported_pairs import RAYDIUM_POOLS, SOLANA_TOKEN_MINTS
+from .account_stream import AccountStream, get_multiple_accounts
 from .base import Exchange
+from .quote_store import Quote, quote_store
+from .raydium_layouts import amm_price, clmm_price, decode_amm_v4, decode_clmm, decode_token_amount
 
+logger = get_logger("raydium")
 
-class RaydiumExchange(Exchange):
+# Адреси HTTP та WebSocket JSON-RPC вузла Solana
+SOLANA_RPC_URL = os.getenv("SOLANA_RPC_URL", "https://api.mainnet-beta.solana.com")
+SOLANA_WS_URL = os.getenv("SOLANA_WS_URL") or SOLANA_RPC_URL.replace("https://", "wss://").replace("http://", "ws://")
+# Максимальний час HTTP-запиту до вузла Solana (секунди)
+SOLANA_RPC_TIMEOUT = float(os.getenv("SOLANA_RPC_TIMEOUT", "10"))
+
+POOL_AMM = "amm"
+POOL_CLMM = "clmm"
+
+# Роль акаунта в ціноутворенні пулу
+ROLE_POOL = "pool"
+ROLE_BASE_VAULT = "base_vault"
+ROLE_QUOTE_VAULT = "quote_vault"
+
+
+class RaydiumPool:
+    """
+    Стан одного пулу Raydium.
+
+    Атрибути:
+        pair: Назва пари у форматі "BASE/QUOTE" (ключ у RAYDIUM_POOLS).
+        kind: Тип пулу: "amm" (AMM v4) або "clmm".
+        address: Адреса акаунта пулу (base58).
+        state: Декодований стан пулу (AmmV4State або ClmmState) або None.
+        base_amount, quote_amount: Резерви сховищ пулу AMM v4 (мінімальні одиниці).
+        mints: (mint токена, ціна якого рахується; mint токена, в якому рахується ціна).
+        quote: Остання ціна першого токена mints у другому (Quote) або None.
+        slots: Слот останнього застосованого оновлення за адресою акаунта.
     """
-    Заглушена реалізація RaydiumExchange для тестування.
 
-    Наразі цей клас не підписується на реальні оновлення через WebSockets/Yellowstone gRPC.
-    Метод get_latest_price повертає фіктивне значення для пари SOL/USDT, щоб не заважати перевірці роботи Uniswap.
+    def __init__(self, pair: str, info: dict):
+        self.pair = pair
+        self.kind = info["type"]
+        self.address = info["pool_address"]
+        self.state = None
+        self.base_amount = None
+        self.quote_amount = None
+        self.mints = None
+        self.quote = None
+        self.slots = {}
 
-    Для запиту:
-      - SOL/USDT повертається поточна фіктивна ціна (наприклад, 32.0).
-      - USDT/SOL повертається інвертована ціна.
-    Для інших пар повертається None.
+    def price(self) -> float:
+        """
+        Обчислює ціну першого токена mints у другому з поточного стану або None, якщо даних бракує.
+        """
+        if self.state is None:
+            return None
+        if self.kind == POOL_CLMM:
+            return clmm_price(self.state)
+        if self.base_amount is None or self.quote_amount is None:
+            return None
+        return amm_price(self.state, self.base_amount, self.quote_amount)
+
+
+class RaydiumExchange(Exchange):
+    """
+    Клас для роботи з Raydium через WebSocket підписку на акаунти пулів та їхніх сховищ.
+
+    Таблиця accounts відображає адресу акаунта на (пул, роль акаунта), а pair_index - назву
+    пари на стан її пулу.
     """
 
     def __init__(self):
+        """
+        Ініціалізація класу: таблиця станів усіх пулів з RAYDIUM_POOLS. З'єднання з вузлом
+        відкриваються під час start(), тож створення об'єкта не звертається до мережі.
+        """
         super().__init__("raydium")
-        # Фіктивна ціна для SOL/USDT
-        self.current_price = 32.0
+        self.quote_store = quote_store
+        self.rpc_url = SOLANA_RPC_URL
+        self.pair_index = {}
+        self.accounts = {}
+        for pair, info in RAYDIUM_POOLS.items():
+            pool = RaydiumPool(pair, info)
+            self.pair_index[pair] = pool
+            self.accounts[pool.address] = (pool, ROLE_POOL)
+        self.stream = AccountStream(SOLANA_WS_URL, self._on_account, on_disconnect=self._schedule_warmup)
+        self._session = None
+        self._warmup_task = None
 
-    async def get_latest_price(self, base: str, quote: str) -> float:
+    async def start(self):
         """
-        Повертає фіктивну ціну для заданої пари валют.
+        Запускає підписку на акаунти пулів та прогрів цін.
+        """
+        self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=SOLANA_RPC_TIMEOUT))
+        await self.stream.add_accounts(list(self.accounts))
+        self.stream.start()
+        self._schedule_warmup()
 
-        Підтримуються:
-            - SOL/USDT: повертається self.current_price (наприклад, 32.0).
-            - USDT/SOL: повертається інвертована ціна.
-        Для інших пар повертається None.
+    async def close(self):
+        """
+        Зупиняє підписку, прогрів цін та закриває HTTP-сесію.
+        """
+        await self.stream.stop()
+        if self._warmup_task is not None:
+            self._warmup_task.cancel()
+            await asyncio.gather(self._warmup_task, return_exceptions=True)
+            self._warmup_task = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def is_warm(self) -> bool:
+        """Біржа готова, щойно є ціна хоча б одного пулу."""
+        return any(pool.quote is not None for pool in self.pair_index.values())
+
+    async def _get_accounts(self, pubkeys):
+        """
+        Читає акаунти через getMultipleAccounts (з метриками запитів до вузла).
+        """
+        started = time.perf_counter()
+        status = "error"
+        try:
+            accounts = await get_multiple_accounts(self._session, self.rpc_url, pubkeys)
+            status = "ok"
+            return accounts
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        finally:
+            metrics.UPSTREAM_DURATION.observe(self.name, "getMultipleAccounts", value=time.perf_counter() - started)
+            metrics.UPSTREAM_REQUESTS.inc(self.name, "getMultipleAccounts", status)
+
+    def _schedule_warmup(self):
+        """
+        Запускає прогрів цін у фоні, якщо він ще не виконується.
+        """
+        if self._warmup_task is None or self._warmup_task.done():
+            self._warmup_task = asyncio.create_task(self._warmup())
+
+    async def _warmup(self):
+        """
+        Читає акаунти пулів, а потім - сховища пулів AMM v4, адреси яких стали відомі з акаунтів пулів.
+        """
+        try:
+            for pubkey, data, slot in await self._get_accounts(list(self.accounts)):
+                if data is not None:
+                    self._on_account(pubkey, data, slot)
+            vaults = [pubkey for pubkey, (_, role) in self.accounts.items() if role != ROLE_POOL]
+            if vaults:
+                for pubkey, data, slot in await self._get_accounts(vaults):
+                    if data is not None:
+                        self._on_account(pubkey, data, slot)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Помилка прогріву цін пулів: %s", e)
+
+    def _on_account(self, pubkey: str, data: bytes, slot: int):
+        """
+        Застосовує оновлення акаунта пулу або сховища до стану пулу та перераховує ціну.
+        Оновлення, старші за вже застосоване для цього акаунта (за слотом), відкидаються.
+        """
+        entry = self.accounts.get(pubkey)
+        if entry is None:
+            return
+        pool, role = entry
+        if slot < pool.slots.get(pubkey, -1):
+            return
+        pool.slots[pubkey] = slot
+        metrics.RAYDIUM_ACCOUNT_UPDATES.inc(role)
+        if role == ROLE_POOL:
+            if not self._apply_pool(pool, data):
+                return
+        else:
+            amount = decode_token_amount(data)
+            if amount is None:
+                return
+            if role == ROLE_BASE_VAULT:
+                pool.base_amount = amount
+            else:
+                pool.quote_amount = amount
+        price = pool.price()
+        if price:
+            price = self._orient(pool, price)
+        if price:
+            self.quote_store.update(self.name, pool.pair, price)
+            pool.quote = self.quote_store.get(self.name, pool.pair)
+
+    def _apply_pool(self, pool: RaydiumPool, data: bytes) -> bool:
+        """
+        Декодує акаунт пулу. Для нового пулу AMM v4 додає його сховища до підписки.
+        Повертає False, якщо акаунт не відповідає типу пулу.
+        """
+        state = decode_clmm(data) if pool.kind == POOL_CLMM else decode_amm_v4(data)
+        if state is None:
+            logger.warning("Акаунт %s не є пулом %s", pool.address, pool.kind)
+            return False
+        if pool.kind == POOL_CLMM:
+            pool.mints = (state.mint0, state.mint1)
+        else:
+            pool.mints = (state.base_mint, state.quote_mint)
+            previous = pool.state
+            if previous is None or (previous.base_vault, previous.quote_vault) != (state.base_vault, state.quote_vault):
+                self.accounts[state.base_vault] = (pool, ROLE_BASE_VAULT)
+                self.accounts[state.quote_vault] = (pool, ROLE_QUOTE_VAULT)
+                asyncio.get_running_loop().create_task(self.stream.add_accounts([state.base_vault, state.quote_vault]))
+        pool.state = state
+        return True
+
+    def _orient(self, pool: RaydiumPool, price: float) -> float:
+        """
+        Переводить ціну першого токена пулу в другому в ціну пари pool.pair (BASE у QUOTE).
+        """
+        base, quote = pool.pair.split("/")
+        base_mint, quote_mint = SOLANA_TOKEN_MINTS.get(base), SOLANA_TOKEN_MINTS.get(quote)
+        if pool.mints == (base_mint, quote_mint):
+            return price
+        if pool.mints == (quote_mint, base_mint):
+            return 1 / price
+        logger.warning("Пара токенів не співпадає для %s", pool.pair)
+        return None
+
+    async def get_latest_quote(self, base: str, quote: str, hedge: bool = False) -> Quote:
+        """
+        Повертає останнє котирування для заданої пари з таблиці станів пулів, без звернень до мережі.
+        Якщо прямий запис не знайдено, шукається зворотній і результат інвертується.
 
         Параметри:
-            base (str): Базова валюта.
-            quote (str): Валюта котирування.
+        - base (str): базова валюта.
+        - quote (str): валюта котирування.
+
+        Повертає:
+        - Quote: котирування за запитом або None, якщо ціни ще немає.
         """
         base = base.upper()
         quote = quote.upper()
-        if base == "SOL" and quote == "USDT":
-            return self.current_price
-        elif base == "USDT" and quote == "SOL":
-            return 1 / self.current_price if self.current_price and self.current_price != 0 else None
-        else:
+        pool = self.pair_index.get(f"{base}/{quote}")
+        if pool is not None:
+            return pool.quote
+        pool = self.pair_index.get(f"{quote}/{base}")
+        if pool is None or pool.quote is None:
             return None
+        return pool.quote.inverted()
+
+    async def get_latest_price(self, base: str, quote: str) -> float:
+        """
+        Повертає останню ціну для пари base/quote (див. get_latest_quote) або None.
+        """
+        result = await self.get_latest_quote(base, quote)
+        return result.price if result else None
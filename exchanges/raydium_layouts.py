@@ -0,0 +1,172 @@
+"""
+Модуль raydium_layouts.py
+-------------------------
+
+Цей модуль містить розбір бінарних акаунтів Solana, потрібних для ціноутворення Raydium:
+
+    - пул AMM v4 (LIQUIDITY_STATE_LAYOUT_V4, 752 байти): десяткові знаки токенів, нараховані
+      комісії (needTakePnl) та адреси сховищ (vault) токенів пулу;
+    - пул CLMM (PoolState програми CLMM, з 8-байтним дискримінатором Anchor): десяткові знаки,
+      крок тіків, ліквідність, sqrtPriceX64 та поточний тік;
+    - акаунт SPL Token (165 байт): кількість токенів на сховищі.
+
+Поля читаються struct.unpack_from прямо з буфера за фіксованими зміщеннями, без копіювання
+та розбору всього акаунта. Також тут є кодування base58 для адрес акаунтів (без зовнішніх залежностей).
+"""
+
+import hashlib
+import struct
+from typing import NamedTuple
+
+# Розмір акаунта пулу AMM v4
+AMM_V4_SIZE = 752
+# Зміщення полів пулу AMM v4
+AMM_BASE_DECIMAL = struct.Struct("<QQ")  # baseDecimal, quoteDecimal
+AMM_BASE_DECIMAL_OFFSET = 32
+AMM_NEED_TAKE_PNL = struct.Struct("<QQ")  # baseNeedTakePnl, quoteNeedTakePnl
+AMM_NEED_TAKE_PNL_OFFSET = 192
+AMM_BASE_VAULT_OFFSET = 336
+AMM_QUOTE_VAULT_OFFSET = 368
+AMM_BASE_MINT_OFFSET = 400
+AMM_QUOTE_MINT_OFFSET = 432
+
+# Дискримінатор Anchor акаунта PoolState програми CLMM
+CLMM_DISCRIMINATOR = hashlib.sha256(b"account:PoolState").digest()[:8]
+# Зміщення полів пулу CLMM (після дискримінатора, bump, ammConfig, owner)
+CLMM_MINT0_OFFSET = 73
+CLMM_MINT1_OFFSET = 105
+CLMM_PRICE = struct.Struct("<BBHQQQQi")  # mintDecimals0, mintDecimals1, tickSpacing, liquidity (u128), sqrtPriceX64 (u128), tickCurrent
+CLMM_PRICE_OFFSET = 233
+
+# Акаунт SPL Token: mint (32 байти), owner (32 байти), amount (u64)
+TOKEN_ACCOUNT_SIZE = 165
+TOKEN_AMOUNT = struct.Struct("<Q")
+TOKEN_AMOUNT_OFFSET = 64
+
+PUBKEY_SIZE = 32
+_B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_B58_INDEX = {char: i for i, char in enumerate(_B58_ALPHABET)}
+
+
+def b58encode(data: bytes) -> str:
+    """Кодує байти в base58 (алфавіт Bitcoin/Solana)."""
+    number = int.from_bytes(data, "big")
+    encoded = ""
+    while number:
+        number, remainder = divmod(number, 58)
+        encoded = _B58_ALPHABET[remainder] + encoded
+    padding = len(data) - len(data.lstrip(b"\0"))
+    return "1" * padding + encoded
+
+
+def b58decode(text: str) -> bytes:
+    """Декодує рядок base58 у байти."""
+    number = 0
+    for char in text:
+        number = number * 58 + _B58_INDEX[char]
+    padding = len(text) - len(text.lstrip("1"))
+    body = number.to_bytes((number.bit_length() + 7) // 8, "big") if number else b""
+    return b"\0" * padding + body
+
+
+def _pubkey(buffer, offset: int) -> str:
+    return b58encode(bytes(buffer[offset:offset + PUBKEY_SIZE]))
+
+
+class AmmV4State(NamedTuple):
+    """
+    Частина стану пулу AMM v4, потрібна для ціноутворення.
+    """
+    base_decimals: int
+    quote_decimals: int
+    base_need_take_pnl: int
+    quote_need_take_pnl: int
+    base_vault: str
+    quote_vault: str
+    base_mint: str
+    quote_mint: str
+
+
+class ClmmState(NamedTuple):
+    """
+    Частина стану пулу CLMM, потрібна для ціноутворення.
+    """
+    mint0: str
+    mint1: str
+    decimals0: int
+    decimals1: int
+    tick_spacing: int
+    liquidity: int
+    sqrt_price_x64: int
+    tick: int
+
+
+def decode_amm_v4(data) -> AmmV4State:
+    """
+    Декодує акаунт пулу AMM v4. Повертає None, якщо розмір акаунта не відповідає layout.
+    """
+    if len(data) != AMM_V4_SIZE:
+        return None
+    buffer = memoryview(data)
+    base_decimals, quote_decimals = AMM_BASE_DECIMAL.unpack_from(buffer, AMM_BASE_DECIMAL_OFFSET)
+    base_pnl, quote_pnl = AMM_NEED_TAKE_PNL.unpack_from(buffer, AMM_NEED_TAKE_PNL_OFFSET)
+    return AmmV4State(
+        base_decimals,
+        quote_decimals,
+        base_pnl,
+        quote_pnl,
+        _pubkey(buffer, AMM_BASE_VAULT_OFFSET),
+        _pubkey(buffer, AMM_QUOTE_VAULT_OFFSET),
+        _pubkey(buffer, AMM_BASE_MINT_OFFSET),
+        _pubkey(buffer, AMM_QUOTE_MINT_OFFSET),
+    )
+
+
+def decode_clmm(data) -> ClmmState:
+    """
+    Декодує акаунт PoolState програми CLMM. Повертає None для акаунта іншого типу.
+    """
+    if len(data) < CLMM_PRICE_OFFSET + CLMM_PRICE.size or bytes(data[:8]) != CLMM_DISCRIMINATOR:
+        return None
+    buffer = memoryview(data)
+    decimals0, decimals1, tick_spacing, liq_lo, liq_hi, sqrt_lo, sqrt_hi, tick = CLMM_PRICE.unpack_from(
+        buffer, CLMM_PRICE_OFFSET
+    )
+    return ClmmState(
+        _pubkey(buffer, CLMM_MINT0_OFFSET),
+        _pubkey(buffer, CLMM_MINT1_OFFSET),
+        decimals0,
+        decimals1,
+        tick_spacing,
+        liq_lo | liq_hi << 64,
+        sqrt_lo | sqrt_hi << 64,
+        tick,
+    )
+
+
+def decode_token_amount(data) -> int:
+    """
+    Повертає кількість токенів (у мінімальних одиницях) акаунта SPL Token або None.
+    """
+    if len(data) < TOKEN_AMOUNT_OFFSET + TOKEN_AMOUNT.size:
+        return None
+    return TOKEN_AMOUNT.unpack_from(data, TOKEN_AMOUNT_OFFSET)[0]
+
+
+def amm_price(state: AmmV4State, base_amount: int, quote_amount: int) -> float:
+    """
+    Ціна base у quote пулу AMM v4 за резервами сховищ без нарахованих комісій (needTakePnl).
+    Повертає None, якщо резерву base немає.
+    """
+    base = (base_amount - state.base_need_take_pnl) / 10 ** state.base_decimals
+    quote = (quote_amount - state.quote_need_take_pnl) / 10 ** state.quote_decimals
+    if base <= 0 or quote <= 0:
+        return None
+    return quote / base
+
+
+def clmm_price(state: ClmmState) -> float:
+    """
+    Ціна mint0 у mint1 пулу CLMM з sqrtPriceX64 з урахуванням різниці десяткових знаків.
+    """
+    return (state.sqrt_price_x64 / 2 ** 64) ** 2 * 10 ** (state.decimals0 - state.decimals1)
@@ -0,0 +1,54 @@
+"""
+Модуль registry.py
+------------------
+
+Цей модуль містить перелік підтримуваних бірж та фабрику їхніх адаптерів.
+
+Адаптери створюються в тому процесі, який збирає дані: у звичайному режимі - у процесі API,
+а в багатопроцесному режимі - лише в процесі збору даних (services/ingest.py), тоді як
+HTTP-воркери працюють з SharedQuoteExchange поверх таблиці котирувань у спільній пам'яті.
+"""
+
+# Назви бірж у порядку, в якому вони повертаються API
+EXCHANGE_NAMES = ["binance", "kucoin", "gate", "uniswap", "raydium"]
+
+
+def create_exchange(name: str):
+    """
+    Створює адаптер біржі за назвою.
+
+    Модулі бірж (ccxt, web3) імпортуються лише тут, тож імпорт цього модуля не сповільнює
+    старт процесу. Функція може виконуватися в окремому потоці (asyncio.to_thread).
+
+    Параметри:
+        name (str): Назва біржі з EXCHANGE_NAMES.
+
+    Повертає:
+        Об'єкт Exchange.
+    """
+    if name == "binance":
+        from .binance import BinanceExchange
+        return BinanceExchange()
+    if name == "kucoin":
+        from .kucoin import KuCoinExchange
+        return KuCoinExchange()
+    if name == "gate":
+        from .gate import GateExchange
+        return GateExchange()
+    if name == "uniswap":
+        from .uniswap import UniswapExchange
+        return UniswapExchange()
+    if name == "raydium":
+        from .raydium import RaydiumExchange
+        return RaydiumExchange()
+    raise ValueError(f"Невідома біржа: {name}")
+
+
+def create_exchanges():
+    """
+    Створює адаптери всіх підтримуваних бірж.
+
+    Повертає:
+        Список об'єктів Exchange у порядку EXCHANGE_NAMES.
+    """
+    return [create_exchange(name) for name in EXCHANGE_NAMES]
@@ -0,0 +1,257 @@
+"""
+Модуль shared.py
+----------------
+
+Цей модуль містить клас SharedQuoteExchange - адаптер біржі для HTTP-воркерів у багатопроцесному
+режимі. Він не має власних з'єднань з біржею: котирування читаються з таблиці у спільній пам'яті
+(SharedQuoteTable), яку заповнює процес збору даних.
+
+Стакани CEX та стан ліквідності пулів DEX є лише в процесі збору даних, тож ефективний курс
+(get_effective_quote: /estimate та оцінка маршрутів) воркер запитує в нього через Unix-сокет
+EFFECTIVE_QUOTE_SOCKET (EffectiveQuoteClient / serve_effective_quotes). Протокол - рядки JSON:
+
+    запит:   {"id", "exchange", "base", "quote", "amount", "hedge"}
+    відповідь: {"id", "price", "timestamp"} ("price": null - даних немає)
+               або {"id", "error", "kind"}, де kind - "pair", "throttled" або "venue"
+
+Усі запити воркера до біржі йдуть одним з'єднанням і розрізняються за id, тож відповіді можуть
+приходити в будь-якому порядку. Якщо процес збору даних недоступний, воркер віддає поточний курс
+з таблиці (як базовий клас).
+"""
+
+import asyncio
+import itertools
+import os
+import tempfile
+import time
+
+import orjson
+
+from logs import get_logger
+from .base import Exchange
+from .health import PairError, Throttled
+from .quote_store import Quote
+from .shared_table import SharedQuoteTable
+
+logger = get_logger("shared")
+
+# Максимальний вік котирування з таблиці (секунди); старші котирування не віддаються
+SHARED_QUOTE_TTL = float(os.getenv("SHARED_QUOTE_TTL", "30"))
+# Unix-сокет процесу збору даних для розрахунку ефективного курсу
+EFFECTIVE_QUOTE_SOCKET = os.getenv(
+    "EFFECTIVE_QUOTE_SOCKET", os.path.join(tempfile.gettempdir(), "crypto_exchange_effective.sock")
+)
+
+# Помилки процесу збору даних за видом (kind у відповіді)
+_ERROR_KINDS = {"pair": PairError, "throttled": Throttled}
+
+
+class EffectiveQuoteClient:
+    """
+    Клієнт воркера для розрахунку ефективного курсу в процесі збору даних (одне з'єднання,
+    запити розрізняються за id). З'єднання відкривається при першому запиті та після обриву.
+
+    Параметри:
+        path (str): Шлях до Unix-сокета процесу збору даних.
+    """
+
+    def __init__(self, path: str = EFFECTIVE_QUOTE_SOCKET):
+        self.path = path
+        self._writer = None
+        self._reader_task = None
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._lock = asyncio.Lock()
+        self._connected = None
+
+    async def _connect(self):
+        async with self._lock:
+            if self._writer is not None and not self._writer.is_closing():
+                return
+            try:
+                reader, self._writer = await asyncio.open_unix_connection(self.path)
+            except OSError:
+                if self._connected is not False:
+                    logger.warning("Процес збору даних недоступний через %s: ефективний курс не розраховується", self.path)
+                self._connected = False
+                raise
+            self._connected = True
+            self._reader_task = asyncio.create_task(self._read_loop(reader))
+
+    async def _read_loop(self, reader):
+        """Розподіляє відповіді за id; після обриву з'єднання завершує всі очікувані запити помилкою."""
+        try:
+            while line := await reader.readline():
+                message = orjson.loads(line)
+                future = self._pending.pop(message.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(message)
+        except (ConnectionError, ValueError) as e:
+            logger.warning("Помилка з'єднання з процесом збору даних: %s", e)
+        finally:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            pending, self._pending = self._pending, {}
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("з'єднання з процесом збору даних закрито"))
+
+    async def request(self, exchange: str, base: str, quote: str, amount: float, hedge: bool = False) -> Quote:
+        """
+        Запитує ефективний курс у процесу збору даних.
+
+        Повертає:
+            Quote або None, якщо даних немає. Помилки біржі піднімаються як PairError, Throttled
+            або RuntimeError (помилка біржі); OSError - процес збору даних недоступний.
+        """
+        await self._connect()
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            self._writer.write(orjson.dumps({
+                "id": request_id, "exchange": exchange, "base": base, "quote": quote, "amount": amount, "hedge": hedge,
+            }) + b"\n")
+            message = await future
+        finally:
+            self._pending.pop(request_id, None)
+        if "error" in message:
+            raise _ERROR_KINDS.get(message.get("kind"), RuntimeError)(message["error"])
+        if message.get("price") is None:
+            return None
+        return Quote(message["price"], message["timestamp"])
+
+    async def close(self):
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            await asyncio.gather(self._reader_task, return_exceptions=True)
+            self._reader_task = None
+
+
+async def serve_effective_quotes(exchanges, path: str = EFFECTIVE_QUOTE_SOCKET):
+    """
+    Запускає в процесі збору даних сервер ефективного курсу на Unix-сокеті path.
+    Кожен запит виконується окремою задачею (get_effective_quote біржі процесу).
+
+    Параметри:
+        exchanges: Біржі процесу збору даних.
+        path (str): Шлях до Unix-сокета (наявний файл сокета замінюється).
+
+    Повертає:
+        asyncio.Server.
+    """
+    by_name = {exchange.name: exchange for exchange in exchanges}
+
+    async def answer(message: dict, writer):
+        response = {"id": message.get("id")}
+        exchange = by_name.get(message.get("exchange"))
+        try:
+            result = None
+            if exchange is not None:
+                result = await exchange.get_effective_quote(
+                    message["base"], message["quote"], float(message["amount"]), bool(message.get("hedge"))
+                )
+            response["price"] = result.price if result is not None else None
+            response["timestamp"] = result.timestamp if result is not None else None
+        except PairError as e:
+            response.update(error=str(e), kind="pair")
+        except Throttled as e:
+            response.update(error=str(e), kind="throttled")
+        except Exception as e:
+            response.update(error=str(e) or type(e).__name__, kind="venue")
+        if not writer.is_closing():
+            writer.write(orjson.dumps(response) + b"\n")
+
+    async def handle(reader, writer):
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(answer(orjson.loads(line), writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, ValueError) as e:
+            logger.warning("Помилка з'єднання воркера: %s", e)
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    if os.path.exists(path):
+        os.unlink(path)
+    return await asyncio.start_unix_server(handle, path)
+
+
+class SharedQuoteExchange(Exchange):
+    """
+    Біржа, котирування якої читаються з таблиці у спільній пам'яті.
+
+    Параметри:
+        name (str): Назва біржі (як у процесі збору даних).
+        table (SharedQuoteTable): Таблиця котирувань.
+        effective (EffectiveQuoteClient): Клієнт розрахунку ефективного курсу (None - окреме з'єднання
+                                          за EFFECTIVE_QUOTE_SOCKET).
+    """
+
+    def __init__(self, name: str, table: SharedQuoteTable, effective: EffectiveQuoteClient = None):
+        super().__init__(name)
+        self.table = table
+        self.ttl = SHARED_QUOTE_TTL
+        self.effective = effective or EffectiveQuoteClient()
+
+    def is_warm(self) -> bool:
+        """
+        Біржа готова, коли процес збору даних записав у таблицю хоча б одне котирування біржі,
+        не старше за SHARED_QUOTE_TTL (саме існування таблиці нічого не каже про біржу).
+        """
+        latest = self.table.latest_timestamp(self.name)
+        return latest is not None and time.time() - latest <= self.ttl
+
+    async def get_latest_quote(self, base: str, quote: str, hedge: bool = False) -> Quote:
+        """
+        Повертає котирування пари з таблиці (пряма пара або інвертована зворотна).
+        Повертає None, якщо свіжого котирування немає.
+        """
+        base = base.upper()
+        quote = quote.upper()
+        result = self.table.get(self.name, f"{base}/{quote}", self.ttl)
+        if result is not None:
+            return result
+        result = self.table.get(self.name, f"{quote}/{base}", self.ttl)
+        return result.inverted() if result is not None else None
+
+    async def get_latest_price(self, base: str, quote: str) -> float:
+        """
+        Повертає останню ціну пари з таблиці або None.
+        """
+        result = await self.get_latest_quote(base, quote)
+        return result.price if result is not None else None
+
+    async def get_effective_quote(self, base: str, quote: str, amount: float, hedge: bool = False) -> Quote:
+        """
+        Повертає ефективний курс, розрахований процесом збору даних (стакан, ліквідність пулу).
+        Якщо процес збору даних недоступний, повертається поточний курс з таблиці.
+        """
+        try:
+            return await self.effective.request(self.name, base, quote, amount, hedge)
+        except OSError:
+            return await super().get_effective_quote(base, quote, amount, hedge)
+
+    async def close(self):
+        await self.effective.close()
+
+
+async def mirror_quotes(table: SharedQuoteTable, store, interval: float):
+    """
+    Фонова задача HTTP-воркера: переносить змінені котирування з таблиці у локальне сховище
+    котирувань, щоб працювали його слухачі (потоки курсів, граф маршрутів, сканер спредів).
+
+    Параметри:
+        table (SharedQuoteTable): Таблиця котирувань.
+        store (QuoteStore): Локальне сховище котирувань.
+        interval (float): Інтервал опитування таблиці (секунди).
+    """
+    while True:
+        for exchange, symbol, quote in table.poll():
+            store.update(exchange, symbol, quote.price, quote.timestamp)
+        await asyncio.sleep(interval)
@@ -0,0 +1,266 @@
+"""
+Модуль shared_table.py
+----------------------
+
+Цей модуль містить таблицю котирувань у спільній пам'яті (SharedQuoteTable) для роботи кількох
+процесів: один процес збору даних (services/ingest.py) тримає з'єднання з біржами та записує
+котирування в таблицю, а HTTP-воркери лише читають її.
+
+Таблиця - файл фіксованої структури, відображений у пам'ять (mmap, за замовчуванням у /dev/shm):
+
+    заголовок (64 байти): magic, версія формату, місткість, кількість зайнятих слотів, епоха
+    слоти (по 80 байт):   seq (u64), ціна (f64), timestamp (f64), біржа (16 байт), символ (40 байт)
+
+Слот закріплюється за ключем (біржа, символ) назавжди, тож читачі будують індекс ключів один раз
+і дочитують лише нові слоти. Ціна та час оновлюються за схемою seqlock: записувач робить seq
+непарним, записує дані й робить seq парним; читач повторює читання, якщо seq непарний або змінився
+під час читання. Блокувань немає ні в записувача, ні в читачів.
+
+Епоха змінюється при кожному перестворенні таблиці (перезапуск процесу збору даних), після чого
+читачі скидають свій індекс.
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+import time
+
+import numpy as np
+
+from .quote_store import Quote
+
+_SHM_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+# Шлях до файлу таблиці котирувань
+QUOTE_TABLE_PATH = os.getenv("QUOTE_TABLE_PATH", os.path.join(_SHM_DIR, "crypto_exchange_quotes.bin"))
+# Кількість слотів (пар біржа/символ) у таблиці
+QUOTE_TABLE_CAPACITY = int(os.getenv("QUOTE_TABLE_CAPACITY", "65536"))
+
+MAGIC = b"QTBL"
+LAYOUT_VERSION = 1
+HEADER_FORMAT = "<4sIIIQ"  # magic, версія, місткість, кількість слотів, епоха
+HEADER_SIZE = 64
+COUNT_OFFSET = 12
+EPOCH_OFFSET = 16
+SLOT_FORMAT = "<Qdd16s40s"  # seq, ціна, timestamp, біржа, символ
+SLOT_SIZE = struct.calcsize(SLOT_FORMAT)
+EXCHANGE_SIZE = 16
+SYMBOL_SIZE = 40
+# Скільки разів читач повторює читання слота, який саме змінюється
+READ_RETRIES = 100
+
+
+def _slot_offset(slot: int) -> int:
+    return HEADER_SIZE + slot * SLOT_SIZE
+
+
+class SharedQuoteTable:
+    """
+    Таблиця котирувань у спільній пам'яті.
+
+    Записувач створюється через SharedQuoteTable.create(), читач - через SharedQuoteTable(path):
+    читач підключається до таблиці при першому зверненні, тож може стартувати раніше за записувача.
+    """
+
+    def __init__(self, path: str = QUOTE_TABLE_PATH):
+        self.path = path
+        self._mm = None
+        self._writer = False
+        self._capacity = 0
+        self._epoch = None
+        # (біржа, символ) -> номер слота, ключі за номером слота та номери слотів кожної біржі
+        self._index = {}
+        self._keys = []
+        self._venue_slots = {}
+        self._indexed = 0
+        # Останні прочитані seq слотів (для poll)
+        self._seen = None
+        # Лише для записувача: seq слотів
+        self._seqs = []
+
+    @classmethod
+    def create(cls, path: str = QUOTE_TABLE_PATH, capacity: int = QUOTE_TABLE_CAPACITY) -> "SharedQuoteTable":
+        """
+        Створює (або перестворює на місці) таблицю й повертає записувача.
+        Файл не видаляється, тож читачі, що вже відобразили його, бачать нову епоху.
+        """
+        table = cls(path)
+        size = HEADER_SIZE + capacity * SLOT_SIZE
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, size)
+            table._mm = mmap.mmap(fd, size, access=mmap.ACCESS_WRITE)
+        finally:
+            os.close(fd)
+        table._mm[HEADER_SIZE:size] = bytes(size - HEADER_SIZE)
+        struct.pack_into(HEADER_FORMAT, table._mm, 0, MAGIC, LAYOUT_VERSION, capacity, 0, time.time_ns())
+        table._writer = True
+        table._capacity = capacity
+        return table
+
+    def available(self) -> bool:
+        """Чи створено таблицю (процес збору даних запущено)."""
+        return self._attach()
+
+    def close(self):
+        """Звільняє відображення файлу."""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def _attach(self) -> bool:
+        """
+        Підключає читача до таблиці. Повертає False, якщо таблиця ще не створена.
+        """
+        if self._mm is not None:
+            return True
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            return False
+        try:
+            size = os.fstat(fd).st_size
+            if size < HEADER_SIZE:
+                return False
+            mm = mmap.mmap(fd, size, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        magic, version, capacity, _, _ = struct.unpack_from(HEADER_FORMAT, mm, 0)
+        if magic != MAGIC or version != LAYOUT_VERSION or size < HEADER_SIZE + capacity * SLOT_SIZE:
+            mm.close()
+            return False
+        self._mm = mm
+        self._capacity = capacity
+        return True
+
+    def _sync_index(self) -> bool:
+        """
+        Дочитує ключі нових слотів; при зміні епохи скидає індекс.
+        Повертає False, якщо таблиця недоступна.
+        """
+        _, _, capacity, _, epoch = struct.unpack_from(HEADER_FORMAT, self._mm, 0)
+        if epoch != self._epoch:
+            self._epoch = None
+            self._index = {}
+            self._keys = []
+            self._venue_slots = {}
+            self._indexed = 0
+            if capacity != self._capacity:
+                # Таблицю перестворено з іншою місткістю - відображаємо файл заново
+                self.close()
+                if not self._attach():
+                    return False
+            self._epoch = epoch
+            self._seen = np.zeros(self._capacity, dtype=np.uint64)
+        count = struct.unpack_from("<I", self._mm, COUNT_OFFSET)[0]
+        for slot in range(self._indexed, count):
+            _, _, _, exchange, symbol = struct.unpack_from(SLOT_FORMAT, self._mm, _slot_offset(slot))
+            key = (exchange.rstrip(b"\0").decode(), symbol.rstrip(b"\0").decode())
+            self._index[key] = slot
+            self._keys.append(key)
+            self._venue_slots.setdefault(key[0], []).append(slot)
+        self._indexed = count
+        return True
+
+    def write(self, exchange: str, symbol: str, price: float, timestamp: float):
+        """
+        Записує котирування (лише записувач). Новому ключу виділяється наступний вільний слот.
+        """
+        slot = self._index.get((exchange, symbol))
+        if slot is None:
+            exchange_bytes = exchange.encode()
+            symbol_bytes = symbol.encode()
+            if len(exchange_bytes) > EXCHANGE_SIZE or len(symbol_bytes) > SYMBOL_SIZE:
+                return
+            slot = len(self._seqs)
+            if slot >= self._capacity:
+                return
+            # Слот стає видимим читачам лише після збільшення лічильника слотів
+            struct.pack_into(SLOT_FORMAT, self._mm, _slot_offset(slot), 2, price, timestamp, exchange_bytes, symbol_bytes)
+            self._seqs.append(2)
+            self._index[(exchange, symbol)] = slot
+            struct.pack_into("<I", self._mm, COUNT_OFFSET, slot + 1)
+            return
+        offset = _slot_offset(slot)
+        seq = self._seqs[slot]
+        struct.pack_into("<Q", self._mm, offset, seq + 1)
+        struct.pack_into("<dd", self._mm, offset + 8, price, timestamp)
+        struct.pack_into("<Q", self._mm, offset, seq + 2)
+        self._seqs[slot] = seq + 2
+
+    def _read(self, slot: int):
+        """
+        Читає (seq, Quote) слота без блокувань. Повертає None, якщо слот постійно змінюється.
+        """
+        offset = _slot_offset(slot)
+        for _ in range(READ_RETRIES):
+            seq = struct.unpack_from("<Q", self._mm, offset)[0]
+            if seq & 1:
+                continue
+            price, timestamp = struct.unpack_from("<dd", self._mm, offset + 8)
+            if struct.unpack_from("<Q", self._mm, offset)[0] == seq:
+                return seq, Quote(price, timestamp)
+        return None
+
+    def get(self, exchange: str, symbol: str, ttl: float = None):
+        """
+        Повертає котирування символу на біржі (як QuoteStore.get) або None.
+        """
+        if not self._attach():
+            return None
+        slot = self._index.get((exchange, symbol))
+        if not self._writer:
+            if slot is None or struct.unpack_from("<Q", self._mm, EPOCH_OFFSET)[0] != self._epoch:
+                if not self._sync_index():
+                    return None
+                slot = self._index.get((exchange, symbol))
+        if slot is None:
+            return None
+        result = self._read(slot)
+        if result is None:
+            return None
+        quote = result[1]
+        if ttl is not None and quote.age > ttl:
+            return None
+        return quote
+
+    def latest_timestamp(self, exchange: str) -> float:
+        """
+        Час найсвіжішого котирування біржі в таблиці (лише для читача) або None, якщо біржа ще
+        не записала жодного котирування. Час читається без seqlock: для оцінки свіжості
+        достатньо значення, записаного одним 8-байтовим словом.
+        """
+        if not self._attach() or not self._sync_index():
+            return None
+        slots = self._venue_slots.get(exchange)
+        if not slots:
+            return None
+        timestamps = np.ndarray(
+            (self._indexed,), dtype="<f8", buffer=self._mm, offset=HEADER_SIZE + 16, strides=(SLOT_SIZE,)
+        )
+        return float(timestamps[slots].max())
+
+    def poll(self):
+        """
+        Повертає список (біржа, символ, Quote) слотів, змінених з моменту попереднього виклику.
+        Змінені слоти знаходяться одним векторним порівнянням лічильників seq.
+        """
+        if not self._attach() or not self._sync_index():
+            return []
+        count = self._indexed
+        if not count:
+            return []
+        seqs = np.ndarray((count,), dtype="<u8", buffer=self._mm, offset=HEADER_SIZE, strides=(SLOT_SIZE,))
+        changed = np.flatnonzero(seqs != self._seen[:count])
+        if not len(changed):
+            return []
+        updates = []
+        for slot in changed.tolist():
+            result = self._read(slot)
+            if result is None:
+                continue
+            seq, quote = result
+            self._seen[slot] = seq
+            exchange, symbol = self._keys[slot]
+            updates.append((exchange, symbol, quote))
+        return updates
@@ -0,0 +1,71 @@
+"""
+Модуль singleflight.py
+----------------------
+
+Цей модуль містить клас SingleFlight для об'єднання однакових одночасних запитів.
+
+Поки запит з певним ключем виконується, всі інші виклики з тим самим ключем не запускають
+новий запит, а чекають на результат уже запущеного. Після завершення запиту ключ звільняється,
+тож наступний виклик знову звернеться до джерела даних.
+"""
+
+import asyncio
+
+
+def pair_key(base: str, quote: str):
+    """
+    Повертає канонічний ключ пари та ознаку інверсії.
+
+    Пара і зворотна до неї (BTC/USDT та USDT/BTC) мають однаковий ключ, тож запити в обох
+    напрямках об'єднуються; inverted=True означає, що запитана пара зворотна до канонічної.
+
+    Повертає:
+        Кортеж ((canonical_base, canonical_quote), inverted).
+    """
+    base = base.upper()
+    quote = quote.upper()
+    if base <= quote:
+        return (base, quote), False
+    return (quote, base), True
+
+
+class SingleFlight:
+    """
+    Об'єднує одночасні виклики з однаковим ключем в один запит.
+    """
+
+    def __init__(self):
+        self._calls = {}
+
+    def __len__(self):
+        """Кількість запитів, що виконуються."""
+        return len(self._calls)
+
+    async def do(self, key, factory):
+        """
+        Виконує запит для ключа або приєднується до вже запущеного.
+
+        Параметри:
+            key: Ключ запиту (будь-який хешований об'єкт).
+            factory: Функція без аргументів, що повертає корутину запиту.
+
+        Повертає:
+            Результат запиту. Скасування одного з викликів (наприклад, через тайм-аут)
+            не скасовує спільний запит для інших викликів.
+        """
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._release(key, done))
+        return await asyncio.shield(future)
+
+    def _release(self, key, future):
+        """
+        Звільняє ключ після завершення запиту.
+        """
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        # Позначаємо помилку як оброблену, навіть якщо всі очікувачі вже скасовані
+        if not future.cancelled():
+            future.exception()
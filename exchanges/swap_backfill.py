@@ -0,0 +1,461 @@
+"""
+Модуль swap_backfill.py
+-----------------------
+
+Цей модуль містить завантаження історичних подій Swap пулів Uniswap V3 (SwapBackfill) та їхній
+кеш на диску в колонковому форматі (SwapCache).
+
+Діапазон блоків ділиться на частини до BACKFILL_CHUNK_BLOCKS блоків, які завантажуються через
+eth_getLogs одночасно BACKFILL_CONCURRENCY воркерами (кожен - окреме WebSocket-з'єднання з
+вузлом). Якщо вузол відповідає, що результат завеликий (ліміт кількості логів, розміру відповіді
+чи діапазону блоків), частина ділиться навпіл, а розмір наступних частин зменшується; після
+кількох успішних частин він знову подвоюється (до BACKFILL_CHUNK_BLOCKS).
+
+Логи декодуються пакетно напряму з topics/data (decode_swap_columns, без ABI-шару web3) і
+зберігаються в кеші окремо для кожного пулу:
+
+    <BACKFILL_CACHE_DIR>/<адреса_пулу>/<колонка>.bin - значення колонки підряд (little-endian);
+    <BACKFILL_CACHE_DIR>/<адреса_пулу>/meta.json     - покритий діапазон блоків та кількість рядків.
+
+Кеш кожного пулу покриває суцільний діапазон блоків, тож після перезапуску завантажуються лише
+нові блоки (та старіші, якщо глибину історії збільшено); розрив між кешем і запитаним діапазоном
+завантажується разом з ним, а не замінює наявну історію. Розрив довший за BACKFILL_MAX_GAP_BLOCKS
+(наприклад, після тривалої зупинки) не завантажується, щоб не затримувати прогрів: наявний кеш пулу
+переноситься в архівний сегмент (<адреса_пулу>.<from_block>-<to_block> поруч з кешем), а новий кеш
+починається із запитаного діапазону. Нові блоки дописуються в кінець файлів
+колонок, а метадані записуються після колонок, тож рядки перерваного запису (понад кількість
+у метаданих) ігноруються.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import orjson
+import websockets
+
+import metrics
+from logs import get_logger
+from .swap_stream import SWAP_TOPIC, decode_swap_columns
+
+logger = get_logger("swap_backfill")
+
+# Каталог кешу декодованих подій Swap
+BACKFILL_CACHE_DIR = os.getenv("BACKFILL_CACHE_DIR", os.path.join("data", "swaps"))
+# Максимальний розмір частини діапазону (блоків) для одного eth_getLogs
+BACKFILL_CHUNK_BLOCKS = int(os.getenv("BACKFILL_CHUNK_BLOCKS", "2000"))
+# Кількість одночасних запитів eth_getLogs (окремих з'єднань з вузлом)
+BACKFILL_CONCURRENCY = int(os.getenv("BACKFILL_CONCURRENCY", "4"))
+# Максимальний час одного запиту eth_getLogs (секунди)
+BACKFILL_REQUEST_TIMEOUT = float(os.getenv("BACKFILL_REQUEST_TIMEOUT", "30"))
+# Кількість повторів частини після помилки вузла або з'єднання
+BACKFILL_RETRIES = int(os.getenv("BACKFILL_RETRIES", "3"))
+# Максимальний розрив між кешем пулу та запитаним діапазоном (блоків), який ще дозавантажується;
+# при довшому розриві кеш пулу архівується і починається новий сегмент
+BACKFILL_MAX_GAP_BLOCKS = int(os.getenv("BACKFILL_MAX_GAP_BLOCKS", "7200"))
+
+# Після скількох успішних частин поспіль розмір частини подвоюється
+CHUNK_GROW_AFTER = 4
+
+# Фрагменти повідомлень вузлів та провайдерів про завеликий результат або діапазон eth_getLogs
+# (Infura, Alchemy, QuickNode, Ankr, Chainstack, geth/erigon). Загальні слова ("exceeded", "range")
+# не підходять: їх містять і помилки ліміту запитів чи некоректного номера блоку.
+TOO_LARGE_MARKERS = (
+    "query returned more than",
+    "log response size exceeded",
+    "response size exceeded",
+    "query exceeds max results",
+    "exceed maximum block range",
+    "block range is too wide",
+    "block range too large",
+    "block range limit exceeded",
+    "eth_getlogs is limited to",
+    "eth_getlogs and eth_newfilter are limited to",
+    "too many logs",
+)
+
+# Колонки кешу та їхні типи
+COLUMNS = {
+    "block": "<i8",
+    "log_index": "<i4",
+    "amount0": "<f8",
+    "amount1": "<f8",
+    "sqrt_price_x96": "<f8",
+    "liquidity": "<f8",
+    "tick": "<i4",
+}
+
+
+def empty_columns() -> dict:
+    """Порожній набір колонок."""
+    return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+
+
+def _take(columns: dict, index) -> dict:
+    """Вибирає рядки колонок за індексом (зріз, маска або масив індексів)."""
+    return {name: values[index] for name, values in columns.items()}
+
+
+def _concat(parts) -> dict:
+    """Об'єднує набори колонок і впорядковує рядки за (block, log_index)."""
+    parts = [part for part in parts if len(part["block"])]
+    if not parts:
+        return empty_columns()
+    columns = {name: np.concatenate([part[name] for part in parts]).astype(dtype) for name, dtype in COLUMNS.items()}
+    return _take(columns, np.lexsort((columns["log_index"], columns["block"])))
+
+
+class LogsTooLarge(Exception):
+    """Вузол відмовився повернути логи діапазону: результат завеликий."""
+
+
+def is_too_large(error: dict) -> bool:
+    """Чи означає помилка JSON-RPC, що діапазон логів треба зменшити."""
+    message = str(error.get("message", "")).lower()
+    return any(marker in message for marker in TOO_LARGE_MARKERS)
+
+
+class SwapCache:
+    """
+    Колонковий кеш декодованих подій Swap на диску (окремий каталог для кожного пулу).
+
+    Параметри:
+        directory (str): Каталог кешу.
+    """
+
+    def __init__(self, directory: str = BACKFILL_CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, address: str, name: str) -> str:
+        return os.path.join(self.directory, address.lower(), name)
+
+    def meta(self, address: str) -> dict:
+        """
+        Метадані пулу: {"from_block", "to_block", "rows"} або None, якщо кешу немає.
+        """
+        try:
+            with open(self._path(address, "meta.json"), "r") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("rows") is not None else None
+
+    def coverage(self, address: str):
+        """Покритий кешем діапазон блоків пулу (from_block, to_block) або None."""
+        meta = self.meta(address)
+        return (meta["from_block"], meta["to_block"]) if meta else None
+
+    def _write_meta(self, address: str, meta: dict):
+        path = self._path(address, "meta.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(path + ".tmp", path)
+
+    def read(self, address: str, from_block: int = None, to_block: int = None) -> dict:
+        """
+        Читає події пулу з кешу (за замовчуванням - усі), впорядковані за (block, log_index).
+        """
+        meta = self.meta(address)
+        if not meta or not meta["rows"]:
+            return empty_columns()
+        columns = {
+            name: np.fromfile(self._path(address, f"{name}.bin"), dtype=dtype, count=meta["rows"])
+            for name, dtype in COLUMNS.items()
+        }
+        blocks = columns["block"]
+        start = 0 if from_block is None else np.searchsorted(blocks, from_block, "left")
+        end = len(blocks) if to_block is None else np.searchsorted(blocks, to_block, "right")
+        return _take(columns, slice(start, end))
+
+    def last(self, address: str) -> dict:
+        """
+        Остання подія пулу в кеші ({колонка: значення}) або None. Читає лише один рядок кожної колонки.
+        """
+        meta = self.meta(address)
+        if not meta or not meta["rows"]:
+            return None
+        last = {}
+        for name, dtype in COLUMNS.items():
+            itemsize = np.dtype(dtype).itemsize
+            values = np.fromfile(
+                self._path(address, f"{name}.bin"), dtype=dtype, count=1, offset=(meta["rows"] - 1) * itemsize
+            )
+            last[name] = values[0].item()
+        return last
+
+    def archive(self, address: str) -> str:
+        """
+        Переносить кеш пулу в архівний сегмент <адреса_пулу>.<from_block>-<to_block> у тому ж
+        каталозі; після цього кеш пулу порожній і наступний запис починає новий сегмент.
+
+        Повертає:
+            Шлях архівного сегмента або None, якщо кешу пулу немає.
+        """
+        meta = self.meta(address)
+        if meta is None:
+            return None
+        path = os.path.join(self.directory, address.lower())
+        segment = f"{path}.{meta['from_block']}-{meta['to_block']}"
+        if os.path.exists(segment):
+            shutil.rmtree(segment)
+        os.replace(path, segment)
+        return segment
+
+    def write(self, address: str, from_block: int, to_block: int, columns: dict):
+        """
+        Записує події пулу за діапазон блоків [from_block, to_block] (усі події діапазону).
+
+        Діапазон, що продовжує покриття, дописується в кінець файлів колонок. Діапазон, що
+        перетинається з покриттям або прилягає до нього з початку, об'єднується з кешем (файли
+        переписуються). Діапазон з розривом відхиляється (ValueError), бо покриття має бути
+        суцільним: спершу треба завантажити розрив.
+        """
+        meta = self.meta(address)
+        if meta is not None and (from_block > meta["to_block"] + 1 or to_block < meta["from_block"] - 1):
+            raise ValueError(
+                f"Діапазон {from_block}-{to_block} не прилягає до кешу {meta['from_block']}-{meta['to_block']} пулу {address}"
+            )
+        os.makedirs(os.path.join(self.directory, address.lower()), exist_ok=True)
+        if meta is not None and from_block == meta["to_block"] + 1:
+            for name, dtype in COLUMNS.items():
+                path = self._path(address, f"{name}.bin")
+                with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+                    f.seek(meta["rows"] * np.dtype(dtype).itemsize)
+                    f.truncate()
+                    f.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+            self._write_meta(
+                address, {"from_block": meta["from_block"], "to_block": to_block, "rows": meta["rows"] + len(columns["block"])}
+            )
+            return
+        if meta is not None:
+            existing = self.read(address)
+            outside = (existing["block"] < from_block) | (existing["block"] > to_block)
+            columns = _concat([_take(existing, outside), columns])
+            from_block, to_block = min(from_block, meta["from_block"]), max(to_block, meta["to_block"])
+        else:
+            columns = _concat([columns])
+        # Поки файли колонок переписуються, кеш пулу вважається порожнім
+        self._write_meta(address, {"from_block": from_block, "to_block": to_block, "rows": None})
+        for name, dtype in COLUMNS.items():
+            path = self._path(address, f"{name}.bin")
+            np.ascontiguousarray(columns[name], dtype=dtype).tofile(path + ".tmp")
+            os.replace(path + ".tmp", path)
+        self._write_meta(address, {"from_block": from_block, "to_block": to_block, "rows": len(columns["block"])})
+
+
+class _ChunkQueue:
+    """
+    Черга частин діапазону блоків з адаптивним розміром частини.
+    """
+
+    def __init__(self, from_block: int, to_block: int, chunk_blocks: int):
+        self.cursor = from_block
+        self.end = to_block
+        self.size = self.max_size = max(chunk_blocks, 1)
+        self.successes = 0
+        # Половини частин, що виявилися завеликими (беруться першими)
+        self.pending = []
+
+    def take(self):
+        """Наступна частина (start, end) або None, якщо діапазон вичерпано."""
+        if self.pending:
+            return self.pending.pop()
+        if self.cursor > self.end:
+            return None
+        start = self.cursor
+        end = min(start + self.size - 1, self.end)
+        self.cursor = end + 1
+        return start, end
+
+    def retry(self, chunk):
+        """Повертає частину в чергу (після помилки з'єднання)."""
+        self.pending.append(chunk)
+
+    def split(self, chunk) -> bool:
+        """
+        Ділить завелику частину навпіл і зменшує розмір наступних частин.
+        Повертає False, якщо частина з одного блоку.
+        """
+        start, end = chunk
+        if start == end:
+            return False
+        middle = (start + end) // 2
+        self.pending.extend([(middle + 1, end), (start, middle)])
+        self.size = max(1, min(self.size, middle - start + 1))
+        self.successes = 0
+        return True
+
+    def done(self):
+        """Враховує успішну частину: після CHUNK_GROW_AFTER успіхів поспіль розмір подвоюється."""
+        self.successes += 1
+        if self.successes >= CHUNK_GROW_AFTER:
+            self.size = min(self.size * 2, self.max_size)
+            self.successes = 0
+
+
+class SwapBackfill:
+    """
+    Завантаження історичних подій Swap з кешем на диску.
+
+    Параметри:
+        ws_url (str): Адреса WebSocket JSON-RPC вузла.
+        cache (SwapCache): Кеш декодованих подій.
+        concurrency (int): Кількість одночасних запитів eth_getLogs.
+        chunk_blocks (int): Максимальний розмір частини діапазону (блоків).
+        exchange (str): Назва біржі для метрик запитів.
+        max_gap_blocks (int): Максимальний розрив між кешем і запитаним діапазоном, що дозавантажується.
+    """
+
+    def __init__(self, ws_url: str, cache: SwapCache, concurrency: int = BACKFILL_CONCURRENCY,
+                 chunk_blocks: int = BACKFILL_CHUNK_BLOCKS, exchange: str = "uniswap",
+                 max_gap_blocks: int = BACKFILL_MAX_GAP_BLOCKS):
+        self.ws_url = ws_url
+        self.cache = cache
+        self.concurrency = max(concurrency, 1)
+        self.chunk_blocks = chunk_blocks
+        self.max_gap_blocks = max_gap_blocks
+        self.exchange = exchange
+        self._request_ids = itertools.count(1)
+        # Завантаження серіалізуються, щоб не записувати кеш одного пулу одночасно
+        self._lock = asyncio.Lock()
+
+    async def _get_logs(self, ws, addresses, start: int, end: int):
+        """
+        Виконує eth_getLogs для частини діапазону на окремому з'єднанні воркера.
+        """
+        request_id = next(self._request_ids)
+        started = time.perf_counter()
+        status = "error"
+        try:
+            await ws.send(orjson.dumps({
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": "eth_getLogs",
+                "params": [{"fromBlock": hex(start), "toBlock": hex(end), "address": addresses, "topics": [SWAP_TOPIC]}],
+            }).decode())
+            message = orjson.loads(await asyncio.wait_for(ws.recv(), BACKFILL_REQUEST_TIMEOUT))
+            if message.get("id") != request_id:
+                raise RuntimeError(f"eth_getLogs: неочікувана відповідь {message.get('id')}")
+            if "error" in message:
+                if is_too_large(message["error"]):
+                    status = "too_large"
+                    raise LogsTooLarge(message["error"].get("message"))
+                raise RuntimeError(f"eth_getLogs: {message['error']}")
+            status = "ok"
+            return message.get("result") or []
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        finally:
+            metrics.UPSTREAM_DURATION.observe(self.exchange, "eth_getLogs", value=time.perf_counter() - started)
+            metrics.UPSTREAM_REQUESTS.inc(self.exchange, "eth_getLogs", status)
+
+    async def fetch(self, addresses, from_block: int, to_block: int):
+        """
+        Завантажує та декодує події Swap пулів за діапазон блоків (без кешу).
+
+        Повертає:
+            Кортеж (масив адрес пулів для кожного рядка, колонки), впорядковані за (block, log_index).
+        """
+        addresses = sorted({address.lower() for address in addresses})
+        if from_block > to_block or not addresses:
+            return np.empty(0, dtype=object), empty_columns()
+        queue = _ChunkQueue(from_block, to_block, self.chunk_blocks)
+        parts = []
+
+        async def worker():
+            ws = None
+            failures = 0
+            try:
+                while (chunk := queue.take()) is not None:
+                    try:
+                        if ws is None:
+                            ws = await websockets.connect(self.ws_url, max_size=None)
+                        logs = await self._get_logs(ws, addresses, *chunk)
+                    except LogsTooLarge:
+                        if not queue.split(chunk):
+                            raise
+                        continue
+                    except (OSError, asyncio.TimeoutError, RuntimeError, websockets.WebSocketException) as e:
+                        failures += 1
+                        if failures > BACKFILL_RETRIES:
+                            raise
+                        logger.debug("Повтор eth_getLogs %s-%s: %s", chunk[0], chunk[1], e)
+                        queue.retry(chunk)
+                        if ws is not None:
+                            await ws.close()
+                            ws = None
+                        await asyncio.sleep(0.5 * failures)
+                        continue
+                    failures = 0
+                    queue.done()
+                    parts.append(decode_swap_columns(logs))
+            finally:
+                if ws is not None:
+                    await ws.close()
+
+        chunks = -(-(to_block - from_block + 1) // max(self.chunk_blocks, 1))
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.concurrency, chunks))]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            # Помилка одного воркера зупиняє решту, щоб вони не продовжували запити у фоні
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        pools = np.array([address for part_addresses, _ in parts for address in part_addresses], dtype=object)
+        columns = {name: np.concatenate([part[name] for _, part in parts] or [np.empty(0, dtype)]) for name, dtype in COLUMNS.items()}
+        order = np.lexsort((columns["log_index"], columns["block"]))
+        return pools[order], _take(columns, order)
+
+    async def backfill(self, addresses, from_block: int, to_block: int):
+        """
+        Доповнює кеш пулів подіями за діапазон блоків [from_block, to_block]: завантажуються лише
+        блоки, яких немає в кеші (пули з однаковими пропущеними діапазонами - одними запитами).
+        Якщо між кешем пулу та діапазоном є розрив до max_gap_blocks блоків, він завантажується
+        теж, тож покриття кешу залишається суцільним. Довший розрив не завантажується: кеш пулу
+        архівується (SwapCache.archive) і завантажується лише запитаний діапазон.
+
+        Повертає:
+            Кількість завантажених подій.
+        """
+        async with self._lock:
+            # Пропущений діапазон -> пули, яким він потрібен
+            missing = {}
+            for address in sorted({address.lower() for address in addresses}):
+                coverage = self.cache.coverage(address)
+                gap = max(from_block - coverage[1], coverage[0] - to_block) - 1 if coverage is not None else 0
+                if gap > self.max_gap_blocks:
+                    segment = self.cache.archive(address)
+                    logger.info(
+                        "Розрив %s блоків між кешем %s-%s пулу %s та блоками %s-%s, кеш перенесено в %s",
+                        gap, coverage[0], coverage[1], address, from_block, to_block, segment,
+                    )
+                    coverage = None
+                if coverage is None:
+                    ranges = [(from_block, to_block)]
+                else:
+                    # Діапазони від запитаних меж до покриття (разом з розривом, якщо він є)
+                    ranges = []
+                    if from_block < coverage[0]:
+                        ranges.append((from_block, coverage[0] - 1))
+                    if to_block > coverage[1]:
+                        ranges.append((coverage[1] + 1, to_block))
+                for block_range in ranges:
+                    missing.setdefault(block_range, []).append(address)
+            fetched = 0
+            for (start, end), group in missing.items():
+                started = time.perf_counter()
+                pools, columns = await self.fetch(group, start, end)
+                for address in group:
+                    self.cache.write(address, start, end, _take(columns, pools == address))
+                fetched += len(pools)
+                logger.info(
+                    "Завантажено %s подій Swap %s пулів за блоки %s-%s (%.1f с)",
+                    len(pools), len(group), start, end, time.perf_counter() - started,
+                )
+            return fetched
@@ -0,0 +1,307 @@
+"""
+Модуль swap_stream.py
+---------------------
+
+Цей модуль містить потік подій Swap пулів Uniswap V3 через одну підписку eth_subscribe("logs").
+
+Одна WebSocket-підписка охоплює адреси всіх пулів, що відстежуються. Логи декодуються напряму
+з topics/data (без ABI-шару web3) і передаються обробнику, який розподіляє їх по пулах.
+Для історичних логів є пакетний декодер у колонки numpy (decode_swap_columns, див. swap_backfill.py).
+При обриві з'єднання потік автоматично перепідключається і дочитує пропущені логи через
+eth_getLogs, починаючи з останнього обробленого блоку.
+
+Адреса вузла задається змінною оточення ETH_WS_URL, тож потік можна перевірити на локальному
+JSON-RPC/WebSocket вузлі-заглушці.
+"""
+
+import asyncio
+import json
+from typing import NamedTuple
+
+import numpy as np
+import websockets
+
+from logs import get_logger
+
+logger = get_logger("swap_stream")
+
+# keccak256("Swap(address,address,int256,int256,uint160,uint128,int24)")
+SWAP_TOPIC = "0xc42079f94a6350d7e6235f29174924f928cc2ac818eb64fed8004e115fbcca67"
+# Подія Swap: 3 topics (сигнатура, sender, recipient) та 5 слів data по 32 байти
+SWAP_TOPICS = 3
+SWAP_DATA_WORDS = 5
+
+# Затримка перед повторним підключенням (секунди)
+RECONNECT_DELAY = 1
+MAX_RECONNECT_DELAY = 30
+
+
+class SwapEvent(NamedTuple):
+    """
+    Декодована подія Swap пулу Uniswap V3.
+    """
+    address: str
+    block_number: int
+    log_index: int
+    amount0: int
+    amount1: int
+    sqrt_price_x96: int
+    liquidity: int
+    tick: int
+
+
+def _to_int(value) -> int:
+    """Перетворює hex-рядок або число з JSON-RPC у int."""
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+def _signed(word: int, bits: int = 256) -> int:
+    """Інтерпретує беззнакове слово як число зі знаком (доповнювальний код)."""
+    if word >= 1 << (bits - 1):
+        return word - (1 << bits)
+    return word
+
+
+def _swap_data(log: dict) -> str:
+    """
+    Повертає поле data логу події Swap (hex без "0x") або None, якщо лог не є подією Swap
+    чи має неправильну форму (кількість topics або довжина data). Про лог неправильної форми
+    з сигнатурою Swap записується попередження.
+    """
+    topics = log.get("topics") or []
+    if not topics or topics[0].lower() != SWAP_TOPIC:
+        return None
+    data = log.get("data") or ""
+    if data.startswith("0x"):
+        data = data[2:]
+    if len(topics) != SWAP_TOPICS or len(data) != SWAP_DATA_WORDS * 64:
+        logger.warning(
+            "Пропущено лог Swap неправильної форми (topics: %s, байтів data: %s) у транзакції %s",
+            len(topics), len(data) // 2, log.get("transactionHash"),
+        )
+        return None
+    return data
+
+
+def decode_swap_log(log: dict) -> SwapEvent:
+    """
+    Декодує сирий лог події Swap (формат eth_getLogs / eth_subscribe).
+
+    Поле data містить 5 слів по 32 байти: amount0 (int256), amount1 (int256),
+    sqrtPriceX96 (uint160), liquidity (uint128), tick (int24, розширений до 256 біт).
+
+    Повертає:
+        SwapEvent або None, якщо лог не є подією Swap або має неправильну форму
+        (не 3 topics чи не 5 слів data).
+    """
+    data = _swap_data(log)
+    if data is None:
+        return None
+    try:
+        words = [int(data[i:i + 64], 16) for i in range(0, SWAP_DATA_WORDS * 64, 64)]
+    except ValueError:
+        logger.warning("Пропущено лог Swap з некоректним data у транзакції %s", log.get("transactionHash"))
+        return None
+    return SwapEvent(
+        address=log["address"].lower(),
+        block_number=_to_int(log["blockNumber"]),
+        log_index=_to_int(log["logIndex"]),
+        amount0=_signed(words[0]),
+        amount1=_signed(words[1]),
+        sqrt_price_x96=words[2],
+        liquidity=words[3],
+        tick=_signed(words[4]),
+    )
+
+
+def _words_to_float(words, signed: bool = False):
+    """
+    Перетворює 256-бітні слова (масив n x 4 беззнакових 64-бітних частин, старша - перша) у float64.
+    Для signed=True слова інтерпретуються в доповнювальному коді.
+    """
+    if signed:
+        negative = words[:, 0] >> np.uint64(63) == 1
+        words = np.where(negative[:, None], ~words, words)
+    value = words[:, 0].astype(np.float64)
+    for i in range(1, 4):
+        value = value * 2.0 ** 64 + words[:, i].astype(np.float64)
+    if signed:
+        # Для від'ємного x: ~x = -x - 1
+        value = np.where(negative, -(value + 1.0), value)
+    return value
+
+
+def decode_swap_columns(logs):
+    """
+    Пакетно декодує сирі логи подій Swap (формат eth_getLogs) у колонки numpy: поля data всіх
+    логів переводяться в байти одним викликом і розбираються як масив 64-бітних слів.
+
+    Логи, що не є подіями Swap, мають неправильну форму або видалені (removed), пропускаються.
+    Суми, sqrtPriceX96 та ліквідність переводяться у float64 (відносна точність ~1e-16), tick - без втрат.
+
+    Повертає:
+        Кортеж (список адрес пулів у нижньому регістрі, словник колонок block, log_index,
+        amount0, amount1, sqrt_price_x96, liquidity, tick) з рядком на кожну подію.
+    """
+    swaps, parts = [], []
+    for log in logs:
+        data = None if log.get("removed") else _swap_data(log)
+        if data is not None:
+            swaps.append(log)
+            parts.append(data)
+    logs = swaps
+    data = bytes.fromhex("".join(parts))
+    words = np.frombuffer(data, dtype=">u8").reshape(len(logs), 5, 4).astype(np.uint64)
+    columns = {
+        "block": np.array([_to_int(log["blockNumber"]) for log in logs], dtype=np.int64),
+        "log_index": np.array([_to_int(log["logIndex"]) for log in logs], dtype=np.int32),
+        "amount0": _words_to_float(words[:, 0], signed=True),
+        "amount1": _words_to_float(words[:, 1], signed=True),
+        "sqrt_price_x96": _words_to_float(words[:, 2]),
+        "liquidity": _words_to_float(words[:, 3]),
+        "tick": (words[:, 4, 3] & np.uint64(0xFFFFFFFF)).astype(np.uint32).view(np.int32),
+    }
+    return [log["address"].lower() for log in logs], columns
+
+
+class SwapLogStream:
+    """
+    Потік подій Swap для набору адрес пулів через одну підписку eth_subscribe("logs").
+
+    Параметри:
+        ws_url (str): Адреса WebSocket JSON-RPC вузла.
+        addresses: Адреси пулів, що відстежуються.
+        on_event: Функція, яка викликається для кожної декодованої події (SwapEvent).
+        on_disconnect: Необов'язкова функція, яка викликається після обриву активної підписки.
+    """
+
+    def __init__(self, ws_url: str, addresses, on_event, on_disconnect=None):
+        self.ws_url = ws_url
+        self.addresses = sorted({address.lower() for address in addresses})
+        self.on_event = on_event
+        self.on_disconnect = on_disconnect
+        self.last_block = None
+        self.connected = False
+        self._ws = None
+        self._request_id = 0
+        self._task = None
+
+    def start(self):
+        """
+        Запускає фонову задачу потоку, якщо вона ще не працює.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Зупиняє фонову задачу потоку та закриває з'єднання.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def set_addresses(self, addresses):
+        """
+        Змінює набір адрес пулів. Поточне з'єднання закривається, і потік перепідписується
+        з новим набором адрес, дочитавши пропущені логи з останнього обробленого блоку.
+        """
+        addresses = sorted({address.lower() for address in addresses})
+        if addresses == self.addresses:
+            return
+        self.addresses = addresses
+        if self._ws is not None:
+            await self._ws.close()
+
+    async def _request(self, ws, method: str, params: list):
+        """
+        Надсилає JSON-RPC запит і чекає на відповідь з тим самим id.
+        Сповіщення підписки, що надійшли раніше за відповідь, обробляються одразу.
+        """
+        self._request_id += 1
+        request_id = self._request_id
+        await ws.send(json.dumps({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}))
+        while True:
+            message = json.loads(await ws.recv())
+            if message.get("id") == request_id:
+                if "error" in message:
+                    raise RuntimeError(f"{method}: {message['error']}")
+                return message.get("result")
+            self._handle_message(message)
+
+    def _handle_log(self, log: dict):
+        """
+        Декодує лог і передає подію обробнику.
+        """
+        if log.get("removed"):
+            return
+        event = decode_swap_log(log)
+        if event is None:
+            return
+        if self.last_block is None or event.block_number > self.last_block:
+            self.last_block = event.block_number
+        self.on_event(event)
+
+    def _handle_message(self, message: dict):
+        """
+        Обробляє повідомлення eth_subscription з новим логом.
+        """
+        if message.get("method") != "eth_subscription":
+            return
+        log = message.get("params", {}).get("result")
+        if isinstance(log, dict):
+            self._handle_log(log)
+
+    async def _resume(self, ws):
+        """
+        Дочитує логи, пропущені під час обриву, починаючи з останнього обробленого блоку.
+        Блок last_block читається повторно, бо міг бути оброблений частково; події,
+        що вже застосовані, відкидаються обробником за номером блоку та індексом логу.
+        """
+        if self.last_block is None:
+            return
+        logs = await self._request(ws, "eth_getLogs", [{
+            "fromBlock": hex(self.last_block),
+            "toBlock": "latest",
+            "address": self.addresses,
+            "topics": [SWAP_TOPIC],
+        }])
+        for log in logs or []:
+            self._handle_log(log)
+
+    async def _run(self):
+        """
+        Основний цикл: підключення, дочитування пропущених логів, підписка та обробка сповіщень.
+        Після обриву з'єднання виконується повторне підключення з експоненційною затримкою.
+        """
+        delay = RECONNECT_DELAY
+        while True:
+            try:
+                async with websockets.connect(self.ws_url, max_size=None) as ws:
+                    self._ws = ws
+                    await self._resume(ws)
+                    await self._request(ws, "eth_subscribe", ["logs", {
+                        "address": self.addresses,
+                        "topics": [SWAP_TOPIC],
+                    }])
+                    self.connected = True
+                    delay = RECONNECT_DELAY
+                    logger.info("Підписка на %s пулів активна", len(self.addresses))
+                    async for raw in ws:
+                        self._handle_message(json.loads(raw))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Помилка потоку подій: %s", e)
+            finally:
+                self._ws = None
+                was_connected, self.connected = self.connected, False
+            if was_connected and self.on_disconnect is not None:
+                self.on_disconnect()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
@@ -1,129 +1,539 @@
 import os
-import json
 import asyncio
+import time
 from web3 import Web3
 from web3.providers.legacy_websocket import LegacyWebSocketProvider
 from dotenv import load_dotenv
+import metrics
+from logs import get_logger
 from .base import Exchange
-from supported_pairs import SUPPORTED_PAIRS, TOKEN_ADDRESSES
+from .quote_store import Quote, quote_store
+from .swap_stream import SwapEvent, SwapLogStream
+from .swap_backfill import SwapBackfill, SwapCache
+from .multicall import (
+    FEE_SELECTOR,
+    GET_BLOCK_NUMBER_SELECTOR,
+    LIQUIDITY_SELECTOR,
+    MULTICALL3_ABI,
+    MULTICALL3_ADDRESS,
+    SLOT0_SELECTOR,
+    TICK_BITMAP_SELECTOR,
+    TICK_SPACING_SELECTOR,
+    TICKS_SELECTOR,
+    build_slot0_calls,
+    decode_slot0,
+    decode_slot0_results,
+    decode_word,
+    encode_call,
+)
+from .v3_math import bitmap_tick_range, bitmap_word_range, simulate_exact_input, ticks_from_bitmap
+from .pool_registry import PoolInfo, PoolRegistry
 
 load_dotenv()
 
-# Завантаження ABI Uniswap V3
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-ABI_PATH = os.path.join(BASE_DIR, "..", "abi", "uniswap_v3.json")
-with open(ABI_PATH, "r") as f:
-    ABI = json.load(f)
+logger = get_logger("uniswap")
+
+# Адреса WebSocket JSON-RPC вузла Ethereum; за замовчуванням використовується Infura
+ETH_WS_URL = os.getenv("ETH_WS_URL") or f"wss://mainnet.infura.io/ws/v3/{os.getenv('INFURA_PROJECT_ID')}"
+
+# Індекс логу для цін, прочитаних з slot0(): стан пулу після завершення блоку новіший
+# за будь-яку подію Swap цього блоку
+SLOT0_LOG_INDEX = 2 ** 32
+
+# Інтервал оновлення ліквідності та ініціалізованих тіків пулів (секунди)
+TICKS_REFRESH_INTERVAL = float(os.getenv("TICKS_REFRESH_INTERVAL", "60"))
+# Кількість слів tickBitmap (по 256 тіків) з кожного боку від поточного тіка
+TICK_BITMAP_WORDS = int(os.getenv("TICK_BITMAP_WORDS", "2"))
+# Інтервал перевірки відставання підписки на події Swap від останнього блоку вузла (секунди)
+LAG_CHECK_INTERVAL = float(os.getenv("LAG_CHECK_INTERVAL", "15"))
+# Глибина історії подій Swap (блоків), що завантажується в кеш після старту; 0 - вимкнено
+BACKFILL_BLOCKS = int(os.getenv("BACKFILL_BLOCKS", "7200"))
+# Кількість останніх блоків, з подій яких відновлюється ціна пулів, не прочитаних через slot0()
+LOG_WARMUP_BLOCKS = int(os.getenv("LOG_WARMUP_BLOCKS", "500"))
+
+
+class PoolState:
+    """
+    Стан одного пулу Uniswap V3: параметри пулу та остання ціна.
+
+    Атрибути:
+        pair: Назва пари у форматі "TOKEN0/TOKEN1" (див. PoolInfo.pair).
+        info: Параметри пулу з реєстру пулів (PoolInfo).
+        address: Checksum-адреса пулу.
+        token0, token1: Адреси токенів пулу в нижньому регістрі.
+        decimals0, decimals1: Кількість десяткових знаків токенів пулу.
+        quote: Остання ціна token0 у token1 (Quote) або None, якщо ціни ще немає.
+        tracked: Чи входить пул до підписки на події Swap.
+        last_event: (номер_блоку, індекс_логу) останнього застосованого оновлення ціни
+                    (подія Swap або читання slot0()).
+        sqrt_price_x96, tick, liquidity: Поточний стан пулу для симуляції обміну.
+        fee, tick_spacing: Комісія (мільйонні частки) та крок тіків пулу.
+        ticks: Відсортований список (тік, liquidityNet) ініціалізованих тіків навколо поточного.
+        tick_range: (нижній, верхній) тік діапазону завантажених слів tickBitmap, у межах якого
+                    ticks повний.
+    """
+
+    def __init__(self, info: PoolInfo):
+        self.pair = info.pair
+        self.info = info
+        self.address = info.address
+        self.token0 = info.token0
+        self.token1 = info.token1
+        self.decimals0 = info.decimals0
+        self.decimals1 = info.decimals1
+        self.quote = None
+        self.tracked = False
+        self.last_event = None
+        self.sqrt_price_x96 = None
+        self.tick = None
+        self.liquidity = None
+        self.fee = info.fee
+        self.tick_spacing = None
+        self.ticks = None
+        self.tick_range = None
+        # Множник для переведення ціни в сирих одиницях у ціну token0 у token1
+        self._scale = 10 ** info.decimals_diff
+
+    def price_from_sqrt(self, sqrt_price_x96: int) -> float:
+        """
+        Обчислює ціну token0 у token1 з sqrtPriceX96 з урахуванням різниці десяткових знаків.
+        """
+        raw_price = (sqrt_price_x96 / (2 ** 96)) ** 2
+        return raw_price * self._scale
 
 
 class UniswapExchange(Exchange):
     """
     Клас для роботи з Uniswap V3 через WebSocket підключення. Використовує події Swap для отримання цін.
+
+    Для кожного пулу з реєстру пулів (PoolRegistry, pool_registry.py) тримається окремий стан
+    (PoolState), тож ціна будь-якої підтримуваної пари віддається одразу з пам'яті, а запити для
+    різних пар не перезаписують ціни одне одного. Таблиця pools індексована адресою пулу в нижньому
+    регістрі, pair_index відображає назву пари пулу на його стан, а routes - пару "BASE/QUOTE" в обох
+    напрямках на (стан пулу, чи інвертувати ціну), тож запит ціни коштує один пошук у словнику.
+    Реєстр (файл даних та кеш знайдених пулів) завантажується у start(), тож імпорт модуля та
+    створення об'єкта не читають файлів. Пули реєстру без адреси знаходяться через фабрику під час
+    прогріву цін.
+
+    Події Swap усіх пулів, що відстежуються, надходять через одну підписку eth_subscribe (SwapLogStream)
+    і розподіляються по пулах за адресою.
+
+    Ціни прогріваються одним пакетним читанням slot0() через Multicall3: під час старту, після
+    кожного обриву підписки та на вимогу для пулу, у якого ще немає ціни. Ціна пулів, яких не
+    вдалося прочитати, відновлюється з останньої події Swap за LOG_WARMUP_BLOCKS блоків.
+
+    Історія подій Swap завантажується паралельними частинами через eth_getLogs у колонковий кеш на
+    диску (SwapBackfill, swap_backfill.py): після прогріву - за останні BACKFILL_BLOCKS блоків, а
+    після перезапуску - лише блоки, яких ще немає в кеші (розрив понад BACKFILL_MAX_GAP_BLOCKS
+    не дозавантажується: кеш пулу починає новий сегмент).
+
+    Для розрахунку реальної суми обміну (get_effective_quote) у фоні підтримуються ліквідність
+    та ініціалізовані тіки пулів, а обмін симулюється по діапазонах ліквідності (v3_math).
+
+    Тривалість і результат RPC-викликів, кількість подій Swap та відставання підписки від
+    останнього блоку вузла (у блоках) записуються в метрики (модуль metrics).
     """
 
     def __init__(self):
         """
-        Ініціалізація класу. Підключення до WebSocket через Infura для роботи з Uniswap.
+        Ініціалізація класу: створення провайдера WebSocket для роботи з Uniswap та порожньої
+        таблиці станів пулів. Реєстр пулів завантажується, а з'єднання з вузлом відкривається
+        під час start(), тож створення об'єкта не звертається ні до диска, ні до мережі.
         """
         super().__init__("uniswap")
-        infura_project_id = os.getenv("INFURA_PROJECT_ID")
-        self.w3 = Web3(LegacyWebSocketProvider(f"wss://mainnet.infura.io/ws/v3/{infura_project_id}"))
-        if self.w3.is_connected():
-            print("[Uniswap] Підключено до Infura WebSocket")
+        self.w3 = Web3(LegacyWebSocketProvider(ETH_WS_URL))
+        self.quote_store = quote_store
+        # Провайдер не підтримує паралельні запити через одне з'єднання, тому RPC-виклики серіалізуються
+        self._rpc_lock = asyncio.Lock()
+        # Реєстр пулів (PoolRegistry); None, доки його не завантажено у start()
+        self.registry = None
+        self.pools = {}
+        self.pair_index = {}
+        self.routes = {}
+        self.multicall = self.w3.eth.contract(address=Web3.to_checksum_address(MULTICALL3_ADDRESS), abi=MULTICALL3_ABI)
+        self.stream = SwapLogStream(
+            ETH_WS_URL, self._tracked_addresses(), self._on_swap, on_disconnect=self._schedule_warmup
+        )
+        self.backfill = SwapBackfill(ETH_WS_URL, SwapCache())
+        self._warmup_task = None
+        self._history_task = None
+        self._liquidity_task = None
+        self._lag_task = None
+
+    def _add_pools(self, infos):
+        """
+        Створює стани нових пулів реєстру (усі вони відстежуються) та перебудовує індекс routes.
+        """
+        for info in infos:
+            key = info.address.lower()
+            if key in self.pools:
+                continue
+            pool = self.pools[key] = PoolState(info)
+            pool.tracked = True
+            self.pair_index[info.pair] = pool
+        self.routes = {
+            pair: (self.pools[info.address.lower()], inverted)
+            for pair, (info, inverted) in self.registry.by_pair.items()
+            if info.address.lower() in self.pools
+        }
+
+    async def discover_pools(self):
+        """
+        Знаходить пули реєстру без адреси (пакетні виклики фабрики через Multicall3), додає їх
+        до таблиці станів та до підписки на події Swap.
+        """
+        if self.registry is None or not self.registry.pending():
+            return
+        try:
+            added = await self.registry.discover(self._aggregate)
+        except Exception as e:
+            logger.warning("Помилка пошуку пулів: %s", e)
+            return
+        if added:
+            self._add_pools(added)
+            await self.stream.set_addresses(self._tracked_addresses())
+
+    async def start(self):
+        """
+        Завантажує реєстр пулів (в окремому потоці), прогріває ціни всіх пулів та запускає
+        спільну підписку на події Swap.
+        """
+        self.registry = await asyncio.to_thread(PoolRegistry.load)
+        self._add_pools(self.registry.pools.values())
+        await self.stream.set_addresses(self._tracked_addresses())
+        if await self._rpc("is_connected", self.w3.is_connected):
+            logger.info("Підключено до WebSocket вузла")
         else:
-            print("[Uniswap] Не вдалося підключитись до Infura WebSocket")
-        self.current_price = None
-        self.contract = None
-        self.pool_info = None
-        self.no_events_counter = 0  # Лічильник подій
+            logger.warning("Не вдалося підключитись до WebSocket вузла")
+        self.stream.start()
+        self._schedule_warmup()
+        self._history_task = asyncio.create_task(self._backfill_history())
+        self._liquidity_task = asyncio.create_task(self._liquidity_loop())
+        self._lag_task = asyncio.create_task(self._lag_loop())
 
-    async def set_pair(self, pair: str):
+    async def close(self):
         """
-        Налаштовує пул для заданої пари. Очищає попередній стан і встановлює новий пул для вказаної пари.
+        Зупиняє підписку на події Swap, прогрів цін та завантаження історії.
+        """
+        await self.stream.stop()
+        tasks = [
+            task for task in (self._warmup_task, self._history_task, self._liquidity_task, self._lag_task)
+            if task is not None
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._warmup_task = None
+        self._history_task = None
+        self._liquidity_task = None
+        self._lag_task = None
+
+    def is_warm(self) -> bool:
+        """Біржа готова, щойно є ціна хоча б одного пулу."""
+        return any(pool.quote is not None for pool in self.pools.values())
+
+    def _tracked_addresses(self):
+        """Адреси пулів, що входять до підписки."""
+        return [address for address, pool in self.pools.items() if pool.tracked]
+
+    async def subscribe(self, pair: str):
+        """
+        Додає пул пари до підписки на події Swap.
+
+        Параметри:
+        pair (str): Назва торгової пари (наприклад, "ETH/USDT").
+        """
+        route = self.routes.get(pair.upper())
+        if route is None:
+            logger.warning("Пара %s не підтримується.", pair)
+            return
+        pool, _ = route
+        pool.tracked = True
+        await self.stream.set_addresses(self._tracked_addresses())
+
+    async def unsubscribe(self, pair: str):
+        """
+        Виключає пул пари з підписки на події Swap.
 
         Параметри:
         pair (str): Назва торгової пари (наприклад, "ETH/USDT").
         """
-        # Очищення попереднього стану
-        self.current_price = None
-        self.contract = None
-        self.pool_info = None
+        route = self.routes.get(pair.upper())
+        if route is None:
+            return
+        pool, _ = route
+        pool.tracked = False
+        await self.stream.set_addresses(self._tracked_addresses())
+
+    async def _rpc(self, method: str, fn, *args, **kwargs):
+        """
+        Виконує блокуючий виклик web3 в окремому потоці, щоб не блокувати цикл подій.
+        method - назва виклику для метрик (наприклад, "eth_getLogs").
+        """
+        async with self._rpc_lock:
+            started = time.perf_counter()
+            status = "error"
+            try:
+                result = await asyncio.to_thread(fn, *args, **kwargs)
+                status = "ok"
+                return result
+            except asyncio.CancelledError:
+                status = "cancelled"
+                raise
+            finally:
+                metrics.UPSTREAM_DURATION.observe(self.name, method, value=time.perf_counter() - started)
+                metrics.UPSTREAM_REQUESTS.inc(self.name, method, status)
+
+    def _set_price(self, pool: PoolState, price: float, volume: float = 0.0):
+        """
+        Оновлює ціну пулу та записує її у сховище котирувань (з обсягом угоди в token0, якщо відомий).
+        """
+        self.quote_store.update(self.name, pool.pair, price, volume=volume)
+        pool.quote = self.quote_store.get(self.name, pool.pair)
+
+    def _apply_price(self, pool: PoolState, position: tuple, sqrt_price_x96: int, tick: int, liquidity: int = None,
+                     volume: float = 0.0):
+        """
+        Застосовує новий стан пулу, якщо він новіший за вже застосований.
+
+        Параметри:
+        - pool (PoolState): стан пулу.
+        - position (tuple): (номер_блоку, індекс_логу) джерела ціни.
+        - sqrt_price_x96 (int): sqrtPriceX96 пулу.
+        - tick (int): поточний тік пулу.
+        - liquidity (int): активна ліквідність пулу, якщо відома.
+        - volume (float): обсяг угоди в token0, що встановила ціну (для події Swap).
+        """
+        if not sqrt_price_x96:
+            return
+        if pool.last_event is not None and position <= pool.last_event:
+            return
+        pool.last_event = position
+        pool.sqrt_price_x96 = sqrt_price_x96
+        pool.tick = tick
+        if liquidity is not None:
+            pool.liquidity = liquidity
+        self._set_price(pool, pool.price_from_sqrt(sqrt_price_x96), volume)
+
+    def _on_swap(self, event: SwapEvent):
+        """
+        Застосовує подію Swap до стану її пулу.
 
-        pool_info = SUPPORTED_PAIRS.get(pair.upper())
-        if not pool_info:
-            print(f"[Uniswap] Пара {pair} не підтримується.")
+        Події, старші за вже застосовану (за номером блоку та індексом логу), відкидаються,
+        тож у стані пулу завжди залишається остання подія блоку.
+        """
+        metrics.UNISWAP_SWAP_EVENTS.inc()
+        pool = self.pools.get(event.address)
+        if pool is None:
             return
-        self.pool_info = pool_info
-        pool_address = Web3.to_checksum_address(pool_info["pool_address"])
-        self.contract = self.w3.eth.contract(address=pool_address, abi=ABI)
-        print(f"[Uniswap] Пул встановлено для {pair}: {pool_address}")
-        # Запускаємо нову підписку
-        asyncio.create_task(self._subscribe_to_updates())
+        volume = abs(event.amount0) / 10 ** pool.decimals0
+        self._apply_price(
+            pool, (event.block_number, event.log_index), event.sqrt_price_x96, event.tick, event.liquidity, volume
+        )
 
-    async def _subscribe_to_updates(self):
+    async def refresh_prices(self, pools=None):
         """
-        Підписка на події Swap, для оновлення поточної ціни.
-        Якщо події не надходять протягом тривалого часу, виводиться попередження.
+        Читає slot0() для багатьох пулів одним викликом Multicall3 і оновлює їхні ціни.
+
+        Параметри:
+        - pools: список PoolState; за замовчуванням - усі пули, що відстежуються.
         """
-        if not self.contract:
-            print("[Uniswap] Контракт не встановлено, неможливо створити фільтр")
+        if pools is None:
+            pools = [pool for pool in self.pools.values() if pool.tracked]
+        if not pools:
             return
+        addresses = [pool.address for pool in pools]
         try:
-            swap_event = self.contract.events["Swap"]
-            event_filter = swap_event.create_filter(from_block="latest")
+            call = self.multicall.functions.aggregate3(build_slot0_calls(addresses))
+            results = await self._rpc("aggregate3", call.call)
         except Exception as e:
-            print(f"[Uniswap] Помилка створення фільтра: {e}")
+            logger.warning("Помилка пакетного читання slot0: %s", e)
+            return
+        block_number, states = decode_slot0_results(addresses, results)
+        self._set_head_block(block_number)
+        for address, slot0 in states.items():
+            pool = self.pools[address.lower()]
+            self._apply_price(pool, (block_number, SLOT0_LOG_INDEX), slot0.sqrt_price_x96, slot0.tick)
+
+    async def _aggregate(self, calls):
+        """
+        Виконує пакет викликів одним eth_call через Multicall3.aggregate3.
+        Повертає список (success, returnData).
+        """
+        call = self.multicall.functions.aggregate3(calls)
+        return await self._rpc("aggregate3", call.call)
+
+    async def refresh_liquidity(self, pools=None):
+        """
+        Оновлює ліквідність та ініціалізовані тіки пулів трьома пакетними викликами Multicall3:
+        1. getBlockNumber(), slot0(), liquidity() (та fee(), tickSpacing() для нових пулів);
+        2. слова tickBitmap навколо поточного тіка;
+        3. ticks() для всіх знайдених ініціалізованих тіків (liquidityNet).
+
+        Поки виконуються пакети 2-3, подія Swap може оновити ціну пулу. Тому ціна, тік та активна
+        ліквідність з першого пакета застосовуються лише тоді, коли його блок новіший за останнє
+        застосоване оновлення (pool.last_event); інакше оновлюються лише тіки.
+
+        Параметри:
+        - pools: список PoolState; за замовчуванням - усі пули, що відстежуються.
+        """
+        if pools is None:
+            pools = [pool for pool in self.pools.values() if pool.tracked]
+        if not pools:
             return
 
+        calls = [(MULTICALL3_ADDRESS, False, GET_BLOCK_NUMBER_SELECTOR)]
+        for pool in pools:
+            calls.append((pool.address, True, SLOT0_SELECTOR))
+            calls.append((pool.address, True, LIQUIDITY_SELECTOR))
+            calls.append((pool.address, True, FEE_SELECTOR))
+            calls.append((pool.address, True, TICK_SPACING_SELECTOR))
+        results = await self._aggregate(calls)
+        block_number = decode_word(results[0][1])
+        results = results[1:]
+        states = {}
+        for i, pool in enumerate(pools):
+            (ok_slot0, slot0_data), (ok_liq, liq_data), (ok_fee, fee_data), (ok_ts, ts_data) = results[4 * i:4 * i + 4]
+            slot0 = decode_slot0(slot0_data) if ok_slot0 else None
+            if slot0 is None or not (ok_liq and ok_fee and ok_ts):
+                continue
+            pool.fee = decode_word(fee_data)
+            pool.tick_spacing = decode_word(ts_data, signed=True)
+            states[pool.address] = (slot0, decode_word(liq_data))
+
+        bitmap_calls = []
+        for pool in pools:
+            if pool.address not in states:
+                continue
+            slot0, _ = states[pool.address]
+            for word in bitmap_word_range(slot0.tick, pool.tick_spacing, TICK_BITMAP_WORDS):
+                bitmap_calls.append((pool, word))
+        results = await self._aggregate(
+            [(pool.address, True, encode_call(TICK_BITMAP_SELECTOR, word)) for pool, word in bitmap_calls]
+        ) if bitmap_calls else []
+        tick_calls = []
+        for (pool, word), (success, data) in zip(bitmap_calls, results):
+            if success:
+                for tick in ticks_from_bitmap(word, decode_word(data), pool.tick_spacing):
+                    tick_calls.append((pool, tick))
+
+        results = await self._aggregate(
+            [(pool.address, True, encode_call(TICKS_SELECTOR, tick)) for pool, tick in tick_calls]
+        ) if tick_calls else []
+        ticks = {address: [] for address in states}
+        for (pool, tick), (success, data) in zip(tick_calls, results):
+            if success:
+                ticks[pool.address].append((tick, decode_word(data, 1, signed=True)))
+
+        for pool in pools:
+            if pool.address not in states:
+                continue
+            slot0, liquidity = states[pool.address]
+            pool.ticks = sorted(ticks[pool.address])
+            pool.tick_range = bitmap_tick_range(slot0.tick, pool.tick_spacing, TICK_BITMAP_WORDS)
+            # Ліквідність прочитана разом з slot0, тож застосовуються вони разом і лише якщо новіші
+            self._apply_price(pool, (block_number, SLOT0_LOG_INDEX), slot0.sqrt_price_x96, slot0.tick, liquidity)
+
+    async def _liquidity_loop(self):
+        """
+        Фонова задача, яка оновлює ліквідність та тіки пулів кожні TICKS_REFRESH_INTERVAL секунд.
+        """
         while True:
             try:
-                events = event_filter.get_new_entries()
-                if events:
-                    event = events[0]
-                    sqrtPriceX96 = event["args"].get("sqrtPriceX96")
-                    if sqrtPriceX96:
-                        raw_price = (sqrtPriceX96 / (2 ** 96)) ** 2
-                        multiplier = 10 ** self.pool_info.get("decimals_diff", 1)
-                        # Обчислюємо ціну
-                        self.current_price = raw_price * multiplier
-                        print(f"[Uniswap] Оновлено ціну: {self.current_price}")
-                    self.no_events_counter = 0  # Скидаємо лічильник при отриманні події
-                else:
-                    self.no_events_counter += 1
-                    if self.no_events_counter >= 10:  # 10 ітерацій без подій
-                        print("[Uniswap] Події не отримано за довгий час")
-                        self.no_events_counter = 0  # Скидаємо лічильник
-                await asyncio.sleep(5)
+                await self.refresh_liquidity()
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                print(f"[Uniswap] Помилка прослуховування: {e}")
-                await asyncio.sleep(5)
+                logger.warning("Помилка оновлення ліквідності пулів: %s", e)
+            await asyncio.sleep(TICKS_REFRESH_INTERVAL)
 
-    async def fetch_last_event(self) -> float:
+    def _set_head_block(self, block_number: int):
+        """
+        Оновлює метрики останнього блоку вузла та відставання підписки на події Swap від нього.
         """
-        Отримує останній лог за останніх 500 блоків та повертає обчислену ціну.
+        if not block_number:
+            return
+        metrics.UNISWAP_HEAD_BLOCK.set(value=block_number)
+        if self.stream.last_block is not None:
+            metrics.UNISWAP_LAST_EVENT_BLOCK.set(value=self.stream.last_block)
+            metrics.UNISWAP_LAG_BLOCKS.set(value=max(block_number - self.stream.last_block, 0))
 
-        Повертає:
-        - float: ціна на основі останнього Swap event або None, якщо події не знайдено.
+    async def _lag_loop(self):
+        """
+        Фонова задача, яка кожні LAG_CHECK_INTERVAL секунд читає номер останнього блоку вузла
+        для метрики відставання підписки на події Swap.
+        """
+        while True:
+            try:
+                self._set_head_block(await self._rpc("eth_blockNumber", lambda: self.w3.eth.block_number))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.debug("Помилка читання номера блоку: %s", e)
+            await asyncio.sleep(LAG_CHECK_INTERVAL)
+
+    def _schedule_warmup(self):
+        """
+        Запускає прогрів цін у фоні, якщо він ще не виконується.
+        """
+        if self._warmup_task is None or self._warmup_task.done():
+            self._warmup_task = asyncio.create_task(self._warmup())
+
+    async def _warmup(self):
+        """
+        Знаходить пули реєстру без адреси та прогріває ціни всіх пулів пакетним читанням slot0().
+        Для пулів, яких не вдалося прочитати, ціна відновлюється з історичних логів.
+        """
+        await self.discover_pools()
+        await self.refresh_prices()
+        missing = [pool for pool in self.pools.values() if pool.quote is None and pool.tracked]
+        if missing:
+            await self._warm_from_logs(missing)
+
+    async def _warm_from_logs(self, pools):
+        """
+        Відновлює стан пулів з останньої події Swap за LOG_WARMUP_BLOCKS блоків (через кеш подій).
+
+        Параметри:
+        - pools (list): стани пулів без ціни.
         """
         try:
-            swap_event = self.contract.events["Swap"]
-            current_block = self.w3.eth.block_number
-            logs = swap_event.get_logs(from_block=current_block - 500, to_block=current_block)
-            if logs:
-                last_event = logs[-1]
-                sqrtPriceX96 = last_event["args"].get("sqrtPriceX96")
-                if sqrtPriceX96:
-                    raw_price = (sqrtPriceX96 / (2 ** 96)) ** 2
-                    multiplier = 10 ** self.pool_info.get("decimals_diff", 1)
-                    return raw_price * multiplier
-            return None
+            head = await self._rpc("eth_blockNumber", lambda: self.w3.eth.block_number)
+            await self.backfill.backfill([pool.address for pool in pools], max(head - LOG_WARMUP_BLOCKS, 0), head)
         except Exception as e:
-            print(f"[Uniswap] Помилка отримання історичних логів: {e}")
-            return None
+            logger.warning("Помилка отримання історичних логів: %s", e)
+            return
+        for pool in pools:
+            last = self.backfill.cache.last(pool.address)
+            if last is None or last["block"] < head - LOG_WARMUP_BLOCKS:
+                continue
+            self._apply_price(
+                pool, (last["block"], last["log_index"]), int(last["sqrt_price_x96"]), last["tick"], int(last["liquidity"])
+            )
+            if pool.quote is not None:
+                logger.info("Історична ціна %s: %s", pool.pair, pool.quote.price)
 
-    async def get_latest_price(self, base: str, quote: str) -> float:
+    async def _backfill_history(self):
         """
-        Повертає останню отриману ціну для заданої пари.
+        Фонова задача: після першого прогріву цін доповнює кеш подій Swap усіх пулів
+        до глибини BACKFILL_BLOCKS блоків від останнього блоку вузла.
+        """
+        if BACKFILL_BLOCKS <= 0:
+            return
+        if self._warmup_task is not None:
+            await asyncio.wait([self._warmup_task])
+        try:
+            head = await self._rpc("eth_blockNumber", lambda: self.w3.eth.block_number)
+            await self.backfill.backfill(list(self.pools), max(head - BACKFILL_BLOCKS, 0), head)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Помилка завантаження історії подій Swap: %s", e)
+
+    async def get_latest_quote(self, base: str, quote: str, hedge: bool = False) -> Quote:
+        """
+        Повертає останнє котирування для заданої пари з таблиці станів пулів, без звернень до мережі
+        (крім одного читання slot0(), якщо ціни пулу ще немає).
         Якщо прямий запис не знайдено, шукається зворотній і результат інвертується.
 
         Параметри:
@@ -131,55 +541,66 @@ class UniswapExchange(Exchange):
         - quote (str): валюта, в яку конвертируется base.
 
         Повертає:
-        - float: ціна за запитом.
+        - Quote: котирування за запитом або None, якщо ціни ще немає.
         """
-        base = base.upper()
-        quote = quote.upper()
-        pair_key = f"{base}/{quote}"
-        pool_info = SUPPORTED_PAIRS.get(pair_key)
-        invert_result = False
-        if not pool_info:
-            reverse_pair = f"{quote}/{base}"
-            pool_info = SUPPORTED_PAIRS.get(reverse_pair)
-            if pool_info:
-                invert_result = True
-                pair_key = reverse_pair
-            else:
-                print(f"[Uniswap] Пара {base}/{quote} не підтримується.")
-                return None
-
-        if not self.pool_info or self.pool_info.get("pool_address").lower() != pool_info.get("pool_address",
-                                                                                             "").lower():
-            await self.set_pair(pair_key)
-            await asyncio.sleep(5)
-
-        if self.current_price is None:
-            computed_price = await self.fetch_last_event()
-            if computed_price is not None:
-                self.current_price = computed_price
-                print(f"[Uniswap] Історична ціна: {computed_price}")
-            else:
-                print("[Uniswap] Даних немає.")
-                return None
-
-        # Отримуємо адреси токенів з TOKEN_ADDRESSES
-        base_addr = TOKEN_ADDRESSES.get(base)
-        quote_addr = TOKEN_ADDRESSES.get(quote)
-        if not base_addr or not quote_addr:
-            print(f"[Uniswap] Невідомі токени: {base} або {quote}")
+        route = self.routes.get(f"{base.upper()}/{quote.upper()}")
+        if route is None:
+            logger.debug("Пара %s/%s не підтримується.", base, quote)
             return None
-        base_addr = Web3.to_checksum_address(base_addr)
-        quote_addr = Web3.to_checksum_address(quote_addr)
-
-        token0 = self.pool_info.get("token0").lower()
-        token1 = self.pool_info.get("token1").lower()
+        pool, inverted = route
 
-        if base_addr.lower() == token0 and quote_addr.lower() == token1:
-            result = self.current_price  # Це 1 ETH = X USDT
-        elif base_addr.lower() == token1 and quote_addr.lower() == token0:
-            result = 1 / self.current_price if self.current_price and self.current_price != 0 else None
-        else:
-            print(f"[Uniswap] Пара токенів не співпадає для {pair_key}")
+        if pool.quote is None:
+            # Ціни ще немає: читаємо slot0() пулу на вимогу (один RPC-виклик)
+            await self.refresh_prices([pool])
+        if pool.quote is None:
+            logger.warning("Даних для %s немає.", pool.pair)
             return None
 
-        return result
+        # Ціна пулу - ціна token0 у token1 (наприклад, 1 ETH = X USDT)
+        return pool.quote.inverted() if inverted else pool.quote
+
+    async def get_effective_quote(self, base: str, quote: str, amount: float, hedge: bool = False) -> Quote:
+        """
+        Повертає ефективний курс обміну amount base на quote з урахуванням ліквідності пулу.
+
+        Обмін симулюється по діапазонах ліквідності пулу (v3_math.simulate_exact_input) з урахуванням
+        комісії пулу. Якщо ліквідність пулу ще не завантажено, відомих тіків недостатньо або обмін
+        виходить за межі завантажених слів tickBitmap (pool.tick_range), повертається курс за поточною
+        ціною (як у базовому класі).
+
+        Повертає:
+        - Quote: курс (отримана сума / amount) та час останнього оновлення ціни пулу.
+        """
+        route = self.routes.get(f"{base.upper()}/{quote.upper()}")
+        pool, inverted = route if route is not None else (None, False)
+        if pool is not None and pool.ticks is not None and pool.quote is not None and amount > 0:
+            decimals_in, decimals_out = (pool.decimals1, pool.decimals0) if inverted else (pool.decimals0, pool.decimals1)
+            amount_out = simulate_exact_input(
+                pool.sqrt_price_x96,
+                pool.liquidity,
+                pool.tick,
+                pool.ticks,
+                amount * 10 ** decimals_in,
+                zero_for_one=not inverted,
+                fee=pool.fee,
+                tick_range=pool.tick_range,
+            )
+            if amount_out is not None:
+                output = amount_out / 10 ** decimals_out
+                return Quote(output / amount, pool.quote.timestamp)
+        return await super().get_effective_quote(base, quote, amount, hedge)
+
+    async def get_latest_price(self, base: str, quote: str) -> float:
+        """
+        Повертає останню отриману ціну для заданої пари.
+        Якщо прямий запис не знайдено, шукається зворотній і результат інвертується.
+
+        Параметри:
+        - base (str): базова валюта.
+        - quote (str): валюта, в яку конвертируется base.
+
+        Повертає:
+        - float: ціна за запитом.
+        """
+        result = await self.get_latest_quote(base, quote)
+        return result.price if result is not None else None
@@ -0,0 +1,137 @@
+"""
+Модуль v3_math.py
+-----------------
+
+Цей модуль містить симуляцію обміну (exact input) у пулі Uniswap V3 з концентрованою ліквідністю.
+
+Обмін проходить по діапазонах між ініціалізованими тіками: у межах діапазону активна ліквідність L
+стала, а при перетині тіка L змінюється на liquidityNet цього тіка. Ініціалізовані тіки відомі лише
+в межах завантажених слів tickBitmap (bitmap_tick_range): обмін, що виходить за ці межі, вважається
+невідомим, адже за ними можуть бути тіки, яких симуляція не бачила. Розрахунок ведеться у числах
+з плаваючою крапкою в сирих одиницях токенів (без урахування десяткових знаків), чого достатньо
+для оцінки суми обміну.
+"""
+
+from bisect import bisect_right
+
+Q96 = 2 ** 96
+
+
+def tick_to_sqrt_price(tick: int) -> float:
+    """Повертає sqrt(ціни) для тіка: sqrt(1.0001 ** tick)."""
+    return 1.0001 ** (tick / 2)
+
+
+def simulate_exact_input(
+    sqrt_price_x96: int,
+    liquidity: int,
+    tick: int,
+    ticks,
+    amount_in: float,
+    zero_for_one: bool,
+    fee: int,
+    tick_range: tuple = None,
+) -> float:
+    """
+    Симулює обмін точної суми amount_in у пулі Uniswap V3.
+
+    Параметри:
+        sqrt_price_x96 (int): Поточний sqrtPriceX96 пулу.
+        liquidity (int): Поточна активна ліквідність пулу.
+        tick (int): Поточний тік пулу.
+        ticks: Відсортований за зростанням список (тік, liquidityNet) ініціалізованих тіків.
+        amount_in (float): Сума вхідного токена в сирих одиницях.
+        zero_for_one (bool): True - обмін token0 на token1 (ціна падає), False - навпаки.
+        fee (int): Комісія пулу в мільйонних частках (наприклад, 3000 = 0.3%).
+        tick_range (tuple): (нижній, верхній) тік діапазону, в якому завантажено tickBitmap
+                            (див. bitmap_tick_range); None - тіки відомі на всьому діапазоні цін.
+
+    Повертає:
+        float: Сума вихідного токена в сирих одиницях або None, якщо відомої ліквідності
+               недостатньо для повного виконання обміну або обмін виходить за межі tick_range.
+    """
+    if tick_range is not None and not tick_range[0] <= tick < tick_range[1]:
+        return None
+    # Межі ціни, до яких ліквідність відома, якщо ініціалізовані тіки в напрямку руху скінчились
+    lower_edge = tick_to_sqrt_price(tick_range[0]) if tick_range is not None else 0.0
+    upper_edge = tick_to_sqrt_price(tick_range[1]) if tick_range is not None else float("inf")
+    sqrt_price = sqrt_price_x96 / Q96
+    liquidity = float(liquidity)
+    remaining = amount_in * (1 - fee / 1_000_000)
+    amount_out = 0.0
+    tick_values = [t for t, _ in ticks]
+    # Найближчий ініціалізований тік у напрямку руху ціни
+    if zero_for_one:
+        index = bisect_right(tick_values, tick) - 1
+    else:
+        index = bisect_right(tick_values, tick)
+
+    while True:
+        has_next = 0 <= index < len(ticks)
+        if liquidity <= 0 and not has_next:
+            return None
+        if liquidity > 0:
+            if zero_for_one:
+                # Скільки token0 потрібно, щоб дійти до ціни наступного тіка
+                target = tick_to_sqrt_price(tick_values[index]) if has_next else lower_edge
+                needed = liquidity * (1 / target - 1 / sqrt_price) if target > 0 else float("inf")
+                if remaining < needed:
+                    next_sqrt_price = 1 / (1 / sqrt_price + remaining / liquidity)
+                    return amount_out + liquidity * (sqrt_price - next_sqrt_price)
+                if not has_next:
+                    return None
+                amount_out += liquidity * (sqrt_price - target)
+            else:
+                # Скільки token1 потрібно, щоб дійти до ціни наступного тіка
+                target = tick_to_sqrt_price(tick_values[index]) if has_next else upper_edge
+                needed = liquidity * (target - sqrt_price)
+                if remaining < needed:
+                    next_sqrt_price = sqrt_price + remaining / liquidity
+                    return amount_out + liquidity * (1 / sqrt_price - 1 / next_sqrt_price)
+                if not has_next:
+                    return None
+                amount_out += liquidity * (1 / sqrt_price - 1 / target)
+            remaining -= needed
+            sqrt_price = target
+        else:
+            sqrt_price = tick_to_sqrt_price(tick_values[index])
+        # Перетин тіка: вниз ліквідність зменшується на liquidityNet, вгору - збільшується
+        if zero_for_one:
+            liquidity -= ticks[index][1]
+            index -= 1
+        else:
+            liquidity += ticks[index][1]
+            index += 1
+
+
+def bitmap_word_range(tick: int, tick_spacing: int, words: int):
+    """
+    Повертає діапазон індексів слів tickBitmap навколо поточного тіка (±words слів).
+    """
+    compressed = tick // tick_spacing
+    word = compressed >> 8
+    return range(word - words, word + words + 1)
+
+
+def bitmap_tick_range(tick: int, tick_spacing: int, words: int) -> tuple:
+    """
+    Повертає (нижній, верхній) тік діапазону, який покривають слова bitmap_word_range: усі
+    ініціалізовані тіки в межах [нижній, верхній) відомі після читання цих слів.
+    """
+    word_range = bitmap_word_range(tick, tick_spacing, words)
+    return (word_range.start << 8) * tick_spacing, (word_range.stop << 8) * tick_spacing
+
+
+def ticks_from_bitmap(word_index: int, bitmap: int, tick_spacing: int):
+    """
+    Повертає ініціалізовані тіки, позначені у слові tickBitmap.
+    """
+    ticks = []
+    bit = 0
+    while bitmap:
+        if bitmap & 1:
+            ticks.append(((word_index << 8) + bit) * tick_spacing)
+        bitmap >>= 1
+        bit += 1
+    return ticks
+
@@ -0,0 +1,79 @@
+"""
+Модуль logs.py
+--------------
+
+Цей модуль налаштовує журналювання додатку (стандартний модуль logging) з рівнями та вибірковим
+записом повідомлень (sampling).
+
+Повідомлення, що повторюються (наприклад, таймаут біржі на кожен запит користувача), записуються
+не частіше одного разу за LOG_SAMPLE_INTERVAL секунд для кожного шаблону повідомлення та джерела
+(перший рядковий аргумент - зазвичай назва біржі). Наступне записане повідомлення містить кількість
+пропущених. Повідомлення рівня ERROR і вище записуються завжди. Оскільки фільтр спрацьовує до
+форматування, пропущені повідомлення майже нічого не коштують.
+"""
+
+import logging
+import os
+import sys
+import time
+
+# Рівень журналювання (DEBUG, INFO, WARNING, ERROR)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Мінімальний інтервал між однаковими повідомленнями (секунди; 0 - записувати всі)
+LOG_SAMPLE_INTERVAL = float(os.getenv("LOG_SAMPLE_INTERVAL", "10"))
+
+ROOT_LOGGER = "crypto_exchange"
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Пропускає не більше одного повідомлення за interval секунд для кожного шаблону повідомлення.
+    """
+
+    def __init__(self, interval: float = LOG_SAMPLE_INTERVAL):
+        super().__init__()
+        self.interval = interval
+        # Ключ повідомлення -> [час останнього запису, кількість пропущених]
+        self._state = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.interval <= 0 or record.levelno >= logging.ERROR:
+            return True
+        source = record.args[0] if isinstance(record.args, tuple) and record.args else None
+        if not isinstance(source, str):
+            source = None
+        key = (record.name, record.msg, source)
+        now = time.monotonic()
+        state = self._state.get(key)
+        if state is None:
+            self._state[key] = [now, 0]
+            return True
+        if now - state[0] < self.interval:
+            state[1] += 1
+            return False
+        if state[1]:
+            record.msg = f"{record.msg} (пропущено ще {state[1]} таких повідомлень)"
+        state[0] = now
+        state[1] = 0
+        return True
+
+
+def configure_logging(level: str = LOG_LEVEL, interval: float = LOG_SAMPLE_INTERVAL):
+    """
+    Налаштовує журнал додатку: рівень, формат та вибірковий запис. Повторний виклик нічого не робить.
+    """
+    logger = logging.getLogger(ROOT_LOGGER)
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    handler.addFilter(SamplingFilter(interval))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Повертає журнал компонента додатку (наприклад, get_logger("uniswap"))."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
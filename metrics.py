@@ -0,0 +1,174 @@
+"""
+Модуль metrics.py
+-----------------
+
+Цей модуль містить метрики додатку (лічильники, датчики та гістограми) у форматі Prometheus.
+
+Метрики зберігаються у звичайних словниках за кортежем значень міток, тож запис метрики на гарячому
+шляху - це один пошук у словнику та додавання. Текстовий формат Prometheus формується лише під час
+запиту /metrics. Датчики можуть мати функцію збору (collect), яка викликається під час запиту
+(наприклад, розмір черг чи кількість запитів, що виконуються).
+"""
+
+from bisect import bisect_left
+
+# Межі кошиків гістограм тривалості запитів (секунди)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Межі кошиків гістограм віку котирувань (секунди)
+AGE_BUCKETS = (0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+_registry = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        _registry.append(self)
+
+    def _samples(self):
+        for key, value in self._values.items():
+            yield self.name, key, "", value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for name, key, extra, value in self._samples():
+            lines.append(f"{name}{_format_labels(self.labels, key, extra)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Лічильник, що лише зростає."""
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+
+class Gauge(_Metric):
+    """
+    Датчик з довільним значенням. Якщо задано collect, значення береться з неї під час запиту
+    /metrics: функція повертає словник {кортеж_міток: значення}.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labels=(), collect=None):
+        super().__init__(name, help_text, labels)
+        self.collect = collect
+
+    def set(self, *labels, value: float):
+        self._values[labels] = value
+
+    def _samples(self):
+        values = self.collect() if self.collect is not None else self._values
+        for key, value in values.items():
+            yield self.name, key, "", value
+
+
+class Histogram(_Metric):
+    """Гістограма з фіксованими кошиками."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, *labels, value: float):
+        state = self._values.get(labels)
+        if state is None:
+            # Лічильники кошиків (останній - +Inf), сума та кількість спостережень
+            state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def _samples(self):
+        for key, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", key, f'le="{_format_value(bound)}"', cumulative
+            yield f"{self.name}_sum", key, "", total
+            yield f"{self.name}_count", key, "", count
+
+
+def render() -> str:
+    """Повертає всі метрики у текстовому форматі Prometheus."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# Запити до бірж (ccxt, JSON-RPC вузла Ethereum)
+UPSTREAM_DURATION = Histogram(
+    "upstream_request_duration_seconds", "Тривалість запитів до бірж", ("exchange", "method")
+)
+UPSTREAM_REQUESTS = Counter(
+    "upstream_requests_total", "Кількість запитів до бірж за результатом", ("exchange", "method", "status")
+)
+
+# Котирування, які API отримує від адаптерів бірж
+QUOTE_DURATION = Histogram(
+    "quote_request_duration_seconds", "Тривалість отримання котирування з біржі", ("exchange", "method")
+)
+QUOTE_REQUESTS = Counter(
+    "quote_requests_total", "Кількість отримань котирувань за статусом (ok/no_data/timeout/error/unavailable)",
+    ("exchange", "method", "status"),
+)
+QUOTE_AGE = Histogram(
+    "quote_age_seconds", "Вік котирувань, відданих клієнтам", ("exchange",), buckets=AGE_BUCKETS
+)
+
+# Сховище котирувань централізованих бірж
+QUOTE_CACHE = Counter("quote_cache_total", "Звернення до сховища котирувань (hit/miss)", ("exchange", "result"))
+
+# Підписка на події Swap Uniswap
+UNISWAP_HEAD_BLOCK = Gauge("uniswap_head_block", "Останній блок вузла Ethereum")
+UNISWAP_LAST_EVENT_BLOCK = Gauge("uniswap_last_event_block", "Блок останньої отриманої події Swap")
+UNISWAP_LAG_BLOCKS = Gauge(
+    "uniswap_subscription_lag_blocks", "Відставання підписки на події Swap від останнього блоку вузла"
+)
+UNISWAP_SWAP_EVENTS = Counter("uniswap_swap_events_total", "Кількість отриманих подій Swap")
+
+# Запобіжники бірж і пар (див. exchanges/health.py)
+CIRCUIT_TRANSITIONS = Counter(
+    "circuit_breaker_transitions_total", "Кількість переходів запобіжників у стан (open/half_open/closed)",
+    ("exchange", "scope", "state"),
+)
+
+# Підписка на акаунти пулів Raydium
+RAYDIUM_ACCOUNT_UPDATES = Counter(
+    "raydium_account_updates_total", "Кількість застосованих оновлень акаунтів Raydium (pool/base_vault/quote_vault)",
+    ("role",),
+)
+
+# Знімки відповідей GET /getRates (див. services/rate_snapshots.py)
+RATE_SNAPSHOTS = Counter(
+    "rate_snapshots_total", "Звернення до знімків відповідей /getRates (hit/rebuilt/unchanged/not_modified)",
+    ("result",),
+)
@@ -0,0 +1,38 @@
+"""
+Модуль serve.py
+---------------
+
+Запуск у багатопроцесному режимі: один процес збору даних (services/ingest.py) та кілька
+HTTP-воркерів uvicorn, які читають котирування з таблиці у спільній пам'яті, а ефективний курс
+(з урахуванням глибини ринку) запитують у процесу збору даних через Unix-сокет.
+
+Змінні середовища:
+    PORT - порт HTTP-сервера (за замовчуванням 5000);
+    WEB_CONCURRENCY - кількість HTTP-воркерів (за замовчуванням 2).
+"""
+
+import multiprocessing
+import os
+
+import uvicorn
+
+from services import ingest
+
+
+def main():
+    port = int(os.getenv("PORT", "5000"))
+    workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+
+    process = multiprocessing.Process(target=ingest.main, name="ingest", daemon=True)
+    process.start()
+    # Воркери не створюють власних з'єднань з біржами, а читають таблицю котирувань
+    os.environ["QUOTE_SOURCE"] = "shared"
+    try:
+        uvicorn.run("app:app", host="0.0.0.0", port=port, workers=workers)
+    finally:
+        process.terminate()
+        process.join(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Модуль ingest.py
+----------------
+
+Процес збору даних для багатопроцесного режиму.
+
+Процес створює адаптери всіх бірж (з'єднання ccxt, WebSocket вузла Ethereum тощо) в одному
+екземплярі та публікує кожне оновлення сховища котирувань у таблицю у спільній пам'яті
+(SharedQuoteTable). HTTP-воркери (QUOTE_SOURCE=shared) лише читають цю таблицю, тож кількість
+з'єднань та використання лімітів бірж не залежить від кількості воркерів.
+
+Кожне котирування також записується в історичну стрічку на диску (services/quote_tape.py),
+яку HTTP-воркери лише читають.
+
+Ефективний курс з урахуванням глибини ринку (стакани, ліквідність пулів) процес розраховує на
+запит воркерів через Unix-сокет EFFECTIVE_QUOTE_SOCKET (exchanges/shared.py), тож /estimate та
+оцінка маршрутів у воркерах такі самі, як в однопроцесному режимі.
+
+Метрики запитів до бірж цього процесу (див. metrics.py) віддаються у форматі Prometheus
+на порту INGEST_METRICS_PORT, якщо його задано.
+
+Запуск окремо:
+    python -m services.ingest
+або разом з воркерами через serve.py.
+"""
+
+import asyncio
+import os
+import signal
+
+import metrics
+from exchanges.quote_store import quote_store
+from exchanges.registry import create_exchanges
+from exchanges.shared import EFFECTIVE_QUOTE_SOCKET, serve_effective_quotes
+from exchanges.shared_table import QUOTE_TABLE_PATH, SharedQuoteTable
+from logs import configure_logging, get_logger
+from services.quote_tape import QUOTE_TAPE_ENABLED, quote_tape
+
+# Порт HTTP-сервера метрик процесу збору даних (не задано - сервер не запускається)
+INGEST_METRICS_PORT = os.getenv("INGEST_METRICS_PORT")
+
+logger = get_logger("ingest")
+
+
+async def _serve_metrics(reader, writer):
+    """
+    Мінімальний HTTP-обробник: на будь-який запит повертає метрики у форматі Prometheus.
+    """
+    try:
+        await reader.readuntil(b"\r\n\r\n")
+        body = metrics.render().encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+            + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run(path: str = QUOTE_TABLE_PATH, socket_path: str = EFFECTIVE_QUOTE_SOCKET):
+    """
+    Запускає біржі, публікує котирування в таблицю та відповідає на запити ефективного курсу
+    до отримання SIGTERM/SIGINT.
+    """
+    table = SharedQuoteTable.create(path)
+
+    def publish(exchange, symbol, quote):
+        table.write(exchange, symbol, quote.price, quote.timestamp)
+
+    quote_store.add_listener(publish, changes_only=False)
+    if QUOTE_TAPE_ENABLED:
+        quote_tape.start()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    server = None
+    if INGEST_METRICS_PORT:
+        server = await asyncio.start_server(_serve_metrics, "0.0.0.0", int(INGEST_METRICS_PORT))
+
+    exchanges = create_exchanges()
+    await asyncio.gather(*(exchange.start() for exchange in exchanges))
+    effective_server = await serve_effective_quotes(exchanges, socket_path)
+    logger.info("Котирування публікуються в %s, ефективний курс - через %s", path, socket_path)
+    try:
+        await stop.wait()
+    finally:
+        # Воркери тримають з'єднання відкритими, тож закриття сервера лише припиняє приймати нові
+        effective_server.close()
+        await asyncio.gather(*(exchange.close() for exchange in exchanges), return_exceptions=True)
+        quote_store.remove_listener(publish)
+        if QUOTE_TAPE_ENABLED:
+            await quote_tape.stop()
+        table.close()
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+
+
+def main():
+    configure_logging()
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
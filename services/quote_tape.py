@@ -0,0 +1,383 @@
+"""
+Модуль quote_tape.py
+--------------------
+
+Цей модуль містить історичну стрічку котирувань (QuoteTape): кожне котирування, яке адаптери бірж
+записують у сховище котирувань, дописується в кінець файлу на диску, а запити історії (свічки OHLC,
+TWAP/VWAP, історія спреду між біржами) виконуються над цими файлами через відображення в пам'ять.
+
+Стрічка розбита на файли за біржею та парою: <QUOTE_TAPE_DIR>/<біржа>/<BASE>_<QUOTE>.tape.
+Кожен файл - заголовок (16 байт: magic, версія, розмір запису) і записи фіксованої ширини
+(24 байти): timestamp (f64), ціна (f64), обсяг угоди (f64, 0 - невідомий). Записи лише
+дописуються, а timestamp у межах файлу не спадає (записувач підтягує запізнілі котирування
+до часу останнього запису), тож вікно часу знаходиться бінарним пошуком.
+
+Файл читається як масив NumPy поверх mmap: бінарний пошук торкається лише кількох сторінок файлу,
+а редукції (np.maximum.reduceat тощо) - лише сторінок запитаного вікна, тож файл ніколи не
+завантажується в пам'ять цілком.
+
+Записуються лише пари, обидві валюти яких входять до QUOTE_TAPE_ASSETS (а не всі сотні символів
+з пакетних тікерів CEX), і лише зміни ціни: незмінне котирування повторно записується не частіше
+ніж раз на QUOTE_TAPE_HEARTBEAT секунд, щоб ціна біржі не випадала з історії спреду. Тож кількість
+файлів обмежена, а обсяг запису залежить від частоти змін цін. Файли не ротуються: стару історію
+видаляють разом з файлами біржі або пари.
+
+Записувач буферизує записи в пам'яті й скидає їх на диск кожні QUOTE_TAPE_FLUSH_INTERVAL секунд
+в окремому потоці. У багатопроцесному режимі записує лише процес збору даних (services/ingest.py),
+а HTTP-воркери лише читають файли.
+"""
+
+import asyncio
+import mmap
+import os
+import re
+import struct
+
+import numpy as np
+
+from exchanges.quote_store import quote_store
+from logs import get_logger
+
+logger = get_logger("tape")
+
+# Каталог файлів стрічки котирувань
+QUOTE_TAPE_DIR = os.getenv("QUOTE_TAPE_DIR", "data/tape")
+# Чи записувати котирування у стрічку
+QUOTE_TAPE_ENABLED = os.getenv("QUOTE_TAPE_ENABLED", "1") == "1"
+# Валюти, пари яких записуються у стрічку (порожнє значення - усі пари)
+QUOTE_TAPE_ASSETS = frozenset(
+    asset.strip().upper() for asset in os.getenv("QUOTE_TAPE_ASSETS", "BTC,ETH,SOL,USDT,USDC,RAY").split(",")
+    if asset.strip()
+)
+# Як часто повторно записувати незмінне котирування (секунди)
+QUOTE_TAPE_HEARTBEAT = float(os.getenv("QUOTE_TAPE_HEARTBEAT", "10"))
+# Інтервал скидання буфера стрічки на диск (секунди)
+QUOTE_TAPE_FLUSH_INTERVAL = float(os.getenv("QUOTE_TAPE_FLUSH_INTERVAL", "1"))
+# Максимальний вік котирування, яке враховується в історії спреду (секунди)
+TAPE_SPREAD_TTL = float(os.getenv("TAPE_SPREAD_TTL", "30"))
+
+MAGIC = b"QTAP"
+LAYOUT_VERSION = 1
+HEADER_FORMAT = "<4sII4x"  # magic, версія, розмір запису
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+RECORD_DTYPE = np.dtype([("timestamp", "<f8"), ("price", "<f8"), ("volume", "<f8")])
+RECORD = struct.Struct("<ddd")
+FILE_SUFFIX = ".tape"
+# Символи, допустимі в назві біржі та символі пари (решта символів не записуються); назви лише
+# з крапок ("." та "..") недопустимі, щоб шлях не виходив за межі каталогу стрічки
+_SAFE_NAME = re.compile(r"^(?!\.+$)[A-Za-z0-9._:-]+$")
+
+EMPTY = np.zeros(0, dtype=RECORD_DTYPE)
+
+
+def partition_path(directory: str, exchange: str, symbol: str) -> str:
+    """
+    Шлях до файлу стрічки біржі та символу "BASE/QUOTE" або None для непридатних назв.
+    """
+    parts = symbol.split("/")
+    if len(parts) != 2 or not _SAFE_NAME.match(exchange) or not all(_SAFE_NAME.match(part) for part in parts):
+        return None
+    return os.path.join(directory, exchange, f"{parts[0]}_{parts[1]}{FILE_SUFFIX}".replace(":", "-"))
+
+
+class TapeFile:
+    """
+    Файл стрічки однієї біржі та пари, відображений у пам'ять лише для читання.
+
+    Відображення оновлюється, коли файл виріс з моменту попереднього звернення.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._mm = None
+        self._size = 0
+
+    def records(self) -> np.ndarray:
+        """
+        Повертає всі повні записи файлу як масив NumPy поверх mmap (без копіювання).
+        """
+        try:
+            size = os.stat(self.path).st_size
+        except FileNotFoundError:
+            return EMPTY
+        if size != self._size or self._mm is None:
+            self.close()
+            if size < HEADER_SIZE:
+                return EMPTY
+            with open(self.path, "rb") as file:
+                self._mm = mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ)
+            magic, version, record_size = struct.unpack_from(HEADER_FORMAT, self._mm, 0)
+            if magic != MAGIC or version != LAYOUT_VERSION or record_size != RECORD_DTYPE.itemsize:
+                logger.warning("Файл стрічки %s має невідомий формат", self.path)
+                self.close()
+                return EMPTY
+            self._size = size
+        count = (self._size - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        return np.frombuffer(self._mm, dtype=RECORD_DTYPE, count=count, offset=HEADER_SIZE)
+
+    def close(self):
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                # На відображення ще посилаються масиви запиту - його звільнить збирач сміття
+                pass
+            self._mm = None
+        self._size = 0
+
+
+class QuoteTape:
+    """
+    Історична стрічка котирувань: записувач (start/stop/append) та запити історії.
+
+    Параметри:
+        directory (str): Каталог файлів стрічки.
+        store: Сховище котирувань, яке слухає записувач (за замовчуванням спільне quote_store).
+        flush_interval (float): Інтервал скидання буфера на диск (секунди).
+        assets: Валюти, пари яких записуються (порожня множина - усі пари).
+        heartbeat (float): Як часто повторно записувати незмінне котирування (секунди).
+    """
+
+    def __init__(self, directory: str = QUOTE_TAPE_DIR, store=quote_store, flush_interval: float = QUOTE_TAPE_FLUSH_INTERVAL,
+                 assets=QUOTE_TAPE_ASSETS, heartbeat: float = QUOTE_TAPE_HEARTBEAT):
+        self.directory = directory
+        self.store = store
+        self.flush_interval = flush_interval
+        self.assets = frozenset(asset.upper() for asset in assets)
+        self.heartbeat = heartbeat
+        # Шлях файлу -> буфер записів, ще не скинутих на диск
+        self._buffers = {}
+        # Шлях файлу -> (timestamp, ціна) останнього запису (для неспадного порядку та пропуску повторів)
+        self._last = {}
+        self._paths = {}
+        self._files = {}
+        self._flush_task = None
+
+    # Записувач
+
+    def start(self):
+        """Починає записувати оновлення сховища котирувань і скидати буфер на диск."""
+        self.store.add_listener(self._on_quote, changes_only=False)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Припиняє запис і скидає залишок буфера на диск."""
+        self.store.remove_listener(self._on_quote)
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        await asyncio.to_thread(self._write, self._take())
+        for tape_file in self._files.values():
+            tape_file.close()
+
+    def _on_quote(self, exchange: str, symbol: str, quote):
+        self.append(exchange, symbol, quote.price, quote.timestamp, quote.volume)
+
+    def append(self, exchange: str, symbol: str, price: float, timestamp: float, volume: float = 0.0):
+        """
+        Додає запис до буфера стрічки. Пари поза assets пропускаються, як і незмінна ціна,
+        записана менше ніж heartbeat секунд тому. Котирування, старше за останній запис файлу,
+        записується з часом останнього запису.
+        """
+        key = (exchange, symbol)
+        path = self._paths.get(key, False)
+        if path is False:
+            path = self._paths[key] = partition_path(self.directory, exchange, symbol) if self._tracked(symbol) else None
+        if path is None or not price:
+            return
+        last_timestamp, last_price = self._last.get(path, (0.0, None))
+        if price == last_price and timestamp - last_timestamp < self.heartbeat:
+            return
+        timestamp = max(timestamp, last_timestamp)
+        self._last[path] = (timestamp, price)
+        buffer = self._buffers.get(path)
+        if buffer is None:
+            buffer = self._buffers[path] = bytearray()
+        buffer += RECORD.pack(timestamp, price, volume)
+
+    def _tracked(self, symbol: str) -> bool:
+        """Чи записується пара у стрічку (обидві валюти з assets)."""
+        return not self.assets or all(part.upper() in self.assets for part in symbol.split("/"))
+
+    def _take(self) -> dict:
+        buffers, self._buffers = self._buffers, {}
+        return buffers
+
+    @staticmethod
+    def _write(buffers: dict):
+        """Дописує буфери у файли (виконується в окремому потоці)."""
+        for path, data in buffers.items():
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "ab") as file:
+                    if file.tell() == 0:
+                        file.write(struct.pack(HEADER_FORMAT, MAGIC, LAYOUT_VERSION, RECORD_DTYPE.itemsize))
+                    file.write(data)
+            except OSError as e:
+                logger.error("Помилка запису стрічки %s: %s", path, e)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            buffers = self._take()
+            if buffers:
+                await asyncio.to_thread(self._write, buffers)
+
+    def flush(self):
+        """Синхронно скидає буфер на диск."""
+        self._write(self._take())
+
+    # Запити історії
+
+    def _records(self, exchange: str, symbol: str) -> np.ndarray:
+        """
+        Записи файлу стрічки біржі та символу. Файл відкривається й запам'ятовується лише для
+        записаної біржі (див. exchanges) і лише якщо він існує, тож запити довільних назв не
+        виходять за межі каталогу стрічки і не накопичують відкритих файлів.
+        """
+        path = partition_path(self.directory, exchange, symbol)
+        if path is None:
+            return EMPTY
+        tape_file = self._files.get(path)
+        if tape_file is None:
+            if exchange not in self.exchanges() or not os.path.isfile(path):
+                return EMPTY
+            tape_file = self._files[path] = TapeFile(path)
+        return tape_file.records()
+
+    def history(self, exchange: str, base: str, quote: str, start: float, end: float):
+        """
+        Повертає записи пари base/quote на біржі у вікні [start, end) та останній запис перед вікном.
+
+        Якщо пара записана у зворотному напрямку, ціни інвертуються, а обсяг переводиться
+        у валюту котирування (копіюється лише вікно).
+
+        Повертає:
+            Кортеж (timestamp, ціни, обсяги, запис перед вікном (timestamp, ціна) або None).
+        """
+        base, quote = base.upper(), quote.upper()
+        inverted = False
+        records = self._records(exchange, f"{base}/{quote}")
+        if not len(records):
+            reverse = self._records(exchange, f"{quote}/{base}")
+            if len(reverse):
+                records, inverted = reverse, True
+        timestamps = records["timestamp"]
+        first, last = np.searchsorted(timestamps, [start, end], side="left")
+        window = records[first:last]
+        prices, volumes = window["price"], window["volume"]
+        if inverted:
+            volumes = volumes * prices
+            prices = 1 / prices
+        previous = None
+        if first > 0:
+            price = records["price"][first - 1]
+            previous = (float(timestamps[first - 1]), float(1 / price if inverted else price))
+        return window["timestamp"], prices, volumes, previous
+
+    def exchanges(self):
+        """Назви бірж, для яких є файли стрічки."""
+        try:
+            return sorted(entry.name for entry in os.scandir(self.directory) if entry.is_dir())
+        except FileNotFoundError:
+            return []
+
+
+def ohlc(timestamps, prices, volumes, start: float, interval: float):
+    """
+    Свічки OHLC інтервалу interval секунд, вирівняні від start (лише інтервали з записами).
+
+    Повертає:
+        Словник масивів: time (початок свічки), open, high, low, close, volume, count.
+    """
+    if not len(prices):
+        return {name: prices[:0] for name in ("time", "open", "high", "low", "close", "volume", "count")}
+    # Записи відсортовані за часом, тож межі свічок знаходяться бінарним пошуком без проходу по записах
+    first = int((timestamps[0] - start) // interval)
+    last = int((timestamps[-1] - start) // interval)
+    edges = np.searchsorted(timestamps, start + np.arange(first, last + 2) * interval, side="left")
+    edges[0], edges[-1] = 0, len(prices)
+    filled = np.flatnonzero(edges[1:] > edges[:-1])
+    starts = edges[filled]
+    ends = edges[filled + 1] - 1
+    return {
+        "time": start + (first + filled) * interval,
+        "open": prices[starts],
+        "high": np.maximum.reduceat(prices, starts),
+        "low": np.minimum.reduceat(prices, starts),
+        "close": prices[ends],
+        "volume": np.add.reduceat(volumes, starts),
+        "count": ends - starts + 1,
+    }
+
+
+def twap(timestamps, prices, start: float, end: float, previous=None) -> float:
+    """
+    Середня ціна, зважена за часом дії: кожна ціна діє до наступного запису (остання - до end).
+    Ціна останнього запису перед вікном (previous) діє від start до першого запису.
+    Повертає None, якщо у вікні немає жодної ціни.
+    """
+    if previous is not None:
+        timestamps = np.concatenate(([start], timestamps))
+        prices = np.concatenate(([previous[1]], prices))
+    if not len(prices):
+        return None
+    durations = np.diff(timestamps, append=end)
+    total = durations.sum()
+    if total <= 0:
+        return float(prices[-1])
+    return float(np.dot(prices, durations) / total)
+
+
+def vwap(prices, volumes) -> float:
+    """
+    Середня ціна, зважена за обсягом угод. Повертає None, якщо у вікні немає записів з обсягом.
+    """
+    total = volumes.sum()
+    if not total:
+        return None
+    return float(np.dot(prices, volumes) / total)
+
+
+def spread_history(tape: QuoteTape, exchange_names, base: str, quote: str, start: float, end: float,
+                   interval: float, ttl: float = TAPE_SPREAD_TTL):
+    """
+    Історія спреду пари між біржами: на кожній точці сітки start, start + interval, ... (до end)
+    береться остання ціна кожної біржі, не старша за ttl секунд.
+
+    Спред точки - (найвища ціна - найнижча) / найнижча серед бірж з даними; точки, де дані є
+    менш ніж на двох біржах, пропускаються.
+
+    Повертає:
+        Словник масивів: time, spread, buy (індекс біржі з найнижчою ціною), sell (з найвищою),
+        prices (матриця цін [точка x біржа] з NaN без даних).
+    """
+    grid = np.arange(start, end, interval)
+    matrix = np.full((len(exchange_names), len(grid)), np.nan)
+    for row, name in enumerate(exchange_names):
+        timestamps, prices, _, _ = tape.history(name, base, quote, start - ttl, end)
+        if not len(prices):
+            continue
+        index = np.searchsorted(timestamps, grid, side="right") - 1
+        valid = index >= 0
+        valid[valid] = grid[valid] - timestamps[index[valid]] <= ttl
+        matrix[row, valid] = prices[index[valid]]
+    # Лише точки, де ціни є щонайменше на двох біржах
+    covered = np.count_nonzero(~np.isnan(matrix), axis=0) >= 2
+    grid, matrix = grid[covered], matrix[:, covered]
+    if not len(grid):
+        return {"time": grid, "spread": grid, "buy": grid.astype(np.int64), "sell": grid.astype(np.int64), "prices": matrix.T}
+    low, high = np.nanmin(matrix, axis=0), np.nanmax(matrix, axis=0)
+    return {
+        "time": grid,
+        "spread": (high - low) / low,
+        "buy": np.nanargmin(matrix, axis=0),
+        "sell": np.nanargmax(matrix, axis=0),
+        "prices": matrix.T,
+    }
+
+
+# Спільна стрічка котирувань
+quote_tape = QuoteTape()
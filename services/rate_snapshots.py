@@ -0,0 +1,135 @@
+"""
+Модуль rate_snapshots.py
+------------------------
+
+Цей модуль містить знімки відповідей /getRates (RateSnapshots) для GET-варіанту ендпоінту.
+
+Для кожної запитаної пари зберігається вже серіалізована відповідь (байти JSON, orjson) разом з
+ETag - хешем цих байтів. Знімок перебудовується (один обхід бірж і одна серіалізація, спільні для
+всіх одночасних запитів пари) лише тоді, коли:
+    - ціна пари або зворотної до неї змінилася у сховищі котирувань на будь-якій біржі;
+    - знімок старший за RATES_SNAPSHOT_TTL секунд (щоб статуси бірж - тайм-аут, відкритий
+      запобіжник - та застарілі котирування не залишалися у знімку довше).
+Решта запитів віддає готові байти без обходу бірж та серіалізації, а клієнт, що передав
+If-None-Match з поточним ETag, отримує 304 без тіла. Оскільки ETag залежить лише від вмісту,
+перебудова з тими самими курсами не змінює його.
+"""
+
+import hashlib
+import os
+import time
+from typing import NamedTuple
+
+import orjson
+
+import metrics
+from exchanges.quote_store import quote_store
+from exchanges.singleflight import SingleFlight
+
+# Максимальний вік знімка відповіді, після якого він перебудовується (секунди)
+RATES_SNAPSHOT_TTL = float(os.getenv("RATES_SNAPSHOT_TTL", "1"))
+# Максимальна кількість пар, для яких зберігаються знімки
+RATES_SNAPSHOT_MAX_PAIRS = int(os.getenv("RATES_SNAPSHOT_MAX_PAIRS", "10000"))
+
+
+def _reverse(pair: str) -> str:
+    base, quote = pair.split("/")
+    return f"{quote}/{base}"
+
+
+class Snapshot(NamedTuple):
+    """
+    Знімок відповіді для однієї пари.
+
+    Атрибути:
+        body: Серіалізована відповідь (байти JSON).
+        etag: ETag відповіді (хеш body в лапках).
+        built_at: Час побудови знімка (time.monotonic()).
+    """
+    body: bytes
+    etag: str
+    built_at: float
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Чи відповідає заголовок If-None-Match поточному ETag (слабке порівняння, як для GET).
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class RateSnapshots:
+    """
+    Знімки відповідей /getRates, що перебудовуються при зміні цін пари.
+
+    Параметри:
+        fetch: Корутинна функція fetch(base, quote), що повертає результати бірж (fetch_prices).
+        render: Функція render(результати), що повертає відповідь для серіалізації.
+        store: Сховище котирувань (за замовчуванням спільне quote_store).
+    """
+
+    def __init__(self, fetch, render, store=quote_store):
+        self.fetch = fetch
+        self.render = render
+        self.store = store
+        # Пара "BASE/QUOTE" -> Snapshot
+        self.snapshots = {}
+        # Пари, ціни яких змінилися після побудови знімка
+        self._dirty = set()
+        self._inflight = SingleFlight()
+
+    def start(self):
+        """Починає слухати зміни у сховищі котирувань."""
+        self.store.add_listener(self._on_quote)
+
+    def stop(self):
+        """Припиняє слухати зміни у сховищі котирувань."""
+        self.store.remove_listener(self._on_quote)
+
+    def _on_quote(self, exchange: str, symbol: str, quote):
+        """
+        Слухач сховища котирувань: позначає знімки пари та зворотної до неї як застарілі.
+        """
+        for pair in (symbol, _reverse(symbol)):
+            if pair in self.snapshots:
+                self._dirty.add(pair)
+
+    async def get(self, pair: str) -> Snapshot:
+        """
+        Повертає актуальний знімок відповіді для пари "BASE/QUOTE" (у верхньому регістрі),
+        за потреби перебудовуючи його.
+        """
+        snapshot = self.snapshots.get(pair)
+        if snapshot is not None and pair not in self._dirty and time.monotonic() - snapshot.built_at < RATES_SNAPSHOT_TTL:
+            metrics.RATE_SNAPSHOTS.inc("hit")
+            return snapshot
+        return await self._inflight.do(pair, lambda: self._rebuild(pair))
+
+    async def _rebuild(self, pair: str) -> Snapshot:
+        """
+        Отримує котирування пари з усіх бірж та серіалізує відповідь. Зміни цін під час
+        обходу бірж знову позначають знімок застарілим.
+        """
+        self._dirty.discard(pair)
+        base, quote = pair.split("/")
+        body = orjson.dumps(self.render(await self.fetch(base, quote)))
+        previous = self.snapshots.pop(pair, None)
+        if previous is not None and previous.body == body:
+            etag = previous.etag
+            metrics.RATE_SNAPSHOTS.inc("unchanged")
+        else:
+            etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+            metrics.RATE_SNAPSHOTS.inc("rebuilt")
+        snapshot = self.snapshots[pair] = Snapshot(body, etag, time.monotonic())
+        # Першими витісняються пари, знімки яких найдовше не перебудовувалися
+        while len(self.snapshots) > RATES_SNAPSHOT_MAX_PAIRS:
+            oldest = next(iter(self.snapshots))
+            del self.snapshots[oldest]
+            self._dirty.discard(oldest)
+        return snapshot
@@ -0,0 +1,188 @@
+"""
+Модуль rate_stream.py
+---------------------
+
+Цей модуль містить розсилку оновлень курсів підписаним клієнтам (WebSocket / SSE).
+
+RateBroadcaster слухає спільне сховище котирувань: коли ціна символу на біржі змінюється,
+оновлення для кожної запитаної пари обчислюється та серіалізується один раз і надсилається
+всім клієнтам, підписаним на цю пару. Кожен клієнт має обмежену чергу: якщо клієнт не встигає
+читати, найстаріші повідомлення відкидаються, тож повільні клієнти не збільшують пам'ять сервера.
+"""
+
+import asyncio
+import json
+import os
+
+from exchanges.quote_store import quote_store
+
+# Розмір черги повідомлень одного клієнта
+CLIENT_QUEUE_SIZE = int(os.getenv("STREAM_CLIENT_QUEUE_SIZE", "100"))
+
+
+def normalize_pair(pair: str) -> str:
+    """
+    Приводить пару до вигляду "BASE/QUOTE" у верхньому регістрі.
+    Повертає None, якщо рядок не є парою.
+    """
+    parts = pair.strip().upper().split("/")
+    if len(parts) != 2 or not all(parts):
+        return None
+    return f"{parts[0]}/{parts[1]}"
+
+
+def parse_subscription(text: str):
+    """
+    Розбирає повідомлення клієнта {"subscribe": [...], "unsubscribe": [...]}.
+
+    Повертає:
+        Кортеж (пари для підписки, пари для відписки); некоректні пари пропускаються.
+        Для повідомлення, що не є JSON-об'єктом зі списками рядків, піднімається ValueError.
+    """
+    message = json.loads(text)
+    if not isinstance(message, dict):
+        raise ValueError("очікується JSON-об'єкт")
+    result = []
+    for field in ("subscribe", "unsubscribe"):
+        pairs = message.get(field, [])
+        if not isinstance(pairs, list) or not all(isinstance(pair, str) for pair in pairs):
+            raise ValueError(f"поле {field} має бути списком пар")
+        result.append([pair for pair in map(normalize_pair, pairs) if pair])
+    return tuple(result)
+
+
+def error_message(detail: str) -> str:
+    """Серіалізоване повідомлення клієнту про помилку {"error": ...}."""
+    return json.dumps({"error": detail}, ensure_ascii=False)
+
+
+def _reverse(pair: str) -> str:
+    base, quote = pair.split("/")
+    return f"{quote}/{base}"
+
+
+class Subscriber:
+    """
+    Клієнт потоку курсів з обмеженою чергою повідомлень.
+
+    Атрибути:
+        pairs: Множина пар, на які підписаний клієнт.
+        queue: Черга серіалізованих повідомлень.
+        dropped: Кількість відкинутих повідомлень через переповнення черги.
+    """
+
+    def __init__(self, queue_size: int = CLIENT_QUEUE_SIZE):
+        self.pairs = set()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def offer(self, message: str):
+        """
+        Додає повідомлення до черги; якщо черга заповнена, відкидає найстаріше.
+        """
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+
+class RateBroadcaster:
+    """
+    Розсилка оновлень курсів зі сховища котирувань підписаним клієнтам.
+
+    Параметри:
+        exchange_names: Назви бірж, курси яких розсилаються.
+        store: Сховище котирувань (за замовчуванням спільне quote_store).
+    """
+
+    def __init__(self, exchange_names, store=quote_store):
+        self.exchange_names = list(exchange_names)
+        self.store = store
+        # Пара -> множина підписаних клієнтів
+        self._subscribers = {}
+        # Пари (запитаного напрямку) з біржами, для яких є нерозіслані зміни
+        self._dirty = {}
+        self._flush_scheduled = False
+
+    def start(self):
+        """Починає слухати зміни у сховищі котирувань."""
+        self.store.add_listener(self._on_quote)
+
+    def stop(self):
+        """Припиняє слухати зміни у сховищі котирувань."""
+        self.store.remove_listener(self._on_quote)
+
+    def subscribe(self, subscriber: Subscriber, pairs):
+        """
+        Підписує клієнта на пари та надсилає йому поточні курси з пам'яті.
+        """
+        for pair in pairs:
+            if pair in subscriber.pairs:
+                continue
+            subscriber.pairs.add(pair)
+            self._subscribers.setdefault(pair, set()).add(subscriber)
+            for name in self.exchange_names:
+                message = self._build_message(name, pair)
+                if message is not None:
+                    subscriber.offer(message)
+
+    def unsubscribe(self, subscriber: Subscriber, pairs=None):
+        """
+        Відписує клієнта від пар (за замовчуванням - від усіх).
+        """
+        for pair in list(subscriber.pairs if pairs is None else pairs):
+            subscriber.pairs.discard(pair)
+            subscribers = self._subscribers.get(pair)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[pair]
+
+    def _build_message(self, exchange: str, pair: str) -> str:
+        """
+        Формує повідомлення з курсом пари на біржі зі сховища котирувань.
+        Повертає None, якщо котирування немає.
+        """
+        quote = self.store.get(exchange, pair)
+        if quote is None:
+            quote = self.store.get(exchange, _reverse(pair))
+            quote = quote.inverted() if quote is not None else None
+        if quote is None:
+            return None
+        return json.dumps({"pair": pair, "exchangeName": exchange, "rate": quote.price, "timestamp": quote.timestamp})
+
+    def _on_quote(self, exchange: str, symbol: str, quote):
+        """
+        Слухач сховища котирувань: позначає пари, на які хтось підписаний, для розсилки.
+        Розсилка виконується один раз за ітерацію циклу подій, тож серія оновлень
+        одного символу дає одне повідомлення.
+        """
+        if exchange not in self.exchange_names:
+            return
+        for pair in (symbol, _reverse(symbol)):
+            if pair in self._subscribers:
+                self._dirty.setdefault(pair, set()).add(exchange)
+        if self._dirty and not self._flush_scheduled:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            self._flush_scheduled = True
+            loop.call_soon(self._flush)
+
+    def _flush(self):
+        """
+        Обчислює кожне оновлення один раз і розсилає всім клієнтам, підписаним на пару.
+        """
+        self._flush_scheduled = False
+        dirty, self._dirty = self._dirty, {}
+        for pair, exchange_names in dirty.items():
+            subscribers = self._subscribers.get(pair)
+            if not subscribers:
+                continue
+            for name in exchange_names:
+                message = self._build_message(name, pair)
+                if message is None:
+                    continue
+                for subscriber in subscribers:
+                    subscriber.offer(message)
@@ -0,0 +1,193 @@
+"""
+Модуль routing.py
+-----------------
+
+Цей модуль містить граф обміну між активами для пошуку багатокрокових маршрутів
+(наприклад, SOL -> USDT -> BTC, коли прямої пари SOL/BTC немає на жодній біржі).
+
+Вузли графа - активи, ребра - котирування (біржа, символ) зі спільного сховища котирувань.
+Граф оновлюється інкрементно: слухач сховища записує логарифм курсу ребра при кожній зміні ціни,
+тож пошук найкращого маршруту - це пошук найкоротшого шляху з вагами -log(курс) серед
+кандидатів. Кандидати (послідовності активів довжиною до max_hops кроків) для кожної пари
+активів обчислюються один раз і перебудовуються лише тоді, коли у графі з'являється нова пара.
+Проміжними вузлами маршрутів можуть бути лише "хабові" активи (ROUTE_HUB_ASSETS), що обмежує
+кількість кандидатів незалежно від кількості активів та бірж.
+"""
+
+import math
+import os
+from itertools import permutations
+from typing import List, NamedTuple, Tuple
+
+from exchanges.quote_store import quote_store
+
+# Максимальна кількість кроків маршруту
+ROUTE_MAX_HOPS = int(os.getenv("ROUTE_MAX_HOPS", "3"))
+# Активи, через які можуть проходити маршрути
+ROUTE_HUB_ASSETS = [
+    asset.strip().upper() for asset in os.getenv("ROUTE_HUB_ASSETS", "USDT,USDC,BTC,ETH").split(",") if asset.strip()
+]
+# Максимальний вік котирування ребра, яке враховується в маршрутах (секунди)
+ROUTE_QUOTE_TTL = float(os.getenv("ROUTE_QUOTE_TTL", "30"))
+
+
+class Hop(NamedTuple):
+    """
+    Один крок маршруту: обмін source на target на біржі exchange.
+    """
+    exchange: str
+    source: str
+    target: str
+
+
+class Route(NamedTuple):
+    """
+    Маршрут обміну.
+
+    Атрибути:
+        hops: Кроки маршруту.
+        rate: Курс маршруту за поточними цінами (добуток курсів кроків).
+        timestamp: Час отримання найстарішого котирування маршруту.
+    """
+    hops: Tuple[Hop, ...]
+    rate: float
+    timestamp: float
+
+
+class RouteGraph:
+    """
+    Граф активів з ребрами-котируваннями бірж.
+
+    Параметри:
+        exchange_names: Назви бірж, котирування яких входять до графа.
+        store: Сховище котирувань (за замовчуванням спільне quote_store).
+        max_hops: Максимальна кількість кроків маршруту.
+        hubs: Активи, через які можуть проходити маршрути.
+        ttl: Максимальний вік котирування ребра (секунди).
+    """
+
+    def __init__(self, exchange_names, store=quote_store, max_hops=ROUTE_MAX_HOPS, hubs=ROUTE_HUB_ASSETS,
+                 ttl=ROUTE_QUOTE_TTL):
+        self.exchange_names = set(exchange_names)
+        self.store = store
+        self.max_hops = max_hops
+        self.hubs = list(hubs)
+        self.ttl = ttl
+        # (source, target) -> {біржа: (символ, log курсу source -> target)}
+        self._edges = {}
+        # Кандидати маршрутів за парою активів: (source, target) -> [(source, ..., target), ...]
+        self._candidates = {}
+
+    def start(self):
+        """Починає слухати зміни у сховищі котирувань."""
+        self.store.add_listener(self._on_quote)
+
+    def stop(self):
+        """Припиняє слухати зміни у сховищі котирувань."""
+        self.store.remove_listener(self._on_quote)
+
+    def add_pair(self, exchange: str, symbol: str, price: float = None):
+        """
+        Додає до графа ребра пари символу на біржі (в обидва боки).
+
+        Параметри:
+            exchange (str): Назва біржі.
+            symbol (str): Символ у форматі "BASE/QUOTE".
+            price (float): Ціна символу; якщо не задана, ребро додається без курсу
+                           і враховується в маршрутах після першого котирування.
+        """
+        parts = symbol.split("/")
+        if len(parts) != 2 or not all(parts) or ":" in symbol:
+            return
+        base, quote = parts[0].upper(), parts[1].upper()
+        log_rate = math.log(price) if price and price > 0 else None
+        self._set_edge(base, quote, exchange, symbol, log_rate)
+        self._set_edge(quote, base, exchange, symbol, -log_rate if log_rate is not None else None)
+
+    def _set_edge(self, source: str, target: str, exchange: str, symbol: str, log_rate: float):
+        venues = self._edges.get((source, target))
+        if venues is None:
+            # Нова пара активів змінює набір можливих маршрутів
+            venues = self._edges[(source, target)] = {}
+            self._candidates.clear()
+        if log_rate is None and exchange in venues:
+            return
+        venues[exchange] = (symbol, log_rate)
+
+    def _on_quote(self, exchange: str, symbol: str, quote):
+        """
+        Слухач сховища котирувань: оновлює курс ребра.
+        """
+        if exchange in self.exchange_names:
+            self.add_pair(exchange, symbol, quote.price)
+
+    def candidates(self, source: str, target: str) -> List[tuple]:
+        """
+        Повертає кандидати маршрутів source -> target - послідовності активів, сусідні елементи
+        яких з'єднані ребром графа. Результат кешується до появи нової пари в графі.
+        """
+        key = (source, target)
+        paths = self._candidates.get(key)
+        if paths is None:
+            paths = []
+            hubs = [hub for hub in self.hubs if hub not in key]
+            for length in range(self.max_hops):
+                for middle in permutations(hubs, length):
+                    path = (source, *middle, target)
+                    if all((a, b) in self._edges for a, b in zip(path, path[1:])):
+                        paths.append(path)
+            self._candidates[key] = paths
+        return paths
+
+    def _best_hop(self, source: str, target: str):
+        """
+        Повертає (log курсу, біржа, timestamp) найкращого свіжого котирування ребра або None.
+        """
+        best = None
+        for exchange, (symbol, log_rate) in self._edges[(source, target)].items():
+            if log_rate is None:
+                continue
+            quote = self.store.get(exchange, symbol, self.ttl)
+            if quote is None:
+                continue
+            if best is None or log_rate > best[0]:
+                best = (log_rate, exchange, quote.timestamp)
+        return best
+
+    def best_routes(self, source: str, target: str, limit: int = 1, min_hops: int = 1) -> List[Route]:
+        """
+        Знаходить найкращі маршрути source -> target за поточними цінами.
+
+        На кожному кроці обирається біржа з найкращим курсом, а маршрути порівнюються за сумою
+        log курсів кроків (найкоротший шлях з вагами -log(курс)).
+
+        Параметри:
+            source (str): Актив, який обмінюють.
+            target (str): Актив, який хочуть отримати.
+            limit (int): Кількість маршрутів у результаті.
+            min_hops (int): Мінімальна кількість кроків маршруту.
+
+        Повертає:
+            Список Route, відсортований від найкращого курсу.
+        """
+        source = source.upper()
+        target = target.upper()
+        scored = []
+        for path in self.candidates(source, target):
+            if len(path) - 1 < min_hops:
+                continue
+            total = 0.0
+            hops = []
+            timestamp = math.inf
+            for a, b in zip(path, path[1:]):
+                best = self._best_hop(a, b)
+                if best is None:
+                    break
+                log_rate, exchange, quote_timestamp = best
+                total += log_rate
+                hops.append(Hop(exchange, a, b))
+                timestamp = min(timestamp, quote_timestamp)
+            else:
+                scored.append((total, Route(tuple(hops), math.exp(total), timestamp)))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [route for _, route in scored[:limit]]
@@ -0,0 +1,212 @@
+"""
+Модуль spread_scanner.py
+------------------------
+
+Цей модуль містить сканер спредів між біржами (SpreadScanner).
+
+Ціни зберігаються в матриці NumPy: рядок - біржа, стовпчик - пара. Слухач сховища котирувань
+лише записує ціну в комірку, а перерахунок спредів виконується одним векторизованим проходом
+по всій матриці не частіше одного разу за ітерацію циклу подій, тож серія оновлень (наприклад,
+fetch_tickers на тисячі символів) дає один перерахунок.
+
+За один прохід обчислюються:
+    - попарні спреди між біржами для кожної пари;
+    - найкраща біржа для купівлі (найнижча ціна) та продажу (найвища ціна);
+    - пари, спред яких перевищує поріг SPREAD_ALERT_THRESHOLD (сповіщення).
+
+Пара та зворотна до неї займають один стовпчик (канонічний порядок pair_key), тож котирування
+"ETH/BTC" на одній біржі порівнюється з "BTC/ETH" на іншій.
+"""
+
+import asyncio
+import os
+import time
+
+import numpy as np
+
+from exchanges.quote_store import quote_store
+from exchanges.singleflight import pair_key
+from logs import get_logger
+
+logger = get_logger("spreads")
+
+# Поріг спреду для сповіщень (частка: 0.005 = 0.5%)
+SPREAD_ALERT_THRESHOLD = float(os.getenv("SPREAD_ALERT_THRESHOLD", "0.005"))
+# Максимальний вік котирування, яке враховується в спредах (секунди)
+SCANNER_QUOTE_TTL = float(os.getenv("SCANNER_QUOTE_TTL", "30"))
+# Початкова кількість стовпчиків матриці (далі матриця розширюється вдвічі)
+INITIAL_CAPACITY = 256
+
+
+class SpreadScanner:
+    """
+    Сканер спредів між біржами на основі матриці цін.
+
+    Параметри:
+        exchange_names: Назви бірж (рядки матриці).
+        store: Сховище котирувань (за замовчуванням спільне quote_store).
+        threshold: Поріг спреду для сповіщень.
+        ttl: Максимальний вік котирування (секунди).
+    """
+
+    def __init__(self, exchange_names, store=quote_store, threshold=SPREAD_ALERT_THRESHOLD, ttl=SCANNER_QUOTE_TTL):
+        self.exchange_names = list(exchange_names)
+        self._rows = {name: i for i, name in enumerate(self.exchange_names)}
+        self.store = store
+        self.threshold = threshold
+        self.ttl = ttl
+        # Пара -> індекс стовпчика; self.pairs - пари за індексом стовпчика
+        self._columns = {}
+        self.pairs = []
+        self._prices = np.full((len(self.exchange_names), INITIAL_CAPACITY), np.nan)
+        self._timestamps = np.zeros((len(self.exchange_names), INITIAL_CAPACITY))
+        self._scan_scheduled = False
+        # Результати останнього перерахунку
+        self.result = None
+        self.scanned_at = 0.0
+        self.alerts = set()
+
+    def start(self):
+        """Починає слухати зміни у сховищі котирувань."""
+        self.store.add_listener(self._on_quote)
+
+    def stop(self):
+        """Припиняє слухати зміни у сховищі котирувань."""
+        self.store.remove_listener(self._on_quote)
+
+    def _column(self, pair: str) -> int:
+        """
+        Повертає індекс стовпчика пари, за потреби додаючи стовпчик і розширюючи матрицю.
+        """
+        column = self._columns.get(pair)
+        if column is None:
+            column = self._columns[pair] = len(self.pairs)
+            self.pairs.append(pair)
+            if column >= self._prices.shape[1]:
+                extra = self._prices.shape[1]
+                self._prices = np.hstack([self._prices, np.full((len(self.exchange_names), extra), np.nan)])
+                self._timestamps = np.hstack([self._timestamps, np.zeros((len(self.exchange_names), extra))])
+        return column
+
+    def update(self, exchange: str, symbol: str, price: float, timestamp: float = None):
+        """
+        Записує ціну символу на біржі в матрицю (у канонічному напрямку пари).
+        """
+        row = self._rows.get(exchange)
+        parts = symbol.split("/")
+        if row is None or len(parts) != 2 or not all(parts) or ":" in symbol or not price:
+            return
+        (base, quote), inverted = pair_key(parts[0], parts[1])
+        column = self._column(f"{base}/{quote}")
+        self._prices[row, column] = 1 / price if inverted else price
+        self._timestamps[row, column] = time.time() if timestamp is None else timestamp
+
+    def _on_quote(self, exchange: str, symbol: str, quote):
+        """
+        Слухач сховища котирувань: записує ціну та планує перерахунок спредів
+        (один раз за ітерацію циклу подій).
+        """
+        self.update(exchange, symbol, quote.price, quote.timestamp)
+        if not self._scan_scheduled:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            self._scan_scheduled = True
+            loop.call_soon(self.scan)
+
+    def scan(self):
+        """
+        Перераховує спреди для всіх пар одним векторизованим проходом.
+
+        Результат зберігається в self.result - словник масивів (по стовпчику на пару):
+            prices: Матриця цін з відкинутими застарілими котируваннями (NaN).
+            pairwise: Попарні спреди (ціна_i - ціна_j) / ціна_j розміру біржі x біржі x пари.
+            spread: Спред між найкращою ціною продажу та купівлі.
+            buy, sell: Індекси бірж з найнижчою та найвищою ціною (-1, якщо цін менше двох).
+        """
+        self._scan_scheduled = False
+        count = len(self.pairs)
+        prices = self._prices[:, :count].copy()
+        prices[time.time() - self._timestamps[:, :count] > self.ttl] = np.nan
+        valid = ~np.isnan(prices)
+        quoted = valid.sum(axis=0) >= 2
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            pairwise = (prices[:, None, :] - prices[None, :, :]) / prices[None, :, :]
+            low = np.where(valid, prices, np.inf)
+            high = np.where(valid, prices, -np.inf)
+            buy = low.argmin(axis=0)
+            sell = high.argmax(axis=0)
+            columns = np.arange(count)
+            spread = np.where(quoted, (high[sell, columns] - low[buy, columns]) / low[buy, columns], np.nan)
+
+        buy = np.where(quoted, buy, -1)
+        sell = np.where(quoted, sell, -1)
+        alerts = set(np.flatnonzero(spread >= self.threshold).tolist())
+        for column in alerts - self.alerts:
+            logger.info(
+                "%s: спред %.4f%% (%s -> %s)", self.pairs[column], spread[column] * 100,
+                self.exchange_names[buy[column]], self.exchange_names[sell[column]],
+            )
+        self.alerts = alerts
+        self.scanned_at = time.time()
+        self.result = {"prices": prices, "pairwise": pairwise, "spread": spread, "buy": buy, "sell": sell}
+
+    def snapshot(self, min_spread: float = 0.0, limit: int = 100, pairs=None, pairwise: bool = False):
+        """
+        Формує відповідь зі спредами, відсортованими за спаданням.
+
+        Параметри:
+            min_spread (float): Мінімальний спред пари у відповіді.
+            limit (int): Максимальна кількість пар у відповіді.
+            pairs: Пари "BASE/QUOTE", якими обмежити відповідь (за замовчуванням - усі);
+                   пара та зворотна до неї дають один і той самий рядок відповіді.
+            pairwise (bool): Чи додавати попарні спреди між біржами.
+
+        Повертає:
+            Список словників з полями pair, spread, buyExchange, buyRate, sellExchange, sellRate,
+            rates (та pairwise, якщо запитано).
+        """
+        # Без нових котирувань результат перераховується, щоб відкинути застарілі ціни
+        if self.result is None or len(self.result["spread"]) != len(self.pairs) or time.time() - self.scanned_at > 1:
+            self.scan()
+        result = self.result
+        spread = result["spread"]
+        if pairs is not None:
+            keys = []
+            for pair in pairs:
+                base, quote = pair.split("/")
+                (base, quote), _ = pair_key(base, quote)
+                keys.append(f"{base}/{quote}")
+            columns = np.array([self._columns[key] for key in keys if key in self._columns], dtype=int)
+        else:
+            columns = np.arange(len(spread))
+        columns = columns[spread[columns] >= min_spread]
+        columns = columns[np.argsort(-spread[columns], kind="stable")][:limit]
+
+        response = []
+        for column in columns.tolist():
+            buy, sell = int(result["buy"][column]), int(result["sell"][column])
+            prices = result["prices"][:, column]
+            entry = {
+                "pair": self.pairs[column],
+                "spread": float(spread[column]),
+                "buyExchange": self.exchange_names[buy],
+                "buyRate": float(prices[buy]),
+                "sellExchange": self.exchange_names[sell],
+                "sellRate": float(prices[sell]),
+                "rates": {
+                    name: float(price) for name, price in zip(self.exchange_names, prices) if not np.isnan(price)
+                },
+            }
+            if pairwise:
+                values = result["pairwise"][:, :, column]
+                entry["pairwise"] = {
+                    f"{a}/{b}": float(values[i, j])
+                    for i, a in enumerate(self.exchange_names)
+                    for j, b in enumerate(self.exchange_names)
+                    if i != j and not np.isnan(values[i, j])
+                }
+            response.append(entry)
+        return response
@@ -0,0 +1,75 @@
+"""
+Спільні налаштування тестів: корінь репозиторію додається до sys.path, щоб модулі
+(exchanges, services, metrics, ...) імпортувалися так само, як під час запуску додатку.
+
+Тут же - підробний ccxt-клієнт (FakeCcxtClient) та фабрика бірж make_cex для тестів
+централізованих бірж без мережі.
+"""
+
+import asyncio
+import os
+import sys
+from collections import Counter
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from exchanges.cex_exchange import CexExchange  # noqa: E402
+from exchanges.rate_limiter import RateLimiter  # noqa: E402
+
+
+class FakeCcxtClient:
+    """
+    Підробний асинхронний ccxt-клієнт: рахує виклики методів і відповідає заданими даними.
+
+    Параметри:
+        price (float): Ціна тікера (fetch_ticker).
+        delay (float): Затримка відповіді fetch_ticker (секунди).
+        error (Exception): Помилка, якою завершується fetch_ticker (замість відповіді).
+        order_books: Знімки стакану {"bids", "asks"}, які fetch_order_book віддає по черзі
+                     (останній повторюється).
+    """
+
+    def __init__(self, price: float = 100.0, delay: float = 0.0, error: Exception = None, order_books=()):
+        self.urls = {"api": {}}
+        self.last_response_headers = None
+        self.price = price
+        self.delay = delay
+        self.error = error
+        self.order_books = list(order_books)
+        self.calls = Counter()
+
+    async def fetch_ticker(self, symbol):
+        self.calls["fetch_ticker"] += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return {"symbol": symbol, "last": self.price}
+
+    async def fetch_order_book(self, symbol, limit=None):
+        self.calls["fetch_order_book"] += 1
+        return self.order_books.pop(0) if len(self.order_books) > 1 else self.order_books[0]
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def make_cex():
+    """
+    Фабрика CexExchange з підробним клієнтом і планувальником без практичних обмежень.
+    symbols - список символів "BASE/QUOTE" для індексу ринків (None - ринки не завантажено).
+    """
+    def make(name: str = "test", client: FakeCcxtClient = None, rate_limiter: RateLimiter = None,
+             request_costs: dict = None, symbols=None) -> CexExchange:
+        exchange = CexExchange(name, client or FakeCcxtClient(), rate_limiter or RateLimiter(1000, 1000), request_costs)
+        if symbols is not None:
+            exchange.symbol_index = {}
+            for symbol in symbols:
+                base, quote = symbol.split("/")
+                exchange.symbol_index[(base, quote)] = (symbol, False)
+                exchange.symbol_index.setdefault((quote, base), (symbol, True))
+        return exchange
+
+    return make
@@ -0,0 +1,93 @@
+"""
+Тести пакетних ендпоінтів (/getRatesBatch, /estimateBatch): відповіді збігаються з одиночними
+запитами, однакові та зворотні пари запитуються в біржі один раз, а розмір пакета обмежено.
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import app
+from conftest import FakeCcxtClient
+from exchanges.quote_store import QuoteStore
+from services.routing import RouteGraph
+
+
+@pytest.fixture
+def venues(make_cex, monkeypatch):
+    """
+    Підміняє біржі додатку двома підробними біржами з ринком BTC/USDT (ціни 100 та 101)
+    і порожнім графом маршрутів. Повертає ccxt-клієнти бірж.
+    """
+    def install(prefix: str):
+        clients = [FakeCcxtClient(price=100.0, delay=0.01), FakeCcxtClient(price=101.0, delay=0.01)]
+        exchanges = [
+            make_cex(f"{prefix}_{i}", client, symbols=["BTC/USDT"]) for i, client in enumerate(clients)
+        ]
+        monkeypatch.setattr(app, "exchanges", exchanges)
+        monkeypatch.setattr(app, "exchanges_by_name", {exchange.name: exchange for exchange in exchanges})
+        monkeypatch.setattr(app, "route_graph", RouteGraph([], store=QuoteStore()))
+        return clients
+
+    return install
+
+
+def rates(entries):
+    return [(entry["exchangeName"], entry["rate"]) for entry in entries]
+
+
+def test_rates_batch_deduplicates_pairs(venues):
+    clients = venues("test_rates_batch")
+    request = app.GetRatesBatchRequest(pairs=[
+        {"baseCurrency": "BTC", "quoteCurrency": "USDT"},
+        {"baseCurrency": "usdt", "quoteCurrency": "btc"},
+        {"baseCurrency": "btc", "quoteCurrency": "usdt"},
+    ])
+    response = asyncio.run(app.get_rates_batch_endpoint(request))
+    # Порядок і написання валют - як у запиті
+    assert [(item["baseCurrency"], item["quoteCurrency"]) for item in response] == [
+        ("BTC", "USDT"), ("usdt", "btc"), ("btc", "usdt"),
+    ]
+    assert rates(response[0]["rates"]) == [("test_rates_batch_0", 100.0), ("test_rates_batch_1", 101.0)]
+    assert rates(response[1]["rates"]) == [("test_rates_batch_0", 0.01), ("test_rates_batch_1", 1 / 101.0)]
+    assert response[2]["rates"] == response[0]["rates"]
+    # Пара та зворотна до неї - один запит до кожної біржі на весь пакет
+    assert [client.calls["fetch_ticker"] for client in clients] == [1, 1]
+
+
+def test_rates_batch_matches_single_request(venues):
+    venues("test_rates_single")
+    single = asyncio.run(app.get_rates_endpoint(app.GetRatesRequest(baseCurrency="USDT", quoteCurrency="BTC")))
+    batch = asyncio.run(app.get_rates_batch_endpoint(
+        app.GetRatesBatchRequest(pairs=[{"baseCurrency": "USDT", "quoteCurrency": "BTC"}])
+    ))
+    assert rates(batch[0]["rates"]) == rates(single)
+
+
+def test_estimate_batch(venues):
+    clients = venues("test_estimate_batch")
+    request = app.EstimateBatchRequest(requests=[
+        {"inputAmount": 2.0, "inputCurrency": "BTC", "outputCurrency": "USDT"},
+        {"inputAmount": 505.0, "inputCurrency": "USDT", "outputCurrency": "BTC"},
+        {"inputAmount": 1.0, "inputCurrency": "FOO", "outputCurrency": "BAR"},
+    ])
+    response = asyncio.run(app.estimate_batch_endpoint(request))
+    assert [item["inputCurrency"] for item in response] == ["BTC", "USDT", "FOO"]
+    assert response[0]["exchangeName"] == "test_estimate_batch_1"
+    assert response[0]["outputAmount"] == pytest.approx(202.0)
+    assert response[1]["exchangeName"] == "test_estimate_batch_0"
+    assert response[1]["outputAmount"] == pytest.approx(5.05)
+    # Пари без даних не ламають пакет
+    assert "error" in response[2] and "outputAmount" not in response[2]
+    assert [client.calls["fetch_ticker"] for client in clients] == [1, 1]
+
+
+def test_batch_size_is_limited():
+    with pytest.raises(HTTPException) as empty:
+        asyncio.run(app.get_rates_batch_endpoint(app.GetRatesBatchRequest(pairs=[])))
+    assert empty.value.status_code == 400
+    pairs = [{"baseCurrency": "BTC", "quoteCurrency": "USDT"}] * (app.MAX_BATCH_SIZE + 1)
+    with pytest.raises(HTTPException) as oversized:
+        asyncio.run(app.get_rates_batch_endpoint(app.GetRatesBatchRequest(pairs=pairs)))
+    assert oversized.value.status_code == 400
@@ -0,0 +1,151 @@
+"""
+Тести обліку стану бірж: стани запобіжника (CircuitBreaker), а також помилки, що стосуються
+лише пари, не відкривають запобіжник біржі.
+"""
+
+import asyncio
+
+import pytest
+from ccxt.base.errors import (
+    AuthenticationError, BadRequest, BadSymbol, ExchangeError, ExchangeNotAvailable, PermissionDenied,
+    RateLimitExceeded,
+)
+
+from conftest import FakeCcxtClient
+from exchanges.health import (
+    CIRCUIT_MAX_OPEN_SECONDS, CIRCUIT_OPEN_SECONDS, CLOSED, HALF_OPEN, HEALTH_MIN_SAMPLES, HEALTH_WINDOW, OPEN,
+    CircuitBreaker, PairError, Throttled,
+)
+
+
+@pytest.fixture
+def fetch(make_cex):
+    """Запит котирування FOO/BAR у біржі, запит тікера якої завершується заданою помилкою."""
+    def fetch(error: Exception):
+        exchange = make_cex(f"test_{type(error).__name__}", FakeCcxtClient(error=error))
+        return asyncio.run(exchange.get_latest_quote("FOO", "BAR"))
+
+    return fetch
+
+
+def test_unknown_symbol_is_no_data(fetch):
+    assert fetch(BadSymbol("binance does not have market symbol FOO/BAR")) is None
+
+
+def test_rejected_request_is_pair_error(fetch):
+    with pytest.raises(PairError):
+        fetch(BadRequest("invalid symbol"))
+
+
+def test_network_errors_are_raised_as_is(fetch):
+    with pytest.raises(ExchangeNotAvailable):
+        fetch(ExchangeNotAvailable("503 Service Unavailable"))
+
+
+@pytest.mark.parametrize("error", [
+    AuthenticationError("invalid api key"),
+    PermissionDenied("ip not whitelisted"),
+    ExchangeError("internal venue error"),
+])
+def test_account_and_venue_errors_are_raised_as_is(fetch, error):
+    with pytest.raises(type(error)):
+        fetch(error)
+
+
+def test_rate_limit_is_throttled(fetch):
+    with pytest.raises(Throttled):
+        fetch(RateLimitExceeded("429 Too Many Requests"))
+
+
+def test_pair_failures_do_not_open_venue_breaker(make_cex):
+    exchange = make_cex("test_pair_breaker", FakeCcxtClient(error=BadRequest("bad")))
+    for _ in range(HEALTH_MIN_SAMPLES * 2):
+        exchange.health.record("FOO", "BAR", True, venue=False)
+    assert exchange.health.venue.state == CLOSED
+    assert exchange.health.allow("BTC", "USDT")
+    assert not exchange.health.allow("FOO", "BAR")
+    assert exchange.health.open_pairs() == 1
+    assert exchange.health.pairs[("BAR", "FOO")].state == OPEN
+
+
+def test_await_quote_counts_pair_errors_against_pair_only(make_cex):
+    import app
+
+    exchange = make_cex("test_await_pair", FakeCcxtClient(error=BadRequest("bad")))
+
+    async def scenario():
+        for _ in range(HEALTH_MIN_SAMPLES * 2):
+            await app.await_quote(exchange, exchange.get_latest_quote("FOO", "BAR"), "FOO", "BAR", 1.0)
+
+    asyncio.run(scenario())
+    assert exchange.health.venue.state == CLOSED
+    assert exchange.health.open_pairs() == 1
+
+
+def test_breaker_needs_min_samples():
+    breaker = CircuitBreaker()
+    for i in range(HEALTH_MIN_SAMPLES - 1):
+        assert not breaker.record(True, float(i))
+    assert breaker.state == CLOSED
+    assert breaker.error_rate(float(HEALTH_MIN_SAMPLES)) == 1.0
+    assert breaker.record(True, float(HEALTH_MIN_SAMPLES))
+    assert breaker.state == OPEN
+
+
+def test_breaker_stays_closed_below_error_rate():
+    breaker = CircuitBreaker()
+    for i in range(HEALTH_MIN_SAMPLES * 4):
+        # Кожен четвертий запит - помилка (25% < HEALTH_ERROR_RATE за замовчуванням)
+        breaker.record(i % 4 == 0, float(i) / 100)
+    assert breaker.state == CLOSED
+
+
+def test_breaker_window_forgets_old_failures():
+    breaker = CircuitBreaker()
+    for i in range(HEALTH_MIN_SAMPLES - 1):
+        breaker.record(True, 0.0)
+    later = HEALTH_WINDOW + 1
+    assert breaker.error_rate(later) == 0.0
+    assert not breaker.record(True, later)
+    assert breaker.state == CLOSED
+
+
+def test_breaker_probe_and_backoff():
+    breaker = CircuitBreaker()
+    breaker.trip(100.0)
+    assert not breaker.probe_due(100.0 + CIRCUIT_OPEN_SECONDS / 2)
+    assert breaker.probe_due(100.0 + CIRCUIT_OPEN_SECONDS)
+    # Поки запобіжник відкритий, результати запитів не враховуються
+    assert not breaker.record(True, 101.0)
+    # Невдала проба відкриває запобіжник на вдвічі довший час (до максимуму)
+    for _ in range(20):
+        breaker.state = HALF_OPEN
+        breaker.trip(200.0)
+    assert breaker.state == OPEN
+    assert breaker.open_for == CIRCUIT_MAX_OPEN_SECONDS
+    breaker.reset()
+    assert breaker.state == CLOSED
+    assert breaker.open_for == CIRCUIT_OPEN_SECONDS
+    assert breaker.error_rate(200.0) == 0.0
+
+
+def test_await_quote_does_not_count_rate_limits(make_cex):
+    import app
+
+    client = FakeCcxtClient(error=RateLimitExceeded("429 Too Many Requests"))
+    client.last_response_headers = {"Retry-After": "30"}
+    exchange = make_cex("test_await_throttled", client)
+
+    async def scenario():
+        return [
+            (await app.await_quote(exchange, exchange.get_latest_quote("FOO", "BAR"), "FOO", "BAR", 1.0))[1]
+            for _ in range(HEALTH_MIN_SAMPLES * 2)
+        ]
+
+    statuses = asyncio.run(scenario())
+    assert statuses == [app.STATUS_RATE_LIMITED] * (HEALTH_MIN_SAMPLES * 2)
+    # Під час паузи планувальника запити до біржі не надсилаються і не чекають у черзі
+    assert client.calls["fetch_ticker"] == 1
+    assert exchange.rate_limiter.paused
+    assert exchange.health.venue.state == CLOSED
+    assert exchange.health.open_pairs() == 0
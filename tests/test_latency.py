@@ -0,0 +1,96 @@
+"""
+Тести хеджування запитів: затримки враховуються лише для звернень до біржі (без черги
+планувальника), відповіді зі сховища котирувань не призводять до дублювання запитів, а поки
+в планувальнику є черга, дублікати не запускаються.
+"""
+
+import asyncio
+import time
+
+from conftest import FakeCcxtClient
+from exchanges.latency import HEDGE_MIN_SAMPLES, LatencyTracker, hedged
+from exchanges.quote_store import quote_store
+from exchanges.rate_limiter import PRIORITY_INTERACTIVE, RateLimiter
+
+
+def test_cache_hits_do_not_feed_latency_tracker(make_cex):
+    async def scenario():
+        client = FakeCcxtClient()
+        exchange = make_cex("test_hits", client, symbols=["BTC/USDT"])
+        quote_store.update("test_hits", "BTC/USDT", 100.0)
+        for _ in range(HEDGE_MIN_SAMPLES * 3):
+            assert (await exchange.get_shared_quote("BTC", "USDT", hedge=True)).price == 100.0
+        assert client.calls["fetch_ticker"] == 0
+        assert len(exchange.latency) == 0
+    asyncio.run(scenario())
+
+
+def test_miss_after_cache_hits_fetches_once(make_cex):
+    async def scenario():
+        client = FakeCcxtClient(delay=0.05)
+        exchange = make_cex("test_miss", client, symbols=["BTC/USDT"])
+        quote_store.update("test_miss", "BTC/USDT", 100.0)
+        for _ in range(50):
+            await exchange.get_shared_quote("BTC", "USDT", hedge=True)
+        # Котирування застаріло: відповіді зі сховища не дали p95 у мікросекунди, тож запит один
+        quote_store.update("test_miss", "BTC/USDT", 100.0, time.time() - exchange.quote_ttl - 1)
+        assert (await exchange.get_shared_quote("BTC", "USDT", hedge=True)).price == 100.0
+        assert client.calls["fetch_ticker"] == 1
+    asyncio.run(scenario())
+
+
+def test_slow_upstream_request_is_hedged():
+    async def scenario():
+        tracker = LatencyTracker()
+        for _ in range(HEDGE_MIN_SAMPLES):
+            tracker.record(0.01)
+        calls = []
+
+        async def request():
+            calls.append(time.perf_counter())
+            await asyncio.sleep(0.2 if len(calls) == 1 else 0.0)
+            return len(calls)
+
+        assert await hedged(request, tracker) == 2
+        assert len(calls) == 2
+    asyncio.run(scenario())
+
+
+def test_rate_limiter_wait_is_not_recorded(make_cex):
+    async def scenario():
+        exchange = make_cex("test_queue_wait", FakeCcxtClient(), RateLimiter(1000, 10))
+        exchange.rate_limiter.pause(0.2)
+        await exchange._request("fetch_ticker", "BTC/USDT", priority=PRIORITY_INTERACTIVE, latency=exchange.latency)
+        assert len(exchange.latency) == 1
+        assert exchange.latency.p95() < 0.1
+    asyncio.run(scenario())
+
+
+def test_no_hedge_when_not_allowed():
+    async def scenario():
+        tracker = LatencyTracker()
+        for _ in range(HEDGE_MIN_SAMPLES):
+            tracker.record(0.01)
+        calls = []
+
+        async def request():
+            calls.append(time.perf_counter())
+            await asyncio.sleep(0.05)
+            return len(calls)
+
+        assert await hedged(request, tracker, can_hedge=lambda: False) == 1
+        assert len(calls) == 1
+    asyncio.run(scenario())
+
+
+def test_exchange_does_not_hedge_while_limiter_has_waiters(make_cex):
+    async def scenario():
+        exchange = make_cex("test_hedge_queue", FakeCcxtClient(), RateLimiter(10, 1))
+        assert exchange._can_hedge()
+        await exchange.rate_limiter.acquire(1)
+        waiter = asyncio.create_task(exchange.rate_limiter.acquire(1))
+        await asyncio.sleep(0)
+        assert not exchange._can_hedge()
+        await waiter
+        assert exchange._can_hedge()
+    asyncio.run(scenario())
@@ -0,0 +1,63 @@
+"""
+Тести локального стакану: заміна знімком, зміни рівнів, обхід глибини та оновлення стакану
+біржі опитуванням REST-знімків.
+"""
+
+import asyncio
+
+from conftest import FakeCcxtClient
+from exchanges.order_book import OrderBook
+
+
+def levels(prices, amount: float = 1.0):
+    return [[price, amount] for price in prices]
+
+
+def test_sell_and_buy_walk_depth():
+    book = OrderBook("BTC/USDT")
+    book.apply_snapshot(levels([100, 99, 98]), levels([101, 102]))
+    assert book.sell_base(1) == 100
+    assert book.sell_base(2.5) == 100 + 99 + 0.5 * 98
+    assert book.sell_base(4) is None
+    assert book.buy_base(101) == 1
+    assert book.buy_base(101 + 51) == 1.5
+    assert book.buy_base(1000) is None
+
+
+def test_apply_diff_updates_and_removes_levels():
+    book = OrderBook("BTC/USDT")
+    book.apply_snapshot(levels([100, 99]), levels([101]))
+    book.apply_diff([[100, 0], [98, 2.0]], [[101, 3.0]])
+    assert sorted(book.bids.levels.items()) == [(98, 2.0), (99, 1.0)]
+    assert book.bids.best() == 99
+    assert book.asks.levels == {101: 3.0}
+
+
+def test_snapshot_after_price_move_drops_stale_levels():
+    book = OrderBook("BTC/USDT")
+    book.apply_snapshot(levels([100, 99, 98, 97, 96]), levels([101]))
+    book.apply_snapshot(levels([105, 104, 103, 102, 101]), levels([106]))
+    assert sorted(book.bids.levels) == [101, 102, 103, 104, 105]
+    # Старі біди 96-100 більше не існують: 8 base не виконуються за глибиною 5 рівнів
+    assert book.sell_base(8) is None
+    assert book.sell_base(5) == 105 + 104 + 103 + 102 + 101
+
+
+def test_exchange_polling_replaces_book_with_each_snapshot(make_cex):
+    client = FakeCcxtClient(order_books=[
+        {"bids": levels([100, 99, 98, 97, 96]), "asks": levels([101, 102])},
+        {"bids": levels([105, 104, 103, 102, 101]), "asks": levels([106, 107])},
+    ])
+    exchange = make_cex("test_books", client, symbols=["BTC/USDT"])
+    book = exchange.order_books["BTC/USDT"]
+
+    async def scenario():
+        await exchange.refresh_order_book(book)
+        await exchange.refresh_order_book(book)
+        return await exchange.get_effective_quote("BTC", "USDT", 5)
+
+    quote = asyncio.run(scenario())
+    assert client.calls["fetch_order_book"] == 2
+    assert sorted(book.bids.levels) == [101, 102, 103, 104, 105]
+    assert sorted(book.asks.levels) == [106, 107]
+    assert quote.price == (105 + 104 + 103 + 102 + 101) / 5
@@ -0,0 +1,102 @@
+"""
+Тести реєстру пулів Uniswap V3: індекси пар, пошук пулів через фабрику (вибір пулу з найбільшою
+ліквідністю, десяткові знаки токенів) та кеш знайденого на диску.
+"""
+
+import asyncio
+from collections import Counter
+
+from exchanges.multicall import DECIMALS_SELECTOR, GET_POOL_SELECTOR, LIQUIDITY_SELECTOR, decode_word
+from exchanges.pool_registry import PoolRegistry, PoolSpec
+
+WETH = "0x" + "c0" * 20
+USDC = "0x" + "a0" * 20
+DAI = "0x" + "6b" * 20
+KNOWN_POOL = "0x" + "11" * 20
+TOKENS = {
+    "WETH": {"address": WETH, "decimals": 18},
+    "USDC": {"address": USDC, "decimals": 6},
+    "DAI": {"address": DAI},
+}
+
+
+def word(value: int) -> bytes:
+    return value.to_bytes(32, "big")
+
+
+class FakeFactory:
+    """
+    Підробний Multicall3 з фабрикою: pools - {(token0, token1, fee): (адреса пулу, liquidity)},
+    decimals - {адреса токена: кількість знаків}. calls рахує виклики за селектором.
+    """
+
+    def __init__(self, pools: dict, decimals: dict):
+        self.pools = pools
+        self.decimals = decimals
+        self.liquidity = {address: liquidity for address, liquidity in pools.values()}
+        self.calls = Counter()
+
+    async def aggregate(self, calls):
+        results = []
+        for target, _, data in calls:
+            selector, target = data[:4], target.lower()
+            self.calls[selector] += 1
+            if selector == DECIMALS_SELECTOR and target in self.decimals:
+                results.append((True, word(self.decimals[target])))
+            elif selector == GET_POOL_SELECTOR:
+                token0, token1 = ("0x" + data[4 + 32 * i + 12:4 + 32 * (i + 1)].hex() for i in range(2))
+                pool = self.pools.get((token0, token1, decode_word(data[4:], 2)))
+                results.append((True, bytes(12) + bytes.fromhex(pool[0][2:]) if pool else word(0)))
+            elif selector == LIQUIDITY_SELECTOR and target in self.liquidity:
+                results.append((True, word(self.liquidity[target])))
+            else:
+                results.append((False, b""))
+        return results
+
+
+def test_pairs_are_indexed_in_both_directions():
+    registry = PoolRegistry(TOKENS, [PoolSpec("WETH", "USDC", KNOWN_POOL, 500)])
+    # USDC < WETH за адресою: пара пулу впорядкована за токенами пулу
+    info, inverted = registry.by_pair["USDC/WETH"]
+    assert not inverted and info.pair == "USDC/WETH"
+    assert info.token0 == USDC and info.decimals_diff == 6 - 18
+    assert registry.by_pair["WETH/USDC"] == (info, True)
+    assert registry.pools[KNOWN_POOL] is info
+    assert registry.pending() == []
+
+
+def test_discover_picks_most_liquid_pool_and_token_decimals(tmp_path):
+    cheap, deep = "0x" + "22" * 20, "0x" + "33" * 20
+    factory = FakeFactory(
+        {(DAI, USDC, 100): (cheap, 10), (DAI, USDC, 500): (deep, 1000)},
+        {DAI: 18},
+    )
+    cache_file = str(tmp_path / "cache.json")
+    registry = PoolRegistry(TOKENS, [PoolSpec("DAI", "USDC", None, None)], cache_file=cache_file)
+    # Десяткових знаків DAI та адреси пулу ще немає
+    assert registry.by_pair == {}
+    assert len(registry.pending()) == 1
+
+    added = asyncio.run(registry.discover(factory.aggregate))
+    assert [info.address.lower() for info in added] == [deep]
+    info, inverted = registry.by_pair["DAI/USDC"]
+    assert not inverted and info.fee == 500 and info.decimals0 == 18
+    assert registry.pending() == []
+    assert factory.calls[GET_POOL_SELECTOR] == len(registry.fee_tiers)
+
+    # Після перезапуску знайдене читається з кешу без викликів у мережі
+    restarted = PoolRegistry(TOKENS, [PoolSpec("DAI", "USDC", None, None)], cache_file=cache_file)
+    assert restarted.by_pair["USDC/DAI"][0] == info
+    factory.calls.clear()
+    assert asyncio.run(restarted.discover(factory.aggregate)) == []
+    assert not factory.calls
+
+
+def test_missing_pool_stays_pending():
+    factory = FakeFactory({}, {DAI: 18})
+    registry = PoolRegistry(TOKENS, [PoolSpec("DAI", "WETH", None, 3000)])
+    assert asyncio.run(registry.discover(factory.aggregate)) == []
+    # Для запису із заданою комісією запитується лише цей рівень
+    assert factory.calls[GET_POOL_SELECTOR] == 1
+    assert len(registry.pending()) == 1
+    assert "DAI/WETH" not in registry.by_pair
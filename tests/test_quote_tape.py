@@ -0,0 +1,87 @@
+"""
+Тести стрічки котирувань: свічки OHLC, TWAP/VWAP та читання історії з файлів стрічки.
+"""
+
+import math
+
+import numpy as np
+
+from services.quote_tape import QuoteTape, ohlc, twap, vwap
+
+
+def test_ohlc_groups_records_by_interval():
+    timestamps = np.array([100.0, 101.0, 105.0, 112.0, 131.0])
+    prices = np.array([10.0, 12.0, 9.0, 11.0, 8.0])
+    volumes = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+    candles = ohlc(timestamps, prices, volumes, 100.0, 10.0)
+    # Свічка 120-130 без записів пропускається
+    assert candles["time"].tolist() == [100.0, 110.0, 130.0]
+    assert candles["open"].tolist() == [10.0, 11.0, 8.0]
+    assert candles["high"].tolist() == [12.0, 11.0, 8.0]
+    assert candles["low"].tolist() == [9.0, 11.0, 8.0]
+    assert candles["close"].tolist() == [9.0, 11.0, 8.0]
+    assert candles["volume"].tolist() == [6.0, 4.0, 5.0]
+    assert candles["count"].tolist() == [3, 1, 1]
+
+
+def test_ohlc_aligns_to_start_and_handles_empty_window():
+    candles = ohlc(np.array([107.0, 108.0]), np.array([1.0, 2.0]), np.zeros(2), 95.0, 10.0)
+    assert candles["time"].tolist() == [105.0]
+    empty = ohlc(np.zeros(0), np.zeros(0), np.zeros(0), 0.0, 60.0)
+    assert all(len(values) == 0 for values in empty.values())
+
+
+def test_twap_weights_prices_by_duration():
+    timestamps = np.array([10.0, 40.0])
+    prices = np.array([100.0, 200.0])
+    # 100 діє 30 с, 200 - 60 с до кінця вікна
+    assert math.isclose(twap(timestamps, prices, 10.0, 100.0), (100 * 30 + 200 * 60) / 90)
+    # Ціна перед вікном діє від start до першого запису
+    assert math.isclose(twap(timestamps, prices, 0.0, 100.0, previous=(-5.0, 50.0)), (50 * 10 + 100 * 30 + 200 * 60) / 100)
+    assert twap(np.zeros(0), np.zeros(0), 0.0, 10.0) is None
+    assert twap(np.zeros(0), np.zeros(0), 0.0, 10.0, previous=(-1.0, 7.0)) == 7.0
+
+
+def test_vwap():
+    assert math.isclose(vwap(np.array([10.0, 20.0]), np.array([1.0, 3.0])), 17.5)
+    assert vwap(np.array([10.0]), np.array([0.0])) is None
+
+
+def test_history_round_trip_and_inversion(tmp_path):
+    tape = QuoteTape(str(tmp_path), assets=(), heartbeat=10)
+    tape.append("binance", "BTC/USDT", 100.0, 1.0, 2.0)
+    # Незмінна ціна в межах heartbeat не записується
+    tape.append("binance", "BTC/USDT", 100.0, 5.0)
+    tape.append("binance", "BTC/USDT", 200.0, 20.0, 1.0)
+    tape.flush()
+    timestamps, prices, volumes, previous = tape.history("binance", "BTC", "USDT", 10.0, 30.0)
+    assert timestamps.tolist() == [20.0]
+    assert prices.tolist() == [200.0]
+    assert previous == (1.0, 100.0)
+    timestamps, prices, volumes, previous = tape.history("binance", "USDT", "BTC", 0.0, 30.0)
+    assert prices.tolist() == [1 / 100.0, 1 / 200.0]
+    assert volumes.tolist() == [200.0, 200.0]
+    assert previous is None
+
+
+def test_history_rejects_paths_outside_tape_directory(tmp_path):
+    tape = QuoteTape(str(tmp_path / "tape"), assets=(), heartbeat=10)
+    tape.append("binance", "BTC/USDT", 100.0, 1.0)
+    tape.flush()
+    # Файл поза каталогом стрічки з відповідною назвою не читається
+    (tmp_path / "BTC_USDT.tape").write_bytes((tmp_path / "tape" / "binance" / "BTC_USDT.tape").read_bytes())
+    assert not len(tape.history("..", "BTC", "USDT", 0.0, 10.0)[0])
+    assert not len(tape.history(".", "BTC", "USDT", 0.0, 10.0)[0])
+    assert len(tape.history("binance", "BTC", "USDT", 0.0, 10.0)[0]) == 1
+
+
+def test_history_caches_only_existing_files(tmp_path):
+    tape = QuoteTape(str(tmp_path), assets=(), heartbeat=10)
+    tape.append("binance", "BTC/USDT", 100.0, 1.0)
+    tape.flush()
+    for i in range(100):
+        tape.history("binance", f"FOO{i}", "BAR", 0.0, 10.0)
+        tape.history(f"unknown{i}", "BTC", "USDT", 0.0, 10.0)
+    assert not tape._files
+    tape.history("binance", "BTC", "USDT", 0.0, 10.0)
+    assert len(tape._files) == 1
@@ -0,0 +1,123 @@
+"""
+Тести планувальника запитів (RateLimiter): пріоритети черги, пауза після помилки ліміту
+та бюджет фонових оновлень бірж.
+"""
+
+import asyncio
+import time
+
+from exchanges.rate_limiter import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, RateLimiter
+
+
+BOOK_SYMBOLS = ["BTC/USDT", "ETH/USDT", "SOL/USDT", "ETH/BTC"]
+
+
+def with_intervals(exchange, tickers: float, books: float):
+    exchange.refresh_interval = tickers
+    exchange.order_book_interval = books
+    return exchange
+
+
+def test_for_limit_stays_within_published_limit():
+    limiter = RateLimiter.for_limit(1200, 60, safety=0.8)
+    # Повне відро разом з поповненням за вікно не перевищує ліміт із запасом
+    assert limiter.capacity + limiter.rate * 60 == 1200 * 0.8
+    assert limiter.rate == 12.8
+
+
+def test_acquire_is_immediate_while_tokens_last():
+    async def scenario():
+        limiter = RateLimiter(1, 5)
+        started = time.monotonic()
+        for _ in range(5):
+            await limiter.acquire(1)
+        return time.monotonic() - started, limiter.tokens
+
+    elapsed, tokens = asyncio.run(scenario())
+    assert elapsed < 0.05
+    assert tokens < 1
+
+
+def test_interactive_requests_are_served_first():
+    async def scenario():
+        limiter = RateLimiter(100, 1)
+        await limiter.acquire(1)
+        order = []
+
+        async def request(name, priority):
+            await limiter.acquire(1, priority)
+            order.append(name)
+
+        background = [asyncio.create_task(request(f"background{i}", PRIORITY_BACKGROUND)) for i in range(3)]
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(request("interactive", PRIORITY_INTERACTIVE))
+        await asyncio.gather(*background, interactive)
+        return order
+
+    assert asyncio.run(scenario()) == ["interactive", "background0", "background1", "background2"]
+
+
+def test_weight_above_capacity_is_capped():
+    async def scenario():
+        limiter = RateLimiter(100, 2)
+        await asyncio.wait_for(limiter.acquire(40), 1)
+
+    asyncio.run(scenario())
+
+
+def test_pause_blocks_requests():
+    async def scenario():
+        limiter = RateLimiter(1000, 10)
+        limiter.pause(0.1)
+        started = time.monotonic()
+        await limiter.acquire(1, PRIORITY_INTERACTIVE)
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) >= 0.09
+
+
+def test_cancelled_request_leaves_queue():
+    async def scenario():
+        limiter = RateLimiter(10, 1)
+        await limiter.acquire(1)
+        task = asyncio.create_task(limiter.acquire(1))
+        await asyncio.sleep(0)
+        assert limiter.queued == 1
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return limiter.queued
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_background_scales_within_budget_are_one():
+    limiter = RateLimiter(10, 10)
+    assert limiter.background_scales([2, 3], share=0.5) == [1.0, 1.0]
+
+
+def test_background_scales_slow_only_expensive_updates():
+    limiter = RateLimiter(10, 10)
+    # Бюджет 5: дешеве оновлення (1) лишається, дороге отримує решту (4)
+    assert limiter.background_scales([20, 1], share=0.5) == [5.0, 1.0]
+    # Обидва дорожчі за свою частку (2.5): кожне отримує її
+    assert limiter.background_scales([10, 5], share=0.5) == [4.0, 2.0]
+    assert limiter.background_scales([10, 0], share=0.5) == [2.0, 1.0]
+
+
+def test_background_intervals_fit_refill_rate(make_cex):
+    exchange = with_intervals(make_cex(
+        rate_limiter=RateLimiter.for_limit(1200, 60), request_costs={"fetch_tickers": 40, "fetch_order_book": 1},
+        symbols=BOOK_SYMBOLS,
+    ), 2, 5)
+    tickers, books = exchange.background_intervals()
+    demand = 40 / tickers + len(exchange.order_books) / books
+    assert tickers > 2 and books == 5
+    assert abs(demand - exchange.rate_limiter.rate * 0.5) < 1e-9
+
+
+def test_background_intervals_keep_configured_values_when_cheap(make_cex):
+    exchange = with_intervals(make_cex(
+        rate_limiter=RateLimiter.for_limit(200, 10), request_costs={"fetch_tickers": 1, "fetch_order_book": 1},
+        symbols=BOOK_SYMBOLS,
+    ), 2, 1)
+    assert exchange.background_intervals() == (2, 1)
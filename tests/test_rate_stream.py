@@ -0,0 +1,33 @@
+"""
+Тести розбору повідомлень клієнтів потоку курсів (/ws/rates).
+"""
+
+import json
+
+import pytest
+
+from services.rate_stream import error_message, parse_subscription
+
+
+def test_parse_subscription():
+    assert parse_subscription('{"subscribe": ["btc/usdt", "bad"], "unsubscribe": ["ETH/USDT"]}') == (
+        ["BTC/USDT"], ["ETH/USDT"],
+    )
+    assert parse_subscription("{}") == ([], [])
+
+
+@pytest.mark.parametrize("text", [
+    "not json",
+    "[1, 2]",
+    '"BTC/USDT"',
+    '{"subscribe": "BTC/USDT"}',
+    '{"subscribe": [1]}',
+    '{"unsubscribe": null}',
+])
+def test_malformed_messages_raise_value_error(text):
+    with pytest.raises(ValueError):
+        parse_subscription(text)
+
+
+def test_error_message():
+    assert json.loads(error_message("помилка")) == {"error": "помилка"}
@@ -0,0 +1,124 @@
+"""
+Тести декодування акаунтів Raydium (raydium_layouts.py) та застосування оновлень акаунтів
+адаптером RaydiumExchange: ціни пулів AMM v4 і CLMM, орієнтація пари та порядок за слотами.
+"""
+
+import asyncio
+
+import pytest
+
+from bench.fake_solana import encode_amm_v4, encode_clmm, encode_token_account
+from exchanges.quote_store import QuoteStore
+from exchanges.raydium import RaydiumExchange
+from exchanges.raydium_layouts import (
+    amm_price,
+    b58decode,
+    b58encode,
+    clmm_price,
+    decode_amm_v4,
+    decode_clmm,
+    decode_token_amount,
+)
+from supported_pairs import RAYDIUM_POOLS, SOLANA_TOKEN_MINTS
+
+SOL, USDC, USDT = SOLANA_TOKEN_MINTS["SOL"], SOLANA_TOKEN_MINTS["USDC"], SOLANA_TOKEN_MINTS["USDT"]
+BASE_VAULT = b58encode(bytes([1]) * 32)
+QUOTE_VAULT = b58encode(bytes([2]) * 32)
+
+
+def test_base58_round_trip():
+    assert b58encode(b"\0\0\x01") == "112"
+    assert b58decode("112") == b"\0\0\x01"
+    for mint in SOLANA_TOKEN_MINTS.values():
+        assert len(b58decode(mint)) == 32
+        assert b58encode(b58decode(mint)) == mint
+
+
+def test_decode_amm_v4():
+    data = encode_amm_v4(9, 6, BASE_VAULT, QUOTE_VAULT, SOL, USDT)
+    state = decode_amm_v4(data)
+    assert (state.base_decimals, state.quote_decimals) == (9, 6)
+    assert (state.base_vault, state.quote_vault) == (BASE_VAULT, QUOTE_VAULT)
+    assert (state.base_mint, state.quote_mint) == (SOL, USDT)
+    assert decode_amm_v4(data[:-1]) is None
+    # Резерви без нарахованих комісій: 10 SOL за 1500 USDT
+    assert amm_price(state._replace(quote_need_take_pnl=5 * 10 ** 6), 10 * 10 ** 9, 1505 * 10 ** 6) == 150.0
+    assert amm_price(state, 0, 10 ** 6) is None
+
+
+def test_decode_clmm():
+    liquidity = 3 << 70
+    data = encode_clmm(SOL, USDC, 9, 6, 2 ** 64 // 2, liquidity)
+    state = decode_clmm(data)
+    assert (state.mint0, state.mint1) == (SOL, USDC)
+    assert (state.decimals0, state.decimals1) == (9, 6)
+    assert state.liquidity == liquidity
+    assert state.sqrt_price_x64 == 2 ** 63
+    assert clmm_price(state) == pytest.approx(0.25 * 1000)
+    assert decode_clmm(b"\0" * 8 + data[8:]) is None
+    assert decode_clmm(data[:200]) is None
+
+
+def test_decode_token_amount():
+    assert decode_token_amount(encode_token_account(SOL, 12345)) == 12345
+    assert decode_token_amount(b"\0" * 70) is None
+
+
+@pytest.fixture
+def exchange():
+    exchange = RaydiumExchange()
+    exchange.quote_store = QuoteStore()
+    exchange.subscribed = []
+
+    async def add_accounts(pubkeys):
+        exchange.subscribed.extend(pubkeys)
+
+    exchange.stream.add_accounts = add_accounts
+    return exchange
+
+
+def test_amm_pool_price_from_vaults(exchange):
+    address = RAYDIUM_POOLS["SOL/USDT"]["pool_address"]
+
+    async def scenario():
+        exchange._on_account(address, encode_amm_v4(9, 6, BASE_VAULT, QUOTE_VAULT, SOL, USDT), 10)
+        await asyncio.sleep(0)
+        # Сховища пулу додано до підписки; ціни ще немає
+        assert exchange.subscribed == [BASE_VAULT, QUOTE_VAULT]
+        assert await exchange.get_latest_quote("SOL", "USDT") is None
+        exchange._on_account(BASE_VAULT, encode_token_account(SOL, 10 * 10 ** 9), 10)
+        exchange._on_account(QUOTE_VAULT, encode_token_account(USDT, 1500 * 10 ** 6), 10)
+        assert (await exchange.get_latest_quote("sol", "usdt")).price == 150.0
+        assert (await exchange.get_latest_quote("USDT", "SOL")).price == pytest.approx(1 / 150.0)
+        # Оновлення зі старішого слоту відкидається
+        exchange._on_account(QUOTE_VAULT, encode_token_account(USDT, 1000 * 10 ** 6), 9)
+        assert (await exchange.get_latest_price("SOL", "USDT")) == 150.0
+        exchange._on_account(QUOTE_VAULT, encode_token_account(USDT, 1600 * 10 ** 6), 11)
+        assert (await exchange.get_latest_price("SOL", "USDT")) == 160.0
+        assert exchange.is_warm()
+
+    asyncio.run(scenario())
+
+
+def test_clmm_pool_orientation(exchange):
+    address = RAYDIUM_POOLS["SOL/USDC"]["pool_address"]
+
+    async def scenario():
+        # Токени пулу впорядковані навпаки до пари: ціна USDC у SOL інвертується
+        exchange._on_account(address, encode_clmm(USDC, SOL, 6, 9, 2 ** 64 * 2), 5)
+        assert (await exchange.get_latest_price("SOL", "USDC")) == pytest.approx(1 / (4 * 10 ** -3))
+        # Акаунт іншого типу не змінює стан пулу
+        exchange._on_account(address, encode_amm_v4(9, 6, BASE_VAULT, QUOTE_VAULT, SOL, USDC), 6)
+        assert (await exchange.get_latest_price("SOL", "USDC")) == pytest.approx(250.0)
+
+    asyncio.run(scenario())
+
+
+def test_pool_with_foreign_mints_has_no_price(exchange):
+    address = RAYDIUM_POOLS["SOL/USDC"]["pool_address"]
+
+    async def scenario():
+        exchange._on_account(address, encode_clmm(SOL, USDT, 9, 6, 2 ** 64), 5)
+        assert await exchange.get_latest_quote("SOL", "USDC") is None
+
+    asyncio.run(scenario())
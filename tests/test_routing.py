@@ -0,0 +1,83 @@
+"""
+Тести графа обміну (RouteGraph): маршрути через хабові активи, вибір біржі з найкращим курсом
+на кожному кроці, оновлення графа слухачем сховища котирувань та застарілі котирування.
+"""
+
+import math
+import time
+
+import pytest
+
+from exchanges.quote_store import QuoteStore
+from services.routing import Hop, RouteGraph
+
+
+@pytest.fixture
+def store():
+    return QuoteStore()
+
+
+@pytest.fixture
+def graph(store):
+    graph = RouteGraph(["binance", "kraken"], store=store, max_hops=3, hubs=["USDT", "BTC"], ttl=30)
+    graph.start()
+    yield graph
+    graph.stop()
+
+
+def test_candidates_go_through_hubs_only(graph, store):
+    store.update("binance", "SOL/USDT", 100.0)
+    store.update("binance", "BTC/USDT", 50000.0)
+    store.update("binance", "SOL/ETH", 0.05)
+    store.update("binance", "ETH/BTC", 0.06)
+    # ETH не є хабом, тож маршрут SOL -> ETH -> BTC не розглядається
+    assert graph.candidates("SOL", "BTC") == [("SOL", "USDT", "BTC")]
+    assert graph.candidates("SOL", "USDT") == [("SOL", "USDT")]
+
+
+def test_best_route_uses_best_venue_per_hop(graph, store):
+    store.update("binance", "SOL/USDT", 100.0)
+    store.update("kraken", "SOL/USDT", 101.0)
+    store.update("binance", "BTC/USDT", 50000.0)
+    store.update("kraken", "BTC/USDT", 50500.0)
+    [route] = graph.best_routes("sol", "btc")
+    # Продаємо SOL дорожче (kraken), купуємо BTC дешевше (binance)
+    assert route.hops == (Hop("kraken", "SOL", "USDT"), Hop("binance", "USDT", "BTC"))
+    assert route.rate == pytest.approx(101.0 / 50000.0)
+
+
+def test_min_hops_skips_direct_pair(graph, store):
+    store.update("binance", "SOL/BTC", 0.0025)
+    store.update("binance", "SOL/USDT", 100.0)
+    store.update("binance", "BTC/USDT", 50000.0)
+    assert [len(route.hops) for route in graph.best_routes("SOL", "BTC", limit=5)] == [1, 2]
+    [route] = graph.best_routes("SOL", "BTC", limit=5, min_hops=2)
+    assert [hop.target for hop in route.hops] == ["USDT", "BTC"]
+
+
+def test_new_pair_rebuilds_candidates(graph, store):
+    store.update("binance", "SOL/USDT", 100.0)
+    assert graph.best_routes("SOL", "BTC") == []
+    store.update("binance", "BTC/USDT", 50000.0)
+    assert graph.candidates("SOL", "BTC") == [("SOL", "USDT", "BTC")]
+    assert len(graph.best_routes("SOL", "BTC")) == 1
+
+
+def test_pairs_without_price_or_fresh_quote_are_skipped(graph, store):
+    graph.add_pair("binance", "SOL/USDT")
+    graph.add_pair("binance", "BTC-PERP/USDT:USDT")
+    store.update("binance", "BTC/USDT", 50000.0)
+    # Ребро без курсу є кандидатом, але не дає маршруту
+    assert graph.candidates("SOL", "BTC") == [("SOL", "USDT", "BTC")]
+    assert graph.best_routes("SOL", "BTC") == []
+    store.update("binance", "SOL/USDT", 100.0, timestamp=time.time() - 60)
+    assert graph.best_routes("SOL", "BTC") == []
+    store.update("binance", "SOL/USDT", 100.0)
+    [route] = graph.best_routes("SOL", "BTC")
+    assert math.isclose(route.rate, 100.0 / 50000.0)
+
+
+def test_other_exchanges_are_ignored(graph, store):
+    store.update("gate", "SOL/USDT", 100.0)
+    store.update("gate", "BTC/USDT", 50000.0)
+    assert graph.candidates("SOL", "BTC") == []
@@ -0,0 +1,107 @@
+"""
+Тести адаптера біржі воркера (SharedQuoteExchange): ефективний курс розраховує процес збору
+даних (через Unix-сокет), його помилки зберігають свій вид, а без процесу збору даних воркер
+віддає поточний курс з таблиці.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from exchanges.base import Exchange
+from exchanges.health import PairError, Throttled
+from exchanges.quote_store import Quote
+from exchanges.shared import EffectiveQuoteClient, SharedQuoteExchange, serve_effective_quotes
+from exchanges.shared_table import SharedQuoteTable
+
+
+class DepthExchange(Exchange):
+    """Біржа процесу збору даних: ефективний курс падає з сумою; пари FOO/* відхиляються, SLOW/* - ліміт."""
+
+    def __init__(self, name: str = "binance"):
+        super().__init__(name)
+        self.calls = 0
+
+    async def get_effective_quote(self, base, quote, amount, hedge=False):
+        self.calls += 1
+        if base == "FOO":
+            raise PairError("invalid symbol")
+        if base == "SLOW":
+            raise Throttled("429")
+        # Відповіді приходять не в порядку запитів
+        await asyncio.sleep(0.01 if amount < 10 else 0.0)
+        return Quote(100.0 - amount, 1.0)
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "quotes.bin"), str(tmp_path / "effective.sock")
+
+
+def test_worker_gets_depth_aware_quote_from_ingest(paths):
+    table_path, socket_path = paths
+
+    async def scenario():
+        writer = SharedQuoteTable.create(table_path)
+        writer.write("binance", "BTC/USDT", 100.0, time.time())
+        ingest = DepthExchange()
+        server = await serve_effective_quotes([ingest], socket_path)
+        worker = SharedQuoteExchange("binance", SharedQuoteTable(table_path), EffectiveQuoteClient(socket_path))
+        try:
+            small, large = await asyncio.gather(
+                worker.get_effective_quote("BTC", "USDT", 1.0),
+                worker.get_effective_quote("BTC", "USDT", 50.0),
+            )
+            assert (small.price, large.price) == (99.0, 50.0)
+            assert ingest.calls == 2
+            with pytest.raises(PairError):
+                await worker.get_effective_quote("FOO", "USDT", 1.0)
+            with pytest.raises(Throttled):
+                await worker.get_effective_quote("SLOW", "USDT", 1.0)
+            # Біржі немає в процесі збору даних
+            unknown = SharedQuoteExchange("gate", SharedQuoteTable(table_path), EffectiveQuoteClient(socket_path))
+            assert await unknown.get_effective_quote("BTC", "USDT", 1.0) is None
+            await unknown.close()
+        finally:
+            await worker.close()
+            server.close()
+            writer.close()
+
+    asyncio.run(scenario())
+
+
+def test_worker_falls_back_to_table_without_ingest(paths):
+    table_path, socket_path = paths
+
+    async def scenario():
+        writer = SharedQuoteTable.create(table_path)
+        writer.write("binance", "BTC/USDT", 100.0, time.time())
+        worker = SharedQuoteExchange("binance", SharedQuoteTable(table_path), EffectiveQuoteClient(socket_path))
+        try:
+            assert (await worker.get_effective_quote("BTC", "USDT", 50.0)).price == 100.0
+        finally:
+            await worker.close()
+            writer.close()
+
+    asyncio.run(scenario())
+
+
+def test_client_reconnects_after_connection_loss(paths):
+    _, socket_path = paths
+
+    async def scenario():
+        server = await serve_effective_quotes([DepthExchange()], socket_path)
+        client = EffectiveQuoteClient(socket_path)
+        try:
+            assert (await client.request("binance", "BTC", "USDT", 10.0)).price == 90.0
+            client._writer.close()
+            await asyncio.sleep(0.01)
+            assert client._writer is None
+            # Наступний запит відкриває нове з'єднання
+            assert (await client.request("binance", "BTC", "USDT", 20.0)).price == 80.0
+        finally:
+            await client.close()
+            server.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,87 @@
+"""
+Тести таблиці котирувань у спільній пам'яті: запис і читання за seqlock, poll змінених слотів,
+свіжість біржі та перестворення таблиці.
+"""
+
+import struct
+import time
+
+from exchanges.shared_table import HEADER_SIZE, SharedQuoteTable
+
+
+def make_tables(tmp_path, capacity: int = 8):
+    path = str(tmp_path / "quotes.bin")
+    return SharedQuoteTable.create(path, capacity), SharedQuoteTable(path)
+
+
+def test_reader_before_writer(tmp_path):
+    reader = SharedQuoteTable(str(tmp_path / "quotes.bin"))
+    assert not reader.available()
+    assert reader.get("binance", "BTC/USDT") is None
+    assert reader.poll() == []
+    assert reader.latest_timestamp("binance") is None
+
+
+def test_write_get_and_ttl(tmp_path):
+    writer, reader = make_tables(tmp_path)
+    now = time.time()
+    writer.write("binance", "BTC/USDT", 100.0, now)
+    writer.write("binance", "BTC/USDT", 101.0, now)
+    writer.write("gate", "ETH/USDT", 10.0, now - 60)
+    assert reader.get("binance", "BTC/USDT").price == 101.0
+    assert reader.get("gate", "ETH/USDT").price == 10.0
+    assert reader.get("gate", "ETH/USDT", ttl=30) is None
+    assert reader.get("kucoin", "BTC/USDT") is None
+
+
+def test_poll_returns_only_changed_slots(tmp_path):
+    writer, reader = make_tables(tmp_path)
+    writer.write("binance", "BTC/USDT", 100.0, 1.0)
+    writer.write("binance", "ETH/USDT", 10.0, 1.0)
+    assert {(exchange, symbol) for exchange, symbol, _ in reader.poll()} == {
+        ("binance", "BTC/USDT"), ("binance", "ETH/USDT"),
+    }
+    assert reader.poll() == []
+    writer.write("binance", "ETH/USDT", 11.0, 2.0)
+    [(exchange, symbol, quote)] = reader.poll()
+    assert (exchange, symbol, quote.price, quote.timestamp) == ("binance", "ETH/USDT", 11.0, 2.0)
+
+
+def test_slot_being_written_is_not_read(tmp_path):
+    writer, reader = make_tables(tmp_path)
+    writer.write("binance", "BTC/USDT", 100.0, time.time())
+    assert reader.get("binance", "BTC/USDT") is not None
+    # Непарний seq: записувач саме змінює слот, тож читач не повертає напівзаписані дані
+    struct.pack_into("<Q", writer._mm, HEADER_SIZE, 3)
+    assert reader.get("binance", "BTC/USDT") is None
+    assert reader.poll() == []
+    struct.pack_into("<Q", writer._mm, HEADER_SIZE, 4)
+    assert reader.get("binance", "BTC/USDT").price == 100.0
+
+
+def test_latest_timestamp_per_venue(tmp_path):
+    writer, reader = make_tables(tmp_path)
+    writer.write("binance", "BTC/USDT", 100.0, 10.0)
+    writer.write("gate", "BTC/USDT", 100.0, 30.0)
+    writer.write("binance", "ETH/USDT", 10.0, 20.0)
+    assert reader.latest_timestamp("binance") == 20.0
+    assert reader.latest_timestamp("gate") == 30.0
+    assert reader.latest_timestamp("kucoin") is None
+    writer.write("binance", "BTC/USDT", 101.0, 40.0)
+    assert reader.latest_timestamp("binance") == 40.0
+
+
+def test_recreated_table_resets_reader_index(tmp_path):
+    writer, reader = make_tables(tmp_path)
+    writer.write("binance", "BTC/USDT", 100.0, 1.0)
+    assert reader.get("binance", "BTC/USDT").price == 100.0
+    writer.close()
+    # Перезапуск процесу збору даних: нова епоха, слоти виділяються заново
+    time.sleep(0.001)
+    writer = SharedQuoteTable.create(str(tmp_path / "quotes.bin"), 8)
+    writer.write("gate", "ETH/USDT", 10.0, 2.0)
+    assert reader.get("binance", "BTC/USDT") is None
+    assert reader.get("gate", "ETH/USDT").price == 10.0
+    assert reader.latest_timestamp("binance") is None
+    [(exchange, symbol, _)] = reader.poll()
+    assert (exchange, symbol) == ("gate", "ETH/USDT")
@@ -0,0 +1,80 @@
+"""
+Тести об'єднання одночасних запитів (SingleFlight): один запит на ключ, звільнення ключа після
+завершення, скасування одного очікувача та об'єднання пари зі зворотною (get_shared_quote).
+"""
+
+import asyncio
+
+import pytest
+
+from conftest import FakeCcxtClient
+from exchanges.singleflight import SingleFlight, pair_key
+
+
+def test_pair_key_is_canonical():
+    assert pair_key("btc", "usdt") == (("BTC", "USDT"), False)
+    assert pair_key("USDT", "BTC") == (("BTC", "USDT"), True)
+
+
+def test_concurrent_calls_share_one_request():
+    async def scenario():
+        flight = SingleFlight()
+        calls = []
+
+        async def request():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        results = await asyncio.gather(*(flight.do("key", request) for _ in range(10)))
+        assert results == [1] * 10
+        assert len(flight) == 0
+        # Після завершення ключ звільнено: наступний виклик - новий запит
+        assert await flight.do("key", request) == 2
+
+    asyncio.run(scenario())
+
+
+def test_error_is_shared_and_released():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def request():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream")
+
+        results = await asyncio.gather(*(flight.do("key", request) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert len(flight) == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_caller_does_not_cancel_shared_request():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def request():
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        impatient = asyncio.ensure_future(asyncio.wait_for(flight.do("key", request), 0.01))
+        patient = asyncio.ensure_future(flight.do("key", request))
+        with pytest.raises(asyncio.TimeoutError):
+            await impatient
+        assert await patient == "ok"
+
+    asyncio.run(scenario())
+
+
+def test_shared_quote_merges_pair_and_inverse(make_cex):
+    async def scenario():
+        client = FakeCcxtClient(price=4.0, delay=0.01)
+        exchange = make_cex("test_singleflight", client, symbols=["BTC/USDT"])
+        direct, inverse = await asyncio.gather(
+            exchange.get_shared_quote("BTC", "USDT"), exchange.get_shared_quote("USDT", "BTC"),
+        )
+        assert direct.price == 4.0 and inverse.price == 0.25
+        assert client.calls["fetch_ticker"] == 1
+
+    asyncio.run(scenario())
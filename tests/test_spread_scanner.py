@@ -0,0 +1,97 @@
+"""
+Тести сканера спредів: пара та зворотна до неї порівнюються в одному стовпчику, найкращі біржі
+для купівлі та продажу, застарілі котирування, сповіщення та один перерахунок на серію оновлень.
+"""
+
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from exchanges.quote_store import QuoteStore
+from services.spread_scanner import INITIAL_CAPACITY, SpreadScanner
+
+EXCHANGES = ["binance", "kraken", "gate"]
+
+
+@pytest.fixture
+def scanner():
+    return SpreadScanner(EXCHANGES, store=QuoteStore(), threshold=0.01, ttl=30)
+
+
+def test_inverse_pairs_share_a_column(scanner):
+    scanner.update("binance", "BTC/ETH", 20.0)
+    scanner.update("kraken", "ETH/BTC", 0.04)
+    [entry] = scanner.snapshot()
+    assert entry["pair"] == "BTC/ETH"
+    assert entry["rates"] == {"binance": 20.0, "kraken": 25.0}
+    assert (entry["buyExchange"], entry["sellExchange"]) == ("binance", "kraken")
+    assert entry["spread"] == pytest.approx(0.25)
+    # Фільтр за парою приймає будь-який напрямок
+    assert scanner.snapshot(pairs=["ETH/BTC"]) == [entry]
+
+
+def test_snapshot_sorts_and_filters_spreads(scanner):
+    scanner.update("binance", "BTC/USDT", 100.0)
+    scanner.update("kraken", "BTC/USDT", 102.0)
+    scanner.update("gate", "BTC/USDT", 101.0)
+    scanner.update("binance", "SOL/USDT", 10.0)
+    scanner.update("kraken", "SOL/USDT", 10.05)
+    # Пара з котируванням лише однієї біржі не має спреду
+    scanner.update("gate", "DOGE/USDT", 0.1)
+    spreads = scanner.snapshot(pairwise=True)
+    assert [entry["pair"] for entry in spreads] == ["BTC/USDT", "SOL/USDT"]
+    assert spreads[0]["pairwise"]["kraken/binance"] == pytest.approx(0.02)
+    assert spreads[0]["pairwise"]["binance/kraken"] == pytest.approx(-2 / 102)
+    assert [entry["pair"] for entry in scanner.snapshot(min_spread=0.01)] == ["BTC/USDT"]
+    assert len(scanner.snapshot(limit=1)) == 1
+    # Сповіщення - пари зі спредом не нижче порогу
+    assert [scanner.pairs[column] for column in scanner.alerts] == ["BTC/USDT"]
+
+
+def test_stale_quotes_are_ignored(scanner):
+    scanner.update("binance", "BTC/USDT", 100.0, timestamp=time.time() - 60)
+    scanner.update("kraken", "BTC/USDT", 110.0)
+    scanner.update("gate", "BTC/USDT", 101.0)
+    [entry] = scanner.snapshot()
+    assert entry["rates"] == {"kraken": 110.0, "gate": 101.0}
+    assert entry["buyExchange"] == "gate"
+
+
+def test_unknown_exchanges_and_bad_symbols_are_skipped(scanner):
+    scanner.update("okx", "BTC/USDT", 100.0)
+    scanner.update("binance", "BTC/USDT:USDT", 100.0)
+    scanner.update("binance", "BTC/USDT", 0.0)
+    assert scanner.pairs == []
+
+
+def test_matrix_grows_past_initial_capacity(scanner):
+    for i in range(INITIAL_CAPACITY + 1):
+        scanner.update("binance", f"T{i}/USDT", 1.0)
+        scanner.update("kraken", f"T{i}/USDT", 1.0 + i / 1000)
+    scanner.scan()
+    spread = scanner.result["spread"]
+    assert len(spread) == INITIAL_CAPACITY + 1
+    assert spread[-1] == pytest.approx(INITIAL_CAPACITY / 1000)
+    assert not np.isnan(spread).any()
+
+
+def test_burst_of_quotes_is_scanned_once(scanner, monkeypatch):
+    scans = []
+    scan = scanner.scan
+    monkeypatch.setattr(scanner, "scan", lambda: (scans.append(1), scan()))
+
+    async def scenario():
+        scanner.start()
+        try:
+            for i in range(100):
+                scanner.store.update("binance", f"T{i}/USDT", 1.0)
+                scanner.store.update("kraken", f"T{i}/USDT", 1.1)
+            await asyncio.sleep(0)
+        finally:
+            scanner.stop()
+
+    asyncio.run(scenario())
+    assert len(scans) == 1
+    assert len(scanner.alerts) == 100
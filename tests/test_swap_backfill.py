@@ -0,0 +1,153 @@
+"""
+Тести кешу подій Swap та завантаження історії: об'єднання діапазонів, відмова від запису з
+розривом, дозавантаження розриву, розпізнавання помилок "результат завеликий" та зупинка
+воркерів після помилки.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from exchanges import swap_backfill
+from exchanges.swap_backfill import COLUMNS, SwapBackfill, SwapCache, is_too_large
+
+POOL = "0xPool"
+
+
+def make_columns(blocks) -> dict:
+    """Колонки з однією подією на кожен блок (ціна дорівнює номеру блоку)."""
+    blocks = np.asarray(blocks, dtype="<i8")
+    columns = {name: np.zeros(len(blocks), dtype=dtype) for name, dtype in COLUMNS.items()}
+    columns["block"] = blocks
+    columns["sqrt_price_x96"] = blocks.astype("<f8")
+    return columns
+
+
+def test_write_appends_and_merges_adjacent_ranges(tmp_path):
+    cache = SwapCache(str(tmp_path))
+    cache.write(POOL, 10, 19, make_columns([12, 15]))
+    cache.write(POOL, 20, 29, make_columns([20, 25]))
+    cache.write(POOL, 5, 9, make_columns([7]))
+    assert cache.coverage(POOL) == (5, 29)
+    assert cache.read(POOL)["block"].tolist() == [7, 12, 15, 20, 25]
+    assert cache.last(POOL)["block"] == 25
+
+
+def test_write_overlap_replaces_only_rewritten_blocks(tmp_path):
+    cache = SwapCache(str(tmp_path))
+    cache.write(POOL, 10, 29, make_columns([12, 15, 20, 25]))
+    cache.write(POOL, 14, 21, make_columns([14, 21]))
+    assert cache.coverage(POOL) == (10, 29)
+    assert cache.read(POOL)["block"].tolist() == [12, 14, 21, 25]
+    assert cache.read(POOL, 13, 22)["block"].tolist() == [14, 21]
+
+
+def test_write_with_gap_keeps_existing_history(tmp_path):
+    cache = SwapCache(str(tmp_path))
+    cache.write(POOL, 10, 19, make_columns([12, 15]))
+    with pytest.raises(ValueError):
+        cache.write(POOL, 30, 39, make_columns([31]))
+    with pytest.raises(ValueError):
+        cache.write(POOL, 0, 5, make_columns([3]))
+    assert cache.coverage(POOL) == (10, 19)
+    assert cache.read(POOL)["block"].tolist() == [12, 15]
+
+
+class RecordingBackfill(SwapBackfill):
+    """Завантаження без вузла: події генеруються для кожного десятого блоку запитаного діапазону."""
+
+    def __init__(self, cache, **kwargs):
+        super().__init__("ws://unused", cache, **kwargs)
+        self.requests = []
+
+    async def fetch(self, addresses, from_block, to_block):
+        self.requests.append((from_block, to_block))
+        blocks = [block for block in range(from_block, to_block + 1) if block % 10 == 0]
+        pools = np.array([address.lower() for address in addresses for _ in blocks], dtype=object)
+        return pools, make_columns([block for _ in addresses for block in blocks])
+
+
+def test_backfill_fetches_gap_to_keep_coverage_contiguous(tmp_path):
+    cache = SwapCache(str(tmp_path))
+    backfill = RecordingBackfill(cache)
+    asyncio.run(backfill.backfill([POOL], 100, 199))
+    asyncio.run(backfill.backfill([POOL], 300, 399))
+    asyncio.run(backfill.backfill([POOL], 0, 49))
+    assert backfill.requests == [(100, 199), (200, 399), (0, 99)]
+    assert cache.coverage(POOL) == (0, 399)
+    assert cache.read(POOL)["block"].tolist() == list(range(0, 400, 10))
+    asyncio.run(backfill.backfill([POOL], 150, 250))
+    assert len(backfill.requests) == 3
+
+
+def test_backfill_starts_new_segment_after_long_gap(tmp_path):
+    cache = SwapCache(str(tmp_path))
+    backfill = RecordingBackfill(cache, max_gap_blocks=100)
+    asyncio.run(backfill.backfill([POOL], 0, 99))
+    # Розрив 100 блоків дозавантажується, довший - ні
+    asyncio.run(backfill.backfill([POOL], 200, 299))
+    asyncio.run(backfill.backfill([POOL], 10_000, 10_099))
+    assert backfill.requests == [(0, 99), (100, 299), (10_000, 10_099)]
+    assert cache.coverage(POOL) == (10_000, 10_099)
+    assert cache.read(POOL)["block"].tolist() == list(range(10_000, 10_100, 10))
+    # Стара історія збережена в архівному сегменті
+    assert cache.meta(f"{POOL}.0-299") == {"from_block": 0, "to_block": 299, "rows": 30}
+
+
+@pytest.mark.parametrize("message", [
+    "query returned more than 10000 results",
+    "Log response size exceeded. You can make eth_getLogs requests with up to a 2K block range",
+    "query exceeds max results 20000",
+    "exceed maximum block range: 5000",
+    "block range is too wide",
+    "eth_getLogs is limited to a 10,000 range",
+])
+def test_too_large_messages(message):
+    assert is_too_large({"code": -32000, "message": message})
+
+
+@pytest.mark.parametrize("error", [
+    {"code": -32005, "message": "project ID request rate exceeded"},
+    {"code": -32000, "message": "invalid block range params"},
+    {"code": -32602, "message": "fromBlock exceeds toBlock"},
+])
+def test_other_errors_are_not_too_large(error):
+    assert not is_too_large(error)
+
+
+class FakeSocket:
+    async def close(self):
+        pass
+
+
+def test_fetch_cancels_workers_after_failure(monkeypatch):
+    started = []
+    cancelled = []
+
+    async def connect(url, max_size=None):
+        return FakeSocket()
+
+    async def get_logs(self, ws, addresses, start, end):
+        started.append(start)
+        if start == 0:
+            raise swap_backfill.LogsTooLarge("query returned more than 10000 results")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(start)
+            raise
+        return []
+
+    monkeypatch.setattr(swap_backfill.websockets, "connect", connect)
+    monkeypatch.setattr(SwapBackfill, "_get_logs", get_logs)
+    backfill = SwapBackfill("ws://unused", SwapCache("unused"), concurrency=3, chunk_blocks=1)
+
+    async def scenario():
+        with pytest.raises(swap_backfill.LogsTooLarge):
+            await asyncio.wait_for(backfill.fetch([POOL], 0, 2), 2)
+        # Решта воркерів зупинені до повернення з fetch, а не лише при закритті циклу подій
+        assert sorted(cancelled) == [1, 2]
+
+    asyncio.run(scenario())
+    assert sorted(started) == [0, 1, 2]
@@ -0,0 +1,64 @@
+"""
+Тести декодування логів подій Swap: одиночний та пакетний декодери дають однакові значення,
+а логи неправильної форми (не 3 topics чи не 5 слів data) пропускаються.
+"""
+
+from exchanges.swap_stream import SWAP_TOPIC, SwapLogStream, decode_swap_columns, decode_swap_log
+
+ADDRESS = "0x00000000000000000000000000000000000000A1"
+ZERO_TOPIC = "0x" + "00" * 32
+
+
+def word(value: int) -> str:
+    return (value % (1 << 256)).to_bytes(32, "big").hex()
+
+
+def swap_log(values=(-5, 7, 2 ** 96, 10 ** 18, -887272), topics=None, block: int = 10, log_index: int = 1) -> dict:
+    return {
+        "address": ADDRESS,
+        "topics": topics if topics is not None else [SWAP_TOPIC, ZERO_TOPIC, ZERO_TOPIC],
+        "data": "0x" + "".join(word(value) for value in values),
+        "blockNumber": hex(block),
+        "logIndex": hex(log_index),
+        "transactionHash": "0x" + "ab" * 32,
+    }
+
+
+def test_decode_swap_log():
+    event = decode_swap_log(swap_log())
+    assert event.address == ADDRESS.lower()
+    assert (event.block_number, event.log_index) == (10, 1)
+    assert (event.amount0, event.amount1) == (-5, 7)
+    assert (event.sqrt_price_x96, event.liquidity, event.tick) == (2 ** 96, 10 ** 18, -887272)
+
+
+def test_other_events_are_ignored():
+    assert decode_swap_log(swap_log(topics=["0x" + "12" * 32, ZERO_TOPIC, ZERO_TOPIC])) is None
+    assert decode_swap_log(swap_log(topics=[])) is None
+
+
+def test_malformed_swap_logs_are_skipped():
+    assert decode_swap_log(swap_log(values=(1, 2, 3, 4))) is None
+    assert decode_swap_log(swap_log(values=(1, 2, 3, 4, 5, 6))) is None
+    assert decode_swap_log(swap_log(topics=[SWAP_TOPIC, ZERO_TOPIC])) is None
+    malformed = swap_log()
+    malformed["data"] = "0x" + "zz" * 160
+    assert decode_swap_log(malformed) is None
+
+
+def test_columns_skip_malformed_logs():
+    logs = [swap_log(block=1), swap_log(values=(1, 2, 3, 4), block=2), swap_log(block=3)]
+    addresses, columns = decode_swap_columns(logs)
+    assert addresses == [ADDRESS.lower()] * 2
+    assert columns["block"].tolist() == [1, 3]
+    assert columns["tick"].tolist() == [-887272, -887272]
+    assert columns["amount0"].tolist() == [-5.0, -5.0]
+
+
+def test_stream_skips_malformed_log():
+    events = []
+    stream = SwapLogStream("ws://localhost", [ADDRESS], events.append)
+    stream._handle_log(swap_log(values=(1, 2, 3), block=5))
+    stream._handle_log(swap_log(block=6))
+    assert [event.block_number for event in events] == [6]
+    assert stream.last_block == 6
@@ -0,0 +1,82 @@
+"""
+Тести стану пулів Uniswap: оновлення ліквідності не перезаписує ціну пулу застарілим slot0(),
+якщо під час читання тіків надійшла новіша подія Swap.
+"""
+
+import asyncio
+
+import pytest
+
+from exchanges.multicall import GET_BLOCK_NUMBER_SELECTOR, LIQUIDITY_SELECTOR, SLOT0_SELECTOR, TICKS_SELECTOR
+from exchanges.pool_registry import PoolInfo
+from exchanges.swap_stream import SwapEvent
+from exchanges.uniswap import PoolState, UniswapExchange
+
+ADDRESS = "0x00000000000000000000000000000000000000a1"
+SQRT_PRICE = 2 ** 96
+LIQUIDITY = 10 ** 18
+SLOT0_BLOCK = 100
+
+
+def word(value: int) -> bytes:
+    return value.to_bytes(32, "big", signed=True)
+
+
+@pytest.fixture
+def exchange():
+    exchange = UniswapExchange()
+    info = PoolInfo("AAA/BBB", ADDRESS, "0xaaa", "0xbbb", 18, 18, 3000)
+    pool = exchange.pools[ADDRESS] = PoolState(info)
+    pool.tracked = True
+    return exchange
+
+
+def fake_aggregate(exchange, on_ticks=None):
+    """
+    Підмінює Multicall3: slot0() прочитано в блоці SLOT0_BLOCK, у кожному слові tickBitmap
+    ініціалізовано нульовий біт. on_ticks викликається перед відповіддю на пакет ticks().
+    """
+    async def aggregate(calls):
+        results = []
+        for _, _, data in calls:
+            selector = data[:4]
+            if selector == GET_BLOCK_NUMBER_SELECTOR:
+                results.append((True, word(SLOT0_BLOCK)))
+            elif selector == SLOT0_SELECTOR:
+                results.append((True, word(SQRT_PRICE) + word(0)))
+            elif selector == LIQUIDITY_SELECTOR:
+                results.append((True, word(LIQUIDITY)))
+            elif selector == TICKS_SELECTOR:
+                results.append((True, word(LIQUIDITY) + word(0)))
+            else:
+                # fee(), tickSpacing() та tickBitmap()
+                results.append((True, word(1)))
+        if on_ticks is not None and calls[0][2][:4] == TICKS_SELECTOR:
+            on_ticks()
+        return results
+
+    exchange._aggregate = aggregate
+
+
+def test_refresh_liquidity_applies_newer_slot0(exchange):
+    fake_aggregate(exchange)
+    asyncio.run(exchange.refresh_liquidity())
+    pool = exchange.pools[ADDRESS]
+    assert pool.sqrt_price_x96 == SQRT_PRICE
+    assert pool.tick == 0
+    assert pool.liquidity == LIQUIDITY
+    assert pool.last_event[0] == SLOT0_BLOCK
+    assert pool.ticks
+
+
+def test_refresh_liquidity_keeps_newer_swap_price(exchange):
+    pool = exchange.pools[ADDRESS]
+    swap = SwapEvent(ADDRESS, SLOT0_BLOCK + 1, 0, 10 ** 18, -10 ** 18, 2 * SQRT_PRICE, 2 * LIQUIDITY, 13863)
+    fake_aggregate(exchange, on_ticks=lambda: exchange._on_swap(swap))
+    asyncio.run(exchange.refresh_liquidity())
+    assert pool.sqrt_price_x96 == 2 * SQRT_PRICE
+    assert pool.tick == 13863
+    assert pool.liquidity == 2 * LIQUIDITY
+    assert pool.last_event == (SLOT0_BLOCK + 1, 0)
+    # Тіки все одно оновлено
+    assert pool.ticks
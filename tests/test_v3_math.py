@@ -0,0 +1,87 @@
+"""
+Тести симуляції обміну в пулі Uniswap V3 та розбору tickBitmap.
+"""
+
+import math
+
+from exchanges.v3_math import (
+    Q96, bitmap_tick_range, bitmap_word_range, simulate_exact_input, tick_to_sqrt_price, ticks_from_bitmap,
+)
+
+LIQUIDITY = 10 ** 6
+# Ініціалізовані тіки далеко від поточної ціни: обмін не виходить за межі діапазону
+FAR_TICKS = [(-500_000, LIQUIDITY), (500_000, -LIQUIDITY)]
+
+
+def test_tick_to_sqrt_price():
+    assert tick_to_sqrt_price(0) == 1.0
+    assert math.isclose(tick_to_sqrt_price(2), 1.0001)
+    assert math.isclose(tick_to_sqrt_price(-2), 1 / 1.0001)
+
+
+def test_exact_input_within_one_range():
+    # При ціні 1 та сталій ліквідності L: out = L * x / (L + x) в обидва боки
+    for zero_for_one in (True, False):
+        out = simulate_exact_input(Q96, LIQUIDITY, 0, FAR_TICKS, 1000, zero_for_one, 0)
+        assert math.isclose(out, LIQUIDITY * 1000 / (LIQUIDITY + 1000))
+
+
+def test_fee_is_taken_from_input():
+    with_fee = simulate_exact_input(Q96, LIQUIDITY, 0, FAR_TICKS, 1000, True, 3000)
+    without_fee = simulate_exact_input(Q96, LIQUIDITY, 0, FAR_TICKS, 997, True, 0)
+    assert math.isclose(with_fee, without_fee)
+
+
+def test_crossing_tick_changes_liquidity():
+    # Нижче тіка -100 ліквідність удвічі більша: liquidityNet = -L при перетині вниз додає L
+    ticks = [(-200_000, 2 * LIQUIDITY), (-100, -LIQUIDITY), (500_000, -LIQUIDITY)]
+    target = tick_to_sqrt_price(-100)
+    to_tick = LIQUIDITY * (1 / target - 1)
+    out_to_tick = LIQUIDITY * (1 - target)
+    extra = 1000
+    out = simulate_exact_input(Q96, LIQUIDITY, 0, ticks, to_tick + extra, True, 0)
+    liquidity = 2 * LIQUIDITY
+    next_sqrt_price = 1 / (1 / target + extra / liquidity)
+    assert math.isclose(out, out_to_tick + liquidity * (target - next_sqrt_price))
+
+
+def test_insufficient_liquidity_returns_none():
+    # Після тіка -100 ліквідності немає, а інших тіків не завантажено
+    ticks = [(-100, LIQUIDITY)]
+    assert simulate_exact_input(Q96, LIQUIDITY, 0, ticks, 10 ** 9, True, 0) is None
+    assert simulate_exact_input(Q96, LIQUIDITY, 0, ticks, 100, True, 0) is not None
+
+
+def test_swap_leaving_loaded_bitmap_range_returns_none():
+    # Тіки завантажено лише в межах [-1000, 1000): далі можуть бути тіки, яких симуляція не бачила
+    tick_range = (-1000, 1000)
+    to_edge = LIQUIDITY * (1 / tick_to_sqrt_price(-1000) - 1)
+    assert simulate_exact_input(Q96, LIQUIDITY, 0, [], to_edge / 2, True, 0, tick_range) is not None
+    assert simulate_exact_input(Q96, LIQUIDITY, 0, [], to_edge * 2, True, 0, tick_range) is None
+    assert simulate_exact_input(Q96, LIQUIDITY, 0, [], to_edge * 2, True, 0) is not None
+    # Угору: після останнього завантаженого тіка обмін доходить до межі діапазону
+    ticks = [(500, 0)]
+    to_upper = LIQUIDITY * (tick_to_sqrt_price(1000) - 1)
+    assert simulate_exact_input(Q96, LIQUIDITY, 0, ticks, to_upper * 0.9, False, 0, tick_range) is not None
+    assert simulate_exact_input(Q96, LIQUIDITY, 0, ticks, to_upper * 1.1, False, 0, tick_range) is None
+    # Поточна ціна вже поза завантаженим діапазоном
+    assert simulate_exact_input(Q96, LIQUIDITY, 1000, [], 1, True, 0, tick_range) is None
+
+
+def test_bitmap_tick_range():
+    assert bitmap_tick_range(0, 60, 2) == (-2 * 256 * 60, 3 * 256 * 60)
+    assert bitmap_tick_range(-1, 1, 0) == (-256, 0)
+
+
+def test_bitmap_word_range():
+    assert bitmap_word_range(0, 60, 2) == range(-2, 3)
+    # Від'ємні тіки округлюються вниз: тік -1 належить слову -1
+    assert bitmap_word_range(-1, 1, 0) == range(-1, 0)
+    assert bitmap_word_range(256 * 60, 60, 1) == range(0, 3)
+
+
+def test_ticks_from_bitmap():
+    assert ticks_from_bitmap(0, 0b101, 10) == [0, 20]
+    assert ticks_from_bitmap(1, 1, 60) == [256 * 60]
+    assert ticks_from_bitmap(-1, 1 << 255, 1) == [-1]
+    assert ticks_from_bitmap(3, 0, 10) == []